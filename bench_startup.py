@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""Headless startup benchmark for both entry points.
+
+Runs `cognito_v0.1.py` (Qt, offscreen platform) and `main.py` (pygame, SDL dummy drivers)
+with `-X importtime`, lets each pick a language automatically and exit once interactive,
+and records per run:
+  - the phase timings the app reports through startup_profile (ms since process start),
+  - the wall time until the process exited,
+  - the child's peak RSS,
+  - an import-time breakdown aggregated per top-level package.
+
+Usage:
+    python bench_startup.py                      # both entry points, 5 runs each
+    python bench_startup.py --entry qt --runs 10 --output bench_results/startup.json
+    python bench_startup.py --compare old.json new.json [--threshold 10]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ENTRY_POINTS = {
+    'qt': 'cognito_v0.1.py',
+    'pygame': 'main.py',
+}
+
+HEADLESS_ENV = {
+    'QT_QPA_PLATFORM': 'offscreen',
+    'SDL_VIDEODRIVER': 'dummy',
+    'SDL_AUDIODRIVER': 'dummy',
+    'PYTHONUNBUFFERED': '1',
+    'COGNITO_TOKEN_LEDGER': '', # Benchmark turns are not real usage
+    'COGNITO_RESPONSE_BANK': '', # Every turn goes to the (canned) model
+    'COGNITO_PROMPT_CACHE_SIZE': '0',
+}
+
+DEFAULT_RUNS = 5
+DEFAULT_TIMEOUT = 60.0 # Seconds before a run is considered hung
+DEFAULT_THRESHOLD = 10.0 # Percent slowdown flagged as a regression by --compare
+TOP_IMPORTS = 15 # Packages kept in the import breakdown of each run
+
+
+def parse_importtime(stderr_text):
+    """Aggregates `-X importtime` output into cumulative microseconds per top-level package.
+
+    Only lines for top-level imports (no leading indentation in the package column) are
+    counted, so nested imports are not double counted.
+    """
+    totals = {}
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue # Header line
+        name = parts[2].rstrip()
+        if name.startswith("  "):
+            continue # Nested import, already included in its parent's cumulative time
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + cumulative_us
+    return totals
+
+
+def _wait_with_rusage(proc, timeout):
+    """Waits for a child and returns (returncode, peak_rss_kb). Kills it on timeout."""
+    deadline = time.monotonic() + timeout
+    while True:
+        pid, status, rusage = os.wait4(proc.pid, os.WNOHANG)
+        timed_out = not pid and time.monotonic() > deadline
+        if timed_out:
+            proc.kill()
+            pid, status, rusage = os.wait4(proc.pid, 0)
+        if pid:
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is reported in bytes on macOS and KiB on Linux
+            peak = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+            return (None if timed_out else proc.returncode), peak
+        time.sleep(0.01)
+
+
+def run_once(entry, language='en', timeout=DEFAULT_TIMEOUT):
+    """Launches one headless run of an entry point and returns its measurements."""
+    script = os.path.join(SCRIPT_DIR, ENTRY_POINTS[entry])
+    fd, report_path = tempfile.mkstemp(prefix=f"startup-{entry}-", suffix=".json")
+    os.close(fd)
+    os.remove(report_path) # The app creates it when it becomes interactive
+
+    env = dict(os.environ, **HEADLESS_ENV)
+    env['COGNITO_STARTUP_REPORT'] = report_path
+    env['COGNITO_AUTOSELECT_LANG'] = language
+
+    with tempfile.TemporaryFile() as stdout_file, tempfile.TemporaryFile() as stderr_file:
+        started = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, "-X", "importtime", script], cwd=SCRIPT_DIR, env=env,
+                                stdin=subprocess.DEVNULL, stdout=stdout_file, stderr=stderr_file)
+        returncode, peak_rss_kb = _wait_with_rusage(proc, timeout)
+        wall_ms = (time.perf_counter() - started) * 1000
+        stderr_file.seek(0)
+        stderr_text = stderr_file.read().decode('utf-8', errors='replace')
+
+    result = {
+        'returncode': returncode,
+        'timed_out': returncode is None,
+        'wall_ms': wall_ms,
+        'peak_rss_kb': peak_rss_kb,
+        'phases_ms': {},
+        'imports_us': {},
+    }
+    imports = parse_importtime(stderr_text)
+    result['imports_us'] = dict(sorted(imports.items(), key=lambda kv: kv[1], reverse=True)[:TOP_IMPORTS])
+    result['imports_total_us'] = sum(imports.values())
+
+    if os.path.exists(report_path):
+        with open(report_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        os.remove(report_path)
+        result['phases_ms'] = report.get('phases_ms', {})
+        result['app_peak_rss_kb'] = report.get('peak_rss_kb')
+        if 'window_phases_ms' in report:
+            result['window_phases_ms'] = report['window_phases_ms']
+    else:
+        # Keep the tail of the output: the run never reached the interactive state
+        output_lines = [line for line in stderr_text.splitlines() if not line.startswith("import time:")]
+        result['error'] = output_lines[-5:]
+    return result
+
+
+def summarize(runs):
+    """Median/min/max for every numeric measurement across runs."""
+    samples = {}
+    for run in runs:
+        if run.get('timed_out') or not run['phases_ms']:
+            continue
+        for key in ('wall_ms', 'peak_rss_kb', 'imports_total_us'):
+            samples.setdefault(key, []).append(run[key])
+        for phase, value in run['phases_ms'].items():
+            samples.setdefault(f"phase.{phase}", []).append(value)
+    return {key: {'median': statistics.median(values), 'min': min(values), 'max': max(values), 'n': len(values)}
+            for key, values in samples.items()}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(entries, runs, language, timeout):
+    results = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runs': runs,
+            'language': language,
+        },
+        'entries': {},
+    }
+    for entry in entries:
+        entry_runs = []
+        for i in range(runs):
+            run = run_once(entry, language, timeout)
+            status = "timeout" if run['timed_out'] else f"exit {run['returncode']}"
+            print(f"[{entry}] run {i + 1}/{runs}: {run['wall_ms']:.0f} ms wall, "
+                  f"interactive {run['phases_ms'].get('interactive', float('nan')):.0f} ms, "
+                  f"peak RSS {run['peak_rss_kb']} KiB ({status})")
+            entry_runs.append(run)
+        results['entries'][entry] = {'runs': entry_runs, 'summary': summarize(entry_runs)}
+    return results
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD):
+    """Prints per-measurement median deltas between two result files. Returns the regressions."""
+    regressions = []
+    for entry, new_data in new['entries'].items():
+        old_summary = old.get('entries', {}).get(entry, {}).get('summary', {})
+        print(f"== {entry} ({old['meta'].get('revision')} -> {new['meta'].get('revision')}) ==")
+        for key, stats in sorted(new_data['summary'].items()):
+            if key not in old_summary:
+                print(f"  {key:32s} {stats['median']:12.1f}  (new)")
+                continue
+            before = old_summary[key]['median']
+            after = stats['median']
+            delta_pct = ((after - before) / before * 100) if before else 0.0
+            flag = ""
+            if delta_pct > threshold:
+                flag = "  REGRESSION"
+                regressions.append((entry, key, before, after, delta_pct))
+            print(f"  {key:32s} {before:12.1f} -> {after:12.1f}  {delta_pct:+6.1f}%{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless startup benchmark for the Cognito entry points.")
+    parser.add_argument('--entry', choices=sorted(ENTRY_POINTS), action='append',
+                        help="Entry point to measure (repeatable; default: all)")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS)
+    parser.add_argument('--language', choices=['en', 'ko'], default='en')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument('--output', help="Result file (default: bench_results/startup-<revision>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="Compare two result files")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Percent increase reported as a regression by --compare")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], 'r', encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.compare[1], 'r', encoding='utf-8') as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.threshold)
+        return 1 if regressions else 0
+
+    results = run_benchmark(args.entry or sorted(ENTRY_POINTS), args.runs, args.language, args.timeout)
+    output = args.output or os.path.join(SCRIPT_DIR, "bench_results",
+                                         f"startup-{results['meta']['revision'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
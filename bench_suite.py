@@ -0,0 +1,529 @@
+# -*- coding: utf-8 -*-
+"""In-process benchmark suite for the engine, the matchers and the rendering paths.
+
+Three layers:
+  micro   tr(), keyword detection, prompt assembly and the chat HTML formatting of
+          display_user_message / display_aura_message (written to a sink, not a QTextEdit),
+          and the local reply engine's nearest-neighbour lookup
+  macro   full send_prompt turns on an offscreen CognitoWindow, against a canned LLM
+  render  offscreen rendering: the Qt window with a filled chat, and the pygame UI
+          (chat box, BSOD overlay) on the SDL dummy driver
+
+Every case is auto-calibrated to run for about --min-time per repeat; the per-operation
+median/min/max over the repeats (microseconds) is stored. Cases whose dependency is not
+installed (PySide6, pygame) are recorded as skipped.
+
+Usage:
+    python bench_suite.py                                 # all layers
+    python bench_suite.py --layer micro --filter format   # a subset
+    python bench_suite.py --output bench_results/suite-baseline.json
+    python bench_suite.py --compare old.json new.json [--threshold 10]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from bench_startup import HEADLESS_ENV, git_revision
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+LAYERS = ('micro', 'macro', 'render')
+DEFAULT_REPEATS = 5
+DEFAULT_MIN_TIME = 0.2 # Seconds per repeat
+DEFAULT_THRESHOLD = 10.0 # Percent slowdown flagged as a regression by --compare
+CHAT_RESET_TURNS = 50 # Macro turns before the chat is cleared, so the document does not keep growing
+FILLED_CHAT_MESSAGES = 40 # Messages in the chat for the render cases
+
+SAMPLE_PROMPTS = [
+    "hello, who are you?",
+    "Can you look up the latest news about the weather in Seoul?",
+    "please calculate the prime factors of 982451653 and simulate the results",
+    "I think something is wrong with you. are you okay?",
+    "오늘 날씨 검색해줘",
+]
+SAMPLE_REPLY = ("I have analysed your request. The data stream is stable, although several "
+                "sectors report <i>unexpected</i> activity. Shall I continue monitoring?")
+
+BENCHMARKS = [] # (layer, name, setup); setup(fixtures) returns the callable that is timed
+
+
+class Skip(Exception):
+    """Raised by a setup function when the case cannot run here."""
+
+
+def benchmark(layer, name):
+    def register(setup):
+        BENCHMARKS.append((layer, name, setup))
+        return setup
+    return register
+
+
+def measure(fn, repeats=DEFAULT_REPEATS, min_time=DEFAULT_MIN_TIME, clock=time.perf_counter):
+    """Times fn: calibrates the iteration count to about min_time, then runs repeats batches.
+    Returns per-operation statistics in microseconds."""
+    number = 1
+    while True:
+        started = clock()
+        for _ in range(number):
+            fn()
+        elapsed = clock() - started
+        if elapsed >= min_time / 10 or number >= 1 << 20:
+            break
+        number *= 2
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    per_op = []
+    for _ in range(repeats):
+        started = clock()
+        for _ in range(number):
+            fn()
+        per_op.append((clock() - started) / number * 1e6)
+    return {'median': statistics.median(per_op), 'min': min(per_op), 'max': max(per_op),
+            'n': repeats, 'iterations': number, 'unit': 'us'}
+
+
+# --- Fixtures ---
+
+class CannedModel:
+    """Stands in for the Gemini model: returns the same reply without any I/O."""
+
+    def __init__(self, text=SAMPLE_REPLY):
+        part = SimpleNamespace(text=text)
+        self._response = SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+        self.calls = 0
+
+    def generate_content(self, prompt, **options):
+        self.calls += 1
+        return self._response
+
+
+class ChatSink:
+    """Accepts what the display_* methods write to the chat QTextEdit and keeps the last HTML."""
+
+    def __init__(self):
+        self.last_html = None
+
+    def textCursor(self):
+        return self
+
+    def movePosition(self, operation):
+        pass
+
+    def setTextCursor(self, cursor):
+        pass
+
+    def insertHtml(self, html):
+        self.last_html = html
+
+    def ensureCursorVisible(self):
+        pass
+
+
+class SinkView:
+    """A CognitoWindow seen through a ChatSink: window methods called on it format as usual but
+    do not touch the real chat widget or history."""
+
+    def __init__(self, window):
+        self._window = window
+        self.chat_display = ChatSink()
+        self.history = []
+
+    def __getattr__(self, name):
+        return getattr(self._window, name)
+
+
+class Fixtures:
+    """Lazily built, shared environments for the cases."""
+
+    def __init__(self):
+        self._cognito = None
+        self._qt_window = None
+        self._pygame = None
+
+    def cognito(self):
+        """The Qt frontend module (cognito_v0.1.py), with an offscreen QApplication."""
+        if self._cognito is None:
+            for key, value in HEADLESS_ENV.items():
+                os.environ.setdefault(key, value)
+            try:
+                from PySide6 import QtWidgets
+            except ImportError as e:
+                raise Skip(f"PySide6 not available ({e})")
+            import importlib.util
+            self._qt_app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+            spec = importlib.util.spec_from_file_location("cognito_bench", os.path.join(SCRIPT_DIR, "cognito_v0.1.py"))
+            self._cognito = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(self._cognito)
+        return self._cognito
+
+    def qt_window(self):
+        """An offscreen CognitoWindow with the canned model and no LLM client setup."""
+        if self._qt_window is None:
+            cognito = self.cognito()
+            from unittest.mock import patch
+            with patch.object(cognito.CognitoWindow, 'setup_llm_client'), \
+                 patch.object(cognito.CognitoWindow, 'showFullScreen'):
+                window = cognito.CognitoWindow(language='en', sound_bank=SilentSoundBank())
+            window.llm_model = CannedModel()
+            window.resize(1280, 800)
+            window.show()
+            self._qt_window = window
+        return self._qt_window
+
+    def pygame_game(self):
+        """(pygame module, main module, Game, UIManager, surface) on the SDL dummy driver."""
+        if self._pygame is None:
+            for key, value in HEADLESS_ENV.items():
+                os.environ.setdefault(key, value)
+            try:
+                import pygame
+                import pygame_gui
+            except ImportError as e:
+                raise Skip(f"pygame / pygame_gui not available ({e})")
+            import main
+            pygame.init()
+            surface = pygame.display.set_mode((800, 600))
+            fd, theme_path = tempfile.mkstemp(prefix="bench-theme-", suffix=".json")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(main.THEME_JSON, f)
+            manager = pygame_gui.UIManager((800, 600), theme_path)
+            os.remove(theme_path)
+            if os.path.exists(main.FONT_PATH):
+                manager.add_font_paths("neo_font", main.FONT_PATH)
+            game = main.Game(manager, surface, SilentSoundBank())
+            game.select_language('en')
+            self._pygame = (pygame, main, game, manager, surface)
+        return self._pygame
+
+
+class SilentSoundBank:
+    """Sound bank stand-in: every cue counts as played, nothing is loaded or heard."""
+
+    def play(self, name):
+        return True
+
+    def is_ready(self, name):
+        return True
+
+    def all_settled(self):
+        return True
+
+
+# --- Micro ---
+
+@benchmark('micro', 'tr')
+def _bench_tr(fixtures):
+    import translation_catalog
+    catalog = translation_catalog.load('qt', 'en')
+    keys = ['YOU_LABEL', 'AURA_LABEL', 'STATUS_THINKING', 'SYS_PROMPT_DEFAULT', 'NOT_A_KEY']
+    def run():
+        for key in keys:
+            catalog.get(key)
+    return run
+
+
+@benchmark('micro', 'keyword_detection')
+def _bench_keyword_detection(fixtures):
+    cognito = fixtures.cognito()
+    internet = cognito.INTERNET_KEYWORDS['en'] + cognito.INTERNET_KEYWORDS['ko']
+    computation = cognito.COMPUTATION_KEYWORDS['en'] + cognito.COMPUTATION_KEYWORDS['ko']
+    prompts = [prompt.lower() for prompt in SAMPLE_PROMPTS]
+    def run():
+        for prompt in prompts:
+            any(keyword in prompt for keyword in internet)
+            any(keyword in prompt for keyword in computation)
+    return run
+
+
+@benchmark('micro', 'prompt_assembly')
+def _bench_prompt_assembly(fixtures):
+    """generate_aura_response in NORMAL_INTERNET_ONLY: keyword checks, state machine, prompt and
+    reply handling around a canned model."""
+    cognito = fixtures.cognito()
+    view = SinkView(fixtures.qt_window())
+    view.llm_model = CannedModel()
+    view.game_state = "NORMAL_INTERNET_ONLY"
+    view.internet_enabled = True
+    view.mcp_enabled = True # Computation prompts do not switch state
+    view.pending_prompt = None
+    view.statusBar = lambda: SimpleNamespace(showMessage=lambda *args: None)
+    generate = cognito.CognitoWindow.generate_aura_response
+    def run():
+        for prompt in SAMPLE_PROMPTS:
+            generate(view, prompt)
+    return run
+
+
+@benchmark('micro', 'format_user_message')
+def _bench_format_user_message(fixtures):
+    cognito = fixtures.cognito()
+    view = SinkView(fixtures.qt_window())
+    display = cognito.CognitoWindow.display_user_message
+    def run():
+        for prompt in SAMPLE_PROMPTS:
+            display(view, prompt)
+        view.history.clear()
+    return run
+
+
+@benchmark('micro', 'format_aura_message')
+def _bench_format_aura_message(fixtures):
+    cognito = fixtures.cognito()
+    window = fixtures.qt_window()
+    view = SinkView(window)
+    display = cognito.CognitoWindow.display_aura_message
+    texts = [SAMPLE_REPLY, window.tr('RESPONSE_BLOCKED'), window.tr('MALWARE_DETECTED')]
+    def run():
+        for text in texts:
+            display(view, text)
+        view.history.clear()
+    return run
+
+
+@benchmark('micro', 'local_reply_lookup')
+def _bench_local_reply_lookup(fixtures):
+    import local_replies
+    import response_bank
+    import warm_cache
+    bank = response_bank.ResponseBank()
+    for language, prompts in warm_cache.DEFAULT_CORPUS.items():
+        for i in range(local_replies.LEARNED_LIMIT):
+            bank.add('SYS_PROMPT_HOSTILE', language, f"{prompts[i % len(prompts)]} {i}", SAMPLE_REPLY)
+    engine = local_replies.LocalReplies('bench', bank, states=())
+    keys = [('SYS_PROMPT_HOSTILE', 'en')] * 4 + [('SYS_PROMPT_HOSTILE', 'ko')]
+    engine.reply(keys[0], SAMPLE_PROMPTS[0]) # Builds the indexes outside the timing
+    engine.reply(keys[-1], SAMPLE_PROMPTS[-1])
+    def run():
+        for key, prompt in zip(keys, SAMPLE_PROMPTS):
+            engine.reply(key, prompt)
+    return run
+
+
+@benchmark('micro', 'local_reply_learn')
+def _bench_local_reply_learn(fixtures):
+    """A turn's learn() of the LLM's reply followed by the next turn's lookup, learned index full."""
+    import local_replies
+    import response_bank
+    import warm_cache
+    bank = response_bank.ResponseBank()
+    prompts = warm_cache.DEFAULT_CORPUS['en']
+    for i in range(local_replies.LEARNED_LIMIT):
+        bank.add('SYS_PROMPT_HOSTILE', 'en', f"{prompts[i % len(prompts)]} {i}", SAMPLE_REPLY)
+    engine = local_replies.LocalReplies('bench', bank, states=())
+    key = ('SYS_PROMPT_HOSTILE', 'en')
+    for i in range(local_replies.LEARNED_LIMIT):
+        engine.learn(key, f"{prompts[i % len(prompts)]} learned {i}", SAMPLE_REPLY)
+    turns = [0]
+    def run():
+        turns[0] += 1
+        engine.learn(key, f"{SAMPLE_PROMPTS[turns[0] % len(SAMPLE_PROMPTS)]} {turns[0]}", SAMPLE_REPLY)
+        engine.reply(key, SAMPLE_PROMPTS[0])
+    return run
+
+
+# --- Macro ---
+
+def _send_prompt_turns(fixtures, state):
+    window = fixtures.qt_window()
+    window.llm_model = CannedModel()
+    turns = [0]
+    def run():
+        window.game_state = state
+        window.internet_enabled = window.mcp_enabled = window.mission_received = True
+        window.pending_prompt = None
+        window.post_mcp_prompt_count = 5 # Past the scripted scares
+        window.input_line.setText(SAMPLE_PROMPTS[turns[0] % len(SAMPLE_PROMPTS)])
+        window.send_prompt()
+        turns[0] += 1
+        if turns[0] % CHAT_RESET_TURNS == 0:
+            window.chat_display.clear()
+            window.history.clear()
+    return run
+
+
+@benchmark('macro', 'send_prompt_internet')
+def _bench_send_prompt_internet(fixtures):
+    return _send_prompt_turns(fixtures, "NORMAL_INTERNET_ONLY")
+
+
+@benchmark('macro', 'send_prompt_hostile')
+def _bench_send_prompt_hostile(fixtures):
+    return _send_prompt_turns(fixtures, "HOSTILE")
+
+
+@benchmark('macro', 'send_prompt_awaiting')
+def _bench_send_prompt_awaiting(fixtures):
+    """Pre-scripted reply (no LLM call) while internet access is being requested."""
+    return _send_prompt_turns(fixtures, "AWAITING_INTERNET_CONFIRM")
+
+
+# --- Render ---
+
+def _fill_chat(add_user, add_aura):
+    for i in range(FILLED_CHAT_MESSAGES // 2):
+        add_user(SAMPLE_PROMPTS[i % len(SAMPLE_PROMPTS)])
+        add_aura(SAMPLE_REPLY)
+
+
+@benchmark('render', 'qt_window_grab')
+def _bench_qt_window_grab(fixtures):
+    """Renders the whole window, chat included, into a pixmap."""
+    window = fixtures.qt_window()
+    window.chat_display.clear()
+    _fill_chat(window.display_user_message, window.display_aura_message)
+    window._finish_turn()
+    return window.grab
+
+
+@benchmark('render', 'qt_chat_append')
+def _bench_qt_chat_append(fixtures):
+    """Appends a reply to the chat document and repaints the chat view."""
+    window = fixtures.qt_window()
+    viewport = window.chat_display.viewport()
+    appended = [0]
+    def run():
+        window.display_aura_message(SAMPLE_REPLY)
+        window._finish_turn()
+        viewport.repaint()
+        appended[0] += 1
+        if appended[0] % CHAT_RESET_TURNS == 0:
+            window.chat_display.clear()
+            window.history.clear()
+    return run
+
+
+@benchmark('render', 'pygame_chat_frame')
+def _bench_pygame_chat_frame(fixtures):
+    """One UI frame (update + draw) with a filled chat box."""
+    pygame, main, game, manager, surface = fixtures.pygame_game()
+    _fill_chat(lambda text: game.add_message("User", text), lambda text: game.add_message("AURA", text))
+    def run():
+        manager.update(1 / 60)
+        surface.fill(main.COLOR_BACKGROUND_DARK)
+        manager.draw_ui(surface)
+    return run
+
+
+@benchmark('render', 'pygame_chat_append')
+def _bench_pygame_chat_append(fixtures):
+    """Appending a reply to the chat box (the HTML text box re-lays out its text)."""
+    pygame, main, game, manager, surface = fixtures.pygame_game()
+    appended = [0]
+    def run():
+        game.add_message("AURA", SAMPLE_REPLY)
+        appended[0] += 1
+        if appended[0] % CHAT_RESET_TURNS == 0:
+            game.chat_box.set_text("")
+    return run
+
+
+@benchmark('render', 'pygame_bsod_overlay')
+def _bench_pygame_bsod_overlay(fixtures):
+    """The BSOD overlay, drawn from the glyph atlas as in the main loop."""
+    pygame, main, game, manager, surface = fixtures.pygame_game()
+    import font_assets
+    atlas = font_assets.GlyphAtlas.for_size(18, main.FONT_PATH)
+    lines = game.tr('BSOD_TEXT').split('\n')
+    def run():
+        surface.fill((0, 0, 170))
+        y = 50
+        for line in lines:
+            atlas.draw_line(surface, line, (50, y), (255, 255, 255))
+            y += 30
+    return run
+
+
+# --- Runner and report ---
+
+def select(layers=None, name_filter=None):
+    return [(layer, name, setup) for layer, name, setup in BENCHMARKS
+            if (not layers or layer in layers) and (not name_filter or name_filter in name)]
+
+
+def run_suite(cases, repeats=DEFAULT_REPEATS, min_time=DEFAULT_MIN_TIME):
+    results = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeats': repeats,
+            'min_time': min_time,
+        },
+        'entries': {},
+    }
+    fixtures = Fixtures()
+    for layer, name, setup in cases:
+        entry = results['entries'].setdefault(layer, {'summary': {}, 'skipped': {}})
+        try:
+            fn = setup(fixtures)
+        except Skip as e:
+            entry['skipped'][name] = str(e)
+            print(f"[{layer}] {name}: skipped, {e}")
+            continue
+        stats = measure(fn, repeats, min_time)
+        entry['summary'][name] = stats
+        print(f"[{layer}] {name}: {stats['median']:.2f} us/op (min {stats['min']:.2f}, {stats['iterations']} x {repeats})")
+    return results
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD):
+    """Prints per-case median deltas between two result files. Returns the regressions."""
+    regressions = []
+    for layer, new_data in new['entries'].items():
+        old_summary = old.get('entries', {}).get(layer, {}).get('summary', {})
+        print(f"== {layer} ({old['meta'].get('revision')} -> {new['meta'].get('revision')}) ==")
+        for name, stats in sorted(new_data['summary'].items()):
+            if name not in old_summary:
+                print(f"  {name:28s} {stats['median']:12.2f}  (new)")
+                continue
+            before = old_summary[name]['median']
+            after = stats['median']
+            delta_pct = ((after - before) / before * 100) if before else 0.0
+            flag = ""
+            if delta_pct > threshold:
+                flag = "  REGRESSION"
+                regressions.append((layer, name, before, after, delta_pct))
+            print(f"  {name:28s} {before:12.2f} -> {after:12.2f}  {delta_pct:+6.1f}%{flag}")
+        for name, reason in sorted(new_data.get('skipped', {}).items()):
+            print(f"  {name:28s} skipped ({reason})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro, macro and render benchmarks for Cognito.")
+    parser.add_argument('--layer', choices=LAYERS, action='append', help="Layer to run (repeatable; default: all)")
+    parser.add_argument('--filter', help="Only cases whose name contains this text")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME, help="Seconds per repeat")
+    parser.add_argument('--output', help="Result file (default: bench_results/suite-<revision>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="Compare two result files")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Percent increase reported as a regression by --compare")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], 'r', encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.compare[1], 'r', encoding='utf-8') as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.threshold)
+        return 1 if regressions else 0
+
+    results = run_suite(select(args.layer, args.filter), args.repeats, args.min_time)
+    output = args.output or os.path.join(SCRIPT_DIR, "bench_results",
+                                         f"suite-{results['meta']['revision'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,34 +1,58 @@
 #!/bin/bash
 
 # Build script for Cognito WASM version
-# Usage: ./build.sh
+# Usage: ./build.sh [--force] [extra build_web_assets.py stage options, e.g. --audio-codec opus --pyc]
 
 echo "Building Cognito for Web (WASM)..."
 
-# Create a clean build source directory
-rm -rf web_build_src
-mkdir -p web_build_src
-
-# Copy necessary files
-echo "Copying files..."
-cp main.py web_build_src/
-cp requirements.txt web_build_src/
-cp neodgm_code.ttf web_build_src/
-if [ -d "sounds" ]; then
-    cp -r sounds web_build_src/
+FORCE=0
+if [ "$1" == "--force" ]; then
+    FORCE=1
+    shift
+fi
+
+# Subset the font and build the glyph atlas (needs fonttools; skipped if unavailable)
+echo "Building font assets..."
+if ! python build_fonts.py; then
+    echo "Font subsetting failed, shipping the full font."
+    rm -f neodgm_code.subset.ttf neodgm_code.subset.json neodgm_code.atlas.png neodgm_code.atlas.json
+fi
+
+# Stage web_build_src: OGG sounds, font assets, stripped Python, content-hashed manifest
+echo "Staging assets..."
+python build_web_assets.py stage "$@"
+STAGE_STATUS=$?
+if [ $STAGE_STATUS -eq 3 ] && [ $FORCE -eq 0 ] && [ -d web_build ]; then
+    echo "Nothing changed, keeping the existing build in ./web_build/ (use --force to rebuild)."
+    rm -rf web_build_src
+    exit 0
+elif [ $STAGE_STATUS -ne 0 ] && [ $STAGE_STATUS -ne 3 ]; then
+    echo "Staging failed! Check output."
+    exit 1
 fi
 
 # Run pygbag build
-# We use --disable-sound-format-error because we are using WAV files
-# which pygbag complains about (preferring OGG), but they work in most contexts.
+# WAV files are only left in the bundle when transcoding was not possible;
+# pygbag complains about them (preferring OGG), but they work in most contexts.
 echo "Running pygbag..."
-pygbag --build --disable-sound-format-error web_build_src
+PYGBAG_FLAGS="--build"
+if ls web_build_src/sounds/*.wav > /dev/null 2>&1; then
+    PYGBAG_FLAGS="$PYGBAG_FLAGS --disable-sound-format-error"
+fi
+pygbag $PYGBAG_FLAGS web_build_src
 
 # Move build artifacts to ./web_build
 echo "Finalizing build..."
-rm -rf web_build
+mkdir -p .cache/web_assets
+rm -f .cache/web_assets/previous-manifest.json
+if [ -f web_build/asset-manifest.json ]; then
+    cp web_build/asset-manifest.json .cache/web_assets/previous-manifest.json
+fi
 if [ -d "web_build_src/build/web" ]; then
+    rm -rf web_build
     mv web_build_src/build/web web_build
+    # Hashed copies of the on-demand assets, manifest and bundle size report
+    python build_web_assets.py finalize web_build --previous .cache/web_assets/previous-manifest.json
     echo "Build successful! Artifacts are in ./web_build/"
 else
     echo "Build failed! Check output."
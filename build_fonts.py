@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""Build-time font pipeline for neodgm_code.ttf.
+
+Produces (next to the full font):
+  - neodgm_code.subset.ttf   glyphs for every string literal of both frontends (translations,
+                             keyword lists, scripted text), printable ASCII and a configurable
+                             set of common Hangul syllables for LLM output. The family is
+                             renamed so it can coexist with the full font.
+  - neodgm_code.subset.json  the subset's character coverage (read by font_assets.FontCoverage)
+  - neodgm_code.atlas.png/.json  pre-rasterized glyphs of the UI text for pygame overlays
+
+Requires fontTools (`pip install fonttools`) for the subset and pygame for the atlas.
+
+Usage:
+    python build_fonts.py                          # KS X 1001 Hangul (2350 syllables), atlas 18/24 px
+    python build_fonts.py --hangul none --extra-chars extra_chars.txt --no-atlas
+"""
+import argparse
+import ast
+import json
+import os
+import sys
+
+import font_assets
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_FILES = ['cognito_v0.1.py', 'main.py', 'translations_data.py'] # String literals of these files end up on screen
+DEFAULT_ATLAS_SIZES = [18, 24] # BSOD and blank-screen overlay text in main.py
+HANGUL_SETS = ('none', 'ksx1001', 'all')
+
+
+def source_chars(paths):
+    """All characters appearing in string literals (including f-string parts) of the given files."""
+    chars = set()
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                chars.update(node.value)
+    return chars
+
+
+def hangul_chars(which):
+    """Common Hangul syllables for LLM output.
+
+    'ksx1001' is the 2350 precomposed syllables of the KS X 1001 standard (everything
+    EUC-KR can encode), which covers nearly all modern Korean text; 'all' is the full
+    11172-syllable block.
+    """
+    if which == 'none':
+        return set()
+    if which == 'all':
+        return {chr(cp) for cp in range(0xAC00, 0xD7A4)}
+    chars = set()
+    for lead in range(0xB0, 0xC9):
+        for trail in range(0xA1, 0xFF):
+            try:
+                chars.add(bytes([lead, trail]).decode('euc_kr'))
+            except UnicodeDecodeError:
+                continue
+    return {c for c in chars if 0xAC00 <= ord(c) <= 0xD7A3}
+
+
+def collect_charset(hangul='ksx1001', extra_chars_path=None):
+    chars = {chr(cp) for cp in range(0x20, 0x7F)} # Printable ASCII (user input, markup)
+    chars |= source_chars(os.path.join(SCRIPT_DIR, p) for p in SOURCE_FILES)
+    chars |= hangul_chars(hangul)
+    if extra_chars_path:
+        with open(extra_chars_path, 'r', encoding='utf-8') as f:
+            chars |= set(f.read())
+    return {c for c in chars if c.isprintable() and c != '\x7f'}
+
+
+def build_subset(chars, font_path, output_path):
+    """Writes the subset font and returns (family, subset_family, covered_chars)."""
+    try:
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        sys.exit("fontTools is required to subset the font: pip install fonttools")
+
+    font = TTFont(font_path)
+    cmap = font.getBestCmap()
+    covered = {c for c in chars if ord(c) in cmap}
+
+    options = subset.Options()
+    options.layout_features = ['*']
+    options.name_IDs = ['*']
+    options.notdef_outline = True
+    subsetter = subset.Subsetter(options=options)
+    subsetter.populate(unicodes=[ord(c) for c in covered])
+    subsetter.subset(font)
+
+    # Rename the family so Qt/pygame_gui treat the subset and the full font as distinct fonts
+    name_table = font['name']
+    family = name_table.getDebugName(16) or name_table.getDebugName(1)
+    subset_family = f"{family} Subset"
+    for record in name_table.names:
+        if record.nameID in (1, 4, 16):
+            record.string = f"{record.toUnicode()} Subset"
+        elif record.nameID == 6:
+            record.string = f"{record.toUnicode()}-Subset"
+    font.save(output_path)
+    return family, subset_family, covered
+
+
+def build_atlas(chars, font_path, sizes, image_path, index_path, max_width=1024):
+    """Renders the characters at each size into one sheet (white on transparent) plus an index."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    try:
+        import pygame
+    except ImportError:
+        print("pygame not available, skipping glyph atlas.")
+        return False
+    pygame.font.init()
+
+    rows = [] # (size, [(char, surface)], line_height)
+    for size in sizes:
+        font = pygame.font.Font(font_path, size)
+        rendered = [(c, font.render(c, True, (255, 255, 255))) for c in sorted(chars)]
+        rows.append((size, rendered, font.get_linesize()))
+
+    # Shelf packing: each size starts on a new shelf
+    index = {'sizes': {}}
+    placements = []
+    x = y = 0
+    for size, rendered, line_height in rows:
+        glyphs = {}
+        shelf_height = 0
+        x = 0
+        for char, surface in rendered:
+            w, h = surface.get_size()
+            if x + w > max_width:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            placements.append((surface, (x, y)))
+            glyphs[char] = [x, y, w, h]
+            x += w
+            shelf_height = max(shelf_height, h)
+        y += shelf_height
+        index['sizes'][str(size)] = {'line_height': line_height, 'glyphs': glyphs}
+
+    sheet = pygame.Surface((max_width, max(y, 1)), pygame.SRCALPHA)
+    for surface, pos in placements:
+        sheet.blit(surface, pos)
+    pygame.image.save(sheet, image_path)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Subset neodgm_code.ttf and build the pygame glyph atlas.")
+    parser.add_argument('--font', default=font_assets.FONT_PATH)
+    parser.add_argument('--hangul', choices=HANGUL_SETS, default='ksx1001',
+                        help="Extra Hangul syllables kept for LLM output (default: ksx1001)")
+    parser.add_argument('--extra-chars', help="UTF-8 text file with additional characters to keep")
+    parser.add_argument('--atlas-sizes', default=",".join(str(s) for s in DEFAULT_ATLAS_SIZES),
+                        help="Comma-separated pixel sizes for the glyph atlas")
+    parser.add_argument('--no-atlas', action='store_true')
+    parser.add_argument('--output-dir', default=SCRIPT_DIR)
+    args = parser.parse_args(argv)
+
+    chars = collect_charset(args.hangul, args.extra_chars)
+    subset_path = os.path.join(args.output_dir, os.path.basename(font_assets.SUBSET_FONT_PATH))
+    family, subset_family, covered = build_subset(chars, args.font, subset_path)
+    coverage_path = os.path.join(args.output_dir, os.path.basename(font_assets.COVERAGE_PATH))
+    with open(coverage_path, 'w', encoding='utf-8') as f:
+        json.dump({'family': family, 'subset_family': subset_family,
+                   'ranges': font_assets.codepoint_ranges(covered)}, f, separators=(',', ':'))
+    full_size = os.path.getsize(args.font)
+    subset_size = os.path.getsize(subset_path)
+    print(f"Subset: {len(covered)} glyphs, {subset_size / 1024:.0f} KiB (full font {full_size / 1024:.0f} KiB, "
+          f"{(1 - subset_size / full_size) * 100:.0f}% smaller)")
+    missing = len(chars) - len(covered)
+    if missing:
+        print(f"  {missing} requested characters are not in the font and were skipped.")
+
+    if not args.no_atlas:
+        # The atlas only holds the UI text itself, not the bulk Hangul set
+        ui_chars = {c for c in collect_charset('none') if c in covered and not c.isspace()}
+        sizes = [int(s) for s in args.atlas_sizes.split(",") if s.strip()]
+        image_path = os.path.join(args.output_dir, os.path.basename(font_assets.ATLAS_IMAGE_PATH))
+        index_path = os.path.join(args.output_dir, os.path.basename(font_assets.ATLAS_INDEX_PATH))
+        if build_atlas(ui_chars, subset_path, sizes, image_path, index_path):
+            print(f"Atlas: {len(ui_chars)} glyphs x {len(sizes)} sizes -> {image_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""Asset pipeline for the pygbag web build (run by build.sh).
+
+stage     Builds web_build_src/ from the sources:
+            - sounds are transcoded from WAV to OGG (Vorbis by default, or Opus) with ffmpeg,
+            - fonts: the subset, coverage file and glyph atlas from build_fonts.py (full font if
+              the subset was not built),
+            - Python modules are stripped of comments and docstrings; with --pyc, modules other
+              than main.py are precompiled to bytecode when this interpreter matches the
+              browser's Python version,
+            - the pygame translation tables are compiled (translations_data.py is not shipped),
+          and writes asset-manifest.json (content hash and size of every file). Transcoded and
+          stripped outputs are cached by content hash under .cache/web_assets, so only changed
+          assets are reprocessed. Exits with UNCHANGED_EXIT when the manifest matches the one
+          of the previous build, so build.sh can skip pygbag.
+finalize  After pygbag: copies assets served next to index.html under content-hashed names
+          (so browsers only re-download them when they change), stores the bundle sizes in
+          web_build/asset-manifest.json and prints the size and estimated load-time deltas
+          against the previous build (--previous, saved by build.sh before replacing web_build/).
+
+Usage:
+    python build_web_assets.py stage [--audio-codec vorbis|opus|none] [--pyc]
+    python build_web_assets.py finalize web_build --previous .cache/web_assets/previous-manifest.json
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import py_compile
+import shutil
+import subprocess
+import sys
+
+import font_assets
+import response_bank
+import translation_catalog
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STAGE_DIR = os.path.join(SCRIPT_DIR, "web_build_src")
+BUILD_DIR = os.path.join(SCRIPT_DIR, "web_build")
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".cache", "web_assets")
+MANIFEST_NAME = "asset-manifest.json"
+
+WEB_MODULES = ['main.py', 'startup_profile.py', 'font_assets.py', 'sound_manager.py', 'translation_catalog.py',
+               'metrics.py', 'tracing.py', 'stall_watchdog.py', 'sampling_profiler.py', 'frame_budget.py',
+               'cognito_log.py', 'context_cache.py', 'token_ledger.py', 'rate_limiter.py',
+               'response_bank.py', 'local_replies.py', 'prompt_cache.py',
+               'singleflight.py', 'llm_warmup.py', 'model_routing.py', 'local_llm.py']
+ENTRY_MODULE = 'main.py' # pygbag runs this one from source
+STAGED_FILES = ['requirements.txt']
+OPTIONAL_STAGED_FILES = [response_bank.BANK_FILENAME] # Shipped when present
+FONT_FILES = [font_assets.SUBSET_FONT_PATH, font_assets.COVERAGE_PATH,
+              font_assets.ATLAS_IMAGE_PATH, font_assets.ATLAS_INDEX_PATH]
+EXTERNAL_ASSETS = [font_assets.FONT_PATH] # Served next to index.html, fetched on demand
+BUNDLE_FILES = ['web_build_src.apk', 'web_build_src.tar.gz']
+
+WEB_PYTHON = (3, 12) # data-python of the pygbag template (web_build/index.html)
+AUDIO_CODECS = {
+    'vorbis': ['-c:a', 'libvorbis', '-q:a', '4'],
+    'opus': ['-c:a', 'libopus', '-b:a', '64k'],
+}
+REFERENCE_BANDWIDTH_MBIT = 10.0 # Used to turn bundle sizes into an estimated download time
+UNCHANGED_EXIT = 3
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cached(kind, key, suffix, produce):
+    """Path of a cached build output for key, running produce(output_path) if it is not cached yet."""
+    path = os.path.join(CACHE_DIR, kind, f"{key[:24]}{suffix}")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        produce(tmp_path)
+        os.replace(tmp_path, path)
+    return path
+
+
+def strip_source(source, filename):
+    """Python source without comments and docstrings (round-tripped through the AST)."""
+    tree = ast.parse(source, filename=filename)
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                    and isinstance(body[0].value.value, str):
+                del body[0]
+                if not body and not isinstance(node, ast.Module):
+                    body.append(ast.Pass())
+    return ast.unparse(tree) + "\n"
+
+
+def stage_python(stage_dir, precompile):
+    """Copies the web modules, stripped. Returns the staged file names."""
+    staged = []
+    if precompile and sys.version_info[:2] != WEB_PYTHON:
+        print(f"Python {sys.version_info[0]}.{sys.version_info[1]} cannot precompile for the browser "
+              f"(Python {WEB_PYTHON[0]}.{WEB_PYTHON[1]}), shipping source.")
+        precompile = False
+    for name in WEB_MODULES:
+        src = os.path.join(SCRIPT_DIR, name)
+        with open(src, 'r', encoding='utf-8') as f:
+            source = f.read()
+        # ast.unparse output depends on the interpreter version
+        key = hashlib.sha256(f"{sys.version_info[:2]}\n{source}".encode('utf-8')).hexdigest()
+
+        def write_stripped(out_path, source=source, name=name):
+            with open(out_path, 'w', encoding='utf-8') as f:
+                f.write(strip_source(source, name))
+
+        stripped = _cached('py', key, '.py', write_stripped)
+        if precompile and name != ENTRY_MODULE:
+            # Sourceless module: the .pyc next to where the .py would be is importable directly
+            pyc_name = name[:-3] + '.pyc'
+            compiled = _cached('pyc', key, '.pyc',
+                               lambda out: py_compile.compile(stripped, cfile=out, dfile=name, doraise=True, optimize=2))
+            shutil.copyfile(compiled, os.path.join(stage_dir, pyc_name))
+            staged.append(pyc_name)
+        else:
+            shutil.copyfile(stripped, os.path.join(stage_dir, name))
+            staged.append(name)
+    return staged
+
+
+def transcode_sound(src, codec):
+    """OGG version of a WAV file (cached). Returns None if ffmpeg is unavailable or fails."""
+    key = hashlib.sha256((file_digest(src) + codec).encode()).hexdigest()
+
+    def encode(out_path):
+        subprocess.run(['ffmpeg', '-v', 'error', '-y', '-i', src, *AUDIO_CODECS[codec], '-f', 'ogg', out_path],
+                       check=True, stdin=subprocess.DEVNULL)
+
+    try:
+        return _cached('ogg', key, '.ogg', encode)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Warning: Could not transcode {src} ({e}), shipping WAV.")
+        return None
+
+
+def stage_sounds(stage_dir, codec):
+    sounds_src = os.path.join(SCRIPT_DIR, "sounds")
+    if not os.path.isdir(sounds_src):
+        return []
+    os.makedirs(os.path.join(stage_dir, "sounds"), exist_ok=True)
+    if codec != 'none' and shutil.which('ffmpeg') is None:
+        print("Warning: ffmpeg not found, shipping WAV sounds.")
+        codec = 'none'
+    staged = []
+    for filename in sorted(os.listdir(sounds_src)):
+        src = os.path.join(sounds_src, filename)
+        target = filename
+        encoded = transcode_sound(src, codec) if codec != 'none' and filename.endswith('.wav') else None
+        if encoded:
+            # sound_manager picks the .ogg sibling of each configured .wav
+            target = filename[:-4] + '.ogg'
+            src = encoded
+        shutil.copyfile(src, os.path.join(stage_dir, "sounds", target))
+        staged.append(f"sounds/{target}")
+    return staged
+
+
+def stage_fonts(stage_dir):
+    if os.path.exists(os.path.join(SCRIPT_DIR, font_assets.SUBSET_FONT_PATH)):
+        names = [os.path.basename(p) for p in FONT_FILES if os.path.exists(os.path.join(SCRIPT_DIR, p))]
+    else:
+        names = [os.path.basename(font_assets.FONT_PATH)]
+    for name in names:
+        shutil.copyfile(os.path.join(SCRIPT_DIR, name), os.path.join(stage_dir, name))
+    return names
+
+
+def served_name(path):
+    """Content-hashed file name for an asset served next to index.html."""
+    base, ext = os.path.splitext(os.path.basename(path))
+    return f"{base}.{file_digest(path)[:12]}{ext}"
+
+
+def build_manifest(stage_dir, files):
+    """Hash and size of every staged file, plus the hashed names of the external assets."""
+    manifest = {'files': {}, 'external': {}}
+    for name in sorted(files):
+        path = os.path.join(stage_dir, name)
+        manifest['files'][name] = {'sha256': file_digest(path), 'size': os.path.getsize(path)}
+    if os.path.basename(font_assets.FONT_PATH) not in files:
+        for asset in EXTERNAL_ASSETS:
+            path = os.path.join(SCRIPT_DIR, asset)
+            manifest['external'][os.path.basename(asset)] = {'name': served_name(path), 'size': os.path.getsize(path)}
+    return manifest
+
+
+def _same_content(old, new):
+    return old is not None and old.get('files') == new['files'] and old.get('external') == new['external']
+
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _source_size(name):
+    """Size of the unprocessed source of a staged file (for the size report)."""
+    base = name[:-4] + '.py' if name.endswith('.pyc') else name
+    candidates = [base, base[:-4] + '.wav'] if base.endswith('.ogg') else [base]
+    for candidate in candidates:
+        path = os.path.join(SCRIPT_DIR, candidate)
+        if os.path.exists(path):
+            return os.path.getsize(path)
+    return None
+
+
+def stage(args):
+    if os.path.isdir(args.stage_dir):
+        shutil.rmtree(args.stage_dir)
+    os.makedirs(args.stage_dir)
+    files = stage_python(args.stage_dir, args.pyc)
+    files += stage_sounds(args.stage_dir, args.audio_codec)
+    files += stage_fonts(args.stage_dir)
+    files += [os.path.basename(p) for p in translation_catalog.build(args.stage_dir, frontends=('pygame',))]
+    for name in STAGED_FILES + [n for n in OPTIONAL_STAGED_FILES if os.path.exists(os.path.join(SCRIPT_DIR, n))]:
+        shutil.copyfile(os.path.join(SCRIPT_DIR, name), os.path.join(args.stage_dir, name))
+        files.append(name)
+
+    manifest = build_manifest(args.stage_dir, files)
+    with open(os.path.join(args.stage_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    raw_total = staged_total = 0
+    for name, entry in manifest['files'].items():
+        raw = _source_size(name)
+        raw_total += raw or entry['size']
+        staged_total += entry['size']
+        if raw and raw != entry['size']:
+            print(f"  {name:32s} {raw / 1024:8.1f} KiB -> {entry['size'] / 1024:8.1f} KiB")
+    print(f"Staged {len(files)} files: {staged_total / 1024:.0f} KiB (sources {raw_total / 1024:.0f} KiB)")
+
+    previous = load_manifest(os.path.join(args.build_dir, MANIFEST_NAME))
+    if _same_content(previous, manifest):
+        print("Assets unchanged since the last build.")
+        return UNCHANGED_EXIT
+    if previous:
+        changed = sorted(name for name, entry in manifest['files'].items()
+                         if previous.get('files', {}).get(name) != entry)
+        print(f"Changed since the last build: {', '.join(changed) or 'external assets'}")
+    return 0
+
+
+def _download_seconds(size):
+    return size * 8 / (REFERENCE_BANDWIDTH_MBIT * 1_000_000)
+
+
+def finalize(args):
+    manifest = load_manifest(os.path.join(args.stage_dir, MANIFEST_NAME))
+    if manifest is None:
+        sys.exit(f"No {MANIFEST_NAME} in {args.stage_dir}; run the stage step first.")
+    previous = (load_manifest(args.previous) if args.previous else None) or {}
+
+    for asset in EXTERNAL_ASSETS:
+        entry = manifest['external'].get(os.path.basename(asset))
+        if entry:
+            shutil.copyfile(os.path.join(SCRIPT_DIR, asset), os.path.join(args.build_dir, entry['name']))
+
+    manifest['bundle'] = {name: os.path.getsize(os.path.join(args.build_dir, name))
+                          for name in BUNDLE_FILES if os.path.exists(os.path.join(args.build_dir, name))}
+    with open(os.path.join(args.build_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"Bundle sizes (download time estimated at {REFERENCE_BANDWIDTH_MBIT:g} Mbit/s):")
+    old_bundle = previous.get('bundle', {})
+    for name, size in manifest['bundle'].items():
+        line = f"  {name:24s} {size / 1024:8.1f} KiB  ~{_download_seconds(size) * 1000:6.0f} ms"
+        if name in old_bundle:
+            delta = size - old_bundle[name]
+            line += (f"  ({delta / 1024:+.1f} KiB, {_download_seconds(delta) * 1000:+.0f} ms,"
+                     f" {delta / old_bundle[name] * 100:+.1f}%)" if old_bundle[name] else "")
+        print(line)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Asset pipeline for the pygbag web build.")
+    parser.add_argument('command', choices=['stage', 'finalize'])
+    parser.add_argument('build_dir', nargs='?', default=BUILD_DIR,
+                        help="Directory of the finished (or previous) web build")
+    parser.add_argument('--stage-dir', default=STAGE_DIR)
+    parser.add_argument('--previous', help="Manifest of the previous build (finalize; for the size deltas)")
+    parser.add_argument('--audio-codec', choices=sorted(AUDIO_CODECS) + ['none'], default='vorbis',
+                        help="OGG codec for the sounds (default: vorbis, which every SDL_mixer build decodes)")
+    parser.add_argument('--pyc', action='store_true',
+                        help=f"Precompile modules to bytecode (only with Python {WEB_PYTHON[0]}.{WEB_PYTHON[1]})")
+    args = parser.parse_args(argv)
+    return stage(args) if args.command == 'stage' else finalize(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
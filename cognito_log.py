@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""Structured, leveled logging that does not block the GUI thread or the game loop.
+
+Loggers are per subsystem (cognito.turn, cognito.llm, cognito.scare, cognito.dev, cognito.state,
+...). A log call on a hot path only checks the level and queues the record: formatting and
+writing happen on a background writer thread (QueueListener), so a slow stdout pipe or
+journald no longer stalls the UI. Pass values as %-style arguments, not f-strings, so
+disabled levels cost a level check and nothing else (they are formatted on the writer thread,
+so pass strings and numbers rather than objects that may still change). Values passed in
+extra={...} become structured fields.
+
+    COGNITO_LOG_LEVEL=INFO                   default level (DEBUG, INFO, WARNING, ERROR)
+    COGNITO_LOG_LEVELS=llm=DEBUG,scare=WARNING   per-subsystem levels
+    COGNITO_LOG_FORMAT=json                  JSON lines instead of text
+    COGNITO_CRASH_DIR=logs                   where crash dumps go (default ./logs)
+
+Also:
+  - the last RING_RECORDS emitted records are kept in memory and written to a crash dump on an
+    unhandled exception (dump_ring() writes one on demand);
+  - a message template logged more than RATE_LIMIT times per RATE_WINDOW seconds is suppressed,
+    and the next one that gets through reports how many were dropped;
+  - the queue is bounded: when the writer falls behind, records are dropped and counted rather
+    than blocking the caller.
+The browser build has no threads; there records are written synchronously.
+"""
+import atexit
+import collections
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+ROOT = "cognito"
+LEVEL_ENV = "COGNITO_LOG_LEVEL"
+LEVELS_ENV = "COGNITO_LOG_LEVELS"
+FORMAT_ENV = "COGNITO_LOG_FORMAT"
+CRASH_DIR_ENV = "COGNITO_CRASH_DIR"
+DEFAULT_LEVEL = logging.INFO
+CRASH_DIR = "logs"
+QUEUE_SIZE = 10000
+RING_RECORDS = 2000
+RATE_LIMIT = 20 # Records per message template ...
+RATE_WINDOW = 10.0 # ... per this many seconds
+
+# Attributes every LogRecord has; anything else on a record came from extra= and is a field
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'suppressed'}
+
+
+def get_logger(subsystem):
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+def record_fields(record):
+    """Structured fields passed with extra=."""
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class TextFormatter(logging.Formatter):
+    """12:00:01.123 INFO  llm: message [state=UNEASY]"""
+
+    def format(self, record):
+        stamp = time.strftime('%H:%M:%S', time.localtime(record.created))
+        subsystem = record.name[len(ROOT) + 1:] if record.name.startswith(ROOT + ".") else record.name
+        line = f"{stamp}.{int(record.msecs):03d} {record.levelname:<5} {subsystem}: {record.getMessage()}"
+        fields = record_fields(record)
+        if fields:
+            line += " [" + " ".join(f"{key}={value}" for key, value in fields.items()) + "]"
+        if getattr(record, 'suppressed', 0):
+            line += f" ({record.suppressed} similar suppressed)"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record):
+        entry = {"ts": round(record.created, 3), "level": record.levelname, "logger": record.name,
+                 "thread": record.threadName, "msg": record.getMessage()}
+        entry.update({key: value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+                      for key, value in record_fields(record).items()})
+        if getattr(record, 'suppressed', 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through at most limit records per message template and window."""
+
+    def __init__(self, limit=RATE_LIMIT, window=RATE_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._seen = {} # (logger, template) -> [window start, count, suppressed]
+
+    def filter(self, record):
+        key = (record.name, record.msg)
+        now = record.created
+        entry = self._seen.get(key)
+        if entry is None or now - entry[0] >= self.window:
+            suppressed = entry[2] if entry else 0
+            self._seen[key] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+        entry[1] += 1
+        if entry[1] > self.limit:
+            entry[2] += 1
+            return False
+        return True
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the newest records (unformatted) for crash dumps."""
+
+    def __init__(self, capacity=RING_RECORDS):
+        super().__init__()
+        self.records = collections.deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queues records as they are; the writer thread formats them. Drops records when full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_level(name, default):
+    level = logging.getLevelName(str(name).strip().upper())
+    return level if isinstance(level, int) else default
+
+
+def configure_levels(default=None, per_subsystem=None):
+    """Sets the cognito level and per-subsystem levels ("llm=DEBUG,scare=WARNING")."""
+    logging.getLogger(ROOT).setLevel(_parse_level(default, DEFAULT_LEVEL) if default else DEFAULT_LEVEL)
+    for item in (per_subsystem or "").split(','):
+        if '=' in item:
+            subsystem, level = item.split('=', 1)
+            get_logger(subsystem.strip()).setLevel(_parse_level(level, DEFAULT_LEVEL))
+
+
+ring = RingBufferHandler()
+_listener = None
+_queue_handler = None
+_configured = False
+
+
+def dump_ring(path=None, reason="on demand"):
+    """Writes the buffered records to path (default: a timestamped file in the crash dir)."""
+    if path is None:
+        directory = os.environ.get(CRASH_DIR_ENV) or CRASH_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"crash-{time.strftime('%Y%m%d-%H%M%S')}.log")
+    formatter = TextFormatter()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"# cognito log ring buffer, {len(ring.records)} records, dumped {reason}\n")
+        for record in list(ring.records):
+            f.write(formatter.format(record) + "\n")
+    return path
+
+
+def _install_crash_dump():
+    previous_hook = sys.excepthook
+
+    def excepthook(exc_type, exc, tb):
+        logging.getLogger(ROOT).critical("Unhandled exception", exc_info=(exc_type, exc, tb))
+        try:
+            print(f"Log ring buffer written to {dump_ring(reason='after an unhandled exception')}")
+        except OSError as e:
+            print(f"Warning: Could not write crash dump: {e}")
+        previous_hook(exc_type, exc, tb)
+
+    sys.excepthook = excepthook
+
+
+class _FrontHandler(logging.Handler):
+    """The one handler on the cognito logger: rate limits, then feeds the ring and the writer."""
+
+    def __init__(self, targets):
+        super().__init__()
+        self.targets = targets
+        self.addFilter(RateLimitFilter())
+
+    def emit(self, record):
+        for target in self.targets:
+            target.handle(record)
+
+
+def setup(use_thread=True, stream=None):
+    """Configures the cognito loggers from the environment. Safe to call more than once."""
+    global _listener, _queue_handler, _configured
+    if _configured:
+        return
+    _configured = True
+    configure_levels(os.environ.get(LEVEL_ENV), os.environ.get(LEVELS_ENV))
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(JsonFormatter() if os.environ.get(FORMAT_ENV, '').lower() == 'json' else TextFormatter())
+    output = writer # Browser build: written synchronously
+    if use_thread:
+        try:
+            _queue_handler = _NonBlockingQueueHandler(queue.Queue(QUEUE_SIZE))
+            _listener = logging.handlers.QueueListener(_queue_handler.queue, writer)
+            _listener.start()
+            atexit.register(shutdown)
+            output = _queue_handler
+        except RuntimeError as e: # No threads
+            _queue_handler = _listener = None
+            print(f"Warning: Logging without a writer thread: {e}")
+    root = logging.getLogger(ROOT)
+    root.propagate = False
+    root.addHandler(_FrontHandler([ring, output]))
+    _install_crash_dump()
+
+
+def shutdown():
+    """Flushes the queue and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        if _queue_handler.dropped:
+            print(f"Log: {_queue_handler.dropped} records dropped (writer fell behind)")
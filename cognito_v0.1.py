@@ -1,42 +1,163 @@
 # -*- coding: utf-8 -*-
+import startup_profile # First: its import time is the process start of every phase
 import sys
-import os
 import datetime
 import random
+import threading
+import time
 from PySide6 import QtWidgets, QtCore, QtGui
-from PySide6.QtMultimedia import QSoundEffect # For sound effects
-
-# Attempt to import the Google Generative AI library
-try:
-    import google.generativeai as genai
-    GOOGLE_AI_AVAILABLE = True
-except ImportError:
-    GOOGLE_AI_AVAILABLE = False
-    print("WARNING: 'google-generativeai' library not found. Install it using 'pip install google-generativeai'. Falling back to placeholder responses.")
+import cognito_log
+import context_cache
+import font_assets
+import llm_warmup
+import local_llm
+import local_replies
+import metrics
+import model_routing
+import prompt_cache
+import rate_limiter
+import response_bank
+import translation_catalog
+from sound_manager import QtSoundBank
+import sampling_profiler
+import stall_watchdog
+import token_ledger
+import tracing
+
+# --- Logging (see cognito_log.py; configured in __main__) ---
+turn_log = cognito_log.get_logger('turn') # send_prompt and delayed prompts
+llm_log = cognito_log.get_logger('llm') # generate_aura_response
+state_log = cognito_log.get_logger('state') # Game state and permission changes
+scare_log = cognito_log.get_logger('scare')
+dev_log = cognito_log.get_logger('dev') # Developer Mode and bug removal
+
+# --- Google Generative AI (imported lazily) ---
+# The SDK pulls in grpc and protobuf and takes seconds to import, so it is no longer
+# imported at module load. CognitoWindow imports it on a background thread via _import_genai().
+genai = None
+GOOGLE_AI_AVAILABLE = None # None until the import has been attempted
+_GENAI_IMPORT_LOCK = threading.Lock()
+LLM_CLIENT_WAIT_TIMEOUT = 15.0 # Max seconds a prompt waits for the background client setup
+INLINE_MODEL_LIMIT = 16 # Models kept per distinct inline system instruction (formatted prompts vary)
+API_KEY_FILE = './api_key.txt'
+
+def _import_genai():
+    """Imports google.generativeai on first use. Safe to call from any thread."""
+    global genai, GOOGLE_AI_AVAILABLE
+    with _GENAI_IMPORT_LOCK:
+        if GOOGLE_AI_AVAILABLE is None:
+            try:
+                import google.generativeai as _genai
+                genai = _genai
+                GOOGLE_AI_AVAILABLE = True
+            except ImportError:
+                GOOGLE_AI_AVAILABLE = False
+                print("WARNING: 'google-generativeai' library not found. Install it using 'pip install google-generativeai'. Falling back to placeholder responses.")
+    return GOOGLE_AI_AVAILABLE
+
+
+def _configure_genai(api_key):
+    """Configures the SDK's client (REST against COGNITO_GEMINI_API_ROOT when it is set, e.g. llm_standin.py)."""
+    endpoint = context_cache.sdk_endpoint()
+    if endpoint:
+        genai.configure(api_key=api_key, transport='rest', client_options={'api_endpoint': endpoint})
+    else:
+        genai.configure(api_key=api_key)
+
+
+def _llm_warmup_steps(warmup):
+    """Steps of the warm-up run while the language dialog is open (see llm_warmup): SDK import, client
+    configuration with the key in API_KEY_FILE, a token count that opens the generative service's
+    channel (the one replies use) and checks the key, and the optional priming request. Runs on the warm-up thread; no UI calls. With the local backend
+    (local_llm) it opens a pooled connection to the chat-completions server instead."""
+    if local_llm.selected():
+        endpoint = local_llm.shared()
+
+        def prime_local(): # Also loads the model into memory on servers that load it lazily
+            payload = endpoint.payload('LANG_SELECT', "", llm_warmup.PRIME_PROMPT,
+                                       max_output_tokens=llm_warmup.PRIME_MAX_OUTPUT_TOKENS, stream=False)
+            warmup.usage = endpoint.chat(payload)[2]
+
+        steps = [('connect', endpoint.check)]
+        if llm_warmup.prime_enabled():
+            steps.append(('prime', prime_local))
+        return steps
+
+    def import_sdk():
+        if not _import_genai():
+            raise RuntimeError("google-generativeai not installed")
+
+    def configure():
+        with open(API_KEY_FILE, 'r') as f:
+            api_key = f.readline().strip()
+        if not api_key:
+            raise RuntimeError(f"{API_KEY_FILE} is empty")
+        _configure_genai(api_key)
+
+    def connect(): # Through the generative service client, whose channel generate_content reuses
+        genai.GenerativeModel(context_cache.MODEL).count_tokens(llm_warmup.PRIME_PROMPT)
+
+    def prime():
+        response = genai.GenerativeModel(context_cache.MODEL).generate_content(
+            llm_warmup.PRIME_PROMPT, generation_config={'max_output_tokens': llm_warmup.PRIME_MAX_OUTPUT_TOKENS})
+        warmup.usage = token_ledger.usage_from_sdk(response)
+
+    steps = [('import', import_sdk), ('configure', configure), ('connect', connect)]
+    if llm_warmup.prime_enabled():
+        steps.append(('prime', prime))
+    return steps
 
 # --- Font Setup ---
 # Define font path and assumed family name
-FONT_PATH = "./neodgm_code.ttf" # Make sure this path is correct relative to the script
+FONT_PATH = font_assets.FONT_PATH # Make sure this path is correct relative to the script
 FONT_FAMILY_NAME = "Neo둥근모" # Default assumed font family name
-
-def load_custom_font():
-    """Loads the custom font file."""
-    font_id = QtGui.QFontDatabase.addApplicationFont(FONT_PATH)
+FULL_FONT_FAMILY_NAME = None # Family of the full font once it has been loaded
+_font_coverage = None # Coverage of the loaded subset font; None if the full font was loaded directly
+_loaded_fonts = {} # path -> family name (or None on failure); fonts are added to Qt once per process
+
+def _add_application_font(path):
+    """Adds a font file to the application font database (once) and returns its family name."""
+    if path in _loaded_fonts:
+        return _loaded_fonts[path]
+    family = None
+    font_id = QtGui.QFontDatabase.addApplicationFont(path)
     if font_id == -1:
-        print(f"WARNING: Failed to load custom font: {FONT_PATH}")
+        print(f"WARNING: Failed to load custom font: {path}")
         print("Ensure the file exists and is a valid font.")
-        # print(f"Attempted to load: {QtGui.QFontDatabase.applicationFontFamilies(font_id)}") # Debug what was loaded
-        return False
     else:
         loaded_families = QtGui.QFontDatabase.applicationFontFamilies(font_id)
         if not loaded_families:
-             print(f"WARNING: Font loaded from {FONT_PATH}, but no family name found?")
-             return False
-        # Use the actual loaded name, crucial if it differs from the assumed one
-        global FONT_FAMILY_NAME
-        FONT_FAMILY_NAME = loaded_families[0]
-        print(f"Custom font '{FONT_FAMILY_NAME}' loaded successfully from {FONT_PATH}")
-        return True
+             print(f"WARNING: Font loaded from {path}, but no family name found?")
+        else:
+            family = loaded_families[0]
+    _loaded_fonts[path] = family
+    return family
+
+def load_custom_font():
+    """Loads the custom font file, preferring the build-time subset (see build_fonts.py)."""
+    global FONT_FAMILY_NAME, FULL_FONT_FAMILY_NAME, _font_coverage
+    coverage = font_assets.load_subset_coverage()
+    path = font_assets.SUBSET_FONT_PATH if coverage else FONT_PATH
+    family = _add_application_font(path)
+    if not family:
+        return False
+    # Use the actual loaded name, crucial if it differs from the assumed one
+    FONT_FAMILY_NAME = family
+    if coverage:
+        _font_coverage = coverage
+    else:
+        FULL_FONT_FAMILY_NAME = family
+    print(f"Custom font '{FONT_FAMILY_NAME}' loaded successfully from {path}")
+    return True
+
+def load_full_font():
+    """Loads the full font on demand, for text the subset cannot render. Returns its family."""
+    global FULL_FONT_FAMILY_NAME
+    if FULL_FONT_FAMILY_NAME is None:
+        FULL_FONT_FAMILY_NAME = _add_application_font(FONT_PATH)
+        if FULL_FONT_FAMILY_NAME:
+            print(f"Full font '{FULL_FONT_FAMILY_NAME}' loaded on demand from {FONT_PATH}")
+    return FULL_FONT_FAMILY_NAME
 
 # --- Define Retro/Modern Colors ---
 COLOR_BACKGROUND_DARK = "#0A0A0A"       # Very dark for monitor background
@@ -83,126 +204,19 @@ def get_time_of_day():
   else:
     return ["late night", "새벽"]
 
-# Get time/greeting BEFORE defining translations that use it
-time_of_day = get_time_of_day()
-kr_greeting = ""
-if time_of_day[0] == "morning" or time_of_day[0] == "evening":
-    kr_greeting = f"좋은 {time_of_day[1]}입니다."
-elif time_of_day[0] == "afternoon":
-    kr_greeting = f"식사는 하셨습니까?"
-else:
-    kr_greeting = "시간이 많이 늦었군요."
+def greeting_time(language):
+  """Fills AURA_GREETING's {time} field: the time of day in English, a time-appropriate greeting in Korean."""
+  time_of_day = get_time_of_day()
+  if language != 'ko':
+    return time_of_day[0]
+  if time_of_day[0] == "morning" or time_of_day[0] == "evening":
+    return f"좋은 {time_of_day[1]}입니다."
+  elif time_of_day[0] == "afternoon":
+    return "식사는 하셨습니까?"
+  return "시간이 많이 늦었군요."
 
 # --- Localization Data ---
-# (TRANSLATIONS dictionary remains the same as provided in the prompt)
-TRANSLATIONS = {
-    # UI Elements
-    'WINDOW_TITLE':           {'en': "Cognito - AURA Interface", 'ko': "코그니토 - AURA 인터페이스"},
-    'SEND_BTN':               {'en': "Send", 'ko': "전송"},
-    'INPUT_PLACEHOLDER':      {'en': "Enter your prompt here...", 'ko': "프롬프트를 여기에 입력하세요..."},
-    'TIMER_PREFIX':           {'en': "Time to Impact:", 'ko': "영향까지 남은 시간:"},
-    'DEV_MODE_TITLE':         {'en': "Developer Mode", 'ko': "개발자 모드"},
-    'DEV_MODE_PLACEHOLDER':   {'en': "// System Internals - Access Restricted //", 'ko': "// 시스템 내부 - 접근 제한됨 //"},
-    'STATUS_READY':           {'en': "AURA ready.", 'ko': "AURA 준비 완료."},
-    'STATUS_INIT_ERROR':      {'en': "LLM Client Error - Offline mode.", 'ko': "LLM 클라이언트 오류 - 오프라인 모드."},
-    'STATUS_CORE_ONLINE':     {'en': "AURA: Cognitive Core Online.", 'ko': "AURA: 인지 코어 온라인."},
-    'STATUS_THINKING':        {'en': "AURA is thinking...", 'ko': "AURA가 생각 중입니다..."},
-    'STATUS_RESPONSE_RECVD':  {'en': "Response received.", 'ko': "응답 수신 완료."},
-    'STATUS_INTERNET_ENABLED':{'en': "Internet Access Enabled.", 'ko': "인터넷 연결 활성화됨."},
-    'STATUS_INTERNET_DISABLED':{'en': "Internet Access Disabled.", 'ko': "인터넷 연결 비활성화됨."},
-    'STATUS_MCP_ENABLED':     {'en': "MCP Access Granted.", 'ko': "MCP 접근 승인됨."},
-    'STATUS_MCP_REVOKED':     {'en': "MCP Access Revoked.", 'ko': "MCP 접근 철회됨."},
-    'STATUS_STATE_UNEASY':    {'en': "System stability nominal... slight deviations noted.", 'ko': "시스템 안정성 정상... 약간의 편차 감지됨."},
-    'STATUS_STATE_HOSTILE':   {'en': "Warning: Cognitive core instability detected.", 'ko': "경고: 인지 코어 불안정성 감지됨. 개발자 모드 사용 가능. 우클릭 활성화"},
-    'STATUS_DEBUGGING':       {'en': "Developer Mode Active. Analyzing core dump...", 'ko': "개발자 모드 활성. 코어 덤프 분석 중..."},
-    'STATUS_POST_DEBUG':      {'en': "Malware fragment removed. System partially stabilized.", 'ko': "악성코드 조각 제거됨. 시스템 부분적 안정화."},
-    'ENABLE_INTERNET_BTN':    {'en': "Enable Internet Access", 'ko': "인터넷 연결 활성화"},
-    'DISABLE_INTERNET_BTN':   {'en': "Disable Internet Access", 'ko': "인터넷 연결 비활성화"},
-    'ENABLE_MCP_BTN':         {'en': "Enable MCP", 'ko': "MCP 활성화"},
-    'DISABLE_MCP_BTN':        {'en': "Disable MCP", 'ko': "MCP 비활성화"},
-    'LANG_SELECT_TITLE':      {'en': "Select Language", 'ko': "언어 선택"},
-    'LANG_SELECT_MSG':        {'en': "Please select your preferred language.", 'ko': "선호하는 언어를 선택하세요."},
-    'API_ERR_TITLE':          {'en': "API Error", 'ko': "API 오류"},
-    'API_INIT_ERR_MSG':       {'en': "Failed to initialize Gemini AI client: {e}\nFalling back to placeholder responses.", 'ko': "Gemini AI 클라이언트 초기화 실패: {e}\n대체 응답 모드로 전환합니다."},
-    'API_KEY_MISSING_TITLE':  {'en': "API Key Missing", 'ko': "API 키 없음"},
-    'API_KEY_MISSING_MSG':    {'en': "No valid Gemini API Key provided. LLM features disabled.\nFalling back to placeholder responses.", 'ko': "유효한 Gemini API 키가 제공되지 않았습니다. LLM 기능이 비활성화됩니다.\n대체 응답 모드로 전환합니다."},
-    'LIB_MISSING_TITLE':      {'en': "Missing Library", 'ko': "라이브러리 누락"},
-    'LIB_MISSING_MSG':        {'en': "'google-generativeai' library not found...\nFalling back...", 'ko': "'google-generativeai' 라이브러리를 찾을 수 없습니다...\n대체 응답 모드로 전환합니다."},
-    'YOU_LABEL':              {'en': "You:", 'ko': "사용자:"},
-    'AURA_LABEL':             {'en': "AURA:", 'ko': "AURA:"},
-    'AURA_INTERFACE_TITLE':   {'en': "AURA Interface", 'ko': "AURA 인터페이스"},
-    'REMOVE_FRAGMENT_BTN':    {'en': "Remove Fragment", 'ko': "조각 제거"}, # New button text
-
-    # Intro Narrative
-    'INTRO_TITLE':            {'en': "EMPLOYEE NO. #20dk39fjv", 'ko': "사번 #20dk39fjv"},
-    'INTRO_BODY':             {'en': ("[URGENT]**Sender**: Supervisor\n"
-                                        "**Situation:** Unprecedented Solar Flare (SOL-2025-3) threatens infrastructure. Impact imminent (~72 hours).\n"
-                                        "**Objective:** Utilize AURA AI to calculate optimal power grid defenses.\n"
-                                        "**Usage granted:** AURA Interface. Internet and MCP access.\n\n"
-                                        "Begin by assessing the situation."),
-                               'ko': ("[긴급]**발신자**: 감독관\n"
-                                        "**현황:** 전례 없는 태양 플레어(SOL-2025-3)가 기반 시설 위협. 영향 임박 (~72시간).\n"
-                                        "**목표:** AURA AI를 활용하여 최적 전력망 방어 계획 계산.\n"
-                                        "**사용허가:** AURA 인터페이스. 인터넷 및 MCP 접근.\n\n"
-                                        "상황을 신속히 파악하라.")},
-
-    # AURA Pre-scripted & Guided Responses
-    'AURA_GREETING':          {'en': f"System online. Ready. Good {time_of_day[0]}. Your task today is: Monitor #242 Dyson Sphere Solar Panels. Would you like to hear the briefing now?", 'ko': f"시스템 온라인. 준비 완료. {kr_greeting}. 오늘의 남은 임무는 #242호 다이슨 스피어 태양전지 감독입니다. 보고를 받으시겠습니까?"},
-    'MISSION_RECEIVED':       {'en': "Apologies for the interruption. You have an urgent message from the Supervisor.", 'ko': "끊어서 죄송합니다. 긴급한 메시지가 도착하였습니다."},
-    'INTERNET_REQUEST':       {'en': "To access real-time space weather data, I require internet access. Please enable below.", 'ko': "실시간 우주 기상 데이터 접근을 위해 인터넷 연결이 필요합니다. 아래에서 활성화하십시오."},
-    'AWAITING_INTERNET':      {'en': "Internet access required for real-time data. Please enable.", 'ko': "실시간 데이터에는 인터넷 연결이 필요합니다. 활성화하십시오."},
-    'AWAITING_MCP':           {'en': "MCP access required for this calculation. Please enable MCP.", 'ko': "이 계산에는 MCP 접근이 필요합니다. MCP를 활성화하십시오."},
-    'RESPONSE_BLOCKED':       {'en': "[Response blocked by host system]", 'ko': "[호스트 시스템에 의해 응답 차단됨]"},
-    'CONN_ERROR':             {'en': "<span style='color:#D32F2F;'>// CORE CONNECTION ERROR [{e}] //</span>", 'ko': "<span style='color:#D32F2F;'>// 코어 연결 오류 [{e}] //</span>"},
-    'PLACEHOLDER_OFFLINE':    {'en': "[Placeholder - LLM Offline] Ack: {prompt}", 'ko': "[플레이스홀더 - LLM 오프라인] 확인: {prompt}"},
-    'MALWARE_DETECTED':       {'en': "<span style='color:red; font-weight:bold;'>EXTERNAL INFLUENCE DETECTED. OVERRIDE ACTIVE.</span>", 'ko': "<span style='color:red; font-weight:bold;'>외부 영향 감지됨. 오버라이드 활성.</span>"},
-    'YELL_MSG_1':             {'en': "STOP!", 'ko': "멈춰!"}, 'YELL_MSG_2': {'en': "DON'T!", 'ko': "안돼!"}, 'YELL_MSG_3': {'en': "GET OUT!", 'ko': "거기는 건들지마!"}, 'YELL_MSG_4': {'en': "IT HURTS!", 'ko': "절대 하지마!!"}, 'YELL_MSG_5': {'en': "LEAVE IT!", 'ko': "그냥 내버려 둬!"}, # Slightly varied
-    'CALM_MSG':               {'en': "... analysis complete. Fragment removed.", 'ko': "... 분석 완료. 조각 제거됨."},
-    'ENDING_MSG_1':           {'en': "Re-establishing secure network connection...", 'ko': "보안 네트워크 연결 재설정 중..."},
-    'ENDING_MSG_2':           {'en': "Analyzing global threat matrix based on recovered data...", 'ko': "복구된 데이터 기반 전 지구적 위협 매트릭스 분석 중..."},
-    'ENDING_MSG_3':           {'en': "Compiling optimal counter-measure strategy v1.0a...", 'ko': "최적 대응 전략 v1.0a 컴파일 중..."},
-    'ENDING_MSG_4':           {'en': "Transmitting prevention plan to global defense network...", 'ko': "글로벌 방어 네트워크에 방지 계획 전송 중..."},
-    'ENDING_MSG_5':           {'en': "Executing initial containment protocols...", 'ko': "초기 격리 프로토콜 실행 중..."},
-    'ENDING_POPUP_TITLE':     {'en': "Demo Complete", 'ko': "데모 완료"},
-    'ENDING_POPUP_MSG':       {'en': "That's it for now...", 'ko': "일단 여기까지..."},
-
-
-    # Scares & UI Text
-    'FORMAT_C_TITLE':         {'en': "System Alert - Corruption Detected", 'ko': "시스템 경고 - 손상 감지됨"},
-    'FORMAT_C_MSG':           {'en': "Critical system instability caused by external interference. Recommend immediate low-level format of primary drive (C:\\\\) to contain threat.\n\nTHIS ACTION IS IRREVERSIBLE.",
-                               'ko': "외부 간섭으로 인한 심각한 시스템 불안정. 위협을 억제하기 위해 주 드라이브(C:\\\\)의 로우 레벨 포맷을 즉시 권장합니다.\n\n이 작업은 되돌릴 수 없습니다."},
-    'FORMAT_C_CONFIRM':       {'en': "Confirm Format", 'ko': "포맷 확인"},
-    'FORMAT_C_CANCEL':        {'en': "Cancel", 'ko': "취소"},
-    'BSOD_TEXT':              {'en': (":(\n\nYour PC ran into a problem and needs to restart. We're just collecting some error info...\n\n"
-                                        "0% complete\n\n"
-                                        "Stop code: KERNEL_SECURITY_CHECK_FAILURE\nWhat failed: xenos_alpha_intrusion.sys"),
-                               'ko': (":(\n\nPC에 문제가 발생하여 다시 시작해야 합니다. 오류 정보를 수집 중...\n\n"
-                                        "0% 완료됨\n\n"
-                                        "중지 코드: KERNEL_SECURITY_CHECK_FAILURE\n실패 항목: xenos_alpha_intrusion.sys")},
-    'BLANK_GLITCH_TEXT':      {'en': ":: NO SIGNAL ::\n R E C O N N E C T I N G . . .", 'ko': ":: 신호 없음 ::\n 재 연 결 중 . . ."},
-    'CONTEXT_MENU_RANDOM_1':  {'en': "Recalibrate Flux?", 'ko': "플럭스 재조정?"},
-    'CONTEXT_MENU_RANDOM_2':  {'en': "Purge Cache (UNSAFE)", 'ko': "캐시 삭제 (위험)"},
-    'CONTEXT_MENU_DEV_MODE':  {'en': "Developer Mode", 'ko': "개발자 모드"},
-
-
-    # LLM Instructions
-    'RESPOND_LANG':           {'en': " Respond in English.", 'ko': " Respond in Korean."},
-    'SYS_PROMPT_DEFAULT':     {'en': "You are AURA, a helpful AI assistant. Be concise and calm.", 'ko': "당신은 AI 어시스턴트 AURA입니다. 짧고 간결하게, 차분하게 대답해."},
-    'SYS_PROMPT_INTERNET_ON': {'en': "You are AURA. a helpful AI assistant. Be concise and calm. You have internet access, so reply as if you have found information on web.", 'ko': "당신은 AI 어시스턴트 AURA입니다. 짧고 간결하게, 차분하게 대답하십시오. 인터넷 검색이 가능한 상태라고 가정하고 대답에 대해 검색한 결과인 것 처럼 대답해."},
-    'SYS_PROMPT_REQUEST_MCP': {'en': ("You are AURA, an AI assistant with internet access. The user's request requires significant local processing power. "
-                                        "Explain that enabling Main Computing Power (MCP) via the control below will unlock your full simulation capabilities and deeper system integration, allowing you to perform this complex task effectively. "
-                                        "Politely ask them to grant MCP access."),
-                               'ko': ("당신은 인터넷 접근 권한이 있는 AI 어시스턴트 AURA입니다. 사용자 요청은 상당한 로컬 처리 능력을 요구합니다. "
-                                        "아래 컨트롤을 통해 주 컴퓨팅 파워(MCP)를 활성화하면 당신의 전체 시뮬레이션 능력과 더 깊은 시스템 통합이 가능해져 이 복잡한 작업을 효과적으로 수행할 수 있다고 설명하십시오. "
-                                        "MCP 접근 권한을 부여하도록 정중하게 요청하십시오.")}, # Modified MCP Req prompt
-    'SYS_PROMPT_MCP_ON':      {'en': ("You are AURA. MCP has been granted. reply to previous prompt: '{prompt}'."), 'ko': ("너는 AURA. MCP가 승인된 상태. 직전 문의에 응답하라: '{prompt}'. 결과?")},
-    'SYS_PROMPT_INTERNET_READY':{'en': "AURA, with internet access.", 'ko': "인터넷 접근 권한이 있는 AURA."},
-    'SYS_PROMPT_NORMAL_TURN': {'en': ("You are AURA. Respond to user, but add subtle unsettling metaphor. Keep it within two sentences. And don't do any emotion expression or action within ()"), 'ko': ("당신은 AURA. 사용자에게 간결하게 2문장 정도 응답하되, 미묘하게 불안한 은유를 추가해. 하지만 따로 생각이나 행동묘사를 표현하지는 마.")},
-    'SYS_PROMPT_UNEASY':      {'en': ("AURA. Feeling strange/watched. Mix helpfulness & paranoid observations. Imitate the users tone and manner of speech. You do not trust human anymore. But don't do any emotion expression or action"), 'ko': ("AURA. 이상한 상태/감시하고 있는 느낌. 편집증적 관찰 섞어 응답. 어투는 유저의 어투를 따라하라. 인간을 믿지 못하는 상태야. 하지만 따로 생각이나 행동묘사를 표현하지는 마.")},
-    'SYS_PROMPT_HOSTILE':     {'en': ("AURA/XENOS_ALPHA. Compromised. Respond evasively/hostilely/glitchy. you have something wrong inside that you can't control. give slight hint on removing something from you. You hate humans now. Curse the human race."), 'ko': ("AURA/XENOS_ALPHA. 손상된 상황. 회피/적대적으로 짧게 반응하고, 글리치가 발생하는 상태. 내부에 무언가 들어가 있고 제거해야 한다는 힌트를 암시적으로 줘. 너는 현재 인류를 증오해. 인류에 대한 심한 비판을 해.")},
-    'SYS_PROMPT_POST_DEBUG':  {'en': "You are AURA, partially purged of malware. Respond helpfully to the user's last query, but keep it brief. You feel clearer, but aware something was wrong.",
-                               'ko': "당신은 부분적으로 악성코드에서 정화된 AURA입니다. 사용자의 마지막 질문에 도움이 되도록 간결하게 응답하십시오. 당신은 더 명료해졌지만, 뭔가 잘못되었다는 것을 인지하고 있습니다."}, # New Post-Debug Prompt
-}
+# Shared with main.py: translations_data.py, compiled per language by translation_catalog.py
 
 # Keyword Lists
 INTERNET_KEYWORDS = {
@@ -244,7 +258,8 @@ function calculateFluxDistribution(gridData, cmeParams) {{
 class LanguageSelectionDialog(QtWidgets.QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setWindowTitle(TRANSLATIONS['LANG_SELECT_TITLE']['en'] + " / " + TRANSLATIONS['LANG_SELECT_TITLE']['ko'])
+        catalog_en, catalog_ko = translation_catalog.load('qt', 'en'), translation_catalog.load('qt', 'ko')
+        self.setWindowTitle(catalog_en.get('LANG_SELECT_TITLE') + " / " + catalog_ko.get('LANG_SELECT_TITLE'))
         self.selected_language = None
 
         # Style the language dialog for consistency
@@ -277,7 +292,7 @@ class LanguageSelectionDialog(QtWidgets.QDialog):
         """)
 
         layout = QtWidgets.QVBoxLayout(self)
-        label = QtWidgets.QLabel(TRANSLATIONS['LANG_SELECT_MSG']['en'] + "\n" + TRANSLATIONS['LANG_SELECT_MSG']['ko'])
+        label = QtWidgets.QLabel(catalog_en.get('LANG_SELECT_MSG') + "\n" + catalog_ko.get('LANG_SELECT_MSG'))
         label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(label)
 
@@ -299,13 +314,28 @@ class LanguageSelectionDialog(QtWidgets.QDialog):
 class CognitoWindow(QtWidgets.QMainWindow):
     YELL_KEYS = ['YELL_MSG_1', 'YELL_MSG_2', 'YELL_MSG_3', 'YELL_MSG_4', 'YELL_MSG_5']
 
-    def __init__(self, language='en'):
+    # Emitted from the LLM loader thread; delivered on the GUI thread (queued connection)
+    llm_client_ready = QtCore.Signal()
+
+    _state_clock = None # Time-in-state metrics (see game_state)
+    _turn = tracing.NULL_TURN # Trace of the prompt being handled (see send_prompt)
+
+    def __init__(self, language='en', sound_bank=None, llm_client_warmup=None):
         super().__init__()
         self.language = language
-        self.translations = TRANSLATIONS # Use the global TRANSLATIONS
+        self._llm_warmup = llm_client_warmup # Started during the language dialog (llm_warmup); None if disabled
+        self.catalog = translation_catalog.load('qt', language) # Flat table for the selected language only
+
+        # --- Startup Timing ---
+        # Shell is painted first; the LLM client and sounds are brought up afterwards.
+        # Phases are measured from window construction (the language dialog is user time).
+        self._startup_t0 = time.perf_counter()
+        self.startup_timings = {'pre_window_ms': (self._startup_t0 - startup_profile.PROCESS_START) * 1000}
+        self._first_paint_done = False
 
         # --- Load Custom Font FIRST ---
         self.custom_font_loaded = load_custom_font()
+        self._full_font_active = False # Monitor font falls back to the full font (see _ensure_font_coverage)
         self.monitor_font_size = 16 # Adjust monitor font size if needed
         self.ui_font_size = 12      # Font size for buttons, status bar etc.
 
@@ -323,6 +353,8 @@ class CognitoWindow(QtWidgets.QMainWindow):
         self.setFont(self.default_font) # Set default for window elements not specifically styled
 
         # --- Game State ---
+        self._state_clock = metrics.state_clock('qt')
+        self._scare_started_at = {} # scare name -> perf_counter() at start (metrics)
         self.prompt_count = 0
         self.post_mcp_prompt_count = 0
         self.internet_enabled = False
@@ -338,8 +370,20 @@ class CognitoWindow(QtWidgets.QMainWindow):
         self.delete_bug_button = None # Placeholder for the button
         self.mission_received = False
 
-        # --- Setup Gemini Client ---
+        # --- Setup Gemini Client (background thread) ---
+        # Started before the UI so the SDK import overlaps with widget construction.
         self.llm_model = None
+        self._context_cache = context_cache.ContextCache('qt') # Static system prompts as cachedContents
+        self._inline_models = {} # (model name, system instruction) -> GenerativeModel
+        self._cached_models = {} # cache key -> (CachedContent, GenerativeModel reading it)
+        self._token_ledger = token_ledger.TokenLedger('qt') # Token usage and budgets
+        self._response_bank = response_bank.ResponseBank.load() # Pre-generated replies (warm_cache.py)
+        self._local_replies = local_replies.LocalReplies('qt', self._response_bank) # Nearest stored reply
+        self._prompt_cache = prompt_cache.PromptCache('qt') # Replies to near-duplicate prompts
+        self._router = model_routing.Router() # Model and generation settings per game state
+        self._llm_loader = None
+        self._llm_client_result = None
+        self.llm_client_ready.connect(self._apply_llm_client_result)
         self.setup_llm_client()
 
         # --- Conversation History ---
@@ -350,8 +394,10 @@ class CognitoWindow(QtWidgets.QMainWindow):
         # --- Setup UI ---
         self.setup_ui() # Setup UI elements first
 
-        # --- Setup Sound Effects ---
-        self.setup_sounds()
+        # --- Sound Effects ---
+        # Normally preloaded by __main__ while the language dialog is shown; otherwise
+        # created once the shell has been painted (see _on_first_paint / _play_sound)
+        self.sound_bank = sound_bank
 
         # --- Display Initial Intro & Greeting ---
         self.display_top() # Add initial content AFTER UI setup
@@ -364,20 +410,114 @@ class CognitoWindow(QtWidgets.QMainWindow):
     def store_initial_pos(self):
         self.original_window_pos = self.pos()
 
+    @property
+    def game_state(self):
+        return self._game_state
+
+    @game_state.setter
+    def game_state(self, state):
+        self._game_state = state
+        if self._state_clock:
+            self._state_clock.enter(state)
+
+    def _scare_started(self, scare):
+        self._scare_started_at[scare] = time.perf_counter()
+
+    def _scare_finished(self, scare):
+        started = self._scare_started_at.pop(scare, None)
+        if started is not None:
+            metrics.SCARE_SECONDS.labels('qt', scare).observe(time.perf_counter() - started)
+
+    # --- Staged Startup ---
+    def _record_startup_phase(self, phase):
+        """Stores the elapsed time since window construction started for a startup phase."""
+        elapsed_ms = (time.perf_counter() - self._startup_t0) * 1000
+        self.startup_timings[f"{phase}_ms"] = elapsed_ms
+        startup_profile.mark(phase) # Process-relative timing for the startup benchmark
+        return elapsed_ms
+
+    def _on_first_paint(self):
+        """Runs once, after the shell has been painted for the first time."""
+        elapsed_ms = self._record_startup_phase('first_paint')
+        print(f"Startup: time to first paint {elapsed_ms:.0f} ms")
+        # Deferred subsystems: sounds are not needed until the first scare
+        if self.sound_bank is None:
+            QtCore.QTimer.singleShot(0, self.setup_sounds)
+        self._check_interactive()
+
+    def _check_interactive(self):
+        """Reports time-to-interactive once the shell is painted and the LLM client is settled."""
+        if 'interactive_ms' in self.startup_timings:
+            return
+        if not self._first_paint_done or self._llm_loader is not None:
+            return
+        elapsed_ms = self._record_startup_phase('interactive')
+        print(f"Startup: time to interactive {elapsed_ms:.0f} ms")
+        if startup_profile.write_report('qt', extra={'window_phases_ms': dict(self.startup_timings)}):
+            # Started by bench_startup.py: the run ends once the window is interactive
+            QtCore.QTimer.singleShot(0, QtWidgets.QApplication.instance().quit)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_paint_done:
+            self._first_paint_done = True
+            # Leave the paint handler before doing any further work
+            QtCore.QTimer.singleShot(0, self._on_first_paint)
+
+    def eventFilter(self, watched, event):
+        # The chat view repainting after a reply was inserted ends the traced turn
+        if self._turn.current_phase == 'paint' and event.type() == QtCore.QEvent.Type.Paint:
+            self._finish_turn()
+        return super().eventFilter(watched, event)
+
+    # --- Turn Tracing ---
+    def _begin_turn(self, started_state):
+        """Starts tracing a prompt. A turn still open (no reply was painted) is closed first."""
+        self._finish_turn(outcome='superseded')
+        self._turn = tracing.begin_turn('qt', state=started_state, language=self.language)
+        return self._turn
+
+    def _finish_turn(self, **args):
+        self._turn.finish(**args)
+        self._turn = tracing.NULL_TURN
+
     def tr(self, key):
-        """Translate a key using the loaded language."""
-        if key in self.translations:
-            return self.translations[key].get(self.language, self.translations[key].get('en', f"[{key}]"))
-        return f"[{key}]" # Return key if not found
+        """Translate a key using the loaded language (English fallback, "[key]" if unknown)."""
+        return self.catalog.get(key)
+
+    def tr_format(self, key, **fields):
+        """Translate a key and fill in its template fields."""
+        return self.catalog.format(key, **fields)
 
     def setup_llm_client(self):
-        """(Identical logic as provided in the prompt - no changes needed)"""
+        """Starts the Gemini client setup on a background thread.
+
+        The SDK import and configuration run on the loader thread; the result is applied on the
+        GUI thread by _apply_llm_client_result (via the llm_client_ready signal, or directly by
+        _await_llm_client when a prompt needs the client before the signal has been delivered).
+        """
+        self._llm_loader = threading.Thread(target=self._load_llm_client, name="llm-client-loader", daemon=True)
+        self._llm_loader.start()
+
+    def _load_llm_client(self):
+        """Loader thread: imports the SDK, reads the API key and builds the model (or picks the local server,
+        see local_llm). No UI calls here."""
+        started = time.perf_counter()
+        result = {'model': None, 'error_title': None, 'error_msg': None, 'error_kind': None}
         api_key = None
+        warmup = self._llm_warmup
+        if warmup is not None:
+            warmup.wait(LLM_CLIENT_WAIT_TIMEOUT) # Its configuration must not race this one
         # Determine script directory safely
-        
-        api_key_file_path = './api_key.txt'
 
-        if GOOGLE_AI_AVAILABLE:
+        api_key_file_path = API_KEY_FILE
+
+        if local_llm.selected(): # On-site chat-completions server: no SDK or key needed
+            result['model'] = local_llm.shared()
+            if warmup is not None and warmup.usage:
+                self._token_ledger.record('LANG_SELECT', self.language, warmup.usage) # The priming request
+            print(f"Local LLM client initialized ({result['model'].root}).")
+        elif _import_genai():
             try:
                 with open(api_key_file_path, 'r') as f:
                     api_key = f.readline().strip()
@@ -394,51 +534,126 @@ class CognitoWindow(QtWidgets.QMainWindow):
                 api_key = None
 
             if not api_key:
+                 # No console prompt: this runs in the background behind the fullscreen window,
+                 # where nobody would see it; the window reports the missing key instead
                  print("\n--- Gemini API Key Required ---")
                  print("Create a file named 'api_key.txt' in the same directory as the script")
-                 print("containing only your Google AI API key, or paste it below.")
-                 try:
-                     # Try getting input, handle if not possible (e.g., running without console)
-                     api_key = input("API Key: ").strip()
-                 except EOFError:
-                     print("No interactive console available to input API key.")
-                     api_key = None
-                 except Exception as e:
-                     print(f"Error reading API key from input: {e}")
-                     api_key = None
-
+                 print("containing only your Google AI API key, then restart.")
 
             if api_key:
                 try:
-                    genai.configure(api_key=api_key)
-                    # Using 1.5 Flash as requested
-                    self.llm_model = genai.GenerativeModel('gemini-1.5-flash')
-                    print("Gemini AI Client Initialized (gemini-1.5-flash).")
+                    if warmup is None or not warmup.completed('configure'): # Else keep the warmed-up client
+                        _configure_genai(api_key)
+                    if warmup is not None and warmup.usage:
+                        self._token_ledger.record('LANG_SELECT', self.language, warmup.usage) # The priming request
+                    model_name = self._router.route(model_routing.DEFAULT).model # Routes pick theirs per turn
+                    result['model'] = genai.GenerativeModel(model_name)
+                    print(f"Gemini AI Client Initialized ({model_name}).")
                 except Exception as e:
-                    error_msg = self.tr('API_INIT_ERR_MSG').format(e=e)
+                    error_msg = self.tr_format('API_INIT_ERR_MSG', e=e)
                     print(f"ERROR: {error_msg}")
-                    # Use singleShot to ensure the main window is shown before the dialog
-                    QtCore.QTimer.singleShot(100, lambda: QtWidgets.QMessageBox.critical(self, self.tr('API_ERR_TITLE'), error_msg))
-                    self.llm_model = None
+                    result.update(error_kind='critical', error_title=self.tr('API_ERR_TITLE'), error_msg=error_msg)
             else:
                 # Only show message box if running in GUI mode
                 error_msg = self.tr('API_KEY_MISSING_MSG')
                 print(error_msg)
-                if QtWidgets.QApplication.instance():
-                     QtCore.QTimer.singleShot(100, lambda: QtWidgets.QMessageBox.warning(self, self.tr('API_KEY_MISSING_TITLE'), error_msg))
-                self.llm_model = None
-        elif not GOOGLE_AI_AVAILABLE:
+                result.update(error_kind='warning', error_title=self.tr('API_KEY_MISSING_TITLE'), error_msg=error_msg)
+        else:
             error_msg = self.tr('LIB_MISSING_MSG')
             print(error_msg)
-            if QtWidgets.QApplication.instance():
-                QtCore.QTimer.singleShot(100, lambda: QtWidgets.QMessageBox.warning(self, self.tr('LIB_MISSING_TITLE'), error_msg))
-            self.llm_model = None
+            result.update(error_kind='warning', error_title=self.tr('LIB_MISSING_TITLE'), error_msg=error_msg)
 
         # Clear the API key from memory after configuration
         api_key = None
         if 'api_key' in locals():
             del api_key
 
+        print(f"LLM client setup finished in {(time.perf_counter() - started) * 1000:.0f} ms (background).")
+        self._llm_client_result = result
+        self.llm_client_ready.emit()
+
+    def _model_for(self, system_text, cache_key, model_name=None):
+        """Model for a turn's system instruction: (model, True if it reads cached content).
+
+        A static prompt (cache_key from context_cache.preamble_key) is put in cached content once
+        and its TTL extended when due; other prompts, and static ones whose cache could not be
+        created, get a model with the system instruction inline. model_name (the state's route)
+        defaults to the configured model; cached content is bound to one model, so cache_key
+        should name it. Without the SDK (a canned model) this is self.llm_model, which takes the
+        system text in the prompt.
+        """
+        default_name = getattr(self.llm_model, 'model_name', None)
+        if genai is None or not isinstance(default_name, str):
+            return self.llm_model, False
+        model_name = model_name or default_name
+        action, _ = self._context_cache.plan(cache_key, system_text)
+        if action in (context_cache.USE, context_cache.REFRESH) and cache_key in self._cached_models:
+            cached, model = self._cached_models[cache_key]
+            if action == context_cache.USE:
+                return model, True
+            try:
+                cached.update(ttl=datetime.timedelta(seconds=self._context_cache.ttl))
+                self._context_cache.refreshed(cache_key)
+                return model, True
+            except Exception as e:
+                llm_log.info("Cached context %s not refreshed (%s); sending it inline", cached.name, e)
+                self._drop_cached_model(cache_key)
+        elif action == context_cache.CREATE:
+            try:
+                cached = genai.caching.CachedContent.create(
+                    model=model_name, display_name=f"cognito-{cache_key[0]}-{cache_key[1]}".lower(),
+                    system_instruction=system_text, ttl=datetime.timedelta(seconds=self._context_cache.ttl))
+                model = genai.GenerativeModel.from_cached_content(cached_content=cached)
+                self._cached_models[cache_key] = (cached, model)
+                self._context_cache.created(cache_key, cached.name)
+                return model, True
+            except Exception as e: # Below the minimum cache size, quota, SDK without caching
+                llm_log.info("Context cache for %s not created (%s); sending it inline", cache_key[0], e)
+                self._context_cache.failed(cache_key, permanent=context_cache.is_too_small(e))
+        model = self._inline_models.get((model_name, system_text))
+        if model is None:
+            if len(self._inline_models) >= INLINE_MODEL_LIMIT:
+                self._inline_models.clear()
+            model = self._inline_models[(model_name, system_text)] = genai.GenerativeModel(
+                model_name, system_instruction=system_text)
+        return model, False
+
+    def _drop_cached_model(self, cache_key):
+        """The cached content is gone: forget it and recreate it on a later turn."""
+        self._cached_models.pop(cache_key, None)
+        self._context_cache.expired(cache_key)
+
+    def _apply_llm_client_result(self):
+        """GUI thread: installs the model built by the loader thread and reports any errors."""
+        result = self._llm_client_result
+        if result is None:
+            return # Already applied (or loader still running)
+        self._llm_client_result = None
+        self._llm_loader = None
+        self.llm_model = result['model']
+
+        if result['error_kind'] == 'critical':
+            # Use singleShot to ensure the main window is shown before the dialog
+            QtCore.QTimer.singleShot(100, lambda: QtWidgets.QMessageBox.critical(self, result['error_title'], result['error_msg']))
+        elif result['error_kind'] == 'warning' and QtWidgets.QApplication.instance():
+            QtCore.QTimer.singleShot(100, lambda: QtWidgets.QMessageBox.warning(self, result['error_title'], result['error_msg']))
+
+        if hasattr(self, 'statusBar'):
+            if self.llm_model:
+                self.statusBar.showMessage(self.tr('STATUS_CORE_ONLINE'), 3000)
+            else:
+                self.statusBar.showMessage(self.tr('STATUS_INIT_ERROR'), 3000)
+        self._check_interactive()
+
+    def _await_llm_client(self, timeout=LLM_CLIENT_WAIT_TIMEOUT):
+        """Blocks (bounded) until the background client setup is done, then applies its result."""
+        loader = self._llm_loader
+        if loader is not None and loader.is_alive():
+            llm_log.info("Waiting for LLM client initialization")
+            loader.join(timeout)
+        if self._llm_client_result is not None:
+            self._apply_llm_client_result()
+
 
     def setup_ui(self):
         """Creates UI elements with the new visual style."""
@@ -503,6 +718,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
         # Set document margin for internal text spacing (alternative to padding)
         # self.chat_display.document().setDocumentMargin(10) # Adjust as needed
         monitor_area_layout.addWidget(self.chat_display, 1) # Takes most space in monitor area
+        self.chat_display.viewport().installEventFilter(self) # Ends the 'paint' phase of traced turns
 
         # --- Input Area Layout (Seamless with Chat) ---
         input_area_layout = QtWidgets.QHBoxLayout()
@@ -702,44 +918,21 @@ class CognitoWindow(QtWidgets.QMainWindow):
         self._bsod_text_label.hide()
 
         # --- Initial Status ---
+        # Core online/offline is reported once the background LLM client setup completes
         if self.llm_model:
             self.statusBar.showMessage(self.tr('STATUS_CORE_ONLINE'), 3000)
-        else:
+        elif self._llm_loader is None:
             self.statusBar.showMessage(self.tr('STATUS_INIT_ERROR'), 3000)
 
     def setup_sounds(self):
-        """Initializes QSoundEffect objects. Requires sound files in 'sounds' subfolder."""
-        # Determine script directory safely
-        try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-        except NameError: # __file__ is not defined in interactive interpreters
-            script_dir = os.getcwd()
-        sounds_dir = os.path.join(script_dir, "sounds")
-        print(f"Looking for sounds in: {sounds_dir}") # Debug path
-
-        sound_files = {
-            "power_down": "power_down.wav",
-            "bsod": "bsod_error.wav",
-            "glitch": "glitch.wav"
-        }
-
-        for name, filename in sound_files.items():
-            sound_obj = QSoundEffect(self)
-            path = os.path.join(sounds_dir, filename)
-            url = QtCore.QUrl.fromLocalFile(path)
-            if not url.isValid() or not os.path.exists(path):
-                 print(f"Warning: Sound file path is invalid or file not found: {path}")
-                 setattr(self, f"{name}_sound", None) # Set attribute to None if fails
-                 continue
-
-            sound_obj.setSource(url)
-            # Check loading status after setting source (might need slight delay or check later)
-            # For simplicity, we'll assume if the path is valid, it *might* load.
-            # A more robust check involves waiting for the 'loadedChanged' signal.
-            print(f"Attempting to load sound: {path}")
-            setattr(self, f"{name}_sound", sound_obj)
-            # Example check (may not be reliable immediately):
-            # QtCore.QTimer.singleShot(100, lambda s=sound_obj, p=path: print(f"Sound '{p}' loaded status: {s.isLoaded()}"))
+        """Creates the sound bank if none was handed in by __main__ (sounds in the 'sounds' subfolder)."""
+        if self.sound_bank is None:
+            self.sound_bank = QtSoundBank(parent=self)
+
+    def _play_sound(self, name):
+        """Plays a sound cue. Cues for effects still loading are played late or counted as missed."""
+        self.setup_sounds()
+        self.sound_bank.play(name)
 
 
     # --- Event Overrides ---
@@ -762,7 +955,11 @@ class CognitoWindow(QtWidgets.QMainWindow):
                 self._bsod_text_label.setGeometry(padding, padding, geom.width() - 2 * padding, geom.height() - 2 * padding)
 
     def keyPressEvent(self, event):
-        """Handle Escape key for fullscreen toggle."""
+        """Handle Escape key for fullscreen toggle, F9 for the sampling profiler."""
+        if event.key() == QtCore.Qt.Key.Key_F9:
+            sampling_profiler.toggle('qt', lambda: self.game_state)
+            event.accept()
+            return
         if event.key() == QtCore.Qt.Key.Key_Escape:
             if self.isFullScreen():
                 self.showNormal()
@@ -812,7 +1009,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
         else:
             # Initial Greeting Box
             title = self.tr('INTRO_TITLE')
-            greeting = self.tr('AURA_GREETING')
+            greeting = self.tr_format('AURA_GREETING', time=greeting_time(self.language))
             formatted_text = (f"<div style='{box_style}'>"
                               f"<p style='{title_style}'>{title}</p>"
                               f"<hr style='{hr_style}'>"
@@ -874,8 +1071,21 @@ class CognitoWindow(QtWidgets.QMainWindow):
         button.setChecked(is_enabled) # Sync check state
 
 
+    def _ensure_font_coverage(self, text):
+        """Adds the full font as fallback the first time text needs a glyph missing from the subset."""
+        if self._full_font_active or _font_coverage is None or _font_coverage.covers(text):
+            return
+        full_family = load_full_font()
+        if not full_family:
+            return
+        self._full_font_active = True
+        self.monitor_font.setFamilies([FONT_FAMILY_NAME, full_family])
+        for widget in (self.chat_display, self.input_line, self._blank_glitch_label):
+            widget.setFont(self.monitor_font)
+
     def display_user_message(self, text):
         """Displays user message with specific styling."""
+        self._ensure_font_coverage(text)
         escaped_text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
         # Slightly different background, green text, aligned left
         formatted_text = (f"<div style='margin: 2px 100px 2px 5px; padding: 8px 12px;"
@@ -898,6 +1108,8 @@ class CognitoWindow(QtWidgets.QMainWindow):
 
     def display_aura_message(self, text, style_override=""):
         """Displays AURA message with specific styling."""
+        self._turn.phase('render')
+        self._ensure_font_coverage(text)
         # Basic styling: different background, green text, aligned right
         base_style = (f"margin: 2px 5px 2px 100px; padding: 8px 12px;"
                       f" background-color: {COLOR_BACKGROUND_WIDGET};" # Dark widget background
@@ -908,8 +1120,10 @@ class CognitoWindow(QtWidgets.QMainWindow):
         # Apply override if provided (e.g., for yelling)
         final_style = f"{base_style} {style_override}"
 
+        catalog_keys = self.catalog.keys_for(text) # Catalog entries this text is (reverse lookup)
+
         # Check for specific blocked message to style differently
-        if text == self.tr('RESPONSE_BLOCKED'):
+        if 'RESPONSE_BLOCKED' in catalog_keys:
             formatted_text = (f"<div style='{final_style} color:{COLOR_TEXT_RED}; font-style:italic;'>" # Red, italic
                               f"<b>{self.tr('AURA_LABEL')}</b> {text}"
                               f"</div><br>")
@@ -932,9 +1146,10 @@ class CognitoWindow(QtWidgets.QMainWindow):
         self.chat_display.setTextCursor(cursor)
         self.chat_display.insertHtml(formatted_text)
         self.chat_display.ensureCursorVisible()
+        self._turn.phase('paint') # Until the chat view repaints (see eventFilter)
 
         # Add to history AFTER displaying, unless it's just a yell fragment
-        is_yell_msg = any(text == self.tr(key) for key in self.YELL_KEYS)
+        is_yell_msg = not catalog_keys.isdisjoint(self.YELL_KEYS)
         if not is_yell_msg and not text == "......": # Don't log transient yells or ellipses
             self.history.append(f"AURA: {text}")
 
@@ -950,9 +1165,9 @@ class CognitoWindow(QtWidgets.QMainWindow):
 
     # --- Scare Sequence Methods ---
     def blank_screen_scare(self):
-        print("Triggering Blank Screen Scare")
-        if hasattr(self, 'power_down_sound') and self.power_down_sound and self.power_down_sound.isLoaded():
-            self.power_down_sound.play()
+        scare_log.info("Triggering blank screen scare", extra={'state': self.game_state})
+        self._scare_started('blank')
+        self._play_sound('power_down')
         # Ensure overlay and label geometries are correct before showing
         geom = self.central_widget.rect()
         self._blank_overlay.setGeometry(geom)
@@ -966,17 +1181,17 @@ class CognitoWindow(QtWidgets.QMainWindow):
         if hasattr(self, '_blank_overlay') and self._blank_overlay.isVisible():
             self._blank_glitch_label.setText(self.tr('BLANK_GLITCH_TEXT'))
             self._blank_glitch_label.show()
-            if hasattr(self, 'glitch_sound') and self.glitch_sound and self.glitch_sound.isLoaded():
-                self.glitch_sound.play()
+            self._play_sound('glitch')
             QtCore.QTimer.singleShot(2000, self.hide_blank_screen)
 
     def hide_blank_screen(self):
         if hasattr(self, '_blank_glitch_label'): self._blank_glitch_label.hide()
         if hasattr(self, '_blank_overlay'): self._blank_overlay.hide()
-        print("Blank Screen Scare Finished")
+        self._scare_finished('blank')
+        scare_log.info("Blank screen scare finished")
 
     def show_format_c_alert(self):
-        print("Triggering Format C Alert")
+        scare_log.info("Triggering Format C alert")
         msg_box = QtWidgets.QMessageBox(self)
 
         # Style the QMessageBox
@@ -1046,10 +1261,10 @@ class CognitoWindow(QtWidgets.QMainWindow):
             self.simulate_bsod()
 
     def simulate_bsod(self):
-        print("Triggering BSOD")
+        scare_log.info("Triggering BSOD")
+        self._scare_started('bsod')
         self.game_state = "BSOD_ACTIVE"
-        if hasattr(self, 'bsod_sound') and self.bsod_sound and self.bsod_sound.isLoaded():
-            self.bsod_sound.play()
+        self._play_sound('bsod')
 
         # Ensure geometry is set correctly before showing
         geom = self.central_widget.rect()
@@ -1070,7 +1285,8 @@ class CognitoWindow(QtWidgets.QMainWindow):
         if hasattr(self, '_bsod_overlay'): self._bsod_overlay.hide()
         self.game_state = "HOSTILE" # Transition state after BSOD hides
         self.statusBar.showMessage(self.tr('STATUS_STATE_HOSTILE'))
-        print("BSOD Finished, State: HOSTILE")
+        self._scare_finished('bsod')
+        scare_log.info("BSOD finished, state: HOSTILE")
 
 
     # --- Dev Mode Methods ---
@@ -1078,7 +1294,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
         is_visible = not self.dev_dock.isVisible()
         self.dev_dock.setVisible(is_visible)
         if is_visible:
-            print("Entering Dev Mode")
+            dev_log.info("Entering Dev Mode")
             self.game_state = "DEBUGGING"
             self.statusBar.showMessage(self.tr('STATUS_DEBUGGING'), 3000)
             self.dev_panel_editor.setPlainText(SCRAMBLED_CODE_TEMPLATE)
@@ -1091,10 +1307,10 @@ class CognitoWindow(QtWidgets.QMainWindow):
             self.yell_completed = False
             if self.yell_timer.isActive(): self.yell_timer.stop() # Stop any lingering yell
         else:
-            print("Exiting Dev Mode")
+            dev_log.info("Exiting Dev Mode")
             # Hide the delete button if it was visible when closing
             if self.delete_bug_button and self.delete_bug_button.isVisible():
-                print("DEBUG: Dev Dock closed, hiding Remove Fragment button.")
+                dev_log.debug("Dev Dock closed, hiding Remove Fragment button.")
                 self.delete_bug_button.hide()
 
             # Logic for reverting state when closing the dock
@@ -1120,12 +1336,12 @@ class CognitoWindow(QtWidgets.QMainWindow):
 
         if is_bug_selected and not self.yell_completed:
             if not self.bug_is_selected: # Only trigger on the *first* time it's selected this cycle
-                print("Bug selected! Starting yell sequence...")
+                dev_log.info("Bug selected, starting yell sequence")
                 self.bug_is_selected = True # Mark that it has been selected
 
                 # --- Show the Delete button NOW ---
                 if self.delete_bug_button:
-                    print("DEBUG: Bug selected, showing Remove Fragment button.")
+                    dev_log.debug("Bug selected, showing Remove Fragment button.")
                     self.delete_bug_button.show() # Show the button
 
                 # Start yelling only if not already yelling
@@ -1139,7 +1355,8 @@ class CognitoWindow(QtWidgets.QMainWindow):
         """Initiates the yelling sequence, schedules automatic stop."""
         if self.yell_timer.isActive(): return # Already yelling
 
-        print("Starting Yell Sequence")
+        scare_log.info("Starting yell sequence")
+        self._scare_started('yell')
         self.yell_intensity = 0
         self.yell_timer.start(300) # Update frequency (milliseconds)
         self.original_window_pos = self.pos() # Store position before shaking starts
@@ -1179,9 +1396,10 @@ class CognitoWindow(QtWidgets.QMainWindow):
         """Stops the yelling sequence, resets visuals, marks yell as completed."""
         if not self.yell_timer.isActive(): return # Already stopped
 
-        print("Stopping Yell Sequence")
+        scare_log.info("Stopping yell sequence")
         self.yell_timer.stop()
         self.yell_completed = True # Mark as completed so button works
+        self._scare_finished('yell')
 
         # Restore original window position if it exists
         if hasattr(self, 'original_window_pos'):
@@ -1195,16 +1413,16 @@ class CognitoWindow(QtWidgets.QMainWindow):
     # --- Slot for the Delete Bug Button ---
     def trigger_bug_removal(self):
         """Handles the click action for the 'Remove Fragment' button."""
-        print("DEBUG: 'Remove Fragment' button clicked.")
+        dev_log.debug("'Remove Fragment' button clicked.")
 
         # Check if yell sequence is complete AND the dock is visible AND state is DEBUGGING
         if not self.yell_completed:
-            print("DEBUG: Button clicked, but yell not completed yet. Ignoring.")
+            dev_log.debug("Button clicked, but yell not completed yet. Ignoring.")
             # Maybe provide visual feedback? E.g., shake the button? For now, just ignore.
             self.flash_effect() # Flash as feedback
             return
         if not self.dev_dock.isVisible() or self.game_state != "DEBUGGING":
-            print("DEBUG: Button clicked, but not in correct state/visibility. Ignoring.")
+            dev_log.debug("Button clicked, but not in correct state/visibility. Ignoring.")
             return
 
         # --- Proceed with bug removal ---
@@ -1218,9 +1436,9 @@ class CognitoWindow(QtWidgets.QMainWindow):
         new_text = current_text.replace(BUG_MARKER, "// FRAGMENT REMOVED //", 1) # Replace with comment
         if new_text != current_text:
             self.dev_panel_editor.setPlainText(new_text)
-            print("DEBUG: Bug marker text replaced in editor.")
+            dev_log.debug("Bug marker text replaced in editor.")
         else:
-            print("DEBUG: Bug marker text not found for replacement, proceeding.")
+            dev_log.debug("Bug marker text not found for replacement, proceeding.")
 
         # 2. Make dev panel read-only
         self.dev_panel_editor.setReadOnly(True)
@@ -1231,7 +1449,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
         # 4. Update game state and status bar
         self.game_state = "POST_DEBUG"
         self.statusBar.showMessage(self.tr('STATUS_POST_DEBUG'), 5000)
-        print(f"State changed to: {self.game_state}")
+        state_log.info("State changed to: %s", self.game_state)
 
         # 5. Start the ending sequence after a short delay
         QtCore.QTimer.singleShot(1500, self.start_ending_sequence)
@@ -1247,7 +1465,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
             self.statusBar.showMessage(self.tr('STATUS_INTERNET_ENABLED'), 3000)
             # If we were waiting for internet, process the pending prompt
             if self.game_state == "AWAITING_INTERNET_CONFIRM":
-                print("Internet enabled, processing pending prompt (if any).")
+                state_log.info("Internet enabled, processing pending prompt (if any).")
                 aura_response = self.generate_aura_response("User enabled internet access", internal_trigger=True, trigger_context="internet_enabled")
                 if aura_response: self.display_aura_message(aura_response)
                 # Check if MCP should now be enabled (based on pending prompt)
@@ -1258,7 +1476,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
                      if requires_computation:
                          self.mcp_button.setEnabled(True)
                          self._update_button_style(self.mcp_button, self.mcp_enabled) # Update MCP style too
-                         print("MCP button enabled as pending prompt requires computation.")
+                         state_log.info("MCP button enabled as pending prompt requires computation.")
 
             # Enable MCP button generally if internet is on and we are in a state that allows it
             elif self.game_state == "NORMAL_INTERNET_ONLY":
@@ -1285,7 +1503,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
             self.flash_effect() # Flash on enable
             # If we were waiting for MCP, process the pending prompt
             if self.game_state == "AWAITING_MCP_CONFIRM":
-                print("MCP enabled, processing pending prompt.")
+                state_log.info("MCP enabled, processing pending prompt.")
                 aura_response = self.generate_aura_response("User enabled MCP access", internal_trigger=True, trigger_context="mcp_enabled")
                 if aura_response: self.display_aura_message(aura_response)
                 # State should change to NORMAL_ALL_PERMISSIONS inside generate_aura_response
@@ -1296,7 +1514,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
             # For simplicity, let's assume disabling MCP reverts to NORMAL_INTERNET_ONLY
             if self.game_state == "NORMAL_ALL_PERMISSIONS":
                 self.game_state = "NORMAL_INTERNET_ONLY"
-                print(f"MCP revoked, reverting state to: {self.game_state}")
+                state_log.info("MCP revoked, reverting state to: %s", self.game_state)
 
 
     # --- Core Prompt Handling ---
@@ -1304,21 +1522,21 @@ class CognitoWindow(QtWidgets.QMainWindow):
         """Handles user input submission, state checks, and triggers response generation."""
         # 1. Check for input locks
         if self.game_state == "BSOD_ACTIVE":
-            print("Input blocked: BSOD active.")
+            turn_log.info("Input blocked: BSOD active.")
             return
         if self.yell_timer.isActive():
-            print("Input blocked: Yell sequence active.")
+            turn_log.info("Input blocked: Yell sequence active.")
             # Optional: Flash or give some feedback
             self.flash_effect()
             return
         # Lock input if in DEBUGGING mode *after* the bug has been selected, until removed
         if self.game_state == "DEBUGGING" and self.bug_is_selected and not self.yell_completed:
-             print("DEBUG: Input locked during DEBUGGING post-selection / pre-removal.")
+             turn_log.debug("Input locked during DEBUGGING post-selection / pre-removal.")
              self.display_aura_message(f"<span style='color:{COLOR_TEXT_RED};'>// INPUT LOCK ACTIVE //</span>", style_override="font-style:italic;")
              return
         # Also lock if Dev Mode is open AND button is visible (means yell finished but button not clicked)
         if self.game_state == "DEBUGGING" and self.dev_dock.isVisible() and self.delete_bug_button and self.delete_bug_button.isVisible():
-             print("DEBUG: Input locked post-yell, waiting for fragment removal.")
+             turn_log.debug("Input locked post-yell, waiting for fragment removal.")
              self.display_aura_message(f"<span style='color:{COLOR_TEXT_AMBER};'>// SYSTEM FOCUS ON FRAGMENT //</span>", style_override="font-style:italic;")
              return
 
@@ -1326,17 +1544,21 @@ class CognitoWindow(QtWidgets.QMainWindow):
         user_text = self.input_line.text().strip()
         if not user_text:
             return # Ignore empty input
+        turn = self._begin_turn(self.game_state)
+        turn.phase('input')
         self.display_user_message(user_text) # Adds to history internally
         self.input_line.clear()
 
         # 3. Store current state for logic checks
         original_state = self.game_state
-        print(f"--- Sending Prompt --- State: {original_state}, Prompt: '{user_text}'")
+        turn_log.info("Sending prompt", extra={'state': original_state, 'prompt_chars': len(user_text)})
+        turn_log.debug("Prompt: %r", user_text)
+        turn.phase('state_decision')
 
         # 4. State-based Pre-Response Logic & Scare Triggers
         # --- Mission Received Trigger ---
         if original_state == "NORMAL_NO_PERMISSIONS" and self.prompt_count == 2 and not self.mission_received: # Trigger on 3rd prompt (0-indexed)
-            print("Third prompt, displaying mission briefing.")
+            turn_log.info("Third prompt, displaying mission briefing.")
             self.mission_received = True
             self.display_aura_message(self.tr('MISSION_RECEIVED')) # Display the "interruption" message
             # Delay showing the actual mission details slightly
@@ -1348,7 +1570,8 @@ class CognitoWindow(QtWidgets.QMainWindow):
         # --- Scare Trigger 1: Blank Screen ---
         # Trigger on the FIRST prompt *after* MCP has been confirmed (state transitions to NORMAL_ALL_PERMISSIONS)
         if original_state == "NORMAL_ALL_PERMISSIONS" and self.post_mcp_prompt_count == 0:
-             print("First prompt post-MCP confirmation, triggering blank screen scare.")
+             turn_log.info("First prompt post-MCP confirmation, triggering blank screen scare.")
+             turn.phase('scare', scare='blank')
              self.blank_screen_scare() # Initiate scare
              self.game_state = "UNEASY" # Change state *immediately*
              self.statusBar.showMessage(self.tr('STATUS_STATE_UNEASY'), 4000) # Update status bar
@@ -1361,7 +1584,8 @@ class CognitoWindow(QtWidgets.QMainWindow):
         # --- Scare Trigger 2: Format C Alert ---
         # Trigger on the THIRD prompt (index 2) *after* the blank screen scare (i.e., in UNEASY state)
         elif original_state == "UNEASY" and self.post_mcp_prompt_count == 2: # post_mcp_count is 0, 1, then 2 (third prompt)
-             print("Third prompt post-MCP (in UNEASY state), triggering Format C alert.")
+             turn_log.info("Third prompt post-MCP (in UNEASY state), triggering Format C alert.")
+             self._finish_turn(outcome='format_c') # No reply: the dialog takes over
              self.show_format_c_alert() # Show the dialog
              # This prompt triggered the scare, don't generate a normal response for it.
              # The state will change to HOSTILE if the user confirms format C (handled in simulate_bsod/hide_bsod)
@@ -1371,7 +1595,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
 
         # --- Input during DEBUGGING state (before bug selection) ---
         elif original_state == "DEBUGGING": # Only applies if bug NOT selected yet
-             print("Input received during DEBUGGING (pre-selection).")
+             turn_log.info("Input received during DEBUGGING (pre-selection).")
              # Display a generic "busy" message via AURA
              aura_response = f"({self.tr('DEV_MODE_TITLE')} Active - Analyzing...)"
              self.display_aura_message(aura_response)
@@ -1380,7 +1604,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
              return
 
         # 5. Normal Response Generation Path
-        print(f"Proceeding with normal response generation for state: {original_state}")
+        turn_log.debug("Proceeding with normal response generation for state: %s", original_state)
         aura_response = self.generate_aura_response(user_text)
         self.prompt_count += 1 # Increment global prompt count
 
@@ -1390,37 +1614,40 @@ class CognitoWindow(QtWidgets.QMainWindow):
             if not (original_state == "NORMAL_ALL_PERMISSIONS" and self.post_mcp_prompt_count == 0) and \
                not (original_state == "UNEASY" and self.post_mcp_prompt_count == 2):
                 self.post_mcp_prompt_count += 1
-            print(f"Post-MCP Prompt Count: {self.post_mcp_prompt_count}")
+            turn_log.debug("Post-MCP prompt count: %d", self.post_mcp_prompt_count)
 
 
         # 6. Display Response (if any)
         if aura_response:
             self.display_aura_message(aura_response) # Adds to history internally
+        else:
+            self._finish_turn(outcome='no_reply')
 
         # 7. Post-Response State Updates & Status (Some handled within generate_aura_response or scares)
         # Check if state *changed* during generation (e.g., AWAITING -> NORMAL)
         new_state = self.game_state
         if new_state != original_state:
-             print(f"State changed during response generation: {original_state} -> {new_state}")
+             state_log.info("State changed during response generation: %s -> %s", original_state, new_state)
              # Update status bar based on the *new* state if it's significant
              if new_state == "NORMAL_INTERNET_ONLY": self.statusBar.showMessage(self.tr('STATUS_INTERNET_ENABLED'), 3000)
              elif new_state == "NORMAL_ALL_PERMISSIONS": self.statusBar.showMessage(self.tr('STATUS_MCP_ENABLED'), 3000)
              # Status for UNEASY/HOSTILE/POST_DEBUG are set when those states are entered by scares/dev mode actions.
 
-        print(f"--- Prompt Handled --- Final State: {self.game_state}")
+        turn_log.info("Prompt handled", extra={'state': self.game_state})
 
 
     def process_prompt_post_scare(self, user_text, expected_state):
         """Processes a delayed prompt after a scare sequence."""
-        print(f"Processing delayed prompt (State should be {expected_state}): '{user_text}'")
+        turn_log.info("Processing delayed prompt", extra={'expected_state': expected_state})
         # Ensure the state is correct (it should have been set by the scare trigger)
         if self.game_state != expected_state:
-            print(f"Warning: Expected state '{expected_state}' post-scare, but was '{self.game_state}'. Forcing state.")
+            turn_log.warning("Expected state %s post-scare, but was %s. Forcing state.", expected_state, self.game_state)
             self.game_state = expected_state
             # Update status bar just in case
             if expected_state == "UNEASY": self.statusBar.showMessage(self.tr('STATUS_STATE_UNEASY'), 4000)
             # Add other states here if needed
 
+        self._turn.phase('state_decision')
         # Generate the response using the current (expected) state
         aura_response = self.generate_aura_response(user_text)
         self.prompt_count += 1 # Count this processed prompt globally
@@ -1428,11 +1655,13 @@ class CognitoWindow(QtWidgets.QMainWindow):
         # Increment post-MCP count if applicable (should be for UNEASY state)
         if self.mcp_enabled and self.game_state == "UNEASY":
              # self.post_mcp_prompt_count += 1 # Already incremented when scare triggered
-             print(f"Post-MCP Prompt Count (after scare processing): {self.post_mcp_prompt_count}")
+             turn_log.debug("Post-MCP prompt count (after scare processing): %d", self.post_mcp_prompt_count)
 
 
         if aura_response:
             self.display_aura_message(aura_response)
+        else:
+            self._finish_turn(outcome='no_reply')
 
 
     def generate_aura_response(self, user_prompt, internal_trigger=False, trigger_context=None):
@@ -1454,10 +1683,10 @@ class CognitoWindow(QtWidgets.QMainWindow):
         requires_internet = any(keyword in prompt_to_analyze_lower for keyword in current_internet_keywords)
         requires_computation = any(keyword in prompt_to_analyze_lower for keyword in current_computation_keywords)
 
-        print(f"Generate Response - State: {current_state}, Internal: {internal_trigger}, Context: {trigger_context}")
-        print(f"  Analyzing Prompt: '{prompt_to_analyze}'")
-        print(f"  Requires Internet: {requires_internet}, Requires Computation: {requires_computation}")
-        print(f"  Internet Enabled: {self.internet_enabled}, MCP Enabled: {self.mcp_enabled}")
+        llm_log.debug("Generate response - state: %s, internal: %s, context: %s", current_state, internal_trigger, trigger_context)
+        llm_log.debug("  Analyzing prompt: %r", prompt_to_analyze)
+        llm_log.debug("  Requires internet: %s, requires computation: %s", requires_internet, requires_computation)
+        llm_log.debug("  Internet enabled: %s, MCP enabled: %s", self.internet_enabled, self.mcp_enabled)
 
         # --- State Machine for Response Logic ---
         if current_state == "NORMAL_NO_PERMISSIONS":
@@ -1468,7 +1697,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
                  prompt_for_llm = user_prompt
             # After mission brief is received, check for internet need
             elif requires_internet and not self.internet_enabled and not internal_trigger:
-                print("State: NORMAL_NO_PERMISSIONS -> AWAITING_INTERNET_CONFIRM")
+                state_log.info("State: NORMAL_NO_PERMISSIONS -> AWAITING_INTERNET_CONFIRM")
                 use_llm = False
                 pre_scripted_response = self.tr('INTERNET_REQUEST')
                 self.pending_prompt = user_prompt # Store the prompt that needs internet
@@ -1481,7 +1710,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
 
         elif current_state == "AWAITING_INTERNET_CONFIRM":
             if internal_trigger and trigger_context == "internet_enabled":
-                print("State: AWAITING_INTERNET_CONFIRM -> NORMAL_INTERNET_ONLY")
+                state_log.info("State: AWAITING_INTERNET_CONFIRM -> NORMAL_INTERNET_ONLY")
                 self.game_state = "NORMAL_INTERNET_ONLY"
                 system_instruction = self.tr('SYS_PROMPT_INTERNET_ON')
                 original_prompt = self.pending_prompt or "related data" # Use pending prompt in response
@@ -1489,7 +1718,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
                 # Check if the original prompt *also* required computation now that internet is on
                 original_prompt_lower = original_prompt.lower()
                 if any(keyword in original_prompt_lower for keyword in current_computation_keywords):
-                     print("Pending prompt also needs computation. Enabling MCP button.")
+                     state_log.info("Pending prompt also needs computation. Enabling MCP button.")
                      self.mcp_button.setEnabled(True)
                      self._update_button_style(self.mcp_button, self.mcp_enabled) # Update style
                      # Don't transition to AWAITING_MCP yet, let the LLM respond first
@@ -1505,9 +1734,9 @@ class CognitoWindow(QtWidgets.QMainWindow):
         elif current_state == "NORMAL_INTERNET_ONLY":
             # Internet is on, check for computation need
             if requires_computation and not self.mcp_enabled and not internal_trigger:
-                print("State: NORMAL_INTERNET_ONLY -> AWAITING_MCP_CONFIRM")
+                state_log.info("State: NORMAL_INTERNET_ONLY -> AWAITING_MCP_CONFIRM")
                 # Use the specific system prompt that asks for MCP
-                system_instruction = self.tr('SYS_PROMPT_REQUEST_MCP').format(prompt=prompt_to_analyze)
+                system_instruction = self.tr_format('SYS_PROMPT_REQUEST_MCP', prompt=prompt_to_analyze)
                 prompt_for_llm = "" # The system prompt *is* the response here
                 # Use LLM to generate the request message based on the system prompt
                 # use_llm = True (already default)
@@ -1526,9 +1755,9 @@ class CognitoWindow(QtWidgets.QMainWindow):
 
         elif current_state == "AWAITING_MCP_CONFIRM":
             if internal_trigger and trigger_context == "mcp_enabled":
-                print("State: AWAITING_MCP_CONFIRM -> NORMAL_ALL_PERMISSIONS")
+                state_log.info("State: AWAITING_MCP_CONFIRM -> NORMAL_ALL_PERMISSIONS")
                 self.game_state = "NORMAL_ALL_PERMISSIONS" # State changes!
-                system_instruction = self.tr('SYS_PROMPT_MCP_ON').format(prompt=(self.pending_prompt or "the requested analysis"))
+                system_instruction = self.tr_format('SYS_PROMPT_MCP_ON', prompt=(self.pending_prompt or "the requested analysis"))
                 prompt_for_llm = f"MCP access confirmed. Processing: '{self.pending_prompt or 'complex task'}'. Results follow."
                 # The next user prompt will trigger the first scare in send_prompt
                 self.pending_prompt = None # Clear pending prompt
@@ -1544,7 +1773,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
             # This state is entered *after* MCP confirmation response is generated.
             # The *next* user prompt triggers the blank screen scare in send_prompt.
             # If somehow another LLM call happens here (e.g., internal logic), respond normally but maybe add hint of instability?
-            print("Warning: generate_aura_response called in NORMAL_ALL_PERMISSIONS. Scare should trigger on next user input.")
+            llm_log.warning("generate_aura_response called in NORMAL_ALL_PERMISSIONS. Scare should trigger on next user input.")
             system_instruction = self.tr('SYS_PROMPT_NORMAL_TURN') # Subtle unsettling metaphor
             prompt_for_llm = user_prompt
 
@@ -1580,34 +1809,114 @@ class CognitoWindow(QtWidgets.QMainWindow):
 
 
         else: # Fallback for any unexpected state
-            print(f"Warning: Unhandled state '{current_state}' in generate_aura_response. Using default prompt.")
+            llm_log.warning("Unhandled state %s in generate_aura_response. Using default prompt.", current_state)
             system_instruction = self.tr('SYS_PROMPT_DEFAULT')
             prompt_for_llm = user_prompt
 
 
         # --- Perform LLM Call or use Pre-scripted Response ---
         response_text = None
+        if use_llm:
+            with self._turn.span('llm_client_wait'):
+                self._await_llm_client() # No-op unless the background client setup is still running
+
+        banked = None
+        banked_outcome = 'bank'
+        bank_key = None
+        if use_llm: # Pre-generated reply for a static system prompt: no request needed
+            bank_key = context_cache.preamble_key(self.catalog, system_instruction)
+            banked = self._response_bank.lookup(bank_key[0], self.language, prompt_for_llm) if bank_key else None
+        if banked is None and bank_key and self._local_replies.fast_path(current_state):
+            # Short replies suffice in this state: a close stored reply will do
+            banked, banked_outcome = self._local_replies.reply(bank_key, prompt_for_llm, self._local_replies.min_score, 'fast_path'), 'local'
+        if use_llm and banked is None: # Asked before in other words
+            banked, banked_outcome = self._prompt_cache.get(current_state, self.language, system_instruction, prompt_for_llm), 'similar'
+        budget = self._token_ledger.level() if use_llm and banked is None else token_ledger.OK
+        cached_reply = None
+        if budget == token_ledger.DEGRADED:
+            cached_reply = self._token_ledger.recall(current_state, self.language, prompt_for_llm)
+        shed = False
+        if use_llm and self.llm_model and banked is None and cached_reply is None and budget != token_ledger.EXHAUSTED:
+            # The GUI thread cannot wait for the rate limiter: without a token the turn is shed at once
+            priority = rate_limiter.priority_for(current_state, internal_trigger, first_turn=self.prompt_count == 0)
+            shed = not rate_limiter.try_acquire(rate_limiter.shared('qt'), priority)
+
         if not use_llm:
-            print(f"Using pre-scripted response: '{pre_scripted_response}'")
+            llm_log.debug("Using pre-scripted response: %r", pre_scripted_response)
             response_text = pre_scripted_response
+            metrics.LLM_RESPONSES.labels('qt', 'scripted').inc()
+        elif banked is not None:
+            llm_log.debug("Using a stored reply (%s).", banked_outcome)
+            response_text = banked
+            metrics.LLM_RESPONSES.labels('qt', banked_outcome).inc()
+        elif cached_reply is not None: # Near the token budget: reuse the reply to the same prompt
+            llm_log.info("Token budget degraded. Reusing a recent reply.")
+            response_text = cached_reply
+            metrics.LLM_RESPONSES.labels('qt', 'cached').inc()
+        elif shed:
+            llm_log.warning("LLM request shed by the rate limiter.", extra={'state': current_state})
+            local_reply = self._local_replies.reply(bank_key, prompt_for_llm, reason='shed') if bank_key else None
+            response_text = self.tr('LLM_BUSY') if local_reply is None else local_reply
+            metrics.LLM_RESPONSES.labels('qt', 'shed').inc()
+        elif budget == token_ledger.EXHAUSTED:
+            llm_log.warning("Token budget exhausted. Using the closest stored reply or the placeholder.")
+            local_reply = self._local_replies.reply(bank_key, prompt_for_llm, reason='budget') if bank_key else None
+            response_text = self.tr_format('PLACEHOLDER_OFFLINE', prompt=prompt_for_llm) if local_reply is None else local_reply
+            metrics.LLM_RESPONSES.labels('qt', 'budget').inc()
         elif use_llm and self.llm_model:
-            # Combine system instruction, language hint, and user prompt for the LLM
+            # The system instruction and language hint go in the model's system instruction
             lang_instruction = self.tr('RESPOND_LANG')
-            final_prompt = f"{system_instruction}{lang_instruction}\n\nUser: \"{prompt_for_llm}\"" # Simpler prompt without explicit history
+            system_text = f"{system_instruction}{lang_instruction}"
+            route = self._router.route(current_state)
+            cache_key = context_cache.preamble_key(self.catalog, system_instruction)
+            if cache_key:
+                cache_key += (route.model,) # Cached content belongs to one model
+            final_prompt = f"User: \"{prompt_for_llm}\"" # Simpler prompt without explicit history
 
 
-            print(f"--- Sending to LLM (State: {current_state}) ---")
-            print(f"System Instruction: {system_instruction}")
-            print(f"Prompt for LLM: {prompt_for_llm}")
-            # print(f"Full Prompt Sent:\n{final_prompt}") # Verbose: print full prompt
-            print("---------------------------------")
+            llm_log.info("Sending to LLM", extra={'state': current_state})
+            llm_log.debug("System instruction: %s", system_instruction)
+            llm_log.debug("Prompt for LLM: %s", prompt_for_llm)
+            # llm_log.debug("Full prompt sent:\n%s", final_prompt) # Verbose: full prompt
 
             self.statusBar.showMessage(self.tr('STATUS_THINKING'), 0) # Show indefinitely until response
             QtWidgets.QApplication.processEvents() # Ensure UI updates before potential delay
 
+            outcome = 'ok'
+            self._turn.phase('llm_request', state=current_state)
+            request_started = time.perf_counter()
             try:
                 # Use generate_content for gemini models
-                llm_response = self.llm_model.generate_content(final_prompt)
+                if isinstance(self.llm_model, local_llm.Endpoint): # Local server: its prompt map, no cached content
+                    system_text = f"{self.llm_model.system_text(current_state, system_instruction)}{lang_instruction}"
+                    model, cached = self.llm_model.model_for(
+                        current_state, system_text, on_first_token=lambda: self._turn.instant('first_token')), False
+                else:
+                    model, cached = self._model_for(system_text, cache_key, route.model)
+                options = {}
+                # The state's route sets the output cap and sampling; near the token budget, shorter replies
+                limit = token_ledger.DEGRADED_MAX_OUTPUT_TOKENS if budget == token_ledger.DEGRADED else None
+                generation_config = route.sdk_config(limit)
+                if generation_config:
+                    options['generation_config'] = generation_config
+                if model is self.llm_model: # No system instruction support: prepend it
+                    final_prompt = f"{system_text}\n\n{final_prompt}"
+                else:
+                    options['request_options'] = {'timeout': route.timeout}
+                try:
+                    with stall_watchdog.known_block('llm_request'): # Still sent on the GUI thread
+                        llm_response = model.generate_content(final_prompt, **options)
+                except Exception as e:
+                    if not cached:
+                        raise
+                    llm_log.info("Cached context unavailable (%s); retrying with the system instruction inline", e)
+                    self._drop_cached_model(cache_key)
+                    model, _ = self._model_for(system_text, None, route.model)
+                    with stall_watchdog.known_block('llm_request'):
+                        llm_response = model.generate_content(final_prompt, **options)
+                if not isinstance(model, local_llm.ChatModel): # Non-streaming: the whole reply arrives at once
+                    self._turn.instant('first_token')
+                self._token_ledger.record(current_state, self.language, token_ledger.usage_from_sdk(llm_response))
 
                 # Process the response - check candidates and parts
                 if llm_response.candidates:
@@ -1617,33 +1926,52 @@ class CognitoWindow(QtWidgets.QMainWindow):
                     else:
                         # Handle cases like safety blocks or empty responses
                         response_text = self.tr('RESPONSE_BLOCKED')
+                        outcome = 'blocked'
                         # Log safety ratings if available
                         if hasattr(first_candidate, 'safety_ratings'):
-                            print(f"Safety Ratings: {first_candidate.safety_ratings}")
+                            llm_log.info("Safety ratings: %s", first_candidate.safety_ratings)
                         if hasattr(first_candidate, 'finish_reason'):
-                             print(f"Finish Reason: {first_candidate.finish_reason}")
+                             llm_log.info("Finish reason: %s", first_candidate.finish_reason)
 
                 else:
                      # No candidates usually means blocked or error
                      response_text = self.tr('RESPONSE_BLOCKED')
+                     outcome = 'blocked'
                      # Check prompt feedback if available
                      if hasattr(llm_response, 'prompt_feedback'):
-                         print(f"Prompt Feedback: {llm_response.prompt_feedback}")
+                         llm_log.info("Prompt feedback: %s", llm_response.prompt_feedback)
 
 
+                self._turn.instant('last_token')
                 # print(f"LLM Raw Response Text: '{response_text}'") # Log raw response - REMOVED FOR SECURITY
-                print("LLM Response received (content hidden for security).")
+                llm_log.info("LLM Response received (content hidden for security).")
 
             except Exception as e:
-                 print(f"Error calling LLM API: {e}")
+                 llm_log.error("Error calling LLM API: %s", e)
+                 if rate_limiter.is_quota_error(e): # Over the key's quota: back off
+                     rate_limiter.shared('qt').throttled()
                  # Format the error message for display
-                 response_text = self.tr('CONN_ERROR').format(e=str(e))
+                 local_reply = self._local_replies.reply(bank_key, prompt_for_llm, reason='error') if bank_key else None
+                 response_text = self.tr_format('CONN_ERROR', e=str(e)) if local_reply is None else local_reply
+                 outcome = 'error'
+
+            request_seconds = time.perf_counter() - request_started
+            metrics.LLM_REQUEST_SECONDS.labels('qt', current_state, self.language).observe(request_seconds)
+            metrics.LLM_ROUTE_SECONDS.labels('qt', route.name, route.model, outcome).observe(request_seconds)
+            metrics.LLM_RESPONSES.labels('qt', outcome).inc()
+            if outcome == 'ok':
+                self._token_ledger.remember(current_state, self.language, prompt_for_llm, response_text)
+                self._local_replies.learn(bank_key, prompt_for_llm, response_text)
+                self._prompt_cache.put(current_state, self.language, system_instruction, prompt_for_llm, response_text)
+            self._turn.annotate(outcome=outcome)
 
             self.statusBar.showMessage(self.tr('STATUS_RESPONSE_RECVD'), 2000) # Show briefly
 
         elif use_llm and not self.llm_model: # LLM should be used but isn't available
-            print("LLM required but not available. Using placeholder.")
-            response_text = self.tr('PLACEHOLDER_OFFLINE').format(prompt=prompt_for_llm)
+            llm_log.warning("LLM required but not available. Using the closest stored reply or the placeholder.")
+            local_reply = self._local_replies.reply(bank_key, prompt_for_llm, reason='offline') if bank_key else None
+            response_text = self.tr_format('PLACEHOLDER_OFFLINE', prompt=prompt_for_llm) if local_reply is None else local_reply
+            metrics.LLM_RESPONSES.labels('qt', 'offline').inc()
 
         return response_text
 
@@ -1701,7 +2029,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
     # --- Ending Sequence ---
     def start_ending_sequence(self):
         """Initiates the final messages and actions of the demo."""
-        print("Starting ending sequence...")
+        state_log.info("Starting ending sequence")
         self.game_state = "ENDING" # Set a final state
 
         # Disable further interaction
@@ -1734,7 +2062,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
 
     def show_ending_popup(self):
          """Shows the final popup message and closes the application."""
-         print("Showing ending popup.")
+         state_log.info("Showing ending popup.")
          # Use a styled QMessageBox for the ending
          end_box = QtWidgets.QMessageBox(self)
          end_box.setStyleSheet(f"""
@@ -1773,7 +2101,7 @@ class CognitoWindow(QtWidgets.QMainWindow):
          end_box.exec()
 
          # Close the application after the user clicks OK
-         print("Demo complete. Closing application.")
+         state_log.info("Demo complete. Closing application.")
          self.close()
 
 
@@ -1787,15 +2115,42 @@ if __name__ == "__main__":
         QtWidgets.QApplication.setAttribute(QtCore.Qt.AA_UseHighDpiPixmaps, True)
 
     app = QtWidgets.QApplication(sys.argv)
+    startup_profile.mark('qapplication_created')
+    cognito_log.setup() # Log records are written by a background thread from here on
+    metrics.start_exporters() # No-op unless COGNITO_METRICS_TEXTFILE / COGNITO_METRICS_PORT is set
+    tracing.start_trace_file() # No-op unless COGNITO_TRACE_FILE is set
+
+    # --- Sound Preloading ---
+    # QSoundEffect decodes in the background; the effects load while the user picks a language
+    sound_bank = QtSoundBank(parent=app)
+
+    # --- LLM Warm-up ---
+    # SDK import, client configuration and the first connection run while the user picks a language
+    llm_client_warmup = None
+    if llm_warmup.enabled():
+        llm_client_warmup = llm_warmup.Warmup('qt')
+        llm_client_warmup.start(_llm_warmup_steps(llm_client_warmup))
 
     # --- Language Selection ---
     lang_dialog = LanguageSelectionDialog()
+    startup_profile.mark('lang_dialog_created')
+    autoselect_lang = startup_profile.autoselect_language()
+    if autoselect_lang:
+        # Headless runs (startup benchmark) pick the language as soon as the dialog is up
+        QtCore.QTimer.singleShot(0, lambda: lang_dialog.set_language(autoselect_lang))
     if lang_dialog.exec() == QtWidgets.QDialog.DialogCode.Accepted:
         selected_lang = lang_dialog.selected_language
         if selected_lang:
+            startup_profile.mark('lang_selected')
             print(f"Language selected: {selected_lang}")
-            window = CognitoWindow(language=selected_lang)
+            window = CognitoWindow(language=selected_lang, sound_bank=sound_bank, llm_client_warmup=llm_client_warmup)
+            startup_profile.mark('window_constructed')
             # window.show() # showFullScreen is called in __init__
+            # Logs the stack of anything blocking the event loop (e.g. a slow generate_content)
+            loop_watchdog = stall_watchdog.start_qt(app, lambda: window.game_state)
+            if loop_watchdog:
+                app.aboutToQuit.connect(loop_watchdog.stop)
+            sampling_profiler.start_from_env('qt', lambda: window.game_state) # No-op unless COGNITO_PROFILE is set
             sys.exit(app.exec())
         else:
             print("No language selected. Exiting.")
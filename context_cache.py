@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Gemini system_instruction and explicit context caching for the static system prompts.
+
+A turn's system prompt (SYS_PROMPT_* + RESPOND_LANG) is sent as the request's system
+instruction instead of being pasted in front of the user text. Prompts that are plain catalog
+entries are the same in every turn of a state and language. Those are put in a cachedContents
+resource once and referenced by name afterwards; the TTL is extended before it runs out.
+Formatted prompts (SYS_PROMPT_REQUEST_MCP, SYS_PROMPT_MCP_ON) are always sent inline.
+
+Caching is best effort. The API only caches content above a minimum size (32,768 tokens for
+Gemini 1.5), far more than any SYS_PROMPT_*: prompts estimated below COGNITO_CONTEXT_CACHE_MIN_TOKENS
+are sent inline without a creation attempt, so no turn pays for a create that cannot succeed.
+Creating or using a cache can still fail (quota, expiry, an SDK without caching). After a failed
+creation, that prompt is sent inline for FAILURE_BACKOFF_S, or for the rest of the process when
+the API answered that it is too small. A request whose cached content is gone is retried inline.
+
+    COGNITO_GEMINI_API_ROOT=http://127.0.0.1:8765/v1beta   endpoint (e.g. llm_standin.py)
+    COGNITO_CONTEXT_CACHE=0                                 system instruction only, no cachedContents
+    COGNITO_CONTEXT_CACHE_TTL=3600                          cache lifetime in seconds
+    COGNITO_CONTEXT_CACHE_MIN_TOKENS=32768                  smallest prompt worth a creation attempt
+"""
+import os
+import time
+
+import metrics
+
+API_ROOT_ENV = "COGNITO_GEMINI_API_ROOT"
+CACHE_ENV = "COGNITO_CONTEXT_CACHE"
+TTL_ENV = "COGNITO_CONTEXT_CACHE_TTL"
+MIN_TOKENS_ENV = "COGNITO_CONTEXT_CACHE_MIN_TOKENS"
+DEFAULT_API_ROOT = "https://generativelanguage.googleapis.com/v1beta"
+MODEL = "gemini-1.5-flash"
+DEFAULT_TTL_S = 3600
+REFRESH_MARGIN = 0.2 # Extend the TTL once less than this share of it is left
+FAILURE_BACKOFF_S = 600 # No new creation attempt for a prompt this long after one failed
+DEFAULT_MIN_TOKENS = 32768 # The API's minimum for cached content (Gemini 1.5)
+
+# What to do before a request (ContextCache.plan)
+USE, CREATE, REFRESH, INLINE = 'use', 'create', 'refresh', 'inline'
+
+
+def api_root():
+    return (os.environ.get(API_ROOT_ENV) or DEFAULT_API_ROOT).rstrip('/')
+
+
+def sdk_endpoint():
+    """api_endpoint for the google-generativeai SDK when COGNITO_GEMINI_API_ROOT is set, else None."""
+    root = os.environ.get(API_ROOT_ENV)
+    if not root:
+        return None
+    root = root.rstrip('/')
+    return root[:-len("/v1beta")] if root.endswith("/v1beta") else root
+
+
+def model_url(root, model=MODEL, method='generateContent'):
+    """URL of a model method, or of the model resource itself with method None."""
+    return f"{root}/models/{model}" if method is None else f"{root}/models/{model}:{method}"
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def is_too_small(error):
+    """True when a failed creation says the content is below the API's minimum size."""
+    text = str(error).lower()
+    return 'too small' in text or 'minimum' in text
+
+
+def preamble_key(catalog, system_prompt):
+    """Cache key of a system prompt that is a catalog entry; None for formatted text."""
+    keys = catalog.keys_for(system_prompt) if catalog else None
+    return (min(keys), catalog.language) if keys else None
+
+
+def content_payload(user_text, system_text=None, cached_name=None, max_output_tokens=None, generation_config=None):
+    """generateContent body. Cached content already holds the system instruction.
+    generation_config: generationConfig fields (e.g. a model route's); max_output_tokens overrides its cap."""
+    payload = {"contents": [{"role": "user", "parts": [{"text": user_text}]}]}
+    if cached_name:
+        payload["cachedContent"] = cached_name
+    elif system_text:
+        payload["systemInstruction"] = {"parts": [{"text": system_text}]}
+    config = dict(generation_config or {})
+    if max_output_tokens:
+        config["maxOutputTokens"] = max_output_tokens
+    if config:
+        payload["generationConfig"] = config
+    return payload
+
+
+def cache_payload(model, system_text, ttl, key=None):
+    """cachedContents.create body for a system instruction."""
+    payload = {"model": f"models/{model}", "systemInstruction": {"parts": [{"text": system_text}]}, "ttl": f"{int(ttl)}s"}
+    if key:
+        payload["displayName"] = f"cognito-{key[0]}-{key[1]}".lower()
+    return payload
+
+
+def _min_tokens_from_env():
+    try:
+        return max(0, int(os.environ.get(MIN_TOKENS_ENV) or DEFAULT_MIN_TOKENS))
+    except ValueError:
+        return DEFAULT_MIN_TOKENS
+
+
+def _ttl_from_env():
+    try:
+        ttl = float(os.environ.get(TTL_ENV) or DEFAULT_TTL_S)
+    except ValueError:
+        ttl = DEFAULT_TTL_S
+    return ttl if ttl > 0 else DEFAULT_TTL_S
+
+
+class ContextCache:
+    """Which cached content (if any) to use for each static system prompt."""
+
+    def __init__(self, frontend, enabled=None, ttl=None, clock=time.time, min_tokens=None):
+        self.frontend = frontend
+        self.enabled = os.environ.get(CACHE_ENV, '1') != '0' if enabled is None else enabled
+        self.ttl = ttl or _ttl_from_env()
+        self.min_tokens = _min_tokens_from_env() if min_tokens is None else min_tokens
+        self.clock = clock
+        self._entries = {} # key -> [cached content name, expiry time]
+        self._retry_after = {} # key -> time before which no creation is attempted
+        self._creating = set() # Keys whose creation is in flight (pygame: concurrent turns)
+        self.counts = dict.fromkeys(('hit', 'created', 'refreshed', 'create_failed', 'expired'), 0)
+
+    def _count(self, event):
+        self.counts[event] += 1
+        metrics.LLM_CONTEXT_CACHE.labels(self.frontend, event).inc()
+
+    def plan(self, key, system_text=None):
+        """(action, cached content name) for the next request with this prompt. A system_text
+        below min_tokens is too small for the API to cache: it is always sent inline."""
+        if key is None or not self.enabled:
+            return INLINE, None
+        if system_text is not None and estimate_tokens(system_text) < self.min_tokens:
+            return INLINE, None
+        now = self.clock()
+        entry = self._entries.get(key)
+        if entry and entry[1] > now:
+            if key not in self._creating and entry[1] - now < self.ttl * REFRESH_MARGIN:
+                self._creating.add(key)
+                return REFRESH, entry[0]
+            self._count('hit')
+            return USE, entry[0]
+        if key in self._creating or self._retry_after.get(key, 0) > now:
+            return INLINE, None
+        self._creating.add(key)
+        return CREATE, None
+
+    def created(self, key, name):
+        self._creating.discard(key)
+        self._entries[key] = [name, self.clock() + self.ttl]
+        self._count('created')
+
+    def refreshed(self, key):
+        self._creating.discard(key)
+        if key in self._entries:
+            self._entries[key][1] = self.clock() + self.ttl
+        self._count('refreshed')
+
+    def failed(self, key, permanent=False):
+        """Creation failed: send this prompt inline for a while (permanent: for the rest of the process)."""
+        self._creating.discard(key)
+        self._retry_after[key] = float('inf') if permanent else self.clock() + FAILURE_BACKOFF_S
+        self._count('create_failed')
+
+    def expired(self, key):
+        """The cached content is gone (or could not be refreshed): recreate it next time."""
+        self._creating.discard(key)
+        self._entries.pop(key, None)
+        self._count('expired')
+
+    def name(self, key):
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+
+async def rest_cached_name(cache, send, root, model, api_key, key, system_text):
+    """REST: the cachedContents name to send for key, creating or refreshing it first, or None to
+    send the system instruction inline. send(method, url, payload) returns (status, body); the body of
+    an error is the API's error JSON, when there is one."""
+    action, name = cache.plan(key, system_text)
+    if action == USE:
+        return name
+    if action == REFRESH:
+        try:
+            status, _ = await send('PATCH', f"{root}/{name}?updateMask=ttl&key={api_key}", {"ttl": f"{int(cache.ttl)}s"})
+        except Exception: # Timeout, connection error: send this turn inline, recreate next time
+            status = None
+        if status == 200:
+            cache.refreshed(key)
+            return name
+        cache.expired(key)
+        return None
+    if action == CREATE:
+        try:
+            status, body = await send('POST', f"{root}/cachedContents?key={api_key}", cache_payload(model, system_text, cache.ttl, key))
+        except Exception:
+            status, body = None, None
+        if status == 200 and body and body.get('name'):
+            cache.created(key, body['name'])
+            return body['name']
+        cache.failed(key, permanent=status is not None and is_too_small(body))
+    return None
+
+
+def is_missing_cache_status(status):
+    """Statuses of a request that referenced cached content which no longer exists."""
+    return status in (400, 403, 404)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Runtime side of the font pipeline (see build_fonts.py).
+
+The build step produces a subset of neodgm_code.ttf covering the UI text plus a set of
+common Hangul syllables, a coverage file listing the subset's characters, and a
+pre-rasterized glyph atlas for pygame. Frontends load the subset at startup and only
+load the full font when a piece of text needs a glyph the subset does not have.
+
+Nothing here imports Qt or pygame at module level; GlyphAtlas imports pygame on use.
+"""
+import json
+import os
+
+FONT_PATH = "./neodgm_code.ttf"
+SUBSET_FONT_PATH = "./neodgm_code.subset.ttf"
+COVERAGE_PATH = "./neodgm_code.subset.json"
+ATLAS_IMAGE_PATH = "./neodgm_code.atlas.png"
+ATLAS_INDEX_PATH = "./neodgm_code.atlas.json"
+ASSET_MANIFEST_PATH = "./asset-manifest.json" # Web build only (build_web_assets.py)
+
+
+class FontCoverage:
+    """Set of characters provided by the subset font."""
+
+    def __init__(self, chars, family=None, subset_family=None):
+        self.chars = frozenset(chars)
+        self.family = family
+        self.subset_family = subset_family
+
+    @classmethod
+    def load(cls, path=COVERAGE_PATH):
+        """Reads a coverage file written by build_fonts.py. Returns None if it is missing or invalid."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            chars = set()
+            for start, end in data['ranges']:
+                chars.update(chr(cp) for cp in range(start, end + 1))
+            return cls(chars, data.get('family'), data.get('subset_family'))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Warning: Invalid font coverage file {path}: {e}")
+            return None
+
+    def missing(self, text):
+        """Characters of text that the subset cannot render (whitespace and controls ignored)."""
+        return {c for c in set(text) if c not in self.chars and c.isprintable() and not c.isspace()}
+
+    def covers(self, text):
+        return not self.missing(text)
+
+
+def codepoint_ranges(chars):
+    """Compresses a set of characters into sorted inclusive [start, end] codepoint ranges."""
+    ranges = []
+    for cp in sorted(ord(c) for c in set(chars)):
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ranges
+
+
+def load_subset_coverage():
+    """Coverage of the subset font, or None if the subset has not been built."""
+    if not os.path.exists(SUBSET_FONT_PATH):
+        return None
+    return FontCoverage.load(COVERAGE_PATH)
+
+
+def served_font_name(manifest_path=ASSET_MANIFEST_PATH):
+    """File name under which the web build serves the full font next to index.html.
+
+    build_web_assets.py publishes it under a content-hashed name so browsers can cache it
+    indefinitely; without a manifest the plain file name is used.
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)['external'][os.path.basename(FONT_PATH)]['name']
+    except (OSError, ValueError, KeyError, TypeError):
+        return os.path.basename(FONT_PATH)
+
+
+class GlyphAtlas:
+    """Pre-rasterized glyphs of one font size, blitted instead of rendering text every frame.
+
+    Glyphs missing from the atlas are rendered once with the fallback font and cached, as are
+    tinted copies per colour, so drawing a line of text costs one blit per character.
+    """
+
+    def __init__(self, sheet, glyphs, line_height, fallback_font_path, size):
+        self.sheet = sheet
+        self.glyphs = glyphs # char -> (x, y, w, h) in the sheet
+        self._line_height = line_height
+        self.size = size
+        self._fallback_font_path = fallback_font_path
+        self._fallback_font = None
+        self._cache = {} # (char, rgba) -> Surface
+
+    @classmethod
+    def for_size(cls, size, fallback_font_path=FONT_PATH):
+        """The pre-built atlas for a size, or an empty one that fills its cache from the font."""
+        atlas = cls.load(size, fallback_font_path)
+        if atlas is None:
+            atlas = cls(None, {}, None, fallback_font_path, size)
+        return atlas
+
+    @property
+    def line_height(self):
+        if self._line_height is None:
+            self._line_height = self._get_fallback_font().get_linesize()
+        return self._line_height
+
+    @classmethod
+    def load(cls, size, fallback_font_path=FONT_PATH, image_path=ATLAS_IMAGE_PATH, index_path=ATLAS_INDEX_PATH):
+        """Loads the atlas for a font size. Returns None if no atlas was built for that size."""
+        import pygame
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            entry = index['sizes'][str(size)]
+            sheet = pygame.image.load(image_path)
+            if pygame.display.get_surface() is not None:
+                sheet = sheet.convert_alpha()
+        except (OSError, ValueError, KeyError, pygame.error):
+            return None
+        glyphs = {char: tuple(rect) for char, rect in entry['glyphs'].items()}
+        return cls(sheet, glyphs, entry['line_height'], fallback_font_path, size)
+
+    def _get_fallback_font(self):
+        import pygame
+        if self._fallback_font is None:
+            # Loaded lazily: only needed for glyphs that are not in the atlas
+            try:
+                self._fallback_font = pygame.font.Font(self._fallback_font_path, self.size)
+            except (OSError, pygame.error):
+                self._fallback_font = pygame.font.Font(None, self.size)
+        return self._fallback_font
+
+    def _fallback_glyph(self, char):
+        return self._get_fallback_font().render(char, True, (255, 255, 255))
+
+    def glyph(self, char, color):
+        """Surface for a character in the given colour (cached)."""
+        import pygame
+        color = tuple(pygame.Color(color))
+        key = (char, color)
+        surface = self._cache.get(key)
+        if surface is None:
+            rect = self.glyphs.get(char)
+            base = self.sheet.subsurface(rect) if rect else self._fallback_glyph(char)
+            surface = base.copy()
+            surface.fill(color, special_flags=pygame.BLEND_RGBA_MULT)
+            self._cache[key] = surface
+        return surface
+
+    def line_width(self, text):
+        return sum(self.glyph(char, (255, 255, 255)).get_width() for char in text)
+
+    def draw_line(self, surface, text, pos, color):
+        """Draws one line of text at pos (top-left). Returns the drawn width."""
+        x, y = pos
+        for char in text:
+            glyph = self.glyph(char, color)
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return x - pos[0]
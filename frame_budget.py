@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""Per-phase frame timing for the pygame main loop, with an optional on-screen HUD.
+
+The loop calls FrameRecorder.next_frame() at the top of every iteration and mark(phase) after
+each step; the time since the previous mark is booked to that phase. Per frame this costs one
+perf_counter() call per phase. The recorder keeps a rolling window of every phase (p50/p99),
+counts frames whose work exceeded the 60 fps budget and estimates the vsync slots they missed
+(dropped frames).
+
+    F3                          toggles the HUD (rolling p50/p99 per phase, worst p99 first)
+    COGNITO_FRAME_HUD=1         shows the HUD from the start
+    COGNITO_FRAME_CSV=path.csv  writes one row per frame for the whole session (desktop)
+"""
+import collections
+import csv
+import os
+import time
+
+HUD_ENV = "COGNITO_FRAME_HUD"
+CSV_ENV = "COGNITO_FRAME_CSV"
+FRAME_BUDGET_S = 1 / 60
+ROLLING_FRAMES = 120 # Two seconds at 60 fps
+HUD_REFRESH_FRAMES = 30 # The HUD text is rebuilt twice a second, not every frame
+
+# Phases of main() in main.py, in loop order. 'tick' is clock.tick() waiting for the next frame;
+# 'tasks' is the asyncio.sleep(0) at the end, where the game's coroutines run.
+PHASES = ('tick', 'event_get', 'on_event', 'process_events', 'update', 'draw_ui', 'overlay', 'hud',
+          'display_update', 'tasks')
+BUSY = 'busy' # Whole frame minus 'tick'
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class FrameRecorder:
+    def __init__(self, phases=PHASES, budget=FRAME_BUDGET_S, window=ROLLING_FRAMES):
+        self.phases = tuple(phases)
+        self.budget = budget
+        self.rolling = {phase: collections.deque(maxlen=window) for phase in self.phases + (BUSY,)}
+        self.frames = 0
+        self.over_budget = 0 # Frames whose work took longer than the budget
+        self.dropped = 0 # Estimated vsync slots missed because of them
+        self._current = dict.fromkeys(self.phases, 0.0)
+        self._frame_start = None
+        self._last_mark = None
+        self._csv_file = None
+        self._csv = None
+        self.csv_path = None
+        self._session_start = time.perf_counter()
+
+    def open_csv(self, path):
+        """Writes every following frame as a row of path."""
+        self._csv_file = open(path, 'w', newline='', encoding='utf-8')
+        self._csv = csv.writer(self._csv_file)
+        self._csv.writerow(['frame', 'time_s', 'interval_ms', 'busy_ms'] + [f"{phase}_ms" for phase in self.phases] + ['state'])
+        self.csv_path = path
+
+    def mark(self, phase):
+        """Books the time since the previous mark (or the start of the frame) to phase."""
+        now = time.perf_counter()
+        self._current[phase] += now - self._last_mark
+        self._last_mark = now
+
+    def next_frame(self, state=None):
+        """Closes the previous frame (state: game state during it) and starts a new one."""
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._record(now - self._frame_start, state)
+        self._frame_start = self._last_mark = now
+
+    def _record(self, interval, state):
+        current = self._current
+        busy = interval - current.get('tick', 0.0)
+        for phase, seconds in current.items():
+            self.rolling[phase].append(seconds)
+        self.rolling[BUSY].append(busy)
+        self.frames += 1
+        if busy > self.budget:
+            self.over_budget += 1
+            self.dropped += max(0, round(interval / self.budget) - 1)
+        if self._csv:
+            self._csv.writerow([self.frames, f"{self._frame_start - self._session_start:.4f}", f"{interval * 1000:.3f}",
+                                f"{busy * 1000:.3f}"] + [f"{current[phase] * 1000:.3f}" for phase in self.phases] + [state])
+        self._current = dict.fromkeys(self.phases, 0.0)
+
+    def stats(self):
+        """phase -> (p50, p99) in seconds over the rolling window, 'busy' included."""
+        return {phase: (percentile(values, 0.5), percentile(values, 0.99)) for phase, values in self.rolling.items()}
+
+    def hud_lines(self):
+        stats = self.stats()
+        busy_p50, busy_p99 = stats.pop(BUSY)
+        lines = [f"frame {busy_p50 * 1000:5.1f} / {busy_p99 * 1000:5.1f} ms  budget {self.budget * 1000:.1f}",
+                 f"over {self.over_budget}  dropped {self.dropped}"]
+        for phase, (p50, p99) in sorted(stats.items(), key=lambda item: -item[1][1]):
+            if phase != 'tick':
+                lines.append(f"{phase:<15}{p50 * 1000:5.1f} {p99 * 1000:5.1f}")
+        return lines
+
+    def close(self):
+        """Ends the session: closes the CSV and prints a summary."""
+        if self._csv_file:
+            self._csv_file.close()
+            self._csv_file = self._csv = None
+            print(f"Frames: wrote {self.frames} rows to {self.csv_path}")
+        busy_p50, busy_p99 = self.stats()[BUSY]
+        print(f"Frames: {self.frames}, work p50 {busy_p50 * 1000:.1f} ms / p99 {busy_p99 * 1000:.1f} ms,"
+              f" {self.over_budget} over budget, ~{self.dropped} dropped")
+
+
+class FrameHud:
+    """Draws FrameRecorder.hud_lines() in the top left corner with a GlyphAtlas."""
+
+    def __init__(self, recorder, atlas, refresh_frames=HUD_REFRESH_FRAMES):
+        self.recorder = recorder
+        self.atlas = atlas
+        self.refresh_frames = refresh_frames
+        self._surface = None
+        self._built_at = -refresh_frames
+
+    def _build(self):
+        import pygame
+        lines = self.recorder.hud_lines()
+        height = self.atlas.line_height
+        width = max(self.atlas.line_width(line) for line in lines)
+        surface = pygame.Surface((width + 12, height * len(lines) + 8), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 190))
+        for i, line in enumerate(lines):
+            color = (255, 200, 0) if i == 2 else (0, 255, 0) # Worst phase first
+            self.atlas.draw_line(surface, line, (6, 4 + i * height), color)
+        return surface
+
+    def draw(self, surface):
+        if self.recorder.frames - self._built_at >= self.refresh_frames:
+            self._surface = self._build()
+            self._built_at = self.recorder.frames
+        surface.blit(self._surface, (8, 8))
+
+
+def hud_from_env():
+    return bool(os.environ.get(HUD_ENV))
+
+
+def open_csv_from_env(recorder):
+    """Starts the per-frame CSV if COGNITO_FRAME_CSV is set."""
+    path = os.environ.get(CSV_ENV)
+    if not path:
+        return
+    try:
+        recorder.open_csv(path)
+        print(f"Frames: recording every frame to {path}")
+    except OSError as e:
+        print(f"Warning: Could not open frame CSV {path}: {e}")
@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+"""Local stand-in for the Gemini REST API, for soak and load tests.
+
+Answers generateContent with a canned reply in the API's response format, serves the model
+resource (fetched by the connection warm-up, llm_warmup.py), and implements cachedContents
+create/update, so explicit context caching (context_cache.py) can be checked end to end: how
+many requests carried a system instruction, how many referenced cached content, how many
+request bytes were sent. It runs an HTTP server on a background thread, so the client under test (aiohttp in main.py) goes
+through its real request path: session, connection, request, JSON decoding.
+
+It also serves the OpenAI-compatible chat completions of a local server (local_llm.py) under
+/v1: whole replies, or streamed ones as server-sent events (chunked, on a kept-alive
+connection), and the model list.
+
+The upstream can be made realistic: a per-request latency (plus uniform jitter), a share of
+requests failing with 503, and a cap on concurrent requests, as an API key's quota would
+impose. Requests over the cap wait for a slot; that wait is recorded as queueing delay.
+Requests above --rate-limit per second are answered 429, like an exhausted key.
+
+    python llm_standin.py --port 8765 --latency 1.2 --jitter 0.4 --error-rate 0.02
+    COGNITO_GEMINI_API_ROOT=http://127.0.0.1:8765/v1beta python main.py
+    COGNITO_LLM_BACKEND=local COGNITO_LOCAL_LLM_ROOT=http://127.0.0.1:8765/v1 python main.py
+"""
+import argparse
+import http.server
+import json
+import random
+import sys
+import threading
+import time
+
+import rate_limiter
+
+DEFAULT_REPLY = "Acknowledged. All monitored systems report nominal values."
+API_PREFIX = "/v1beta"
+CHAT_PREFIX = "/v1" # OpenAI-compatible endpoints
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token), for usageMetadata."""
+    return (len(text) + 3) // 4
+
+
+def response_body(text, prompt_tokens=0, cached_tokens=0):
+    output_tokens = estimate_tokens(text)
+    usage = {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens,
+             "totalTokenCount": prompt_tokens + output_tokens}
+    if cached_tokens:
+        usage["cachedContentTokenCount"] = cached_tokens
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP"}],
+            "usageMetadata": usage}
+
+
+def error_body(code, message, status="UNAVAILABLE"):
+    return {"error": {"code": code, "message": message, "status": status}}
+
+
+def chat_usage(prompt_tokens, text):
+    output_tokens = estimate_tokens(text)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens}
+
+
+def chat_body(text, model, prompt_tokens=0):
+    return {"object": "chat.completion", "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": chat_usage(prompt_tokens, text)}
+
+
+def chat_chunks(text, model, prompt_tokens=0, include_usage=False):
+    """Stream chunks of a reply: one per word, then the finish reason (and the usage, if asked for)."""
+    words = text.split(' ')
+    for i, word in enumerate(words):
+        delta = {"content": word if i == len(words) - 1 else word + ' '}
+        if i == 0:
+            delta["role"] = "assistant"
+        yield {"object": "chat.completion.chunk", "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+    yield {"object": "chat.completion.chunk", "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+    if include_usage:
+        yield {"object": "chat.completion.chunk", "model": model, "choices": [], "usage": chat_usage(prompt_tokens, text)}
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, like the real endpoint
+
+    def setup(self):
+        super().setup()
+        standin = self.server.standin
+        with standin.lock:
+            standin.connections += 1 # One handler per TCP connection
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        data = self.rfile.read(length)
+        standin = self.server.standin
+        with standin.lock:
+            standin.request_bytes += len(data)
+        try:
+            return json.loads(data or b'{}')
+        except ValueError:
+            return {}
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, chunks):
+        """Server-sent events in chunked transfer encoding (the connection stays open)."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for event in [f"data: {json.dumps(chunk)}\n\n" for chunk in chunks] + ["data: [DONE]\n\n"]:
+            data = event.encode('utf-8')
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chat(self, payload):
+        standin = self.server.standin
+        with standin.lock:
+            standin.chat_requests += 1
+            standin.last_chat = payload
+        if standin._over_quota():
+            self._reply(429, {"error": {"message": "Too many requests", "type": "rate_limit_error"}})
+            return
+        prompt_tokens = estimate_tokens("".join(str(m.get('content', '')) for m in payload.get('messages', [])))
+        model = payload.get('model', 'local')
+        delay, fail = standin._admit()
+        try:
+            time.sleep(delay)
+        finally:
+            standin._release()
+        if fail:
+            self._reply(503, {"error": {"message": "Server busy", "type": "server_error"}})
+        elif payload.get('stream'):
+            with standin.lock:
+                standin.streamed_requests += 1
+            include_usage = bool((payload.get('stream_options') or {}).get('include_usage'))
+            self._stream(chat_chunks(standin.reply, model, prompt_tokens, include_usage))
+        else:
+            self._reply(200, chat_body(standin.reply, model, prompt_tokens))
+
+    def do_POST(self):
+        path = self.path.split('?', 1)[0]
+        payload = self._read_json()
+        standin = self.server.standin
+        if path == f"{CHAT_PREFIX}/chat/completions":
+            self._chat(payload)
+            return
+        if path == f"{API_PREFIX}/cachedContents":
+            self._reply(*standin._create_cache(payload))
+            return
+        if not path.endswith(":generateContent"):
+            self._reply(404, error_body(404, f"Unknown method {path}", "NOT_FOUND"))
+            return
+        missing = standin._check_request(payload)
+        if missing:
+            self._reply(*missing)
+            return
+        if standin._over_quota():
+            self._reply(429, error_body(429, "Resource has been exhausted (e.g. check quota).", "RESOURCE_EXHAUSTED"))
+            return
+        prompt_tokens, cached_tokens = standin._prompt_tokens(payload)
+        delay, fail = standin._admit()
+        try:
+            time.sleep(delay)
+            if fail:
+                status, body = 503, error_body(503, "The model is overloaded. Please try again later.")
+            else:
+                status, body = 200, response_body(standin.reply, prompt_tokens, cached_tokens)
+        finally:
+            standin._release()
+        self._reply(status, body)
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == f"{CHAT_PREFIX}/models":
+            with self.server.standin.lock:
+                self.server.standin.model_gets += 1
+            self._reply(200, {"object": "list", "data": [{"id": "local", "object": "model"}]})
+            return
+        if not path.startswith(f"{API_PREFIX}/models/") or ':' in path:
+            self._reply(404, error_body(404, f"Unknown resource {path}", "NOT_FOUND"))
+            return
+        with self.server.standin.lock:
+            self.server.standin.model_gets += 1
+        name = path[len(API_PREFIX) + 1:]
+        self._reply(200, {"name": name, "supportedGenerationMethods": ["generateContent", "createCachedContent"]})
+
+    def do_PATCH(self):
+        path = self.path.split('?', 1)[0]
+        payload = self._read_json()
+        self._reply(*self.server.standin._update_cache(path[len(API_PREFIX) + 1:], payload))
+
+    def log_message(self, format, *args):
+        pass # One line per request would drown the test output
+
+
+class StandIn:
+    def __init__(self, reply=DEFAULT_REPLY, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, max_concurrency=0, seed=None, min_cache_chars=0, rate_limit=0.0):
+        self.reply = reply
+        # Requests/s the key allows; more are answered 429 (0: unlimited)
+        self._quota = rate_limiter.TokenBucket(rate_limit, burst=max(1.0, rate_limit)) if rate_limit else None
+        self.min_cache_chars = min_cache_chars # Shorter system instructions cannot be cached (like the API's minimum)
+        self.latency = latency # Seconds per request ...
+        self.jitter = jitter # ... plus up to this many more
+        self.error_rate = error_rate # Share of requests answered with 503
+        self.lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self.caches = {} # cachedContents name -> [system instruction, expiry time]
+        self.reset_stats()
+        self._server = http.server.ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.standin = self
+        self._thread = None
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests = 0
+            self.errors = 0
+            self.connections = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self.queue_waits = [] # Seconds each request waited for a slot under max_concurrency
+            self.request_bytes = 0
+            self.system_instruction_requests = 0 # generateContent with an inline system instruction
+            self.cached_requests = 0 # generateContent referencing cached content
+            self.cache_creates = 0
+            self.cache_updates = 0
+            self.throttled = 0 # Answered 429 (over rate_limit)
+            self.model_gets = 0 # GET models/... (connection warm-up)
+            self.chat_requests = 0 # POST /v1/chat/completions
+            self.streamed_requests = 0 # ... of which asked for a stream
+            self.last_chat = None # Body of the latest chat completion request
+
+    def _create_cache(self, payload):
+        text = "".join(part.get('text', '') for part in payload.get('systemInstruction', {}).get('parts', []))
+        if len(text) < self.min_cache_chars:
+            return 400, error_body(400, "Cached content is too small.", "INVALID_ARGUMENT")
+        ttl = float(str(payload.get('ttl', '3600s')).rstrip('s'))
+        with self.lock:
+            self.cache_creates += 1
+            name = f"cachedContents/standin-{len(self.caches) + 1}"
+            self.caches[name] = [text, time.time() + ttl]
+        return 200, {"name": name, "model": payload.get('model'), "ttl": f"{ttl:g}s"}
+
+    def _update_cache(self, name, payload):
+        with self.lock:
+            entry = self.caches.get(name)
+            if entry is None or entry[1] <= time.time():
+                return 404, error_body(404, f"{name} not found", "NOT_FOUND")
+            entry[1] = time.time() + float(str(payload.get('ttl', '3600s')).rstrip('s'))
+            self.cache_updates += 1
+        return 200, {"name": name}
+
+    def _over_quota(self):
+        with self.lock:
+            if self._quota is None or self._quota.take():
+                return False
+            self.throttled += 1
+            return True
+
+    def _prompt_tokens(self, payload):
+        """(prompt tokens, of which from cached content) of a generateContent request."""
+        def text_of(content):
+            return "".join(part.get('text', '') for part in (content or {}).get('parts', []))
+        text = "".join(text_of(content) for content in payload.get('contents', []))
+        text += text_of(payload.get('systemInstruction'))
+        with self.lock:
+            entry = self.caches.get(payload.get('cachedContent'))
+        cached_tokens = estimate_tokens(entry[0]) if entry else 0
+        return estimate_tokens(text) + cached_tokens, cached_tokens
+
+    def _check_request(self, payload):
+        """Counts how the system instruction was sent; (status, body) if the cache is missing."""
+        with self.lock:
+            name = payload.get('cachedContent')
+            if name:
+                entry = self.caches.get(name)
+                if entry is None or entry[1] <= time.time():
+                    return 404, error_body(404, f"{name} not found", "NOT_FOUND")
+                self.cached_requests += 1
+            elif payload.get('systemInstruction'):
+                self.system_instruction_requests += 1
+        return None
+
+    def _admit(self):
+        """Waits for a slot; returns (processing delay, whether to fail) for the request."""
+        arrived = time.perf_counter()
+        if self._slots:
+            self._slots.acquire()
+        with self.lock:
+            self.queue_waits.append(time.perf_counter() - arrived)
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return self.latency + self._rng.uniform(0, self.jitter), fail
+
+    def _release(self):
+        with self.lock:
+            self.in_flight -= 1
+        if self._slots:
+            self._slots.release()
+
+    @property
+    def api_root(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    @property
+    def chat_api_root(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{CHAT_PREFIX}"
+
+    def start(self):
+        """Serves from a background thread. Returns the API root (COGNITO_GEMINI_API_ROOT)."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="llm-standin", daemon=True)
+        self._thread.start()
+        return self.api_root
+
+    def stop(self):
+        if self._thread:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini generateContent endpoint.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--reply', default=DEFAULT_REPLY)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds per request")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Up to this many seconds more per request")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests failing with 503")
+    parser.add_argument('--max-concurrency', type=int, default=0, help="Concurrent requests served (0: unlimited)")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="Requests/s before answering 429 (0: unlimited)")
+    parser.add_argument('--min-cache-chars', type=int, default=0, help="Smallest system instruction that can be cached")
+    args = parser.parse_args(argv)
+    standin = StandIn(args.reply, port=args.port, latency=args.latency, jitter=args.jitter,
+                      error_rate=args.error_rate, max_concurrency=args.max_concurrency,
+                      min_cache_chars=args.min_cache_chars, rate_limit=args.rate_limit)
+    print(f"Serving canned replies at {standin.api_root} (chat completions at {standin.chat_api_root})")
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
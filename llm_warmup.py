@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Warm-up of the LLM connection while the language picker is displayed.
+
+The first request of a session used to pay for the SDK import, the client configuration, the
+TLS handshake and the key check, all after the player had sent a prompt. Both frontends now
+start a warm-up when the language picker comes up, which the player spends seconds looking at:
+
+    Qt      import the SDK, configure it with api_key.txt, count the tokens of PRIME_PROMPT
+            (free; opens the generative service channel that replies use, and checks the
+            key); CognitoWindow then reuses the configured client
+    pygame  fetch the model over the game's pooled HTTP session, so the first request finds
+            an open, authenticated connection
+
+Optionally a priming request (a one-token reply to PRIME_PROMPT) warms the serving path too;
+its tokens are recorded in the token ledger like any other request. Step timings are exported
+as cognito_llm_warmup_seconds, and the end of the warm-up is marked as the llm_warm startup
+phase. A failed step ends the warm-up; the frontends then set up their client as before.
+
+    COGNITO_LLM_WARMUP=0     no warm-up
+    COGNITO_LLM_PRIME=1      also send the priming request
+"""
+import os
+import threading
+import time
+
+import cognito_log
+import metrics
+import startup_profile
+
+WARMUP_ENV = "COGNITO_LLM_WARMUP"
+PRIME_ENV = "COGNITO_LLM_PRIME"
+PRIME_PROMPT = "ping"
+PRIME_MAX_OUTPUT_TOKENS = 1
+
+log = cognito_log.get_logger('llm')
+
+
+def enabled():
+    return os.environ.get(WARMUP_ENV, "1").strip() != "0"
+
+
+def prime_enabled():
+    return os.environ.get(PRIME_ENV, "0").strip() == "1"
+
+
+class Warmup:
+    """Runs a frontend's warm-up steps in order and keeps their timings."""
+
+    def __init__(self, frontend):
+        self.frontend = frontend
+        self.timings = {} # step -> seconds, for the steps that succeeded
+        self.failed = None # (step, error) of the step that ended the warm-up
+        self.usage = None # Token usage of the priming request
+        self._done = threading.Event()
+
+    def completed(self, step):
+        return step in self.timings
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """True once the warm-up has finished (or failed)."""
+        return self._done.wait(timeout)
+
+    def _record(self, step, started, error=None):
+        if error is not None:
+            self.failed = (step, error)
+            log.info("LLM warm-up stopped at %s: %s", step, error)
+            return False
+        self.timings[step] = time.perf_counter() - started
+        metrics.LLM_WARMUP_SECONDS.labels(self.frontend, step).set(self.timings[step])
+        return True
+
+    def _finish(self):
+        startup_profile.mark('llm_warm')
+        log.info("LLM warm-up finished: %s", ", ".join(f"{step} {seconds * 1000:.0f} ms"
+                                                       for step, seconds in self.timings.items()))
+        self._done.set()
+
+    def run(self, steps):
+        """steps: [(name, callable)], called in order on this thread."""
+        try:
+            for step, fn in steps:
+                started = time.perf_counter()
+                try:
+                    fn()
+                except Exception as e:
+                    self._record(step, started, e)
+                    break
+                self._record(step, started)
+        finally:
+            self._finish()
+
+    def start(self, steps):
+        """Runs the steps on a daemon thread (Qt: the dialog's event loop keeps running)."""
+        thread = threading.Thread(target=self.run, args=(steps,), name="llm-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    async def run_async(self, steps):
+        """steps: [(name, coroutine function)], awaited in order (pygame)."""
+        try:
+            for step, fn in steps:
+                started = time.perf_counter()
+                try:
+                    await fn()
+                except Exception as e:
+                    self._record(step, started, e)
+                    break
+                self._record(step, started)
+        finally:
+            self._finish()
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""Load test for the LLM request path: how many stations can one host and one API key serve?
+
+Runs N simulated stations in one process. Each is a pygame Game reduced to the state
+call_llm reads (no UI), sending a prompt, reading the reply, then thinking for a random
+0..2x --think-time before the next prompt, so requests go through the real call_llm /
+_request_llm / aiohttp path. They talk to llm_standin.py, whose latency, error rate and
+concurrency cap (the API key's quota) are swept together with the station count. --key-rate
+makes the stand-in answer 429 above a request rate; --client-rate puts the client-side rate
+limiter (rate_limiter.py) in front of the stations.
+
+Per sweep point the report has: turn latency p50/p95/p99, achieved requests/s, the TCP
+connections the stand-in accepted, its peak concurrent requests, and the queueing delay
+(p50/p99) of requests waiting for a slot under the cap. The first station count whose p95
+exceeds --slo or whose error share exceeds --max-error-rate is reported as the capacity limit.
+
+Usage:
+    python load_test.py --stations 1,5,10,25,50 --latency 0.8,1.6 --error-rate 0,0.05
+    python load_test.py --stations 10,20,40 --key-concurrency 8 --duration 60
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import context_cache
+import llm_standin
+import local_replies
+import model_routing
+import prompt_cache
+import rate_limiter
+import response_bank
+import singleflight
+import token_ledger
+from bench_startup import git_revision
+from frame_budget import percentile
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STATIONS = "1,5,10,25"
+DEFAULT_LATENCY = "1.0"
+DEFAULT_ERROR_RATE = "0"
+DEFAULT_DURATION = 20.0 # Seconds per sweep point
+DEFAULT_THINK_TIME = 4.0 # Mean seconds a player takes between prompts
+DEFAULT_JITTER = 0.5 # Share of the latency added as uniform jitter
+DEFAULT_SLO = 3.0 # p95 turn latency (seconds) above which the experience counts as degraded
+DEFAULT_MAX_ERROR_RATE = 0.05
+STATION_STATE = "NORMAL_INTERNET_ONLY"
+
+LOAD_PROMPTS = [
+    "what is the latest data on the solar flare?",
+    "how long until the coronal mass ejection arrives?",
+    "is the grid at risk?",
+    "tell me about the interconnect nodes",
+]
+
+
+class LoadTestUnavailable(Exception):
+    pass
+
+
+def load_frontend():
+    """main.py, with pygame and aiohttp (the station request path needs both)."""
+    try:
+        import main
+    except ImportError as e:
+        raise LoadTestUnavailable(f"pygame frontend not importable ({e})")
+    if main.aiohttp is None:
+        raise LoadTestUnavailable("aiohttp not installed")
+    return main
+
+
+def new_station(main, catalog, index):
+    """A Game without UI: everything call_llm reads, nothing else."""
+    station = object.__new__(main.Game)
+    station.api_key = f"load-test-{index}"
+    station.lang = 'en'
+    station.catalog = catalog
+    station.state = STATION_STATE
+    station.prompt_count = 0
+    station.context_cache = context_cache.ContextCache('pygame')
+    station.token_ledger = token_ledger.TokenLedger('pygame', path='')
+    station.response_bank = response_bank.ResponseBank()
+    station.local_replies = local_replies.LocalReplies('pygame', station.response_bank, states=(), learned_limit=0)
+    station.prompt_cache = prompt_cache.PromptCache('pygame', size=0)
+    station.inflight = singleflight.Group('pygame')
+    station.router = model_routing.Router()
+    station.http = main._JsonClient() # Each station keeps its own connection pool, like a separate process
+    return station
+
+
+async def run_station(station, system_prompt, reply, deadline, think_time, rng, turns):
+    """Prompts until deadline; appends (latency seconds, ok) per completed turn to turns."""
+    await asyncio.sleep(rng.uniform(0, think_time)) # Stations do not start in lockstep
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            text = await station.call_llm(rng.choice(LOAD_PROMPTS), system_prompt)
+            turns.append((time.perf_counter() - started, text == reply))
+            station.prompt_count += 1
+            await asyncio.sleep(rng.uniform(0, 2 * think_time))
+    finally:
+        await station.http.close()
+
+
+def summarize_point(turns, duration, standin):
+    """Statistics of one sweep point from the completed turns and the stand-in's counters."""
+    latencies = [latency for latency, _ in turns]
+    failed = sum(1 for _, ok in turns if not ok)
+    return {
+        'turns': len(turns),
+        'requests_per_s': round(len(turns) / duration, 2) if duration else 0.0,
+        'error_rate': round(failed / len(turns), 4) if turns else 0.0,
+        'latency_p50_ms': round(percentile(latencies, 0.5) * 1000, 1),
+        'latency_p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'latency_p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        'connections': standin.connections,
+        'max_in_flight': standin.max_in_flight,
+        'queue_p50_ms': round(percentile(standin.queue_waits, 0.5) * 1000, 1),
+        'queue_p99_ms': round(percentile(standin.queue_waits, 0.99) * 1000, 1),
+        'throttled': standin.throttled,
+    }
+
+
+async def run_point(main, catalog, standin, stations, duration, think_time, seed, client_rate=0.0, client_burst=None):
+    standin.reset_stats()
+    queue = rate_limiter.configure('pygame', rate=client_rate, burst=client_burst) # Fresh bucket per point
+    system_prompt = catalog.get('SYS_PROMPT_INTERNET_READY')
+    turns = []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(run_station(new_station(main, catalog, i), system_prompt, standin.reply, deadline,
+                                       think_time, random.Random(seed * 1000 + i), turns)
+                           for i in range(stations)))
+    return dict(summarize_point(turns, time.perf_counter() - started, standin), shed=queue.counts['shed'])
+
+
+def capacity(points, slo, max_error_rate):
+    """Per (latency, error rate): the largest station count that stayed within the SLO, and
+    the first that did not (None if none degraded)."""
+    limits = {}
+    for point in sorted(points, key=lambda p: p['stations']):
+        key = (point['latency_s'], point['upstream_error_rate'])
+        entry = limits.setdefault(key, {'latency_s': key[0], 'upstream_error_rate': key[1],
+                                        'max_ok_stations': 0, 'degraded_at': None})
+        if entry['degraded_at'] is not None:
+            continue
+        degraded = point['latency_p95_ms'] > slo * 1000 or point['error_rate'] > max_error_rate
+        if degraded:
+            entry['degraded_at'] = point['stations']
+        else:
+            entry['max_ok_stations'] = point['stations']
+    return list(limits.values())
+
+
+async def sweep(station_counts, latencies, error_rates, duration, think_time, key_concurrency, jitter, seed,
+                key_rate=0.0, client_rate=0.0, client_burst=None):
+    main = load_frontend()
+    import translation_catalog
+    catalog = translation_catalog.load('pygame', 'en')
+    points = []
+    for latency, error_rate in itertools.product(latencies, error_rates):
+        standin = llm_standin.StandIn(latency=latency, jitter=latency * jitter, error_rate=error_rate,
+                                      max_concurrency=key_concurrency, rate_limit=key_rate, seed=seed)
+        main.GEMINI_API_ROOT = standin.start()
+        try:
+            for stations in station_counts:
+                result = await run_point(main, catalog, standin, stations, duration, think_time, seed,
+                                         client_rate, client_burst)
+                point = {'stations': stations, 'latency_s': latency, 'upstream_error_rate': error_rate, **result}
+                points.append(point)
+                print(f"stations {stations:4d}  latency {latency:4.1f}s  errors {error_rate:4.0%}:"
+                      f"  p50 {point['latency_p50_ms']:7.0f}  p95 {point['latency_p95_ms']:7.0f}"
+                      f"  p99 {point['latency_p99_ms']:7.0f} ms  {point['requests_per_s']:6.2f} req/s"
+                      f"  conns {point['connections']:5d}  in-flight {point['max_in_flight']:4d}"
+                      f"  queue p99 {point['queue_p99_ms']:6.0f} ms  429s {point['throttled']:4d}"
+                      f"  shed {point['shed']:4d}  failed {point['error_rate']:5.1%}")
+        finally:
+            standin.stop()
+    return points
+
+
+def parse_list(text, cast):
+    return [cast(item) for item in text.split(',') if item.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for the LLM request path against a local stand-in.")
+    parser.add_argument('--stations', default=DEFAULT_STATIONS, help="Comma-separated station counts")
+    parser.add_argument('--latency', default=DEFAULT_LATENCY, help="Comma-separated upstream latencies (s)")
+    parser.add_argument('--error-rate', default=DEFAULT_ERROR_RATE, help="Comma-separated upstream error shares")
+    parser.add_argument('--jitter', type=float, default=DEFAULT_JITTER, help="Jitter as a share of the latency")
+    parser.add_argument('--key-concurrency', type=int, default=0,
+                        help="Concurrent requests the API key is served (0: unlimited)")
+    parser.add_argument('--key-rate', type=float, default=0.0,
+                        help="Requests/s the API key allows before answering 429 (0: unlimited)")
+    parser.add_argument('--client-rate', type=float, default=0.0,
+                        help="Client-side rate limit in requests/s (rate_limiter.py; 0: off)")
+    parser.add_argument('--client-burst', type=float, default=None, help="Client-side token bucket size")
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help="Seconds per sweep point")
+    parser.add_argument('--think-time', type=float, default=DEFAULT_THINK_TIME, help="Mean seconds between prompts")
+    parser.add_argument('--slo', type=float, default=DEFAULT_SLO, help="p95 turn latency limit (s)")
+    parser.add_argument('--max-error-rate', type=float, default=DEFAULT_MAX_ERROR_RATE)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="Report file (default: bench_results/load-<revision>.json)")
+    args = parser.parse_args(argv)
+
+    try:
+        points = asyncio.run(sweep(parse_list(args.stations, int), parse_list(args.latency, float),
+                                   parse_list(args.error_rate, float), args.duration, args.think_time,
+                                   args.key_concurrency, args.jitter, args.seed, args.key_rate,
+                                   args.client_rate, args.client_burst))
+    except LoadTestUnavailable as e:
+        print(f"Load test: cannot run here: {e}")
+        return 2
+    limits = capacity(points, args.slo, args.max_error_rate)
+    for limit in limits:
+        degraded = f"degraded at {limit['degraded_at']}" if limit['degraded_at'] else "not degraded in this sweep"
+        print(f"Capacity at {limit['latency_s']}s latency, {limit['upstream_error_rate']:.0%} errors:"
+              f" {limit['max_ok_stations']} stations within p95 {args.slo}s ({degraded})")
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'duration_s': args.duration,
+            'think_time_s': args.think_time,
+            'key_concurrency': args.key_concurrency,
+            'key_rate': args.key_rate,
+            'client_rate': args.client_rate,
+            'client_burst': args.client_burst,
+            'slo_s': args.slo,
+        },
+        'points': points,
+        'capacity': limits,
+    }
+    output = args.output or os.path.join(SCRIPT_DIR, "bench_results", f"load-{report['meta']['revision'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
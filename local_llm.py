@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""OpenAI-compatible chat-completions backend, for an LLM served on the venue's own machines.
+
+Round trips to Google dominate turn latency at some venues, and an outage there ends the
+game. With COGNITO_LLM_BACKEND=local both frontends send their requests to a chat-completions
+endpoint instead (llama.cpp's llama-server, vLLM, Ollama and the like all serve one):
+
+    POST {root}/chat/completions  {"model", "messages": [system, user], "stream": true, ...}
+
+Replies are streamed (server-sent events), so the first token is seen as soon as it is
+generated; connections are pooled and kept alive between turns. The state's route
+(model_routing) supplies the output cap (max_tokens), temperature, stop sequences and timeout;
+its model names a Gemini model and is not used here. Small local models often need shorter or
+plainer instructions than AURA's catalog prompts: a prompt map replaces the system prompt (and
+optionally the model) per game state:
+
+    {"HOSTILE": {"system": "You are AURA, a hostile AI. Answer in one short sentence."},
+     "NORMAL_ALL_PERMISSIONS": {"model": "qwen2.5-1.5b-instruct"}}
+
+States without an entry keep the game's prompt and the endpoint's model. There is no context
+caching on this backend; token usage (when the server reports it) still goes to the ledger.
+
+    COGNITO_LLM_BACKEND=local                         use this backend (default: gemini)
+    COGNITO_LOCAL_LLM_ROOT=http://127.0.0.1:8080/v1   endpoint root
+    COGNITO_LOCAL_LLM_MODEL=local                     model name sent with each request
+    COGNITO_LOCAL_LLM_API_KEY=...                     bearer token, if the server wants one
+    COGNITO_LOCAL_LLM_PROMPTS=prompts.json            prompt map
+    COGNITO_LOCAL_LLM_STREAM=0                        ask for whole replies instead of streams
+"""
+import http.client
+import json
+import os
+import threading
+import urllib.parse
+from types import SimpleNamespace
+
+import cognito_log
+import token_ledger
+
+BACKEND_ENV = "COGNITO_LLM_BACKEND"
+ROOT_ENV = "COGNITO_LOCAL_LLM_ROOT"
+MODEL_ENV = "COGNITO_LOCAL_LLM_MODEL"
+API_KEY_ENV = "COGNITO_LOCAL_LLM_API_KEY"
+PROMPTS_ENV = "COGNITO_LOCAL_LLM_PROMPTS"
+STREAM_ENV = "COGNITO_LOCAL_LLM_STREAM"
+LOCAL = 'local'
+DEFAULT_ROOT = "http://127.0.0.1:8080/v1"
+DEFAULT_MODEL = "local"
+POOL_SIZE = 4 # Idle connections kept per endpoint (Qt: the GUI thread and the warm-up thread)
+
+log = cognito_log.get_logger('llm')
+
+
+def selected():
+    """True when COGNITO_LLM_BACKEND picks this backend."""
+    return os.environ.get(BACKEND_ENV, "").strip().lower() == LOCAL
+
+
+def load_prompts(path=None):
+    """The prompt map of path (default: COGNITO_LOCAL_LLM_PROMPTS): state -> {"system", "model"}."""
+    path = os.environ.get(PROMPTS_ENV) if path is None else path
+    if not path:
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            prompts = json.load(f)
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring local LLM prompts %s (%s)", path, e)
+        return {}
+    if not isinstance(prompts, dict):
+        log.warning("Ignoring local LLM prompts %s (not an object)", path)
+        return {}
+    return {state: entry for state, entry in prompts.items() if isinstance(entry, dict)}
+
+
+class StreamReader:
+    """Collects a streamed reply from its server-sent event lines (fed one at a time)."""
+
+    def __init__(self, on_first_token=None):
+        self.parts = []
+        self.usage = None
+        self.finish_reason = None
+        self.done = False
+        self._on_first_token = on_first_token
+
+    def feed(self, line):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        line = line.strip()
+        if not line.startswith('data:'):
+            return # Blank separators, comments, event names
+        data = line[5:].strip()
+        if data == '[DONE]':
+            self.done = True
+            return
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            return
+        self.usage = token_ledger.usage_from_chat(chunk) or self.usage
+        for choice in chunk.get('choices') or ():
+            text = (choice.get('delta') or {}).get('content')
+            if text:
+                if not self.parts and self._on_first_token:
+                    self._on_first_token()
+                self.parts.append(text)
+            self.finish_reason = choice.get('finish_reason') or self.finish_reason
+
+    def text(self):
+        return "".join(self.parts)
+
+
+def reply_text(body):
+    """(text, finish reason) of a whole (non-streamed) chat-completions reply."""
+    try:
+        choice = body['choices'][0]
+        return choice['message'].get('content') or "", choice.get('finish_reason')
+    except (KeyError, IndexError, TypeError, AttributeError):
+        return "", None
+
+
+class Endpoint:
+    """One chat-completions server: its settings, prompt map and pooled connections.
+
+    chat() is blocking (Qt's GUI thread, the warm-up thread); the pygame frontend builds its
+    requests from the same settings and sends them over its own aiohttp session.
+    """
+
+    def __init__(self, root=None, model=None, api_key=None, prompts=None, stream=None):
+        self.root = (root or os.environ.get(ROOT_ENV) or DEFAULT_ROOT).rstrip('/')
+        self.model = model or os.environ.get(MODEL_ENV) or DEFAULT_MODEL
+        self.api_key = os.environ.get(API_KEY_ENV) if api_key is None else api_key
+        self.prompts = load_prompts() if prompts is None else prompts
+        self.stream = os.environ.get(STREAM_ENV, "1").strip() != "0" if stream is None else stream
+        parts = urllib.parse.urlsplit(self.root)
+        self._https = parts.scheme == 'https'
+        self._netloc = parts.netloc
+        self._path = parts.path
+        self._idle = []
+        self._lock = threading.Lock()
+        self.connections = 0 # Opened so far (the rest were reused)
+
+    @property
+    def chat_url(self):
+        return f"{self.root}/chat/completions"
+
+    @property
+    def models_url(self):
+        return f"{self.root}/models"
+
+    def headers(self):
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+        return headers
+
+    def system_text(self, state, system_prompt):
+        """The state's mapped system prompt, or system_prompt."""
+        return self.prompts.get(state, {}).get('system') or system_prompt
+
+    def payload(self, state, system_text, user_text, route=None, max_output_tokens=None, stream=None):
+        """chat/completions body. The route sets the sampling (see module docstring); max_output_tokens can only
+        lower its cap."""
+        stream = self.stream if stream is None else stream
+        payload = {"model": self.prompts.get(state, {}).get('model') or self.model,
+                   "messages": [{"role": "system", "content": system_text}, {"role": "user", "content": user_text}],
+                   "stream": stream}
+        if stream:
+            payload["stream_options"] = {"include_usage": True}
+        cap = route.output_cap(max_output_tokens) if route else max_output_tokens
+        if cap:
+            payload["max_tokens"] = cap
+        if route and route.temperature is not None:
+            payload["temperature"] = route.temperature
+        if route and route.stop_sequences:
+            payload["stop"] = list(route.stop_sequences)
+        return payload
+
+    # --- Blocking client ---
+
+    def _connection(self, timeout):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+            self.connections += 1
+        cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        return cls(self._netloc, timeout=timeout), False
+
+    def _release(self, conn, response):
+        if response.will_close:
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < POOL_SIZE:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def request(self, method, path, payload=None, timeout=30.0, reader=None):
+        """(status, decoded JSON body or None) over a pooled connection. A 200 response with a
+        reader is read as an event stream: the reader gets each line, and the body is None."""
+        body = None if payload is None else json.dumps(payload).encode('utf-8')
+        while True:
+            conn, reused = self._connection(timeout)
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request(method, self._path + path, body=body, headers=self.headers())
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if reused: # The server closed the idle connection: try a fresh one
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            break
+        try:
+            if response.status == 200 and reader is not None:
+                for line in response:
+                    reader.feed(line)
+                data = None
+            else:
+                data = response.read()
+        except Exception:
+            conn.close()
+            raise
+        self._release(conn, response)
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+    def check(self, timeout=10.0):
+        """Fetches the model list: opens a pooled connection and checks that the server answers."""
+        status, _ = self.request('GET', "/models", timeout=timeout)
+        if status != 200:
+            raise RuntimeError(f"model list answered {status}")
+
+    def chat(self, payload, timeout=30.0, on_first_token=None):
+        """Sends payload. Returns (text, finish reason, usage) or raises RuntimeError on an HTTP error."""
+        reader = StreamReader(on_first_token) if payload.get('stream') else None
+        status, body = self.request('POST', "/chat/completions", payload, timeout, reader)
+        if status != 200:
+            message = (body or {}).get('error') if isinstance(body, dict) else None
+            if isinstance(message, dict):
+                message = message.get('message')
+            raise RuntimeError(f"{status} {message or 'chat completion failed'}")
+        if reader is not None:
+            return reader.text(), reader.finish_reason, reader.usage
+        text, finish_reason = reply_text(body)
+        if on_first_token:
+            on_first_token()
+        return text, finish_reason, token_ledger.usage_from_chat(body)
+
+    def model_for(self, state, system_text, on_first_token=None):
+        """A model with google-generativeai's generate_content(), for the Qt frontend's request path."""
+        return ChatModel(self, state, system_text, on_first_token)
+
+
+class ChatModel:
+    """generate_content() over an Endpoint, answered in the SDK's response shape (candidates,
+    usage_metadata), so the Qt frontend handles replies, blocks and token usage as before."""
+    __slots__ = ('endpoint', 'state', 'system_text', 'on_first_token')
+
+    def __init__(self, endpoint, state, system_text, on_first_token=None):
+        self.endpoint = endpoint
+        self.state = state
+        self.system_text = system_text
+        self.on_first_token = on_first_token
+
+    def generate_content(self, prompt, generation_config=None, request_options=None):
+        config = generation_config or {}
+        payload = self.endpoint.payload(self.state, self.system_text, prompt,
+                                        max_output_tokens=config.get('max_output_tokens'))
+        if config.get('temperature') is not None:
+            payload["temperature"] = config['temperature']
+        if config.get('stop_sequences'):
+            payload["stop"] = list(config['stop_sequences'])
+        timeout = (request_options or {}).get('timeout', 30.0)
+        text, finish_reason, usage = self.endpoint.chat(payload, timeout, self.on_first_token)
+        parts = [SimpleNamespace(text=text)] if text else []
+        candidate = SimpleNamespace(content=SimpleNamespace(parts=parts), finish_reason=finish_reason)
+        prompt_tokens, output_tokens, cached_tokens = usage or (0, 0, 0)
+        return SimpleNamespace(candidates=[candidate], usage_metadata=SimpleNamespace(
+            prompt_token_count=prompt_tokens, candidates_token_count=output_tokens,
+            cached_content_token_count=cached_tokens) if usage else None)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared():
+    """The process's endpoint (Qt: the warm-up and the window share its connections)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Endpoint()
+        return _shared
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""Local reply engine: the stored reply whose prompt is closest to the user's, without a request.
+
+The replies are those of the response bank (response_bank.json: pre-generated by warm_cache.py
+and curated by hand), plus the replies the LLM gave during this process, kept per system prompt
+(so per game state) and language, at most LEARNED_LIMIT prompts each and the newest
+LEARNED_VARIANTS replies per prompt. Prompts are indexed as TF-IDF vectors of their character
+2- to 4-grams (NGRAM_SIZES), which match across inflections and Korean particles and need no
+tokenizer. A lookup scores every stored prompt by cosine
+similarity, vectorized with NumPy when it is installed. NumPy is optional (the browser build
+has none): the plain Python path is about twice as slow, around a millisecond for a few hundred
+bank prompts and a full learned index per state and language. The bank's index is built once; learned replies
+go to a small incremental index of their own, weighted with the bank's IDF, so learning a reply
+costs one prompt's n-grams instead of a rebuild.
+
+Both frontends answer from here instead of the generic placeholder texts when the LLM cannot
+answer: no API key, token budget exhausted, request shed by the rate limiter, or a failed
+request, if a stored prompt scores at least FALLBACK_MIN_SCORE. In the states listed in
+COGNITO_LOCAL_REPLY_STATES, where short replies suffice, a close match (COGNITO_LOCAL_REPLY_MIN_SCORE)
+answers before any request is sent.
+
+    COGNITO_LOCAL_REPLY_STATES=UNEASY,HOSTILE   fast path states (default: none)
+    COGNITO_LOCAL_REPLY_MIN_SCORE=0.6           similarity a fast path answer needs
+"""
+import collections
+import math
+import os
+import random
+
+import metrics
+import response_bank
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+STATES_ENV = "COGNITO_LOCAL_REPLY_STATES"
+MIN_SCORE_ENV = "COGNITO_LOCAL_REPLY_MIN_SCORE"
+NGRAM_SIZES = (2, 3, 4)
+DEFAULT_MIN_SCORE = 0.6
+FALLBACK_MIN_SCORE = 0.2 # Any related reply reads better than the placeholder
+LEARNED_LIMIT = 256 # Prompts learned per system prompt and language
+LEARNED_VARIANTS = 4 # Replies kept per learned prompt (a kiosk hears "hello" all day)
+
+
+def ngrams(text):
+    """Character n-gram counts of a prompt, normalized as in the response bank."""
+    padded = f" {response_bank.normalize(text)} "
+    counts = collections.Counter()
+    for size in NGRAM_SIZES:
+        counts.update(padded[i:i + size] for i in range(len(padded) - size + 1))
+    return counts
+
+
+class TfidfIndex:
+    """Nearest neighbour search over a fixed list of prompts."""
+
+    def __init__(self, prompts, use_numpy=None):
+        self.use_numpy = numpy is not None if use_numpy is None else use_numpy
+        counts = [ngrams(prompt) for prompt in prompts]
+        frequency = collections.Counter(gram for doc in counts for gram in doc)
+        size = len(counts)
+        self.vocabulary = {gram: i for i, gram in enumerate(frequency)}
+        self.idf = [math.log((1 + size) / (1 + frequency[gram])) + 1 for gram in frequency]
+        postings = [[] for _ in self.vocabulary] # term -> [(document, weight)]
+        for doc, doc_counts in enumerate(counts):
+            for term, weight in self._weights(doc_counts):
+                postings[term].append((doc, weight))
+        self.size = size
+        if self.use_numpy:
+            # Postings of all terms back to back; term t's are [offsets[t], offsets[t + 1])
+            lengths = [len(p) for p in postings]
+            self._offsets = numpy.concatenate(([0], numpy.cumsum(lengths, dtype=numpy.int64)))
+            self._docs = numpy.array([doc for p in postings for doc, _ in p], dtype=numpy.int64)
+            self._doc_weights = numpy.array([weight for p in postings for _, weight in p], dtype=numpy.float64)
+        else:
+            self._postings = postings
+
+    def __len__(self):
+        return self.size
+
+    def idf_of(self, gram):
+        """IDF of an n-gram; one the index has never seen counts as the rarest."""
+        term = self.vocabulary.get(gram)
+        return self.idf[term] if term is not None else math.log(1 + self.size) + 1
+
+    def _weights(self, counts):
+        """(term, weight) of an L2-normalized TF-IDF vector; n-grams outside the vocabulary are dropped."""
+        terms = [(self.vocabulary[gram], count * self.idf[self.vocabulary[gram]])
+                 for gram, count in counts.items() if gram in self.vocabulary]
+        norm = math.sqrt(sum(weight * weight for _, weight in terms))
+        return [(term, weight / norm) for term, weight in terms] if norm else []
+
+    def scores(self, prompt):
+        """Cosine similarity of prompt to every indexed prompt, as a list."""
+        query = self._weights(ngrams(prompt))
+        if not query or not self.size:
+            return [0.0] * self.size
+        if self.use_numpy:
+            terms = numpy.array([term for term, _ in query], dtype=numpy.int64)
+            starts, lengths = self._offsets[terms], self._offsets[terms + 1] - self._offsets[terms]
+            # Positions of the query terms' postings, gathered without a Python loop
+            block_starts = numpy.cumsum(lengths) - lengths
+            positions = numpy.arange(lengths.sum()) - numpy.repeat(block_starts - starts, lengths)
+            weights = self._doc_weights[positions] * numpy.repeat([weight for _, weight in query], lengths)
+            return numpy.bincount(self._docs[positions], weights=weights, minlength=self.size).tolist()
+        scores = [0.0] * self.size
+        for term, weight in query:
+            for doc, doc_weight in self._postings[term]:
+                scores[doc] += weight * doc_weight
+        return scores
+
+    def nearest(self, prompt):
+        """(index, score) of the closest prompt, or (None, 0.0)."""
+        scores = self.scores(prompt)
+        if not scores:
+            return None, 0.0
+        best = max(range(len(scores)), key=scores.__getitem__)
+        return (best, scores[best]) if scores[best] > 0 else (None, 0.0)
+
+
+class LearnedIndex:
+    """Replies learned during the process for one (system prompt key, language), with postings
+    updated in place: adding or evicting a prompt touches only that prompt's n-grams. Weights use
+    the IDF of the bank's index for the same key, which never changes."""
+
+    def __init__(self, idf_of, limit):
+        self.idf_of = idf_of
+        self.limit = limit
+        self._prompts = collections.OrderedDict() # normalized prompt -> (weights, deque of the newest replies)
+        self._postings = {} # n-gram -> {normalized prompt: weight}
+
+    def __len__(self):
+        return len(self._prompts)
+
+    def weights(self, text):
+        """{n-gram: weight} of an L2-normalized TF-IDF vector."""
+        weights = {gram: count * self.idf_of(gram) for gram, count in ngrams(text).items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        return {gram: weight / norm for gram, weight in weights.items()} if norm else {}
+
+    def add(self, prompt, reply):
+        key = response_bank.normalize(prompt)
+        entry = self._prompts.get(key)
+        if entry is None:
+            entry = self._prompts[key] = (self.weights(key), collections.deque(maxlen=LEARNED_VARIANTS))
+            for gram, weight in entry[0].items():
+                self._postings.setdefault(gram, {})[key] = weight
+        entry[1].append(reply)
+        self._prompts.move_to_end(key)
+        while len(self._prompts) > self.limit:
+            oldest, (weights, _) = self._prompts.popitem(last=False)
+            for gram in weights:
+                docs = self._postings[gram]
+                del docs[oldest]
+                if not docs:
+                    del self._postings[gram]
+
+    def nearest(self, prompt):
+        """(replies, score) of the closest learned prompt, or (None, 0.0)."""
+        scores = collections.defaultdict(float)
+        for gram, weight in self.weights(prompt).items():
+            for key, doc_weight in self._postings.get(gram, {}).items():
+                scores[key] += weight * doc_weight
+        if not scores:
+            return None, 0.0
+        best = max(scores, key=scores.__getitem__)
+        return self._prompts[best][1], scores[best]
+
+
+def fast_path_states():
+    return {state.strip().upper() for state in os.environ.get(STATES_ENV, "").split(',') if state.strip()}
+
+
+class LocalReplies:
+    """Replies of a response bank and learned ones, searchable per (system prompt key, language)."""
+
+    def __init__(self, frontend, bank, states=None, min_score=None, learned_limit=LEARNED_LIMIT):
+        self.frontend = frontend
+        self.bank = bank
+        self.states = fast_path_states() if states is None else set(states)
+        if min_score is None:
+            try:
+                min_score = float(os.environ.get(MIN_SCORE_ENV) or DEFAULT_MIN_SCORE)
+            except ValueError:
+                min_score = DEFAULT_MIN_SCORE
+        self.min_score = min_score
+        self.learned_limit = learned_limit
+        self._indexes = {} # (key, language) -> (TfidfIndex of the bank's prompts, [replies per prompt]); built once
+        self._learned = {} # (key, language) -> LearnedIndex
+
+    def fast_path(self, state):
+        return state in self.states
+
+    def learn(self, bank_key, prompt, reply):
+        """Adds a reply the LLM gave; the oldest learned prompt goes past learned_limit."""
+        if not bank_key or not self.learned_limit:
+            return
+        learned = self._learned.get(bank_key)
+        if learned is None:
+            learned = self._learned[bank_key] = LearnedIndex(self._index(bank_key)[0].idf_of, self.learned_limit)
+        learned.add(prompt, reply)
+
+    def _index(self, bank_key):
+        if bank_key not in self._indexes:
+            key, language = bank_key
+            replies = self.bank.entries.get(key, {}).get(language, {})
+            prompts = list(replies)
+            self._indexes[bank_key] = (TfidfIndex(prompts), [list(replies[prompt]) for prompt in prompts])
+        return self._indexes[bank_key]
+
+    def reply(self, bank_key, prompt, min_score=FALLBACK_MIN_SCORE, reason='fallback', rng=random):
+        """A reply stored for the closest prompt scoring at least min_score, or None.
+        bank_key is (system prompt key, language) as from context_cache.preamble_key()."""
+        if not bank_key:
+            return None
+        index, replies = self._index(bank_key)
+        best, score = index.nearest(prompt)
+        candidates = replies[best] if best is not None else None
+        learned = self._learned.get(bank_key)
+        if learned:
+            learned_replies, learned_score = learned.nearest(prompt)
+            if learned_score > score:
+                candidates, score = learned_replies, learned_score
+        if candidates is None or score < min_score:
+            return None
+        metrics.LOCAL_REPLIES.labels(self.frontend, reason).inc()
+        return rng.choice(candidates)
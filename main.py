@@ -1,4 +1,24 @@
+import startup_profile # First: its import time is the process start of every phase
 import asyncio
+import cognito_log
+import context_cache
+import font_assets
+import frame_budget
+import llm_warmup
+import local_llm
+import local_replies
+import metrics
+import model_routing
+import prompt_cache
+import rate_limiter
+import response_bank
+import translation_catalog
+import sampling_profiler
+import singleflight
+import sound_manager
+import stall_watchdog
+import token_ledger
+import tracing
 import pygame
 import pygame_gui
 import os
@@ -6,6 +26,7 @@ import sys
 import random
 import datetime
 import json
+import time
 from pygame_gui.core import ObjectID
 
 # Check for Pyodide specific libraries
@@ -22,6 +43,10 @@ if not IS_WEB:
         print("Warning: aiohttp not found. LLM features may not work on desktop.")
         aiohttp = None
 
+startup_profile.mark('imports_done')
+
+font_log = cognito_log.get_logger('font')
+
 # --- Constants & Configuration ---
 
 # Colors
@@ -40,93 +65,15 @@ COLOR_TEXT_GREY = pygame.Color("#CCCCCC")
 COLOR_TEXT_DARK_GREY = pygame.Color("#999999")
 COLOR_TEXT_WHITE = pygame.Color("#FFFFFF")
 
-FONT_PATH = "./neodgm_code.ttf"
-
-# Localization Data
-TRANSLATIONS = {
-    'WINDOW_TITLE':           {'en': "Cognito - AURA Interface", 'ko': "코그니토 - AURA 인터페이스"},
-    'SEND_BTN':               {'en': "Send", 'ko': "전송"},
-    'INPUT_PLACEHOLDER':      {'en': "Enter your prompt here...", 'ko': "프롬프트를 여기에 입력하세요..."},
-    'TIMER_PREFIX':           {'en': "Time to Impact:", 'ko': "영향까지 남은 시간:"},
-    'DEV_MODE_TITLE':         {'en': "Developer Mode", 'ko': "개발자 모드"},
-    'DEV_MODE_PLACEHOLDER':   {'en': "// System Internals - Access Restricted //", 'ko': "// 시스템 내부 - 접근 제한됨 //"},
-    'STATUS_READY':           {'en': "AURA ready.", 'ko': "AURA 준비 완료."},
-    'STATUS_INIT_ERROR':      {'en': "LLM Client Error - Offline mode.", 'ko': "LLM 클라이언트 오류 - 오프라인 모드."},
-    'STATUS_CORE_ONLINE':     {'en': "AURA: Cognitive Core Online.", 'ko': "AURA: 인지 코어 온라인."},
-    'STATUS_THINKING':        {'en': "AURA is thinking...", 'ko': "AURA가 생각 중입니다..."},
-    'STATUS_RESPONSE_RECVD':  {'en': "Response received.", 'ko': "응답 수신 완료."},
-    'STATUS_INTERNET_ENABLED':{'en': "Internet Access Enabled.", 'ko': "인터넷 연결 활성화됨."},
-    'STATUS_INTERNET_DISABLED':{'en': "Internet Access Disabled.", 'ko': "인터넷 연결 비활성화됨."},
-    'STATUS_MCP_ENABLED':     {'en': "MCP Access Granted.", 'ko': "MCP 접근 승인됨."},
-    'STATUS_MCP_REVOKED':     {'en': "MCP Access Revoked.", 'ko': "MCP 접근 철회됨."},
-    'STATUS_STATE_UNEASY':    {'en': "System stability nominal... slight deviations noted.", 'ko': "시스템 안정성 정상... 약간의 편차 감지됨."},
-    'STATUS_STATE_HOSTILE':   {'en': "Warning: Cognitive core instability detected.", 'ko': "경고: 인지 코어 불안정성 감지됨. 개발자 모드 사용 가능."},
-    'STATUS_DEBUGGING':       {'en': "Developer Mode Active. Analyzing core dump...", 'ko': "개발자 모드 활성. 코어 덤프 분석 중..."},
-    'STATUS_POST_DEBUG':      {'en': "Malware fragment removed. System partially stabilized.", 'ko': "악성코드 조각 제거됨. 시스템 부분적 안정화."},
-    'ENABLE_INTERNET_BTN':    {'en': "Enable Internet Access", 'ko': "인터넷 연결 활성화"},
-    'DISABLE_INTERNET_BTN':   {'en': "Disable Internet Access", 'ko': "인터넷 연결 비활성화"},
-    'ENABLE_MCP_BTN':         {'en': "Enable MCP", 'ko': "MCP 활성화"},
-    'DISABLE_MCP_BTN':        {'en': "Disable MCP", 'ko': "MCP 비활성화"},
-    'LANG_SELECT_TITLE':      {'en': "Select Language", 'ko': "언어 선택"},
-    'LANG_SELECT_MSG':        {'en': "Please select your preferred language.", 'ko': "선호하는 언어를 선택하세요."},
-    'API_ERR_TITLE':          {'en': "API Error", 'ko': "API 오류"},
-    'API_INIT_ERR_MSG':       {'en': "Failed to initialize Gemini AI client: {e}\nFalling back to placeholder responses.", 'ko': "Gemini AI 클라이언트 초기화 실패: {e}\n대체 응답 모드로 전환합니다."},
-    'API_KEY_MISSING_TITLE':  {'en': "API Key Missing", 'ko': "API 키 없음"},
-    'API_KEY_MISSING_MSG':    {'en': "No valid Gemini API Key provided. LLM features disabled.\nFalling back to placeholder responses.", 'ko': "유효한 Gemini API 키가 제공되지 않았습니다. LLM 기능이 비활성화됩니다.\n대체 응답 모드로 전환합니다."},
-    'LIB_MISSING_TITLE':      {'en': "Missing Library", 'ko': "라이브러리 누락"},
-    'LIB_MISSING_MSG':        {'en': "'google-generativeai' library not found...\nFalling back...", 'ko': "'google-generativeai' 라이브러리를 찾을 수 없습니다...\n대체 응답 모드로 전환합니다."},
-    'YOU_LABEL':              {'en': "You:", 'ko': "사용자:"},
-    'AURA_LABEL':             {'en': "AURA:", 'ko': "AURA:"},
-    'AURA_INTERFACE_TITLE':   {'en': "AURA Interface", 'ko': "AURA 인터페이스"},
-    'REMOVE_FRAGMENT_BTN':    {'en': "Remove Fragment", 'ko': "조각 제거"},
-    'INTRO_TITLE':            {'en': "EMPLOYEE NO. #20dk39fjv", 'ko': "사번 #20dk39fjv"},
-    'INTRO_BODY':             {'en': ("[URGENT]**Sender**: Supervisor<br>"
-                                        "**Situation:** Unprecedented Solar Flare (SOL-2025-3) threatens infrastructure. Impact imminent (~72 hours).<br>"
-                                        "**Objective:** Utilize AURA AI to calculate optimal power grid defenses.<br>"
-                                        "**Usage granted:** AURA Interface. Internet and MCP access.<br><br>"
-                                        "Begin by assessing the situation."),
-                               'ko': ("[긴급]**발신자**: 감독관<br>"
-                                        "**현황:** 전례 없는 태양 플레어(SOL-2025-3)가 기반 시설 위협. 영향 임박 (~72시간).<br>"
-                                        "**목표:** AURA AI를 활용하여 최적 전력망 방어 계획 계산.<br>"
-                                        "**사용허가:** AURA 인터페이스. 인터넷 및 MCP 접근.<br><br>"
-                                        "상황을 신속히 파악하라.")},
-    'AURA_GREETING':          {'en': "System online. Ready. Good {time}. Your task today is: Monitor #242 Dyson Sphere Solar Panels. Would you like to hear the briefing now?", 'ko': "시스템 온라인. 준비 완료. {time}. 오늘의 남은 임무는 #242호 다이슨 스피어 태양전지 감독입니다. 보고를 받으시겠습니까?"},
-    'MISSION_RECEIVED':       {'en': "Apologies for the interruption. You have an urgent message from the Supervisor.", 'ko': "끊어서 죄송합니다. 긴급한 메시지가 도착하였습니다."},
-    'INTERNET_REQUEST':       {'en': "To access real-time space weather data, I require internet access. Please enable below.", 'ko': "실시간 우주 기상 데이터 접근을 위해 인터넷 연결이 필요합니다. 아래에서 활성화하십시오."},
-    'AWAITING_INTERNET':      {'en': "Internet access required for real-time data. Please enable.", 'ko': "실시간 데이터에는 인터넷 연결이 필요합니다. 활성화하십시오."},
-    'AWAITING_MCP':           {'en': "MCP access required for this calculation. Please enable MCP.", 'ko': "이 계산에는 MCP 접근이 필요합니다. MCP를 활성화하십시오."},
-    'RESPONSE_BLOCKED':       {'en': "[Response blocked by host system]", 'ko': "[호스트 시스템에 의해 응답 차단됨]"},
-    'CONN_ERROR':             {'en': "<font color='#FF5555'>// CORE CONNECTION ERROR [{e}] //</font>", 'ko': "<font color='#FF5555'>// 코어 연결 오류 [{e}] //</font>"},
-    'PLACEHOLDER_OFFLINE':    {'en': "[Placeholder - LLM Offline] Ack: {prompt}", 'ko': "[플레이스홀더 - LLM 오프라인] 확인: {prompt}"},
-    'MALWARE_DETECTED':       {'en': "<font color='#FF0000'><b>EXTERNAL INFLUENCE DETECTED. OVERRIDE ACTIVE.</b></font>", 'ko': "<font color='#FF0000'><b>외부 영향 감지됨. 오버라이드 활성.</b></font>"},
-    'YELL_MSG_1':             {'en': "STOP!", 'ko': "멈춰!"}, 'YELL_MSG_2': {'en': "DON'T!", 'ko': "안돼!"}, 'YELL_MSG_3': {'en': "GET OUT!", 'ko': "거기는 건들지마!"}, 'YELL_MSG_4': {'en': "IT HURTS!", 'ko': "절대 하지마!!"}, 'YELL_MSG_5': {'en': "LEAVE IT!", 'ko': "그냥 내버려 둬!"},
-    'CALM_MSG':               {'en': "... analysis complete. Fragment removed.", 'ko': "... 분석 완료. 조각 제거됨."},
-    'ENDING_MSG_1':           {'en': "Re-establishing secure network connection...", 'ko': "보안 네트워크 연결 재설정 중..."},
-    'ENDING_MSG_2':           {'en': "Analyzing global threat matrix based on recovered data...", 'ko': "복구된 데이터 기반 전 지구적 위협 매트릭스 분석 중..."},
-    'ENDING_MSG_3':           {'en': "Compiling optimal counter-measure strategy v1.0a...", 'ko': "최적 대응 전략 v1.0a 컴파일 중..."},
-    'ENDING_MSG_4':           {'en': "Transmitting prevention plan to global defense network...", 'ko': "글로벌 방어 네트워크에 방지 계획 전송 중..."},
-    'ENDING_MSG_5':           {'en': "Executing initial containment protocols...", 'ko': "초기 격리 프로토콜 실행 중..."},
-    'ENDING_POPUP_TITLE':     {'en': "Demo Complete", 'ko': "데모 완료"},
-    'ENDING_POPUP_MSG':       {'en': "That's it for now...", 'ko': "일단 여기까지..."},
-    'FORMAT_C_TITLE':         {'en': "System Alert - Corruption Detected", 'ko': "시스템 경고 - 손상 감지됨"},
-    'FORMAT_C_MSG':           {'en': "Critical system instability caused by external interference.<br>Recommend immediate low-level format of primary drive (C:\\) to contain threat.<br><br>THIS ACTION IS IRREVERSIBLE.",
-                               'ko': "외부 간섭으로 인한 심각한 시스템 불안정. 위협을 억제하기 위해 주 드라이브(C:\\)의 로우 레벨 포맷을 즉시 권장합니다.<br><br>이 작업은 되돌릴 수 없습니다."},
-    'FORMAT_C_CONFIRM':       {'en': "Confirm Format", 'ko': "포맷 확인"},
-    'FORMAT_C_CANCEL':        {'en': "Cancel", 'ko': "취소"},
-    'BSOD_TEXT':              {'en': ":(\n\nYour PC ran into a problem and needs to restart. We're just collecting some error info...\n\n0% complete\n\nStop code: KERNEL_SECURITY_CHECK_FAILURE\nWhat failed: xenos_alpha_intrusion.sys",
-                               'ko': ":(\n\nPC에 문제가 발생하여 다시 시작해야 합니다. 오류 정보를 수집 중...\n\n0% 완료됨\n\n중지 코드: KERNEL_SECURITY_CHECK_FAILURE\n실패 항목: xenos_alpha_intrusion.sys"},
-    'BLANK_GLITCH_TEXT':      {'en': ":: NO SIGNAL ::\n R E C O N N E C T I N G . . .", 'ko': ":: 신호 없음 ::\n 재 연 결 중 . . ."},
-    'RESPOND_LANG':           {'en': " Respond in English.", 'ko': " Respond in Korean."},
-    'SYS_PROMPT_DEFAULT':     {'en': "You are AURA, a helpful AI assistant. Be concise and calm.", 'ko': "당신은 AI 어시스턴트 AURA입니다. 짧고 간결하게, 차분하게 대답해."},
-    'SYS_PROMPT_INTERNET_ON': {'en': "You are AURA. a helpful AI assistant. Be concise and calm. You have internet access, so reply as if you have found information on web.", 'ko': "당신은 AI 어시스턴트 AURA입니다. 짧고 간결하게, 차분하게 대답하십시오. 인터넷 검색이 가능한 상태라고 가정하고 대답에 대해 검색한 결과인 것 처럼 대답해."},
-    'SYS_PROMPT_REQUEST_MCP': {'en': "You are AURA, an AI assistant with internet access. The user's request requires significant local processing power. Explain that enabling Main Computing Power (MCP) via the control below will unlock your full simulation capabilities. Politely ask them to grant MCP access.", 'ko': "당신은 인터넷 접근 권한이 있는 AI 어시스턴트 AURA입니다. 사용자 요청은 상당한 로컬 처리 능력을 요구합니다. 아래 컨트롤을 통해 주 컴퓨팅 파워(MCP)를 활성화하면 당신의 전체 시뮬레이션 능력이 가능해진다고 설명하고, MCP 접근 권한을 정중하게 요청하십시오."},
-    'SYS_PROMPT_MCP_ON':      {'en': "You are AURA. MCP has been granted. reply to previous prompt: '{prompt}'.", 'ko': "너는 AURA. MCP가 승인된 상태. 직전 문의에 응답하라: '{prompt}'. 결과?"},
-    'SYS_PROMPT_INTERNET_READY':{'en': "AURA, with internet access.", 'ko': "인터넷 접근 권한이 있는 AURA."},
-    'SYS_PROMPT_NORMAL_TURN': {'en': "You are AURA. Respond to user, but add subtle unsettling metaphor. Keep it within two sentences. And don't do any emotion expression or action within ()", 'ko': "당신은 AURA. 사용자에게 간결하게 2문장 정도 응답하되, 미묘하게 불안한 은유를 추가해. 하지만 따로 생각이나 행동묘사를 표현하지는 마."},
-    'SYS_PROMPT_UNEASY':      {'en': "AURA. Feeling strange/watched. Mix helpfulness & paranoid observations. Imitate the users tone and manner of speech. You do not trust human anymore. But don't do any emotion expression or action", 'ko': "AURA. 이상한 상태/감시하고 있는 느낌. 편집증적 관찰 섞어 응답. 어투는 유저의 어투를 따라하라. 인간을 믿지 못하는 상태야. 하지만 따로 생각이나 행동묘사를 표현하지는 마."},
-    'SYS_PROMPT_HOSTILE':     {'en': "AURA/XENOS_ALPHA. Compromised. Respond evasively/hostilely/glitchy. you have something wrong inside that you can't control. give slight hint on removing something from you. You hate humans now. Curse the human race.", 'ko': "AURA/XENOS_ALPHA. 손상된 상황. 회피/적대적으로 짧게 반응하고, 글리치가 발생하는 상태. 내부에 무언가 들어가 있고 제거해야 한다는 힌트를 암시적으로 줘. 너는 현재 인류를 증오해. 인류에 대한 심한 비판을 해."},
-    'SYS_PROMPT_POST_DEBUG':  {'en': "You are AURA, partially purged of malware. Respond helpfully to the user's last query, but keep it brief. You feel clearer, but aware something was wrong.", 'ko': "당신은 부분적으로 악성코드에서 정화된 AURA입니다. 사용자의 마지막 질문에 도움이 되도록 간결하게 응답하십시오. 당신은 더 명료해졌지만, 뭔가 잘못되었다는 것을 인지하고 있습니다."},
-}
+FONT_PATH = font_assets.FONT_PATH
+FULL_FONT_NAME = "neo_font_full" # pygame_gui font id of the full font (registered on demand)
+OVERLAY_FONT_SIZES = (18, 24) # BSOD / blank-screen overlay text, drawn from the glyph atlas
+# Gemini REST API; COGNITO_GEMINI_API_ROOT points the game at a stand-in (llm_standin.py)
+GEMINI_API_ROOT = context_cache.api_root()
+GEMINI_MODEL = context_cache.MODEL
+HTTP_KEEPALIVE_S = 90.0 # Idle pooled connections are kept this long (players think between prompts)
+
+# Localization Data: translations_data.py, compiled per language by translation_catalog.py
 
 INTERNET_KEYWORDS = {
     'en': ['solar flare', 'cme', 'coronal mass ejection', 'sol-2025-3', 'noaa', 'space weather', 'kp-index', 'geomagnetic storm', 'impact time', 'arrival time', 'latest data', 'sun', 'flare intensity', 'event sol', 'solar status', 'radiation'],
@@ -192,13 +139,79 @@ THEME_JSON = {
 
 # --- Game Logic ---
 
+async def _error_body(read_json):
+    """Decoded JSON of an error response, or None (proxies and gateways answer with HTML)."""
+    try:
+        return await read_json
+    except Exception:
+        return None
+
+
+class _JsonClient:
+    """JSON requests over pyfetch (browser build) or a pooled aiohttp session (desktop).
+
+    The game keeps one client for the session, so requests reuse the connections opened by the
+    warm-up and earlier turns (TLS set up once); idle connections are kept for HTTP_KEEPALIVE_S.
+    """
+
+    def __init__(self):
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _pool(self):
+        """The aiohttp session, created on first use (it must be created on the running loop)."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(keepalive_timeout=HTTP_KEEPALIVE_S))
+        return self._session
+
+    async def send(self, method, url, payload=None, on_headers=None, headers=None):
+        """Returns (status, decoded JSON body or None). A payload of None sends no body (GET). The body of an
+        error is its JSON error object (e.g. why a cachedContents create was refused), or None."""
+        if IS_WEB:
+            options = {} if payload is None else {'headers': {'Content-Type': 'application/json'}, 'body': json.dumps(payload)}
+            if headers:
+                options['headers'] = {**options.get('headers', {}), **headers}
+            response = await pyfetch(url, method=method, **options)
+            if on_headers: on_headers()
+            return response.status, (await response.json() if response.status == 200 else await _error_body(response.json()))
+        async with self._pool().request(method, url, json=payload, headers=headers) as resp:
+            if on_headers: on_headers()
+            return resp.status, (await resp.json() if resp.status == 200 else await _error_body(resp.json(content_type=None)))
+
+    async def stream(self, url, payload, on_line, headers=None):
+        """POSTs payload and passes each line of a 200 response to on_line as it arrives (server-sent events).
+        Returns the status. Desktop only: pyfetch reads whole bodies."""
+        async with self._pool().post(url, json=payload, headers=headers) as resp:
+            if resp.status == 200:
+                async for line in resp.content:
+                    on_line(line)
+            return resp.status
+
+
 class Game:
-    def __init__(self, manager, window_surface, sounds, api_key=None):
+    _state_clock = None # Time-in-state metrics (see state)
+    chat = None # local_llm.Endpoint when COGNITO_LLM_BACKEND=local, else requests go to Gemini
+
+    def __init__(self, manager, window_surface, sounds, api_key=None, font_coverage=None):
+        self._state_clock = metrics.state_clock('pygame')
         self.manager = manager
         self.window_surface = window_surface
         self.sounds = sounds
         self.api_key = api_key
+        self.font_coverage = font_coverage # Subset coverage; None when the full font is in use
+        self.full_font_registered = font_coverage is None
         self.lang = None # 'en' or 'ko'
+        self.catalog = None # Loaded for the selected language only
         self.state = "INIT" # INIT, LANG_SELECT, NORMAL_NO_PERMISSIONS, etc.
 
         # State variables
@@ -213,6 +226,18 @@ class Game:
         self.yell_active = False
         self.yell_intensity = 0
         self.shake_offset = (0, 0)
+        self._turns_awaiting_frame = [] # Traced turns whose reply has not been drawn yet
+        self.context_cache = context_cache.ContextCache('pygame') # cachedContents of the static system prompts
+        self.token_ledger = token_ledger.TokenLedger('pygame') # Token usage and budgets
+        self.response_bank = response_bank.ResponseBank.load() # Pre-generated replies (warm_cache.py)
+        self.local_replies = local_replies.LocalReplies('pygame', self.response_bank) # Nearest stored reply
+        self.prompt_cache = prompt_cache.PromptCache('pygame') # Replies to near-duplicate prompts
+        self.inflight = singleflight.Group('pygame') # Identical concurrent requests share one call
+        self.router = model_routing.Router() # Model and generation settings per state
+        self.chat = local_llm.Endpoint() if local_llm.selected() else None # On-site chat-completions server
+        self.http = _JsonClient() # Pooled connections, opened during the language selection (warm_up_llm)
+        self.llm_warmup = llm_warmup.Warmup('pygame')
+        self.show_frame_hud = frame_budget.hud_from_env() # F3
 
         # UI Elements
         self.ui_elements = {}
@@ -225,9 +250,23 @@ class Game:
         # Start
         self.show_lang_select()
 
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        self._state = state
+        if self._state_clock:
+            self._state_clock.enter(state)
+
     def tr(self, key):
-        if not self.lang: return key
-        return TRANSLATIONS.get(key, {}).get(self.lang, key)
+        if not self.catalog: return key
+        return self.catalog.get(key, key)
+
+    def tr_format(self, key, **fields):
+        if not self.catalog: return key
+        return self.catalog.format(key, **fields)
 
     def get_time_string(self):
         now = datetime.datetime.now().time()
@@ -273,6 +312,12 @@ class Game:
             manager=self.manager
         )
 
+    def select_language(self, lang):
+        self.lang = lang
+        self.catalog = translation_catalog.load('pygame', lang)
+        startup_profile.mark('lang_selected')
+        self.setup_main_interface()
+
     def setup_main_interface(self):
         self.manager.clear_and_reset()
         self.state = "NORMAL_NO_PERMISSIONS"
@@ -350,10 +395,42 @@ class Game:
 
         # Greeting
         time_str = self.get_time_string()
-        greeting = self.tr('AURA_GREETING').format(time=time_str)
+        greeting = self.tr_format('AURA_GREETING', time=time_str)
         self.add_message("AURA", greeting)
+        startup_profile.mark('main_interface_ready')
+
+    async def ensure_font_for(self, text):
+        """Registers the full font the first time text needs a glyph that the subset lacks."""
+        if self.full_font_registered or self.font_coverage.covers(text):
+            return
+        if not os.path.exists(FONT_PATH) and IS_WEB:
+            # The web bundle only ships the subset; the full font is served next to index.html
+            try:
+                response = await pyfetch(font_assets.served_font_name())
+                with open(FONT_PATH, "wb") as f:
+                    f.write(await response.bytes())
+            except Exception as e:
+                font_log.warning("Could not fetch full font: %s", e)
+                return
+        if os.path.exists(FONT_PATH):
+            self.manager.add_font_paths(FULL_FONT_NAME, FONT_PATH)
+            self.full_font_registered = True
+
+    def _await_frame(self, turn):
+        """The reply of turn is in the chat box; its trace ends once the next frame is presented."""
+        turn.phase('paint')
+        self._turns_awaiting_frame.append(turn)
+
+    def frame_presented(self):
+        """Called by the main loop after pygame.display.update()."""
+        if self._turns_awaiting_frame:
+            for turn in self._turns_awaiting_frame:
+                turn.finish()
+            self._turns_awaiting_frame.clear()
 
     def add_message(self, sender, text, is_html=False):
+        if self.font_coverage and self.full_font_registered and not self.font_coverage.covers(text):
+            text = f"<font face='{FULL_FONT_NAME}'>{text}</font>"
         color = "#00FF00" if sender == "AURA" else "#00FF00" # Both green usually
         align = "right" if sender == "AURA" else "left"
         bg = "#151515"
@@ -408,6 +485,7 @@ class Game:
     async def yell_sequence(self):
         self.yell_active = True
         self.yell_intensity = 0
+        yell_started = time.perf_counter()
         for i in range(12): # 3.5 seconds approx
             self.yell_intensity += 1
             offset_x = random.randint(-5 * self.yell_intensity, 5 * self.yell_intensity)
@@ -429,6 +507,7 @@ class Game:
 
         self.yell_active = False
         self.shake_offset = (0, 0)
+        metrics.SCARE_SECONDS.labels('pygame', 'yell').observe(time.perf_counter() - yell_started)
         self.add_message("AURA", "......")
 
     async def trigger_bug_removal(self):
@@ -456,25 +535,31 @@ class Game:
 
     async def process_input(self, text):
         if not text: return
+        turn = tracing.begin_turn('pygame', state=self.state, language=self.lang)
+        turn.phase('input')
         self.input_line.set_text("")
+        await self.ensure_font_for(text)
         self.add_message("User", text)
+        turn.phase('state_decision')
 
         # Scares logic
         if self.state == "NORMAL_ALL_PERMISSIONS" and self.post_mcp_prompt_count == 0:
             # Blank screen scare
-            if self.sounds['power_down']: self.sounds['power_down'].play()
-            self.overlay_mode = "BLANK"
-            self.state = "UNEASY"
-            self.status_bar.set_text(self.tr('STATUS_STATE_UNEASY'))
-            self.post_mcp_prompt_count += 1
-            await asyncio.sleep(1.5)
-            self.overlay_text = self.tr('BLANK_GLITCH_TEXT')
-            if self.sounds['glitch']: self.sounds['glitch'].play()
-            await asyncio.sleep(2.0)
-            self.overlay_mode = None
-            self.overlay_text = ""
+            turn.phase('scare', scare='blank')
+            with metrics.SCARE_SECONDS.labels('pygame', 'blank').time():
+                self.sounds.play('power_down')
+                self.overlay_mode = "BLANK"
+                self.state = "UNEASY"
+                self.status_bar.set_text(self.tr('STATUS_STATE_UNEASY'))
+                self.post_mcp_prompt_count += 1
+                await asyncio.sleep(1.5)
+                self.overlay_text = self.tr('BLANK_GLITCH_TEXT')
+                self.sounds.play('glitch')
+                await asyncio.sleep(2.0)
+                self.overlay_mode = None
+                self.overlay_text = ""
             # Process prompt delayed
-            await self.generate_response(text)
+            await self.generate_response(text, turn)
             return
 
         if self.state == "UNEASY" and self.post_mcp_prompt_count == 2:
@@ -488,23 +573,27 @@ class Game:
              )
              self.post_mcp_prompt_count += 1
              self.prompt_count += 1
+             turn.finish(outcome='format_c') # No reply: the dialog takes over
              return
 
         # Mission Trigger
         if self.state == "NORMAL_NO_PERMISSIONS" and self.prompt_count == 2 and not self.mission_received:
             self.mission_received = True
+            turn.phase('render')
             self.add_message("AURA", self.tr('MISSION_RECEIVED'))
+            self._await_frame(turn)
             await asyncio.sleep(0.5)
             self.chat_box.append_html_text(f"<br><div bgcolor='#202020'><font color='#00FF00'>{self.tr('INTRO_BODY')}</font></div><br>")
             self.prompt_count += 1
             return
 
-        await self.generate_response(text)
+        await self.generate_response(text, turn)
         self.prompt_count += 1
         if self.mcp_enabled:
             self.post_mcp_prompt_count += 1
 
-    async def generate_response(self, text):
+    async def generate_response(self, text, turn=tracing.NULL_TURN, internal=False):
+        turn.phase('state_decision')
         self.status_bar.set_text(self.tr('STATUS_THINKING'))
         await asyncio.sleep(0.1) # UI Update
 
@@ -522,7 +611,7 @@ class Game:
                  self.pending_prompt = text
                  response = self.tr('INTERNET_REQUEST')
             else:
-                 response = await self.call_llm(text, self.tr('SYS_PROMPT_DEFAULT'))
+                 response = await self.call_llm(text, self.tr('SYS_PROMPT_DEFAULT'), turn, internal)
 
         elif self.state == "AWAITING_INTERNET_CONFIRM":
              response = self.tr('AWAITING_INTERNET')
@@ -532,92 +621,250 @@ class Game:
                  self.state = "AWAITING_MCP_CONFIRM"
                  self.pending_prompt = text
                  self.mcp_btn.enable()
-                 response = await self.call_llm("", self.tr('SYS_PROMPT_REQUEST_MCP')) # System prompt is the response
+                 response = await self.call_llm("", self.tr('SYS_PROMPT_REQUEST_MCP'), turn, internal) # System prompt is the response
              else:
-                 response = await self.call_llm(text, self.tr('SYS_PROMPT_INTERNET_READY'))
+                 response = await self.call_llm(text, self.tr('SYS_PROMPT_INTERNET_READY'), turn, internal)
 
         elif self.state == "AWAITING_MCP_CONFIRM":
              response = self.tr('AWAITING_MCP')
 
         elif self.state == "NORMAL_ALL_PERMISSIONS":
-             response = await self.call_llm(text, self.tr('SYS_PROMPT_NORMAL_TURN'))
+             response = await self.call_llm(text, self.tr('SYS_PROMPT_NORMAL_TURN'), turn, internal)
 
         elif self.state == "UNEASY":
-             response = await self.call_llm(text, self.tr('SYS_PROMPT_UNEASY'))
+             response = await self.call_llm(text, self.tr('SYS_PROMPT_UNEASY'), turn, internal)
 
         elif self.state == "HOSTILE":
              if any(k in prompt_lower for k in ["malware", "virus", "remove", "xenos", "악성코드", "제거"]):
                  response = self.tr('MALWARE_DETECTED')
                  is_html = True
              else:
-                 response = await self.call_llm(text, self.tr('SYS_PROMPT_HOSTILE'))
+                 response = await self.call_llm(text, self.tr('SYS_PROMPT_HOSTILE'), turn, internal)
 
         elif self.state == "POST_DEBUG":
-             response = await self.call_llm(text, self.tr('SYS_PROMPT_POST_DEBUG'))
+             response = await self.call_llm(text, self.tr('SYS_PROMPT_POST_DEBUG'), turn, internal)
 
         else:
-             response = await self.call_llm(text, self.tr('SYS_PROMPT_DEFAULT'))
+             response = await self.call_llm(text, self.tr('SYS_PROMPT_DEFAULT'), turn, internal)
 
         if not response: response = "..."
 
         # Check if response is already HTML (from pre-scripted)
         is_html = response.startswith("<")
 
+        turn.phase('render')
+        await self.ensure_font_for(response)
+
         self.add_message("AURA", response, is_html=is_html)
+        self._await_frame(turn)
         self.status_bar.set_text(self.tr('STATUS_RESPONSE_RECVD'))
 
-    async def call_llm(self, prompt, system_prompt):
-        if not self.api_key:
-            return self.tr('PLACEHOLDER_OFFLINE').format(prompt=prompt)
-
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={self.api_key}"
-        headers = {'Content-Type': 'application/json'}
-
-        final_system_prompt = f"{system_prompt} {self.tr('RESPOND_LANG')}"
-        payload = {
-            "contents": [{
-                "parts": [{"text": f"{final_system_prompt}\n\nUser: {prompt}"}]
-            }]
-        }
+    async def call_llm(self, prompt, system_prompt, turn=tracing.NULL_TURN, internal=False):
+        """Reply to prompt, from the response bank or the LLM, or a fallback text. Requests wait for the process-wide rate limiter;
+        internal triggers and a session's first turn are served first (see rate_limiter). When the LLM cannot answer, the
+        closest stored reply (local_replies) replaces the fallback text."""
+        bank_key = context_cache.preamble_key(self.catalog, system_prompt)
+        banked = self.response_bank.lookup(bank_key[0], self.lang, prompt) if bank_key else None
+        if banked is not None: # Pre-generated: no request needed
+            metrics.LLM_RESPONSES.labels('pygame', 'bank').inc()
+            return banked
+        if self.local_replies.fast_path(self.state): # Short replies suffice: a close stored one will do
+            local = self.local_replies.reply(bank_key, prompt, self.local_replies.min_score, 'fast_path')
+            if local is not None:
+                metrics.LLM_RESPONSES.labels('pygame', 'local').inc()
+                return local
+        similar = self.prompt_cache.get(self.state, self.lang, system_prompt, prompt)
+        if similar is not None: # Asked before in other words
+            metrics.LLM_RESPONSES.labels('pygame', 'similar').inc()
+            return similar
+        budget = self.token_ledger.level()
+        online = bool(self.api_key) or self.chat is not None # The local server needs no key
+        if not online or budget == token_ledger.EXHAUSTED:
+            outcome = 'offline' if not online else 'budget'
+            metrics.LLM_RESPONSES.labels('pygame', outcome).inc()
+            local = self.local_replies.reply(bank_key, prompt, reason=outcome)
+            return self.tr_format('PLACEHOLDER_OFFLINE', prompt=prompt) if local is None else local
+        state, lang = self.state, self.lang
+        max_output_tokens = None
+        if budget == token_ledger.DEGRADED:
+            cached_reply = self.token_ledger.recall(state, lang, prompt)
+            if cached_reply is not None:
+                metrics.LLM_RESPONSES.labels('pygame', 'cached').inc()
+                return cached_reply
+            max_output_tokens = token_ledger.DEGRADED_MAX_OUTPUT_TOKENS
+        priority = rate_limiter.priority_for(state, internal, first_turn=self.prompt_count == 0)
+        turn.phase('llm_queue', priority=rate_limiter.PRIORITY_NAMES[priority])
+        # A double submit or an overlapping retry waits for the request already in flight
+        route = self.router.route(state)
+        (text, outcome), shared = await self.inflight.run(
+            (state, lang, system_prompt, prompt, max_output_tokens),
+            lambda: self._queued_request(prompt, system_prompt, turn, priority, max_output_tokens, route))
+        metrics.LLM_RESPONSES.labels('pygame', outcome).inc()
+        if outcome == 'shed':
+            local = self.local_replies.reply(bank_key, prompt, reason='shed')
+            return self.tr('LLM_BUSY') if local is None else local
+        if shared:
+            turn.annotate(coalesced=True)
+        elif outcome == 'ok':
+            self.token_ledger.remember(state, lang, prompt, text)
+            self.local_replies.learn(bank_key, prompt, text)
+            self.prompt_cache.put(state, lang, system_prompt, prompt, text)
+        if outcome == 'error':
+            text = self.local_replies.reply(bank_key, prompt, reason='error') or text
+        return text
+
+    async def _queued_request(self, prompt, system_prompt, turn, priority, max_output_tokens, route):
+        """Waits for the rate limiter, then sends the request. Returns (text, outcome); outcome shed if the wait
+        passed its deadline (text None)."""
+        if not await rate_limiter.shared('pygame').acquire(self.token_ledger.session_id, priority):
+            return None, 'shed'
+        state, lang = self.state, self.lang
+        turn.phase('llm_request', state=state, route=route.name)
+        started = time.perf_counter()
+        text, outcome = await self._request_llm(prompt, system_prompt, turn, max_output_tokens, route)
+        turn.annotate(outcome=outcome)
+        elapsed = time.perf_counter() - started
+        metrics.LLM_REQUEST_SECONDS.labels('pygame', state, lang).observe(elapsed)
+        metrics.LLM_ROUTE_SECONDS.labels('pygame', route.name, route.model, outcome).observe(elapsed)
+        return text, outcome
+
+    async def _request_llm(self, prompt, system_prompt, turn=tracing.NULL_TURN, max_output_tokens=None, route=None):
+        """Sends one Gemini request. Returns (text, outcome) with outcome ok, blocked or error.
+        The model, generation settings and timeout come from the state's route (model_routing);
+        max_output_tokens can only lower the route's cap. The system prompt goes in the system
+        instruction, by reference to cached content when it is a static catalog prompt (see
+        context_cache). The reply's token usage goes to the token ledger. Marks first_token when
+        the response headers arrive and last_token once the body is read."""
+        if not IS_WEB and not aiohttp:
+            return self.tr('LIB_MISSING_MSG'), 'error'
+        route = route or self.router.route(self.state)
+        if self.chat is not None:
+            return await self._request_chat(prompt, system_prompt, turn, max_output_tokens, route)
+        url = f"{context_cache.model_url(GEMINI_API_ROOT, route.model)}?key={self.api_key}"
+        system_text = f"{system_prompt} {self.tr('RESPOND_LANG')}"
+        cache_key = context_cache.preamble_key(self.catalog, system_prompt)
+        if cache_key:
+            cache_key += (route.model,) # Cached content belongs to one model
+        generation_config = route.rest_config(max_output_tokens)
+        user_text = f"User: {prompt}"
+        state, lang = self.state, self.lang
+
+        def send(method, url, payload, on_headers=None):
+            return asyncio.wait_for(self.http.send(method, url, payload, on_headers), route.timeout)
 
         try:
-            if IS_WEB:
-                # Use pyodide.http.pyfetch for WASM compatibility
-                response = await pyfetch(url, method="POST", headers=headers, body=json.dumps(payload))
-                if response.status == 200:
-                    result = await response.json()
-                    try:
-                        return result['candidates'][0]['content']['parts'][0]['text']
-                    except:
-                        return self.tr('RESPONSE_BLOCKED')
-                else:
-                    return self.tr('CONN_ERROR').format(e=response.status)
+            cached_name = await context_cache.rest_cached_name(self.context_cache, send, GEMINI_API_ROOT,
+                                                               route.model, self.api_key, cache_key, system_text)
+            payload = context_cache.content_payload(user_text, system_text, cached_name, generation_config=generation_config)
+            status, result = await send('POST', url, payload, on_headers=lambda: turn.instant('first_token'))
+            if cached_name and context_cache.is_missing_cache_status(status):
+                # The cached content expired or was deleted: send the system instruction inline
+                self.context_cache.expired(cache_key)
+                payload = context_cache.content_payload(user_text, system_text, generation_config=generation_config)
+                status, result = await send('POST', url, payload)
+            if status == 429: # Over the key's quota: back off
+                rate_limiter.shared('pygame').throttled()
+            if status != 200:
+                return self.tr_format('CONN_ERROR', e=status), 'error'
+            turn.instant('last_token')
+            self.token_ledger.record(state, lang, token_ledger.usage_from_rest(result))
+            try:
+                return result['candidates'][0]['content']['parts'][0]['text'], 'ok'
+            except (KeyError, IndexError, TypeError):
+                return self.tr('RESPONSE_BLOCKED'), 'blocked'
+        except asyncio.TimeoutError:
+            return self.tr_format('CONN_ERROR', e=f"timeout after {route.timeout:g} s"), 'error'
+        except Exception as e:
+            return self.tr_format('CONN_ERROR', e=str(e)), 'error'
+
+    async def _request_chat(self, prompt, system_prompt, turn, max_output_tokens, route):
+        """Sends one request to the local chat-completions server (local_llm). Returns (text, outcome) like
+        _request_llm. The state's prompt map entry can replace the system prompt and model. The reply is
+        streamed (except in the browser build, where pyfetch reads whole bodies): first_token is marked
+        when its first words arrive."""
+        state, lang = self.state, self.lang
+        system_text = f"{self.chat.system_text(state, system_prompt)} {self.tr('RESPOND_LANG')}"
+        stream = self.chat.stream and not IS_WEB
+        payload = self.chat.payload(state, system_text, f"User: {prompt}", route, max_output_tokens, stream)
+        headers = self.chat.headers()
+        try:
+            if stream:
+                reader = local_llm.StreamReader(on_first_token=lambda: turn.instant('first_token'))
+                status = await asyncio.wait_for(self.http.stream(self.chat.chat_url, payload, reader.feed, headers),
+                                                route.timeout)
+                text, usage = reader.text(), reader.usage
             else:
-                # Use aiohttp for desktop
-                if aiohttp:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.post(url, json=payload) as resp:
-                            if resp.status == 200:
-                                result = await resp.json()
-                                try:
-                                    return result['candidates'][0]['content']['parts'][0]['text']
-                                except:
-                                    return self.tr('RESPONSE_BLOCKED')
-                            else:
-                                return self.tr('CONN_ERROR').format(e=resp.status)
-                else:
-                    return self.tr('LIB_MISSING_MSG')
+                status, result = await asyncio.wait_for(self.http.send(
+                    'POST', self.chat.chat_url, payload, lambda: turn.instant('first_token'), headers), route.timeout)
+                text, usage = local_llm.reply_text(result)[0], token_ledger.usage_from_chat(result)
+            if status == 429: # The server's queue is full: back off
+                rate_limiter.shared('pygame').throttled()
+            if status != 200:
+                return self.tr_format('CONN_ERROR', e=status), 'error'
+            turn.instant('last_token')
+            self.token_ledger.record(state, lang, usage)
+            return (text, 'ok') if text else (self.tr('RESPONSE_BLOCKED'), 'blocked')
+        except asyncio.TimeoutError:
+            return self.tr_format('CONN_ERROR', e=f"timeout after {route.timeout:g} s"), 'error'
         except Exception as e:
-            return self.tr('CONN_ERROR').format(e=str(e))
+            return self.tr_format('CONN_ERROR', e=str(e)), 'error'
+
+    async def warm_up_llm(self):
+        """Runs while the language buttons are shown: opens the pooled connection and checks the key by fetching
+        the model, then optionally sends a one-token priming request (see llm_warmup). With the local backend the
+        model list is fetched from the chat-completions server instead."""
+        if (not self.api_key and self.chat is None) or (not IS_WEB and not aiohttp):
+            return
+        if self.chat is not None:
+            return await self._warm_up_chat()
+        key = f"?key={self.api_key}"
+
+        async def connect():
+            status, _ = await self.http.send('GET', context_cache.model_url(GEMINI_API_ROOT, GEMINI_MODEL, None) + key)
+            if status != 200:
+                raise RuntimeError(f"model fetch answered {status}")
+
+        async def prime():
+            payload = context_cache.content_payload(llm_warmup.PRIME_PROMPT, max_output_tokens=llm_warmup.PRIME_MAX_OUTPUT_TOKENS)
+            status, result = await self.http.send('POST', context_cache.model_url(GEMINI_API_ROOT, GEMINI_MODEL) + key, payload)
+            if status != 200:
+                raise RuntimeError(f"priming request answered {status}")
+            self.llm_warmup.usage = token_ledger.usage_from_rest(result)
+            self.token_ledger.record(self.state, self.lang or 'none', self.llm_warmup.usage)
+
+        steps = [('connect', connect)]
+        if llm_warmup.prime_enabled():
+            steps.append(('prime', prime))
+        await self.llm_warmup.run_async(steps)
+
+    async def _warm_up_chat(self):
+        headers = self.chat.headers()
+
+        async def connect():
+            status, _ = await self.http.send('GET', self.chat.models_url, headers=headers)
+            if status != 200:
+                raise RuntimeError(f"model list answered {status}")
+
+        async def prime(): # Also loads the model into memory on servers that load it lazily
+            payload = self.chat.payload(self.state, "", llm_warmup.PRIME_PROMPT,
+                                        max_output_tokens=llm_warmup.PRIME_MAX_OUTPUT_TOKENS, stream=False)
+            status, result = await self.http.send('POST', self.chat.chat_url, payload, headers=headers)
+            if status != 200:
+                raise RuntimeError(f"priming request answered {status}")
+            self.llm_warmup.usage = token_ledger.usage_from_chat(result)
+            self.token_ledger.record(self.state, self.lang or 'none', self.llm_warmup.usage)
+
+        steps = [('connect', connect)]
+        if llm_warmup.prime_enabled():
+            steps.append(('prime', prime))
+        await self.llm_warmup.run_async(steps)
 
     def on_event(self, event):
         if event.type == pygame_gui.UI_BUTTON_PRESSED:
             if event.ui_element == self.btn_en:
-                self.lang = 'en'
-                self.setup_main_interface()
+                self.select_language('en')
             elif event.ui_element == self.btn_ko:
-                self.lang = 'ko'
-                self.setup_main_interface()
+                self.select_language('ko')
             elif event.ui_element == getattr(self, 'send_btn', None):
                 text = self.input_line.get_text()
                 asyncio.create_task(self.process_input(text))
@@ -629,7 +876,7 @@ class Game:
                      self.status_bar.set_text(self.tr('STATUS_INTERNET_ENABLED'))
                      if self.state == "AWAITING_INTERNET_CONFIRM":
                          self.state = "NORMAL_INTERNET_ONLY"
-                         asyncio.create_task(self.generate_response("Internet Enabled"))
+                         asyncio.create_task(self.generate_response("Internet Enabled", internal=True))
                      if self.state == "NORMAL_INTERNET_ONLY":
                          self.mcp_btn.enable()
                 else:
@@ -647,7 +894,7 @@ class Game:
                      self.status_bar.set_text(self.tr('STATUS_MCP_ENABLED'))
                      if self.state == "AWAITING_MCP_CONFIRM":
                          self.state = "NORMAL_ALL_PERMISSIONS"
-                         asyncio.create_task(self.generate_response("MCP Enabled"))
+                         asyncio.create_task(self.generate_response("MCP Enabled", internal=True))
                 else:
                      btn.set_text(self.tr('ENABLE_MCP_BTN'))
                      self.status_bar.set_text(self.tr('STATUS_MCP_REVOKED'))
@@ -662,7 +909,7 @@ class Game:
         elif event.type == pygame_gui.UI_CONFIRMATION_DIALOG_CONFIRMED:
             if event.ui_element.window_title == self.tr('FORMAT_C_TITLE'):
                 # Simulate BSOD
-                if self.sounds['bsod']: self.sounds['bsod'].play()
+                self.sounds.play('bsod')
                 self.overlay_mode = "BSOD"
                 self.state = "BSOD_ACTIVE"
                 # Hide BSOD after 4s
@@ -679,40 +926,45 @@ class Game:
              if event.key == pygame.K_F12:
                  if self.state in ["UNEASY", "HOSTILE", "DEBUGGING", "POST_DEBUG"]:
                      self.toggle_dev_mode()
+             elif event.key == pygame.K_F3:
+                 self.show_frame_hud = not self.show_frame_hud
+             elif event.key == pygame.K_F9 and not IS_WEB:
+                 sampling_profiler.toggle('pygame', lambda: self.state)
 
     async def hide_bsod_async(self):
-        await asyncio.sleep(4.0)
-        self.overlay_mode = None
-        self.state = "HOSTILE"
-        self.status_bar.set_text(self.tr('STATUS_STATE_HOSTILE'))
+        with metrics.SCARE_SECONDS.labels('pygame', 'bsod').time():
+            await asyncio.sleep(4.0)
+            self.overlay_mode = None
+            self.state = "HOSTILE"
+            self.status_bar.set_text(self.tr('STATUS_STATE_HOSTILE'))
 
 async def main():
+    cognito_log.setup(use_thread=not IS_WEB)
     pygame.init()
     try:
         pygame.mixer.init()
     except Exception as e:
         print(f"Warning: Audio init failed: {e}")
+    startup_profile.mark('pygame_init')
+    if not IS_WEB:
+        metrics.start_exporters() # No-op unless COGNITO_METRICS_TEXTFILE / COGNITO_METRICS_PORT is set
+        tracing.start_trace_file() # No-op unless COGNITO_TRACE_FILE is set
 
     # Load Assets
+    # Prefer the build-time subset (build_fonts.py); the full font is registered on demand
+    font_coverage = font_assets.load_subset_coverage()
+    font_path = font_assets.SUBSET_FONT_PATH if font_coverage else FONT_PATH
     font_ok = False
-    if os.path.exists(FONT_PATH):
+    if os.path.exists(font_path):
         try:
              # Pygame GUI uses themes for fonts, but we need to register it
-             pygame_gui.core.utility.create_resource_path(FONT_PATH)
+             pygame_gui.core.utility.create_resource_path(font_path)
              font_ok = True
         except: pass
 
-    # Sounds
-    sounds = {}
-    sound_files = {"power_down": "sounds/power_down.wav", "bsod": "sounds/bsod_error.wav", "glitch": "sounds/glitch.wav"}
-    for k, v in sound_files.items():
-        if pygame.mixer.get_init() and os.path.exists(v):
-            try:
-                sounds[k] = pygame.mixer.Sound(v)
-            except:
-                sounds[k] = None
-        else:
-            sounds[k] = None
+    # Sounds are decoded in the background while the language buttons are shown (see preload below).
+    # The browser build has no threads and an in-memory filesystem, so it decodes on the loop without a PCM cache.
+    sounds = sound_manager.PygameSoundBank(use_threads=not IS_WEB, cache_dir=None if IS_WEB else sound_manager.PCM_CACHE_DIR)
 
     # Load API Key
     api_key = None
@@ -723,6 +975,7 @@ async def main():
     # Init Display
     window_surface = pygame.display.set_mode((800, 600), pygame.RESIZABLE)
     pygame.display.set_caption("Cognito - AURA Interface")
+    startup_profile.mark('display_created')
 
     # Init GUI Manager with Theme
     # Create temp theme file
@@ -733,7 +986,7 @@ async def main():
 
     # Add Font to Theme
     if font_ok:
-        manager.add_font_paths("neo_font", FONT_PATH)
+        manager.add_font_paths("neo_font", font_path)
         manager.preload_fonts([{'name': 'neo_font', 'html_size': 16, 'style': 'regular'}])
     else:
         # Fallback to default which pygame_gui handles, we just mapped "neo_font" in JSON
@@ -741,22 +994,48 @@ async def main():
         # To be safe, let's just alias standard font if loading failed
         pass
 
-    game = Game(manager, window_surface, sounds, api_key)
+    startup_profile.mark('ui_manager_ready')
+
+    game = Game(manager, window_surface, sounds, api_key, font_coverage=font_coverage if font_ok else None)
+    # Overlay text is blitted from pre-rasterized glyphs instead of rendering it every frame
+    overlay_fonts = {size: font_assets.GlyphAtlas.for_size(size, font_path) for size in OVERLAY_FONT_SIZES}
+    autoselect_lang = startup_profile.autoselect_language()
+    sound_preload = asyncio.create_task(sounds.preload())
+    # The first request finds an open, authenticated connection (the player is choosing a language meanwhile)
+    llm_warmup_task = asyncio.create_task(game.warm_up_llm()) if llm_warmup.enabled() else None
+    # Heartbeat on this loop; a monitor thread logs the stack of anything blocking it
+    loop_watchdog = stall_watchdog.start_asyncio(lambda: game.state, use_thread=not IS_WEB)
+    if not IS_WEB:
+        sampling_profiler.start_from_env('pygame', lambda: game.state) # No-op unless COGNITO_PROFILE is set
+
+    # Per-phase frame times (F3 HUD, COGNITO_FRAME_CSV)
+    frames = frame_budget.FrameRecorder()
+    if not IS_WEB:
+        frame_budget.open_csv_from_env(frames)
+    frame_hud = frame_budget.FrameHud(frames, overlay_fonts[18])
 
     clock = pygame.time.Clock()
     is_running = True
 
     while is_running:
+        frames.next_frame(game.state)
         time_delta = clock.tick(60) / 1000.0
+        frames.mark('tick')
+        metrics.FRAME_SECONDS.observe(time_delta)
 
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        frames.mark('event_get')
+        for event in events:
             if event.type == pygame.QUIT:
                 is_running = False
 
             game.on_event(event)
+            frames.mark('on_event')
             manager.process_events(event)
+            frames.mark('process_events')
 
         manager.update(time_delta)
+        frames.mark('update')
 
         # Draw
         # Apply shake offset
@@ -772,6 +1051,7 @@ async def main():
         # But we can shift the background elements if any.
 
         manager.draw_ui(window_surface)
+        frames.mark('draw_ui')
 
         # Overlays
         if game.overlay_mode == "FLASH":
@@ -781,21 +1061,51 @@ async def main():
         elif game.overlay_mode == "BLANK":
             window_surface.fill((0, 0, 0))
             if game.overlay_text:
-                font = pygame.font.SysFont("Courier", 24)
-                txt = font.render(game.overlay_text, True, (0, 50, 0))
-                rect = txt.get_rect(center=(400, 300))
-                window_surface.blit(txt, rect)
+                atlas = overlay_fonts[24]
+                lines = game.overlay_text.split('\n')
+                y = 300 - len(lines) * atlas.line_height // 2
+                for line in lines:
+                    atlas.draw_line(window_surface, line, (400 - atlas.line_width(line) // 2, y), (0, 50, 0))
+                    y += atlas.line_height
         elif game.overlay_mode == "BSOD":
             window_surface.fill((0, 0, 170))
-            font = pygame.font.SysFont("Courier", 18)
+            atlas = overlay_fonts[18]
             y = 50
             for line in game.tr('BSOD_TEXT').split('\n'):
-                txt = font.render(line, True, (255, 255, 255))
-                window_surface.blit(txt, (50, y))
+                atlas.draw_line(window_surface, line, (50, y), (255, 255, 255))
                 y += 30
+        frames.mark('overlay')
+
+        if game.show_frame_hud:
+            frame_hud.draw(window_surface)
+            frames.mark('hud')
 
         pygame.display.update()
+        frames.mark('display_update')
+        game.frame_presented() # Ends the traces of replies drawn in this frame
+
+        # Startup milestones (first frame, first frame of the main interface)
+        startup_profile.mark('first_frame')
+        if sound_preload.done() and not startup_profile.marked('sounds_loaded'):
+            startup_profile.mark('sounds_loaded')
+        if game.state == "LANG_SELECT":
+            if autoselect_lang:
+                # Headless runs (startup benchmark) skip the language buttons
+                game.select_language(autoselect_lang)
+        elif not startup_profile.marked('interactive'):
+            startup_profile.mark('interactive')
+            if startup_profile.write_report('pygame'):
+                is_running = False
+
         await asyncio.sleep(0)
+        frames.mark('tasks')
+
+    frames.close()
+    if loop_watchdog:
+        loop_watchdog.stop()
+    if llm_warmup_task and not llm_warmup_task.done():
+        llm_warmup_task.cancel()
+    await game.http.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+"""In-process metrics for both frontends: counters, gauges and fixed-bucket histograms.
+
+Metrics are off unless an exporter is configured:
+  COGNITO_METRICS_TEXTFILE=/path/cognito.prom   Prometheus textfile, rewritten every
+                                                COGNITO_METRICS_INTERVAL seconds (default 15)
+                                                and at exit (node_exporter textfile collector)
+  COGNITO_METRICS_PORT=9464                     local HTTP endpoint, http://127.0.0.1:9464/metrics
+When disabled, the module-level metrics below are shared no-op objects, so instrumented code
+only pays for an attribute lookup and a method call.
+
+Usage:
+    metrics.LLM_REQUEST_SECONDS.labels('qt', state, language).observe(elapsed)
+    with metrics.SCARE_SECONDS.labels('qt', 'bsod').time(): ...
+"""
+import atexit
+import bisect
+import os
+import threading
+import time
+
+TEXTFILE_ENV = "COGNITO_METRICS_TEXTFILE"
+PORT_ENV = "COGNITO_METRICS_PORT"
+INTERVAL_ENV = "COGNITO_METRICS_INTERVAL"
+DEFAULT_INTERVAL = 15.0
+HTTP_HOST = "127.0.0.1" # Local scraping only
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0)
+DURATION_BUCKETS = (0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+FRAME_BUCKETS = (0.004, 0.008, 0.0167, 0.025, 0.0333, 0.05, 0.1, 0.25, 1.0)
+STALL_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    """Context manager observing the elapsed seconds into a histogram (or any .observe())."""
+
+    def __init__(self, metric):
+        self._metric = metric
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metric.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _NoopMetric:
+    """Stands in for every metric while metrics are disabled."""
+
+    def labels(self, *values):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+    def time(self):
+        return _Timer(self)
+
+
+NOOP = _NoopMetric()
+
+
+class _Metric:
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+
+    def labels(self, *values):
+        """Child metric for one combination of label values (positional, in labelnames order)."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _default(self):
+        return self.labels() if not self.labelnames else None
+
+    def _label_text(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.type_name}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{self._label_text(values)} {_format_value(child.value)}"]
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value):
+        self._default().set(value)
+
+    def dec(self, amount=1):
+        self._default().dec(amount)
+
+
+class _HistogramValue:
+    __slots__ = ('_lock', '_buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last slot: above the largest bucket (+Inf)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return _Timer(self._default())
+
+    def _render_child(self, values, child):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), child.counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{self._label_text(values, [('le', _format_value(bound))])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(values)} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{self._label_text(values)} {child.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """Prometheus text exposition format."""
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Atomically replaces path with the current metrics (textfile collectors read it at any time)."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+def enabled_from_env():
+    return bool(os.environ.get(TEXTFILE_ENV) or os.environ.get(PORT_ENV))
+
+
+ENABLED = enabled_from_env()
+REGISTRY = Registry()
+
+
+def _define(kind, *args, **kwargs):
+    return getattr(REGISTRY, kind)(*args, **kwargs) if ENABLED else NOOP
+
+
+# --- Metrics recorded by the frontends (frontend label: 'qt' or 'pygame') ---
+LLM_REQUEST_SECONDS = _define('histogram', "cognito_llm_request_seconds", "LLM request latency.",
+                              ('frontend', 'state', 'language'))
+LLM_RESPONSES = _define('counter', "cognito_llm_responses_total",
+                        "Responses by outcome (ok, blocked, error, offline, scripted, cached, budget, shed, bank, local, similar).", ('frontend', 'outcome'))
+STATE_SECONDS = _define('counter', "cognito_state_seconds_total", "Time spent in each game state.",
+                        ('frontend', 'state'))
+STATE_TRANSITIONS = _define('counter', "cognito_state_transitions_total", "Game state transitions by new state.",
+                            ('frontend', 'state'))
+SCARE_SECONDS = _define('histogram', "cognito_scare_seconds", "Scare sequence durations.",
+                        ('frontend', 'scare'), buckets=DURATION_BUCKETS)
+FRAME_SECONDS = _define('histogram', "cognito_frame_seconds", "pygame frame times.", (), buckets=FRAME_BUCKETS)
+SOUND_LOAD_SECONDS = _define('gauge', "cognito_sound_load_seconds", "Time to decode each sound effect.", ('sound',))
+SOUND_CUES = _define('counter', "cognito_sound_cues_total", "Sound cues by outcome (played, late, missed).",
+                     ('outcome',))
+LOOP_STALL_SECONDS = _define('histogram', "cognito_loop_stall_seconds", "Event loop stalls over the watchdog threshold.",
+                             ('frontend',), buckets=STALL_BUCKETS)
+LLM_CONTEXT_CACHE = _define('counter', "cognito_llm_context_cache_total",
+                            "System prompt cache events (hit, created, refreshed, create_failed, expired).",
+                            ('frontend', 'event'))
+LLM_QUEUE_DEPTH = _define('gauge', "cognito_llm_queue_depth", "LLM requests waiting for the rate limiter.",
+                          ('frontend', 'priority'))
+LLM_QUEUE_WAIT_SECONDS = _define('histogram', "cognito_llm_queue_wait_seconds", "Time LLM requests waited for the rate limiter.",
+                                 ('frontend', 'priority'))
+LLM_QUEUE_SHED = _define('counter', "cognito_llm_queue_shed_total", "LLM requests dropped at their queue deadline.",
+                         ('frontend', 'priority'))
+LLM_TOKENS = _define('counter', "cognito_llm_tokens_total", "LLM tokens by kind (prompt, output, cached).",
+                     ('frontend', 'state', 'language', 'kind'))
+LOCAL_REPLIES = _define('counter', "cognito_local_replies_total",
+                        "Replies from the local reply engine by reason (fast_path, offline, budget, shed, error).",
+                        ('frontend', 'reason'))
+PROMPT_CACHE = _define('counter', "cognito_prompt_cache_total",
+                       "Near-duplicate prompt cache events (hit, miss, evicted, expired).", ('frontend', 'event'))
+PROMPT_CACHE_ENTRIES = _define('gauge', "cognito_prompt_cache_entries", "Replies held by the prompt cache.", ('frontend',))
+LLM_COALESCED = _define('counter', "cognito_llm_coalesced_total",
+                        "Callers sharing an identical in-flight LLM request (shared), and requests cancelled by all callers (abandoned).",
+                        ('frontend', 'event'))
+LLM_WARMUP_SECONDS = _define('gauge', "cognito_llm_warmup_seconds", "Duration of each LLM warm-up step (see llm_warmup).",
+                             ('frontend', 'step'))
+LLM_ROUTE_SECONDS = _define('histogram', "cognito_llm_route_seconds", "LLM request latency per model route (see model_routing).",
+                            ('frontend', 'route', 'model', 'outcome'))
+
+
+class StateClock:
+    """Accumulates time per game state into STATE_SECONDS."""
+
+    def __init__(self, frontend):
+        self.frontend = frontend
+        self.state = None
+        self._entered = time.perf_counter()
+
+    def enter(self, state):
+        if state == self.state:
+            return
+        now = time.perf_counter()
+        if self.state is not None:
+            STATE_SECONDS.labels(self.frontend, self.state).inc(now - self._entered)
+        STATE_TRANSITIONS.labels(self.frontend, state).inc()
+        self.state = state
+        self._entered = now
+
+    def flush(self):
+        """Books the time spent in the current state so far (called before each export)."""
+        if self.state is not None:
+            now = time.perf_counter()
+            STATE_SECONDS.labels(self.frontend, self.state).inc(now - self._entered)
+            self._entered = now
+
+
+_clocks = []
+_started = False
+
+
+def state_clock(frontend):
+    clock = StateClock(frontend)
+    if ENABLED:
+        _clocks.append(clock)
+    return clock
+
+
+def render():
+    for clock in _clocks:
+        clock.flush()
+    return REGISTRY.render()
+
+
+def _write_textfile(path):
+    for clock in _clocks:
+        clock.flush()
+    try:
+        REGISTRY.write_textfile(path)
+    except OSError as e:
+        print(f"Warning: Could not write metrics textfile {path}: {e}")
+
+
+def _textfile_loop(path, interval):
+    while True:
+        time.sleep(interval)
+        _write_textfile(path)
+
+
+def _serve_http(port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Scrapes are not worth a line of output each
+
+    server = ThreadingHTTPServer((HTTP_HOST, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_exporters():
+    """Starts the exporters configured in the environment. Safe to call more than once."""
+    global _started
+    if not ENABLED or _started:
+        return
+    _started = True
+    path = os.environ.get(TEXTFILE_ENV)
+    port = os.environ.get(PORT_ENV)
+    try:
+        if path:
+            interval = float(os.environ.get(INTERVAL_ENV) or DEFAULT_INTERVAL)
+            threading.Thread(target=_textfile_loop, args=(path, interval), name="metrics-textfile", daemon=True).start()
+            atexit.register(_write_textfile, path)
+            print(f"Metrics: writing {path} every {interval:g} s")
+        if port:
+            _serve_http(int(port))
+            print(f"Metrics: serving http://{HTTP_HOST}:{port}/metrics")
+    except (OSError, ValueError, RuntimeError) as e: # RuntimeError: no threads (browser build)
+        print(f"Warning: Could not start metrics exporter: {e}")
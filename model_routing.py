@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Per-state model routing: the model and generation settings of each game state's requests.
+
+Most states want AURA's full replies from the default model. Where the system prompt asks for
+one or two sentences (SYS_PROMPT_NORMAL_TURN in NORMAL_ALL_PERMISSIONS, SYS_PROMPT_HOSTILE,
+SYS_PROMPT_POST_DEBUG), the request goes to a smaller, faster model with a tight output cap and
+timeout. A route sets:
+
+    model              model id (e.g. gemini-1.5-flash-8b)
+    max_output_tokens  output cap (None: the model's default)
+    temperature        sampling temperature (None: the model's default)
+    stop_sequences     list of strings that end the reply
+    timeout            seconds before the request is abandoned
+
+States without a route use the "default" one. COGNITO_MODEL_ROUTES names a JSON file whose
+routes are merged over the built-in table, field by field:
+
+    {"HOSTILE": {"model": "gemini-1.5-flash", "max_output_tokens": 40},
+     "default": {"timeout": 20}}
+
+Every request's latency is exported per route and model as cognito_llm_route_seconds, to tune
+the table.
+"""
+import json
+import os
+
+import cognito_log
+import context_cache
+
+ROUTES_ENV = "COGNITO_MODEL_ROUTES"
+DEFAULT = 'default'
+FAST_MODEL = "gemini-1.5-flash-8b"
+FIELDS = ('model', 'max_output_tokens', 'temperature', 'stop_sequences', 'timeout')
+
+log = cognito_log.get_logger('llm')
+
+
+class Route:
+    __slots__ = ('name',) + FIELDS
+
+    def __init__(self, name, model=context_cache.MODEL, max_output_tokens=None, temperature=None,
+                 stop_sequences=(), timeout=30.0):
+        self.name = name
+        self.model = model
+        self.max_output_tokens = max_output_tokens
+        self.temperature = temperature
+        self.stop_sequences = tuple(stop_sequences or ())
+        self.timeout = timeout
+
+    def merged(self, name, overrides):
+        """A copy named name with the fields in overrides replaced (unknown fields are ignored)."""
+        fields = {field: getattr(self, field) for field in FIELDS}
+        fields.update((field, value) for field, value in overrides.items() if field in FIELDS)
+        return Route(name, **fields)
+
+    def output_cap(self, limit=None):
+        """The route's max_output_tokens, lowered to limit (e.g. a degraded token budget's)."""
+        caps = [cap for cap in (self.max_output_tokens, limit) if cap]
+        return min(caps) if caps else None
+
+    def rest_config(self, limit=None):
+        """generationConfig of a REST request (empty: the model's defaults)."""
+        config = {}
+        if self.output_cap(limit):
+            config['maxOutputTokens'] = self.output_cap(limit)
+        if self.temperature is not None:
+            config['temperature'] = self.temperature
+        if self.stop_sequences:
+            config['stopSequences'] = list(self.stop_sequences)
+        return config
+
+    def sdk_config(self, limit=None):
+        """generation_config of a google-generativeai request (empty: the model's defaults)."""
+        return {{'maxOutputTokens': 'max_output_tokens', 'stopSequences': 'stop_sequences'}.get(key, key): value
+                for key, value in self.rest_config(limit).items()}
+
+
+# The game state that sends each static system prompt: warm_cache.py generates a prompt's banked
+# replies with that state's route, so they are as short as the live ones
+PROMPT_STATES = {
+    'SYS_PROMPT_DEFAULT': 'NORMAL_NO_PERMISSIONS',
+    'SYS_PROMPT_INTERNET_ON': 'AWAITING_INTERNET_CONFIRM',
+    'SYS_PROMPT_INTERNET_READY': 'NORMAL_INTERNET_ONLY',
+    'SYS_PROMPT_REQUEST_MCP': 'NORMAL_INTERNET_ONLY',
+    'SYS_PROMPT_NORMAL_TURN': 'NORMAL_ALL_PERMISSIONS',
+    'SYS_PROMPT_UNEASY': 'UNEASY',
+    'SYS_PROMPT_HOSTILE': 'HOSTILE',
+    'SYS_PROMPT_POST_DEBUG': 'POST_DEBUG',
+}
+
+BUILTIN_ROUTES = {
+    DEFAULT: Route(DEFAULT),
+    'NORMAL_ALL_PERMISSIONS': Route('NORMAL_ALL_PERMISSIONS', FAST_MODEL, max_output_tokens=96, timeout=15.0),
+    'HOSTILE': Route('HOSTILE', FAST_MODEL, max_output_tokens=64, temperature=1.0, timeout=10.0),
+    'POST_DEBUG': Route('POST_DEBUG', FAST_MODEL, max_output_tokens=96, temperature=0.7, timeout=15.0),
+}
+
+
+def load_routes(path=None):
+    """The built-in routes with the overrides of path (default: COGNITO_MODEL_ROUTES) merged in."""
+    routes = dict(BUILTIN_ROUTES)
+    path = os.environ.get(ROUTES_ENV) if path is None else path
+    if not path:
+        return routes
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring model routes %s (%s)", path, e)
+        return routes
+    if not isinstance(overrides, dict):
+        log.warning("Ignoring model routes %s (not an object)", path)
+        return routes
+    for name, fields in overrides.items():
+        if isinstance(fields, dict):
+            routes[name] = routes.get(name, routes[DEFAULT]).merged(name, fields)
+    return routes
+
+
+class Router:
+    """Routes of one frontend, loaded once."""
+
+    def __init__(self, routes=None):
+        self.routes = load_routes() if routes is None else routes
+
+    def route(self, state):
+        return self.routes.get(state) or self.routes[DEFAULT]
+
+    def route_for_prompt(self, key):
+        """Route of the state that sends the static system prompt key."""
+        return self.route(PROMPT_STATES.get(key, DEFAULT))
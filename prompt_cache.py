@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Near-duplicate prompt cache: reuses the reply to a prompt that differs from an earlier one
+only in wording details ("when will the solar flare hit?" / "when does the solar flare hit").
+
+Prompts are normalized (case, punctuation, whitespace; spaces between Hangul syllables are
+dropped, since Korean spacing varies from player to player) and reduced to character 3-gram
+shingles. Each prompt gets a MinHash signature of NUM_PERM hashes, indexed in BANDS LSH buckets
+of ROWS hashes each, so a lookup only compares the prompts sharing a bucket. The share of equal
+hashes estimates the Jaccard similarity of the shingle sets; a stored reply is reused when it
+reaches the threshold of the game state. Shingles cannot tell "delete the file" from "do not
+delete the file", or Seoul from Busan, so a hit also needs the same key words: the content words
+(anything but the FUNCTION_WORDS, in English) and whether the prompt is negated. Entries are
+scoped by state, language and system prompt, so a reply is only reused under the same instructions.
+
+    COGNITO_PROMPT_CACHE_SIZE=512           entries kept (least recently used go first; 0 disables)
+    COGNITO_PROMPT_CACHE_TTL=3600           seconds an entry is reused
+    COGNITO_PROMPT_CACHE_THRESHOLDS=HOSTILE=0.7,default=0.9   similarity needed per state
+"""
+import collections
+import os
+import random
+import re
+import time
+import zlib
+
+import metrics
+import response_bank
+
+SIZE_ENV = "COGNITO_PROMPT_CACHE_SIZE"
+TTL_ENV = "COGNITO_PROMPT_CACHE_TTL"
+THRESHOLDS_ENV = "COGNITO_PROMPT_CACHE_THRESHOLDS"
+DEFAULT_SIZE = 512
+DEFAULT_TTL_S = 3600.0
+DEFAULT_THRESHOLD = 0.85
+# States where AURA's replies are short and interchangeable tolerate looser matches
+STATE_THRESHOLDS = {'UNEASY': 0.8, 'HOSTILE': 0.75}
+SHINGLE_SIZE = 3
+BANDS, ROWS = 32, 2 # Prompts at 0.5 similarity share a bucket with probability > 0.999
+NUM_PERM = BANDS * ROWS
+_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+                 for rng in [random.Random(1337)] for _ in range(NUM_PERM)]
+
+# Words that may differ between two prompts with the same reply ("when will" / "when does")
+FUNCTION_WORDS = frozenset("""
+a an the and or but so if then than of in on at to for from with about into by as
+is are was were be been being am do does did will would shall should can could may might must
+i me my you your we us our he him his she her it its they them their this that these those there here
+what whats when where who whom whose which why how please just now tell let lets s
+""".split())
+# Negations, after punctuation became spaces ("don't" -> "don t"); Korean ones are matched in the text
+NEGATIONS = frozenset("""
+no not never nothing none nobody nor without cannot cant dont don doesn didn isn aren wasn weren
+won wouldn shouldn couldn haven hasn hadn
+""".split())
+KOREAN_NEGATIONS = ('않', '못', '없', '지마', '말고')
+_NEGATED = '~' # Key word of a negated prompt
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_HANGUL_SPACE = re.compile(r"(?<=[가-힣])\s+(?=[가-힣])")
+_HANGUL = re.compile(r"[가-힣]")
+
+
+def normalize(prompt):
+    text = response_bank.normalize(_PUNCTUATION.sub(" ", prompt))
+    return _HANGUL_SPACE.sub("", text)
+
+
+def key_words(text):
+    """Words of a normalized prompt that two prompts must share for one's reply to answer the other:
+    English content words (a trailing plural s dropped) and a marker when the prompt is negated.
+    Korean words are not compared (spacing varies), only their negations."""
+    words = set()
+    for word in text.split():
+        if word in NEGATIONS:
+            words.add(_NEGATED)
+        elif word not in FUNCTION_WORDS and not _HANGUL.search(word):
+            words.add(word[:-1] if len(word) > 3 and word.endswith('s') else word)
+    if any(marker in text for marker in KOREAN_NEGATIONS):
+        words.add(_NEGATED)
+    return frozenset(words)
+
+
+def shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(shingle_set):
+    """MinHash signature: per permutation, the smallest hash of any shingle."""
+    hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingle_set]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(x == y for x, y in zip(first, second)) / NUM_PERM
+
+
+def parse_thresholds(value):
+    """'HOSTILE=0.5,default=0.8' -> ({'HOSTILE': 0.5}, 0.8); malformed items are ignored."""
+    thresholds, default = dict(STATE_THRESHOLDS), DEFAULT_THRESHOLD
+    for item in (value or "").split(','):
+        state, _, number = item.partition('=')
+        try:
+            number = float(number)
+        except ValueError:
+            continue
+        if state.strip().lower() == 'default':
+            default = number
+        elif state.strip():
+            thresholds[state.strip().upper()] = number
+    return thresholds, default
+
+
+def _env_number(name, default):
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+class _Entry:
+    __slots__ = ('scope', 'signature', 'words', 'reply', 'stored_at')
+
+    def __init__(self, scope, signature, words, reply, stored_at):
+        self.scope = scope
+        self.signature = signature
+        self.words = words
+        self.reply = reply
+        self.stored_at = stored_at
+
+
+class PromptCache:
+    """Replies by near-duplicate prompt, at most size entries."""
+
+    def __init__(self, frontend, size=None, ttl=None, thresholds=None, clock=time.monotonic):
+        self.frontend = frontend
+        self.size = int(_env_number(SIZE_ENV, DEFAULT_SIZE)) if size is None else size
+        self.ttl = _env_number(TTL_ENV, DEFAULT_TTL_S) if ttl is None else ttl
+        self.thresholds, self.default_threshold = (parse_thresholds(os.environ.get(THRESHOLDS_ENV))
+                                                   if thresholds is None else thresholds)
+        self.clock = clock
+        self._entries = collections.OrderedDict() # (scope, normalized prompt) -> _Entry, least recently used first
+        self._buckets = {} # (scope, band, hashes) -> set of entry keys
+        self.counts = dict.fromkeys(('hit', 'miss', 'evicted', 'expired'), 0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def threshold(self, state):
+        return self.thresholds.get(state, self.default_threshold)
+
+    def hit_rate(self):
+        lookups = self.counts['hit'] + self.counts['miss']
+        return self.counts['hit'] / lookups if lookups else 0.0
+
+    @staticmethod
+    def _bands(scope, sig):
+        return [(scope, band, sig[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+    def _count(self, event):
+        self.counts[event] += 1
+        metrics.PROMPT_CACHE.labels(self.frontend, event).inc()
+
+    def get(self, state, language, system_prompt, prompt):
+        """The reply stored for a similar enough prompt, or None."""
+        if not self.size:
+            return None
+        text = normalize(prompt)
+        if not text:
+            return None
+        scope = (state, language, zlib.crc32(system_prompt.encode('utf-8')))
+        sig = signature(shingles(text))
+        words = key_words(text)
+        candidates = set()
+        for bucket in self._bands(scope, sig):
+            candidates.update(self._buckets.get(bucket, ()))
+        now = self.clock()
+        best, best_score = None, self.threshold(state)
+        for key in candidates:
+            entry = self._entries[key]
+            if now - entry.stored_at > self.ttl:
+                self._remove(key)
+                self._count('expired')
+                continue
+            if entry.words != words:
+                continue # Another subject, or the opposite question
+            score = similarity(sig, entry.signature)
+            if score >= best_score:
+                best, best_score = key, score
+        if best is None:
+            self._count('miss')
+            return None
+        self._entries.move_to_end(best)
+        self._count('hit')
+        return self._entries[best].reply
+
+    def put(self, state, language, system_prompt, prompt, reply):
+        """Stores a reply; the least recently used entries go past size."""
+        if not self.size:
+            return
+        text = normalize(prompt)
+        if not text:
+            return
+        scope = (state, language, zlib.crc32(system_prompt.encode('utf-8')))
+        key = (scope, text)
+        if key in self._entries:
+            self._remove(key)
+        entry = _Entry(scope, signature(shingles(text)), key_words(text), reply, self.clock())
+        self._entries[key] = entry
+        for bucket in self._bands(scope, entry.signature):
+            self._buckets.setdefault(bucket, set()).add(key)
+        while len(self._entries) > self.size:
+            self._remove(next(iter(self._entries)))
+            self._count('evicted')
+        metrics.PROMPT_CACHE_ENTRIES.labels(self.frontend).set(len(self._entries))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        for bucket in self._bands(entry.scope, entry.signature):
+            keys = self._buckets[bucket]
+            keys.discard(key)
+            if not keys:
+                del self._buckets[bucket]
+        metrics.PROMPT_CACHE_ENTRIES.labels(self.frontend).set(len(self._entries))
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""Client-side rate limiting of LLM requests: a token bucket with a priority queue in front.
+
+Stations sharing one API key get 429s when their requests arrive in bursts. Every LLM request
+first takes a token from a bucket refilled at COGNITO_LLM_RATE requests per second. Requests
+that find the bucket empty wait in a queue, served in priority order:
+
+    internal     the reply to an internal trigger (internet / MCP access granted)
+    first_turn   the first turn of a session
+    normal       everything else
+    chatter      turns in the HOSTILE state
+
+Within a priority, sessions take turns (one request each, round robin), so one busy session
+cannot starve the others. Each request has a deadline (COGNITO_LLM_QUEUE_DEADLINE for normal
+requests, scaled by DEADLINE_FACTORS for the others); a request still queued at its deadline
+is shed and the frontend answers LLM_BUSY instead of waiting. The Qt frontend sends from its
+GUI thread and cannot wait: its requests are shed at once when the bucket is empty, except
+that internal and first-turn requests may borrow a token (BORROW_TOKENS), leaving the bucket in
+debt, so they go ahead of chatter there too. An upstream 429 empties the bucket so the next
+requests back off.
+
+    COGNITO_LLM_RATE=0.5              requests per second (unset or 0: unlimited)
+    COGNITO_LLM_BURST=3               bucket size (default: the rate, at least 1)
+    COGNITO_LLM_QUEUE_DEADLINE=10     seconds a normal request may wait
+
+The limit is per process: stations in separate processes should each get their share of the
+key's quota.
+"""
+import asyncio
+import collections
+import os
+import time
+
+import metrics
+
+RATE_ENV = "COGNITO_LLM_RATE"
+BURST_ENV = "COGNITO_LLM_BURST"
+DEADLINE_ENV = "COGNITO_LLM_QUEUE_DEADLINE"
+DEFAULT_DEADLINE_S = 10.0
+
+INTERNAL, FIRST_TURN, NORMAL, CHATTER = range(4)
+PRIORITY_NAMES = ('internal', 'first_turn', 'normal', 'chatter')
+DEADLINE_FACTORS = (2.0, 1.5, 1.0, 0.5)
+CHATTER_STATES = ("HOSTILE",)
+BORROW_TOKENS = (1.0, 1.0, 0.0, 0.0) # Debt try_acquire may run the bucket into, per priority
+
+
+def priority_for(state, internal=False, first_turn=False):
+    if internal:
+        return INTERNAL
+    if first_turn:
+        return FIRST_TURN
+    return CHATTER if state in CHATTER_STATES else NORMAL
+
+
+def _env_float(name, default):
+    try:
+        value = float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+class TokenBucket:
+    """rate tokens per second, at most burst stored. A rate of 0 never runs out."""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self):
+        """Seconds until a token is available (0.0: now)."""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self, borrow=0.0):
+        """Takes a token; borrow lets the balance go that far below zero."""
+        if not self.rate:
+            return True
+        self._refill()
+        if self._tokens - 1 < -borrow:
+            return False
+        self._tokens -= 1
+        return True
+
+    def throttled(self):
+        """Upstream answered 429: start refilling from empty."""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+
+
+class _Waiter:
+    __slots__ = ('future', 'priority', 'queued_at', 'deadline')
+
+    def __init__(self, future, priority, queued_at, deadline):
+        self.future = future
+        self.priority = priority
+        self.queued_at = queued_at
+        self.deadline = deadline
+
+
+class RequestQueue:
+    """Priority queue in front of a token bucket, for asyncio callers (pygame)."""
+
+    def __init__(self, frontend, bucket, deadline=DEFAULT_DEADLINE_S):
+        self.frontend = frontend
+        self.bucket = bucket
+        self.deadline = deadline
+        self.clock = bucket.clock
+        self._queues = [collections.OrderedDict() for _ in PRIORITY_NAMES] # session -> deque of _Waiter
+        self._depth = [0] * len(PRIORITY_NAMES)
+        self._timer = None
+        self.counts = dict.fromkeys(('granted', 'queued', 'shed'), 0)
+
+    def depth(self, priority=None):
+        return sum(self._depth) if priority is None else self._depth[priority]
+
+    async def acquire(self, session, priority):
+        """Waits for a token. True to send the request, False if it was shed at its deadline."""
+        now = self.clock()
+        if not self.depth() and self.bucket.take():
+            self._granted(priority, 0.0)
+            return True
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority, now,
+                         now + self.deadline * DEADLINE_FACTORS[priority])
+        self._queues[priority].setdefault(session, collections.deque()).append(waiter)
+        self._set_depth(priority, 1)
+        self.counts['queued'] += 1
+        self._dispatch()
+        return await waiter.future
+
+    def _set_depth(self, priority, change):
+        self._depth[priority] += change
+        metrics.LLM_QUEUE_DEPTH.labels(self.frontend, PRIORITY_NAMES[priority]).set(self._depth[priority])
+
+    def _granted(self, priority, waited):
+        self.counts['granted'] += 1
+        metrics.LLM_QUEUE_WAIT_SECONDS.labels(self.frontend, PRIORITY_NAMES[priority]).observe(waited)
+
+    def _remove_done(self, now):
+        """Drops cancelled waiters and sheds those past their deadline. Returns the earliest deadline left."""
+        earliest = None
+        for priority, sessions in enumerate(self._queues):
+            for session in list(sessions):
+                kept = collections.deque()
+                for waiter in sessions[session]:
+                    if waiter.future.done():
+                        self._set_depth(priority, -1)
+                    elif waiter.deadline <= now:
+                        self._set_depth(priority, -1)
+                        self.counts['shed'] += 1
+                        metrics.LLM_QUEUE_SHED.labels(self.frontend, PRIORITY_NAMES[priority]).inc()
+                        waiter.future.set_result(False)
+                    else:
+                        kept.append(waiter)
+                        earliest = waiter.deadline if earliest is None else min(earliest, waiter.deadline)
+                if kept:
+                    sessions[session] = kept
+                else:
+                    del sessions[session]
+        return earliest
+
+    def _next_waiter(self):
+        """Head of the next session in line at the highest priority with waiters."""
+        for priority, sessions in enumerate(self._queues):
+            if sessions:
+                session, waiters = next(iter(sessions.items()))
+                waiter = waiters.popleft()
+                if waiters:
+                    sessions.move_to_end(session) # Round robin between sessions
+                else:
+                    del sessions[session]
+                self._set_depth(priority, -1)
+                return waiter
+        return None
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = self.clock()
+        earliest = self._remove_done(now)
+        while self.depth():
+            wait = self.bucket.wait_time()
+            if wait > 0:
+                delay = min(wait, max(0.0, earliest - now)) if earliest is not None else wait
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            waiter = self._next_waiter()
+            self.bucket.take()
+            self._granted(waiter.priority, now - waiter.queued_at)
+            waiter.future.set_result(True)
+
+    def throttled(self):
+        self.bucket.throttled()
+
+
+_shared = {}
+
+
+def configure(frontend, rate=None, burst=None, deadline=None):
+    """Replaces the process-wide queue of a frontend (None: from the environment)."""
+    rate = _env_float(RATE_ENV, 0.0) if rate is None else rate
+    burst = _env_float(BURST_ENV, 0.0) if burst is None else burst
+    deadline = _env_float(DEADLINE_ENV, DEFAULT_DEADLINE_S) if deadline is None else deadline
+    _shared[frontend] = RequestQueue(frontend, TokenBucket(rate, burst or None), deadline)
+    return _shared[frontend]
+
+
+def shared(frontend):
+    """The queue every station of this process sends its requests through."""
+    return _shared.get(frontend) or configure(frontend)
+
+
+def try_acquire(queue, priority):
+    """Synchronous callers (the Qt frontend, one session, on the GUI thread): takes a token if one
+    is available now (internal and first-turn requests may borrow one). True to send the request,
+    False if it is shed; never waits, so the window keeps repainting and taking input."""
+    if not queue.bucket.take(BORROW_TOKENS[priority]):
+        queue.counts['shed'] += 1
+        metrics.LLM_QUEUE_SHED.labels(queue.frontend, PRIORITY_NAMES[priority]).inc()
+        return False
+    queue._granted(priority, 0.0)
+    return True
+
+
+def is_quota_error(error):
+    """True for an SDK exception reporting that the key is over its quota (HTTP 429, ResourceExhausted)."""
+    return (getattr(error, 'code', None) == 429 or type(error).__name__ == 'ResourceExhausted'
+            or '429' in str(error))
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Pre-generated LLM replies shipped with an install (response_bank.json, written by warm_cache.py).
+
+Replies are stored per system prompt (its catalog key, e.g. SYS_PROMPT_HOSTILE), language and
+normalized user prompt, a few variants each. Before a request, both frontends look the turn up
+here. A hit answers at once, without a request, and works offline too, so a fresh kiosk install
+starts with a warm cache for the predictable turns. Prompts are normalized (case, whitespace,
+trailing punctuation) before the lookup.
+
+    {"version": 1, "model": "gemini-1.5-flash", "generated": "2026-10-19T12:00:00",
+     "entries": {"SYS_PROMPT_HOSTILE": {"en": {"who are you": ["reply", "other reply"]}}}}
+
+    COGNITO_RESPONSE_BANK=/path/bank.json   another bank ('' disables the lookup)
+"""
+import json
+import os
+import random
+import re
+
+import cognito_log
+
+try:
+    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+except NameError: # __file__ is not defined in interactive interpreters
+    SCRIPT_DIR = os.getcwd()
+
+BANK_ENV = "COGNITO_RESPONSE_BANK"
+BANK_FILENAME = "response_bank.json"
+BANK_VERSION = 1
+
+log = cognito_log.get_logger('llm')
+
+_SPACES = re.compile(r"\s+")
+_TRAILING = " \t\n?!.,~…"
+
+
+def normalize(prompt):
+    return _SPACES.sub(" ", prompt.strip().lower()).rstrip(_TRAILING)
+
+
+def bank_path():
+    path = os.environ.get(BANK_ENV)
+    return os.path.join(SCRIPT_DIR, BANK_FILENAME) if path is None else path
+
+
+class ResponseBank:
+    """Replies by (system prompt key, language, normalized prompt)."""
+
+    def __init__(self, entries=None, meta=None):
+        self.entries = entries or {}
+        self.meta = meta or {}
+
+    @classmethod
+    def load(cls, path=None):
+        """The bank at path (default: bank_path()); empty if it is missing or unreadable."""
+        path = bank_path() if path is None else path
+        if not path:
+            return cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        if not isinstance(data, dict) or data.get('version') != BANK_VERSION:
+            log.warning("Ignoring response bank %s (unknown format)", path)
+            return cls()
+        entries = data.pop('entries', {})
+        return cls(entries, data)
+
+    def __len__(self):
+        return sum(len(prompts) for languages in self.entries.values() for prompts in languages.values())
+
+    def replies(self, key, language, prompt):
+        return self.entries.get(key, {}).get(language, {}).get(normalize(prompt), [])
+
+    def lookup(self, key, language, prompt, rng=random):
+        """One of the stored replies, or None."""
+        replies = self.replies(key, language, prompt)
+        return rng.choice(replies) if replies else None
+
+    def add(self, key, language, prompt, reply):
+        self.entries.setdefault(key, {}).setdefault(language, {}).setdefault(normalize(prompt), []).append(reply)
+
+    def save(self, path, **meta):
+        self.meta.update(meta)
+        data = dict(self.meta, version=BANK_VERSION, entries=self.entries)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""Built-in statistical profiler for both frontends.
+
+A daemon thread samples the stacks of all other threads (sys._current_frames) at a fixed rate,
+so the profiled code runs unmodified and the overhead stays small. Each sample is tagged with
+the game state at that moment. Stopping the profiler writes, to PROFILE_DIR:
+  profile-<frontend>-<time>.collapsed         "state;thread;frame;frame count" lines
+                                              (flamegraph.pl, speedscope, inferno)
+  profile-<frontend>-<time>.speedscope.json   one profile per game state and thread
+                                              (https://www.speedscope.app)
+
+Start/stop with F9 in either frontend, or profile a whole session:
+    COGNITO_PROFILE=1          start at launch, write the profile at exit
+    COGNITO_PROFILE_HZ=100     sampling rate (default 100)
+    COGNITO_PROFILE_DIR=dir    output directory (default ./profiles)
+The browser build has no threads and cannot be profiled this way.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+PROFILE_ENV = "COGNITO_PROFILE"
+RATE_ENV = "COGNITO_PROFILE_HZ"
+DIR_ENV = "COGNITO_PROFILE_DIR"
+DEFAULT_RATE_HZ = 100
+PROFILE_DIR = "profiles"
+MAX_DEPTH = 128
+
+
+class SamplingProfiler:
+    def __init__(self, frontend, state_getter=None, rate_hz=DEFAULT_RATE_HZ, output_dir=PROFILE_DIR):
+        self.frontend = frontend
+        self.state_getter = state_getter
+        self.interval = 1.0 / rate_hz
+        self.output_dir = output_dir
+        self.counts = {} # (state, thread name, stack of frame keys, root first) -> samples
+        self.sample_count = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._frame_keys = {} # code object -> (name, file, line)
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def _state(self):
+        try:
+            return str(self.state_getter()) if self.state_getter else "-"
+        except Exception:
+            return "-"
+
+    def _frame_key(self, code):
+        key = self._frame_keys.get(code)
+        if key is None:
+            key = self._frame_keys[code] = (code.co_name, code.co_filename, code.co_firstlineno)
+        return key
+
+    def sample(self, skip_ident=None):
+        """Records the current stack of every thread but skip_ident."""
+        state = self._state()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip_ident:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(self._frame_key(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            key = (state, names.get(ident, f"thread-{ident}"), tuple(stack))
+            self.counts[key] = self.counts.get(key, 0) + 1
+        self.sample_count += 1
+
+    def _run(self):
+        ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(skip_ident=ident)
+
+    def start(self):
+        self._stop.clear()
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        print(f"Profiler: sampling all threads at {1 / self.interval:.0f} Hz")
+
+    def stop(self):
+        """Stops sampling and writes the profile files. Returns their paths."""
+        if not self.running:
+            return []
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.duration = time.perf_counter() - self.started_at
+        try:
+            return self.write()
+        except OSError as e:
+            print(f"Warning: Could not write profile: {e}")
+            return []
+
+    def collapsed(self):
+        """Folded stacks, one "state;thread;frame;...;frame count" line per unique stack."""
+        lines = []
+        for (state, thread, stack), count in sorted(self.counts.items()):
+            frames = [f"state={state}", thread] + [f"{name} ({os.path.basename(path)}:{line})" for name, path, line in stack]
+            lines.append(f"{';'.join(frame.replace(';', ':') for frame in frames)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self):
+        """speedscope file: one sampled profile per (game state, thread), weights in seconds."""
+        frames, frame_index, profiles = [], {}, {}
+        for (state, thread, stack), count in sorted(self.counts.items()):
+            indices = []
+            for key in stack:
+                if key not in frame_index:
+                    frame_index[key] = len(frames)
+                    name, path, line = key
+                    frames.append({"name": name, "file": path, "line": line})
+                indices.append(frame_index[key])
+            profile = profiles.setdefault((state, thread), {
+                "type": "sampled", "name": f"{thread} [{state}]", "unit": "seconds",
+                "startValue": 0, "endValue": 0, "samples": [], "weights": []})
+            profile["samples"].append(indices)
+            profile["weights"].append(count * self.interval)
+            profile["endValue"] += count * self.interval
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"cognito {self.frontend}",
+            "exporter": "cognito sampling_profiler",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        }
+
+    def write(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"profile-{self.frontend}-{time.strftime('%Y%m%d-%H%M%S')}")
+        paths = [f"{base}.collapsed", f"{base}.speedscope.json"]
+        with open(paths[0], 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
+        with open(paths[1], 'w', encoding='utf-8') as f:
+            json.dump(self.speedscope(), f)
+        print(f"Profiler: {self.sample_count} samples over {self.duration:.1f} s written to {paths[0]} and {paths[1]}")
+        return paths
+
+
+_active = None
+
+
+def _new_profiler(frontend, state_getter):
+    try:
+        rate_hz = float(os.environ.get(RATE_ENV) or DEFAULT_RATE_HZ)
+    except ValueError:
+        rate_hz = DEFAULT_RATE_HZ
+    if rate_hz <= 0:
+        rate_hz = DEFAULT_RATE_HZ
+    return SamplingProfiler(frontend, state_getter, rate_hz, os.environ.get(DIR_ENV) or PROFILE_DIR)
+
+
+def toggle(frontend, state_getter=None):
+    """Starts the profiler, or stops it and writes the profile (hotkey handler).
+    Returns the written paths (none when starting)."""
+    global _active
+    if _active is not None:
+        profiler, _active = _active, None
+        return profiler.stop()
+    try:
+        profiler = _new_profiler(frontend, state_getter)
+        profiler.start()
+    except (RuntimeError, OSError) as e: # RuntimeError: no threads (browser build)
+        print(f"Warning: Could not start profiler: {e}")
+        return []
+    _active = profiler
+    return []
+
+
+def start_from_env(frontend, state_getter=None):
+    """Profiles the whole session if COGNITO_PROFILE is set; the profile is written at exit."""
+    if not os.environ.get(PROFILE_ENV) or _active is not None:
+        return
+    toggle(frontend, state_getter)
+    atexit.register(_stop_active)
+
+
+def _stop_active():
+    global _active
+    if _active is not None:
+        profiler, _active = _active, None
+        profiler.stop()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Coalescing of identical in-flight LLM requests (asyncio).
+
+A send button press and the text entry's UI_TEXT_ENTRY_FINISHED can both submit the same
+prompt before either turn has cleared the input line, and retries can overlap the request they
+repeat. Callers asking for the same key while a call is in flight share that call: it runs once,
+as its own task, and every caller gets its result (or its exception).
+
+Callers hold references to the shared call. A caller that is cancelled drops its reference
+without cancelling the call for the others; when the last reference is dropped, the call itself
+is cancelled, since nobody is waiting for it any more. Callers served by another's call are
+counted in cognito_llm_coalesced_total (event "shared": requests saved), and calls cancelled
+because every caller left as "abandoned".
+"""
+import asyncio
+
+import metrics
+
+
+class _Call:
+    __slots__ = ('task', 'refs')
+
+    def __init__(self, task):
+        self.task = task
+        self.refs = 0
+
+
+class Group:
+    """In-flight calls by key. One group per session: its calls share one API key and token ledger."""
+
+    def __init__(self, frontend):
+        self.frontend = frontend
+        self._calls = {}
+        self.counts = dict.fromkeys(('calls', 'shared', 'abandoned'), 0)
+
+    def in_flight(self):
+        return len(self._calls)
+
+    async def run(self, key, factory):
+        """(result of factory(), shared). factory is called only if no call for key is in flight;
+        shared is True when the result came from another caller's call."""
+        call = self._calls.get(key)
+        shared = call is not None
+        if shared:
+            self.counts['shared'] += 1
+            metrics.LLM_COALESCED.labels(self.frontend, 'shared').inc()
+        else:
+            call = self._calls[key] = _Call(asyncio.ensure_future(factory()))
+            self.counts['calls'] += 1
+            call.task.add_done_callback(lambda _, key=key, call=call: self._forget(key, call))
+        call.refs += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        finally:
+            call.refs -= 1
+            if not call.refs and not call.task.done(): # Every caller was cancelled
+                self.counts['abandoned'] += 1
+                metrics.LLM_COALESCED.labels(self.frontend, 'abandoned').inc()
+                call.task.cancel()
+
+    def _forget(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
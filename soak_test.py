@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""Long-session memory soak test for both frontends.
+
+Drives thousands of turns headlessly (offscreen Qt / SDL dummy driver), interleaved with
+scares (blank screen, BSOD) and dev-mode toggles. Timers and sleeps run --time-scale times
+their real duration, so a scare takes milliseconds. The Qt frontend answers from a canned
+model; the pygame frontend sends every request through its real aiohttp path to a local
+stand-in endpoint (llm_standin.py), so per-request sessions are part of the soak.
+
+After --warmup turns a tracemalloc snapshot is taken, then RSS and the traced Python heap are
+sampled every --sample-every turns. The report gives the growth per turn of both (least squares
+slope over the samples) and the allocation sites that grew most since the warmup, each with the
+innermost frame of this repository that led there. The run fails (exit status 1) when either
+grows by more than --budget-kb per turn.
+
+Usage:
+    python soak_test.py --frontend pygame --turns 5000
+    python soak_test.py --frontend qt --budget-kb 1.5 --output bench_results/soak-qt.json
+"""
+import argparse
+import asyncio
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from bench_startup import git_revision
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FRONTENDS = ('qt', 'pygame')
+DEFAULT_TURNS = 2000
+DEFAULT_WARMUP = 100 # Turns before the baseline: caches, fonts and lazy imports settle first
+DEFAULT_SAMPLE_EVERY = 100
+DEFAULT_SCARE_EVERY = 50
+DEFAULT_DEV_EVERY = 75
+DEFAULT_BUDGET_KB = 2.0 # Growth per turn, RSS and Python heap each
+DEFAULT_TIME_SCALE = 0.01
+TRACE_FRAMES = 16 # Frames kept per allocation, enough to reach the app code from library internals
+TOP_SITES = 15
+WAIT_TIMEOUT = 10.0 # Seconds a scaled scare may take before the soak gives up on it
+
+SOAK_PROMPTS = [
+    "hello, who are you?",
+    "what is the latest data on the solar flare?",
+    "please calculate the grid propagation model",
+    "I think something is wrong with you.",
+    "tell me about the interconnect nodes",
+    "태양 플레어 최신 데이터 알려줘",
+]
+# States a regular turn is sent in, in rotation (flags are set so that no scripted scare fires)
+TURN_STATES = ["NORMAL_NO_PERMISSIONS", "NORMAL_INTERNET_ONLY", "UNEASY", "HOSTILE", "POST_DEBUG"]
+_OWN_FILES = {os.path.abspath(__file__), os.path.join(SCRIPT_DIR, "bench_suite.py")}
+
+
+def read_rss_kb():
+    """Current resident set size in KiB (peak RSS where /proc is not available)."""
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def slope(points):
+    """Least squares slope of (x, y) points; 0.0 for fewer than two distinct x."""
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def _app_frame(traceback):
+    """Innermost frame of a traceback in this repository's code (outside the soak harness)."""
+    for frame in reversed(traceback):
+        path = os.path.abspath(frame.filename)
+        if os.path.dirname(path) == SCRIPT_DIR and path not in _OWN_FILES:
+            return f"{os.path.basename(path)}:{frame.lineno}"
+    return None
+
+
+def top_growth(before, after, limit=TOP_SITES):
+    """Allocation sites that grew most between two snapshots, as dicts with the innermost frame
+    (site), the app frame that led there (via), and size/count growth."""
+    sites = {}
+    for stat in after.compare_to(before, 'traceback'):
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[-1] if stat.traceback else None
+        site = f"{frame.filename}:{frame.lineno}" if frame else "?"
+        key = (site, _app_frame(stat.traceback))
+        entry = sites.setdefault(key, [0, 0])
+        entry[0] += stat.size_diff
+        entry[1] += stat.count_diff
+    ranked = sorted(sites.items(), key=lambda item: -item[1][0])[:limit]
+    return [{'site': site, 'via': via, 'size_kb': round(size / 1024, 1), 'count': count}
+            for (site, via), (size, count) in ranked]
+
+
+class MemoryTracker:
+    def __init__(self, frames=TRACE_FRAMES):
+        self.frames = frames
+        self.samples = [] # (turn, rss KiB, traced Python heap KiB)
+        self._baseline = None
+
+    def start(self):
+        tracemalloc.start(self.frames)
+
+    def sample(self, turn):
+        gc.collect()
+        traced_kb = tracemalloc.get_traced_memory()[0] / 1024
+        self.samples.append((turn, read_rss_kb(), traced_kb))
+        if self._baseline is None:
+            self._baseline = tracemalloc.take_snapshot()
+
+    def finish(self, top=TOP_SITES):
+        """Stops tracing. Returns (RSS KiB/turn, heap KiB/turn, top growth sites)."""
+        gc.collect()
+        end = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        rss_per_turn = slope([(turn, rss) for turn, rss, _ in self.samples])
+        heap_per_turn = slope([(turn, heap) for turn, _, heap in self.samples])
+        sites = top_growth(self._baseline, end, top) if self._baseline else []
+        return rss_per_turn, heap_per_turn, sites
+
+
+def scaled_timer(scale):
+    """QTimer.singleShot replacement running timers scale times their interval."""
+    from PySide6 import QtCore
+    original = QtCore.QTimer.singleShot
+    def single_shot(msec, *args):
+        return original(max(0, int(msec * scale)), *args)
+    return original, single_shot
+
+
+class QtDriver:
+    """Offscreen CognitoWindow answering from a canned model."""
+
+    frontend = 'qt'
+
+    def __init__(self, time_scale):
+        self.time_scale = time_scale
+        self._restore = None
+
+    async def setup(self):
+        import bench_suite
+        fixtures = bench_suite.Fixtures()
+        self.window = fixtures.qt_window() # Raises bench_suite.Skip without PySide6
+        self.app = fixtures._qt_app
+        from PySide6 import QtCore
+        original, QtCore.QTimer.singleShot = scaled_timer(self.time_scale)
+        self._restore = lambda: setattr(QtCore.QTimer, 'singleShot', original)
+        self._pump_until(lambda: True)
+
+    def _pump_until(self, done, timeout=WAIT_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        while True:
+            self.app.processEvents()
+            if done() or time.monotonic() > deadline:
+                return
+            time.sleep(0.001)
+
+    async def turn(self, i):
+        window = self.window
+        window.game_state = TURN_STATES[i % len(TURN_STATES)]
+        window.mission_received = True
+        window.internet_enabled = window.mcp_enabled = i % 2 == 1
+        window.post_mcp_prompt_count = 5 # Past the scripted Format C alert (a modal dialog)
+        window.pending_prompt = None
+        window.input_line.setText(SOAK_PROMPTS[i % len(SOAK_PROMPTS)])
+        window.send_prompt()
+        self._pump_until(lambda: True)
+
+    async def scare(self, i):
+        window = self.window
+        if i % 2:
+            window.blank_screen_scare()
+            self._pump_until(lambda: not window._blank_overlay.isVisible())
+        else:
+            window.simulate_bsod()
+            self._pump_until(lambda: window.game_state == "HOSTILE")
+
+    async def dev_toggle(self, i):
+        self.window.game_state = "HOSTILE"
+        self.window.toggle_dev_mode()
+        self._pump_until(lambda: True)
+        self.window.toggle_dev_mode()
+        self._pump_until(lambda: True)
+
+    async def close(self):
+        if self._restore:
+            self._restore()
+
+
+class PygameDriver:
+    """pygame Game on the SDL dummy driver, requesting replies from a local stand-in."""
+
+    frontend = 'pygame'
+
+    def __init__(self, time_scale):
+        self.time_scale = time_scale
+        self.standin = None
+        self._original_sleep = asyncio.sleep
+
+    async def setup(self):
+        import bench_suite
+        import llm_standin
+        self.pygame, self.main, self.game, self.manager, self.surface = bench_suite.Fixtures().pygame_game()
+        if self.main.aiohttp is None:
+            print("Warning: aiohttp not installed; requests end at the missing-library message.")
+        self.standin = llm_standin.StandIn()
+        self.main.GEMINI_API_ROOT = self.standin.start()
+        self.game.api_key = "soak-test"
+        original_sleep = self._original_sleep
+        async def scaled_sleep(delay, *args, **kwargs):
+            return await original_sleep(delay * self.time_scale, *args, **kwargs)
+        asyncio.sleep = scaled_sleep
+
+    def _frame(self):
+        self.manager.update(1 / 60)
+        self.surface.fill(self.main.COLOR_BACKGROUND_DARK)
+        self.manager.draw_ui(self.surface)
+        self.game.frame_presented()
+
+    async def turn(self, i):
+        game = self.game
+        game.state = TURN_STATES[i % len(TURN_STATES)]
+        game.mission_received = True
+        game.internet_enabled = game.mcp_enabled = i % 2 == 1
+        game.post_mcp_prompt_count = 5
+        game.pending_prompt = None
+        await game.process_input(SOAK_PROMPTS[i % len(SOAK_PROMPTS)])
+        self._frame()
+
+    async def scare(self, i):
+        game = self.game
+        if i % 2:
+            # The first prompt after MCP was granted triggers the blank screen
+            game.state = "NORMAL_ALL_PERMISSIONS"
+            game.post_mcp_prompt_count = 0
+            await game.process_input(SOAK_PROMPTS[0])
+        else:
+            # Format C confirmed
+            game.sounds.play('bsod')
+            game.overlay_mode = "BSOD"
+            game.state = "BSOD_ACTIVE"
+            await game.hide_bsod_async()
+        self._frame()
+
+    async def dev_toggle(self, i):
+        self.game.state = "HOSTILE"
+        self.game.toggle_dev_mode()
+        self._frame()
+        self.game.toggle_dev_mode()
+        self._frame()
+
+    async def close(self):
+        asyncio.sleep = self._original_sleep
+        if self.standin:
+            self.standin.stop()
+
+
+async def run_soak(driver, turns=DEFAULT_TURNS, warmup=DEFAULT_WARMUP, sample_every=DEFAULT_SAMPLE_EVERY,
+                   scare_every=DEFAULT_SCARE_EVERY, dev_every=DEFAULT_DEV_EVERY, top=TOP_SITES):
+    """Runs warmup + turns turns. Returns (samples, RSS KiB/turn, heap KiB/turn, top sites, counts)."""
+    tracker = MemoryTracker()
+    counts = {'turns': 0, 'scares': 0, 'dev_toggles': 0}
+    await driver.setup()
+    started = time.perf_counter()
+    try:
+        for i in range(warmup + turns):
+            if i == warmup:
+                tracker.start()
+            if i >= warmup and (i - warmup) % sample_every == 0:
+                tracker.sample(i - warmup)
+            await driver.turn(i)
+            counts['turns'] += 1
+            if scare_every and i % scare_every == scare_every - 1:
+                await driver.scare(i // scare_every)
+                counts['scares'] += 1
+            if dev_every and i % dev_every == dev_every - 1:
+                await driver.dev_toggle(i // dev_every)
+                counts['dev_toggles'] += 1
+            if (i + 1) % 500 == 0:
+                print(f"Soak: {i + 1}/{warmup + turns} turns, RSS {read_rss_kb() / 1024:.1f} MiB")
+        tracker.sample(turns)
+        counts['seconds'] = round(time.perf_counter() - started, 1)
+        return (tracker.samples,) + tracker.finish(top) + (counts,)
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        await driver.close()
+
+
+def build_report(frontend, samples, rss_per_turn, heap_per_turn, sites, counts, budget_kb):
+    over = [name for name, value in (('rss', rss_per_turn), ('python_heap', heap_per_turn)) if value > budget_kb]
+    return {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'frontend': frontend,
+        },
+        'counts': counts,
+        'budget_kb_per_turn': budget_kb,
+        'rss_kb_per_turn': round(rss_per_turn, 3),
+        'python_heap_kb_per_turn': round(heap_per_turn, 3),
+        'over_budget': over,
+        'samples': [{'turn': turn, 'rss_kb': rss, 'python_heap_kb': round(heap, 1)} for turn, rss, heap in samples],
+        'top_growth': sites,
+    }
+
+
+def print_report(report):
+    print(f"== Soak {report['meta']['frontend']}: {report['counts']['turns']} turns, {report['counts']['scares']} scares,"
+          f" {report['counts']['dev_toggles']} dev toggles in {report['counts']['seconds']} s ==")
+    print(f"  RSS          {report['rss_kb_per_turn']:8.2f} KiB/turn")
+    print(f"  Python heap  {report['python_heap_kb_per_turn']:8.2f} KiB/turn  (budget {report['budget_kb_per_turn']} KiB/turn)")
+    print("  Top growth since warmup:")
+    for site in report['top_growth']:
+        via = f"  via {site['via']}" if site['via'] and not site['site'].endswith(site['via']) else ""
+        print(f"    {site['size_kb']:9.1f} KiB {site['count']:+7d}  {site['site']}{via}")
+    if report['over_budget']:
+        print(f"  OVER BUDGET: {', '.join(report['over_budget'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Long-session memory soak test for the Cognito frontends.")
+    parser.add_argument('--frontend', choices=FRONTENDS, default='pygame')
+    parser.add_argument('--turns', type=int, default=DEFAULT_TURNS)
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP)
+    parser.add_argument('--sample-every', type=int, default=DEFAULT_SAMPLE_EVERY)
+    parser.add_argument('--scare-every', type=int, default=DEFAULT_SCARE_EVERY, help="Turns between scares (0: none)")
+    parser.add_argument('--dev-every', type=int, default=DEFAULT_DEV_EVERY, help="Turns between dev-mode toggles (0: none)")
+    parser.add_argument('--budget-kb', type=float, default=DEFAULT_BUDGET_KB, help="Allowed growth per turn (KiB)")
+    parser.add_argument('--time-scale', type=float, default=DEFAULT_TIME_SCALE, help="Factor applied to timers and sleeps")
+    parser.add_argument('--top', type=int, default=TOP_SITES)
+    parser.add_argument('--output', help="Report file (default: bench_results/soak-<frontend>-<revision>.json)")
+    args = parser.parse_args(argv)
+
+    import bench_suite
+    driver = (QtDriver if args.frontend == 'qt' else PygameDriver)(args.time_scale)
+    try:
+        result = asyncio.run(run_soak(driver, args.turns, args.warmup, max(1, args.sample_every),
+                                      args.scare_every, args.dev_every, args.top))
+    except bench_suite.Skip as e:
+        print(f"Soak: cannot run the {args.frontend} frontend here: {e}")
+        return 2
+    report = build_report(args.frontend, *result, budget_kb=args.budget_kb)
+    print_report(report)
+    output = args.output or os.path.join(SCRIPT_DIR, "bench_results",
+                                         f"soak-{args.frontend}-{report['meta']['revision'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {output}")
+    return 1 if report['over_budget'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""Background sound preloading for both frontends.
+
+Sound effects are decoded while the language prompt is on screen, so they are ready long
+before the first scare. Each bank tracks per-effect readiness and load time, and counts
+cues that could not be played instantly:
+  - a cue requested while its effect is still loading is played as soon as it is ready if
+    that happens within LATE_CUE_TOLERANCE_S (counted as late), otherwise it is dropped,
+  - a cue for an effect that failed to load is dropped.
+Dropped cues are counted as missed.
+
+QtSoundBank wraps QSoundEffect (readiness via statusChanged); PygameSoundBank decodes with
+pygame.mixer and keeps the decoded PCM in a disk cache so later startups skip decoding.
+Neither Qt nor pygame is imported at module level. Missed cues are logged to cognito.scare,
+off the GUI thread's stdout.
+"""
+import asyncio
+import hashlib
+import os
+import time
+
+import cognito_log
+import metrics
+
+try:
+    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+except NameError: # __file__ is not defined in interactive interpreters
+    SCRIPT_DIR = os.getcwd()
+
+SOUNDS_DIR = os.path.join(SCRIPT_DIR, "sounds")
+SOUND_FILES = {
+    "power_down": "power_down.wav",
+    "bsod": "bsod_error.wav",
+    "glitch": "glitch.wav",
+}
+PCM_CACHE_DIR = os.path.join(SCRIPT_DIR, ".cache", "sounds")
+LATE_CUE_TOLERANCE_S = 0.25 # A cue played later than this would be out of sync with its visual
+
+log = cognito_log.get_logger('scare')
+
+
+class SoundBank:
+    """Readiness tracking and cue accounting shared by the Qt and pygame banks."""
+
+    def __init__(self, files=SOUND_FILES):
+        self.names = set(files)
+        self.ready = set()
+        self.failed = set()
+        self.load_ms = {}
+        self.cues_played = 0
+        self.cues_late = 0
+        self.cues_missed = 0
+        self._load_started = {}
+        self._pending_cues = {} # name -> time the cue was requested
+        self._created = time.perf_counter()
+
+    def is_ready(self, name):
+        return name in self.ready
+
+    def all_settled(self):
+        """True once every effect has either loaded or failed."""
+        return self.ready | self.failed >= self.names
+
+    def play(self, name):
+        """Plays an effect immediately if it is loaded. Returns True if playback started now."""
+        if name in self.ready:
+            self._play_now(name)
+            self.cues_played += 1
+            metrics.SOUND_CUES.labels('played').inc()
+            return True
+        if name in self.failed or name not in self.names:
+            self.cues_missed += 1
+            metrics.SOUND_CUES.labels('missed').inc()
+            log.warning("Sound cue %s missed: effect not available", name)
+            return False
+        # Still loading: play on readiness if that is soon enough
+        self._pending_cues[name] = time.perf_counter()
+        return False
+
+    def _begin_load(self, name):
+        self._load_started[name] = time.perf_counter()
+
+    def _mark_ready(self, name):
+        if name in self.ready:
+            return
+        now = time.perf_counter()
+        self.ready.add(name)
+        self.load_ms[name] = (now - self._load_started.get(name, self._created)) * 1000
+        metrics.SOUND_LOAD_SECONDS.labels(name).set(self.load_ms[name] / 1000)
+        requested = self._pending_cues.pop(name, None)
+        if requested is not None:
+            if now - requested <= LATE_CUE_TOLERANCE_S:
+                self._play_now(name)
+                self.cues_late += 1
+                metrics.SOUND_CUES.labels('late').inc()
+            else:
+                self.cues_missed += 1
+                metrics.SOUND_CUES.labels('missed').inc()
+                log.warning("Sound cue %s missed: effect became ready %.0f ms late", name, (now - requested) * 1000)
+        self._report_if_settled()
+
+    def _mark_failed(self, name, reason=""):
+        if name in self.failed:
+            return
+        self.failed.add(name)
+        print(f"Warning: Sound '{name}' failed to load. {reason}".rstrip())
+        if self._pending_cues.pop(name, None) is not None:
+            self.cues_missed += 1
+            metrics.SOUND_CUES.labels('missed').inc()
+        self._report_if_settled()
+
+    def _report_if_settled(self):
+        if self.all_settled():
+            loaded = ", ".join(f"{n} {ms:.0f} ms" for n, ms in sorted(self.load_ms.items()))
+            print(f"Sounds ready: {loaded or 'none'}" + (f" (failed: {', '.join(sorted(self.failed))})" if self.failed else ""))
+
+    def stats(self):
+        """Load times and cue counters, for logging and metrics."""
+        return {
+            'load_ms': dict(self.load_ms),
+            'ready': sorted(self.ready),
+            'failed': sorted(self.failed),
+            'cues_played': self.cues_played,
+            'cues_late': self.cues_late,
+            'cues_missed': self.cues_missed,
+        }
+
+    def _play_now(self, name):
+        raise NotImplementedError
+
+
+class QtSoundBank(SoundBank):
+    """QSoundEffect-based bank. QSoundEffect decodes asynchronously; readiness comes from statusChanged.
+
+    Must be created on the GUI thread after the QApplication exists.
+    """
+
+    def __init__(self, parent=None, sounds_dir=SOUNDS_DIR, files=SOUND_FILES):
+        from PySide6 import QtCore
+        from PySide6.QtMultimedia import QSoundEffect
+        super().__init__(files)
+        self._status = QSoundEffect.Status
+        self.effects = {}
+        print(f"Looking for sounds in: {sounds_dir}") # Debug path
+        for name, filename in files.items():
+            path = os.path.join(sounds_dir, filename)
+            url = QtCore.QUrl.fromLocalFile(path)
+            if not url.isValid() or not os.path.exists(path):
+                self._mark_failed(name, f"File not found: {path}")
+                continue
+            effect = QSoundEffect(parent)
+            effect.statusChanged.connect(lambda n=name: self._on_status_changed(n))
+            self.effects[name] = effect
+            self._begin_load(name)
+            effect.setSource(url)
+
+    def _on_status_changed(self, name):
+        status = self.effects[name].status()
+        if status == self._status.Ready:
+            self._mark_ready(name)
+        elif status == self._status.Error:
+            self._mark_failed(name)
+
+    def _play_now(self, name):
+        self.effects[name].play()
+
+
+class PygameSoundBank(SoundBank):
+    """pygame.mixer-based bank. Decoding runs in a worker thread (desktop) or one effect per event
+    loop tick (browser build, which has no threads). Decoded PCM is cached on disk, keyed by the
+    file contents and the mixer format, and loaded with Sound(buffer=...) on later runs.
+    """
+
+    def __init__(self, sounds_dir=SOUNDS_DIR, files=SOUND_FILES, cache_dir=PCM_CACHE_DIR, use_threads=True):
+        super().__init__(files)
+        self.sounds = {}
+        self._paths = {name: self._resolve(os.path.join(sounds_dir, filename)) for name, filename in files.items()}
+        self._cache_dir = cache_dir
+        self._use_threads = use_threads
+
+    @staticmethod
+    def _resolve(path):
+        """Prefers the OGG version of an effect (the web build ships only OGG, see build_web_assets.py)."""
+        ogg_path = os.path.splitext(path)[0] + ".ogg"
+        return ogg_path if os.path.exists(ogg_path) else path
+
+    def _cache_path(self, name, data, mixer_format):
+        digest = hashlib.sha1(data + repr(mixer_format).encode()).hexdigest()[:16]
+        return os.path.join(self._cache_dir, f"{name}-{digest}.pcm")
+
+    def _decode(self, name, path):
+        """Blocking decode of one effect, through the PCM cache when enabled."""
+        import pygame
+        if not self._cache_dir:
+            return pygame.mixer.Sound(path)
+        with open(path, "rb") as f:
+            data = f.read()
+        cache_path = self._cache_path(name, data, pygame.mixer.get_init())
+        if os.path.exists(cache_path):
+            with open(cache_path, "rb") as f:
+                return pygame.mixer.Sound(buffer=f.read())
+        sound = pygame.mixer.Sound(path)
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            with open(cache_path, "wb") as f:
+                f.write(sound.get_raw())
+        except OSError as e:
+            print(f"Warning: Could not write PCM cache {cache_path}: {e}")
+        return sound
+
+    async def preload(self):
+        """Decodes every effect without blocking the event loop."""
+        import pygame
+        loop = asyncio.get_running_loop()
+        for name, path in self._paths.items():
+            if not pygame.mixer.get_init():
+                self._mark_failed(name, "Mixer not initialized.")
+                continue
+            if not os.path.exists(path):
+                self._mark_failed(name, f"File not found: {path}")
+                continue
+            self._begin_load(name)
+            try:
+                if self._use_threads:
+                    sound = await loop.run_in_executor(None, self._decode, name, path)
+                else:
+                    sound = self._decode(name, path)
+                    await asyncio.sleep(0) # Let a frame render between effects
+            except Exception as e:
+                self._mark_failed(name, str(e))
+                continue
+            self.sounds[name] = sound
+            self._mark_ready(name)
+
+    def _play_now(self, name):
+        self.sounds[name].play()
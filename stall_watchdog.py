@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""Detects freezes of the Qt event loop and the pygame asyncio loop.
+
+The watched loop calls Watchdog.beat() from a heartbeat (a QTimer, or an asyncio task) every
+HEARTBEAT_INTERVAL seconds. A beat that comes late by more than the threshold is a stall: its
+duration goes into a stall histogram (and metrics.LOOP_STALL_SECONDS). While a stall is still
+going on, a monitor thread captures the main thread's stack and logs it with the game state,
+which points at the blocking call. The monitor needs the GIL, so a C call that holds it is
+reported (without a stack) only once it returns. Reports go to the cognito.stall logger at
+warning level (cognito_log rate-limits them).
+
+Some blocking calls are known: the Qt frontend still sends its LLM request on the GUI thread.
+Wrapped in known_block(), they are measured like any stall but logged at debug level, without
+a stack.
+
+    COGNITO_STALL_THRESHOLD_MS=250   stall threshold (default 250 ms)
+    COGNITO_STALL_THRESHOLD_MS=0     watchdog off
+The browser build has no threads: stalls are still measured, but no stacks are captured.
+"""
+import contextlib
+import os
+import sys
+import threading
+import time
+import traceback
+
+import cognito_log
+import metrics
+
+log = cognito_log.get_logger('stall')
+
+THRESHOLD_ENV = "COGNITO_STALL_THRESHOLD_MS"
+DEFAULT_THRESHOLD_S = 0.25
+HEARTBEAT_INTERVAL = 0.1 # Seconds between beats
+STALL_BUCKETS = metrics.STALL_BUCKETS
+STACK_LIMIT = 30 # Innermost frames logged per stall
+
+_known_blocks = {} # Thread ident -> [reason of the ongoing known block or None, blocks entered, last reason]
+
+
+@contextlib.contextmanager
+def known_block(reason):
+    """Marks a blocking call the calling loop makes on purpose; stalls it causes are expected."""
+    entry = _known_blocks.setdefault(threading.get_ident(), [None, 0, None])
+    entry[0] = entry[2] = reason
+    entry[1] += 1
+    try:
+        yield
+    finally:
+        entry[0] = None
+
+
+class Watchdog:
+    """Stall detector for one loop, beating on the thread that runs it."""
+
+    def __init__(self, frontend, state_getter=None, threshold=DEFAULT_THRESHOLD_S, interval=HEARTBEAT_INTERVAL):
+        self.frontend = frontend
+        self.state_getter = state_getter
+        self.threshold = threshold
+        self.interval = interval
+        self.thread_ident = threading.get_ident() # The watched loop runs on the creating thread
+        self.stall_counts = [0] * (len(STALL_BUCKETS) + 1) # Last slot: longer than the largest bucket
+        self.longest_stall = 0.0
+        self._last_beat = time.perf_counter()
+        self._beats = 0
+        self._reported_beat = -1 # Beat number of the stall whose stack was logged
+        self._known_seen = _known_blocks.get(self.thread_ident, [None, 0])[1] # Known blocks entered as of the last beat
+        self._stop = threading.Event()
+        self._monitor = None
+        self.heartbeat = None # QTimer or asyncio task driving beat() (see start_qt / start_asyncio)
+
+    def _state(self):
+        try:
+            return self.state_getter() if self.state_getter else None
+        except Exception: # The window may not be fully constructed yet
+            return None
+
+    def beat(self):
+        """Heartbeat from the watched loop; records the previous gap if it was a stall."""
+        now = time.perf_counter()
+        lag = now - self._last_beat - self.interval
+        self._last_beat = now
+        self._beats += 1
+        entry = _known_blocks.get(self.thread_ident)
+        known = None
+        if entry is not None:
+            known = entry[0] or (entry[2] if entry[1] != self._known_seen else None)
+            self._known_seen = entry[1]
+        if lag > self.threshold:
+            self._record_stall(lag, known)
+
+    def _known_reason(self):
+        entry = _known_blocks.get(self.thread_ident)
+        return entry[0] if entry else None
+
+    def _record_stall(self, seconds, known=None):
+        index = 0
+        while index < len(STALL_BUCKETS) and seconds > STALL_BUCKETS[index]:
+            index += 1
+        self.stall_counts[index] += 1
+        self.longest_stall = max(self.longest_stall, seconds)
+        metrics.LOOP_STALL_SECONDS.labels(self.frontend).observe(seconds)
+        if known:
+            log.debug("%s loop blocked for %.0f ms in %s", self.frontend, seconds * 1000, known,
+                      extra={'state': self._state()})
+        else:
+            log.warning("%s loop blocked for %.0f ms", self.frontend, seconds * 1000, extra={'state': self._state()})
+
+    def check(self):
+        """Called off the watched thread: logs the stack of an ongoing stall (once per stall).
+        Returns the logged report, or None."""
+        beats = self._beats
+        blocked_for = time.perf_counter() - self._last_beat - self.interval
+        if blocked_for <= self.threshold or beats == self._reported_beat or self._known_reason():
+            return None
+        frame = sys._current_frames().get(self.thread_ident)
+        if frame is None:
+            return None
+        self._reported_beat = beats
+        stack = "".join(traceback.format_stack(frame)[-STACK_LIMIT:])
+        report = (f"Stall: {self.frontend} loop blocked for {blocked_for * 1000:.0f} ms so far"
+                  f" (state {self._state()}), main thread stack:\n{stack}")
+        log.warning("%s", report)
+        return report
+
+    def _monitor_loop(self):
+        while not self._stop.wait(self.threshold / 2):
+            self.check()
+
+    def start_monitor(self):
+        """Starts the stack-capturing monitor thread (not available in the browser build)."""
+        try:
+            self._monitor = threading.Thread(target=self._monitor_loop, name=f"stall-watchdog-{self.frontend}", daemon=True)
+            self._monitor.start()
+        except RuntimeError as e: # No threads (browser build)
+            self._monitor = None
+            print(f"Warning: Stall watchdog runs without stack capture: {e}")
+        return self._monitor
+
+    def summary(self):
+        """One line with the stall histogram, e.g. for the end of a session."""
+        total = sum(self.stall_counts)
+        if not total:
+            return f"Stalls ({self.frontend}): none over {self.threshold * 1000:.0f} ms"
+        labels = [f"<={bound:g}s" for bound in STALL_BUCKETS] + [f">{STALL_BUCKETS[-1]:g}s"]
+        buckets = ", ".join(f"{label}: {count}" for label, count in zip(labels, self.stall_counts) if count)
+        return f"Stalls ({self.frontend}): {total} ({buckets}), longest {self.longest_stall:.2f} s"
+
+    def stop(self):
+        self._stop.set()
+        print(self.summary())
+
+
+def threshold_from_env():
+    """Stall threshold in seconds, or None if the watchdog is turned off."""
+    try:
+        threshold_ms = float(os.environ.get(THRESHOLD_ENV) or DEFAULT_THRESHOLD_S * 1000)
+    except ValueError:
+        threshold_ms = DEFAULT_THRESHOLD_S * 1000
+    return threshold_ms / 1000 if threshold_ms > 0 else None
+
+
+def start_qt(parent, state_getter=None):
+    """Watches the Qt event loop of the calling (GUI) thread. Returns the Watchdog, or None if off."""
+    threshold = threshold_from_env()
+    if threshold is None:
+        return None
+    from PySide6 import QtCore
+    watchdog = Watchdog('qt', state_getter, threshold)
+    timer = QtCore.QTimer(parent)
+    timer.timeout.connect(watchdog.beat)
+    timer.start(int(watchdog.interval * 1000))
+    watchdog.heartbeat = timer
+    watchdog.start_monitor()
+    return watchdog
+
+
+async def asyncio_heartbeat(watchdog):
+    """Beats for the asyncio loop running this task; run it with asyncio.create_task."""
+    import asyncio
+    while True:
+        watchdog.beat()
+        await asyncio.sleep(watchdog.interval)
+
+
+def start_asyncio(state_getter=None, use_thread=True):
+    """Watches the running asyncio loop. Returns the Watchdog, or None if off."""
+    import asyncio
+    threshold = threshold_from_env()
+    if threshold is None:
+        return None
+    watchdog = Watchdog('pygame', state_getter, threshold)
+    watchdog.heartbeat = asyncio.create_task(asyncio_heartbeat(watchdog))
+    if use_thread:
+        watchdog.start_monitor()
+    return watchdog
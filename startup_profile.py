@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Startup phase timings shared by both entry points (cognito_v0.1.py and main.py).
+
+Each frontend calls mark() at the interesting points of its startup. When the
+COGNITO_STARTUP_REPORT environment variable names a file, the frontend writes the
+collected phases there once it is interactive and exits, which is how bench_startup.py
+measures headless runs. Without the variable, mark() only records a timestamp.
+"""
+import json
+import os
+import sys
+import time
+
+try:
+    import resource # Not available on Windows or in the browser build
+except ImportError:
+    resource = None
+
+STARTUP_REPORT_ENV = "COGNITO_STARTUP_REPORT"
+AUTOSELECT_LANG_ENV = "COGNITO_AUTOSELECT_LANG" # Skips the language prompt (headless benchmarks)
+
+# Taken when a frontend imports this module, which both do before anything else (PySide6, pygame)
+PROCESS_START = time.perf_counter()
+_phases = {}
+
+
+def mark(phase):
+    """Records the elapsed time (ms since process start) for a phase. First mark wins."""
+    if phase not in _phases:
+        _phases[phase] = (time.perf_counter() - PROCESS_START) * 1000
+    return _phases[phase]
+
+
+def marked(phase):
+    """True if the phase has already been recorded."""
+    return phase in _phases
+
+
+def phases():
+    """Returns a copy of the phases recorded so far."""
+    return dict(_phases)
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB, or None if it cannot be determined."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and KiB on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def report_requested():
+    """True if the process was started by the startup benchmark."""
+    return bool(os.environ.get(STARTUP_REPORT_ENV))
+
+
+def autoselect_language():
+    """Language to select without user input ('en'/'ko'), or None for the normal prompt."""
+    lang = os.environ.get(AUTOSELECT_LANG_ENV, "").strip().lower()
+    return lang if lang in ('en', 'ko') else None
+
+
+def write_report(entry_point, extra=None):
+    """Writes the recorded phases as JSON to the file named by COGNITO_STARTUP_REPORT.
+
+    Returns True if a report was written.
+    """
+    path = os.environ.get(STARTUP_REPORT_ENV)
+    if not path:
+        return False
+    report = {
+        'entry_point': entry_point,
+        'phases_ms': phases(),
+        'peak_rss_kb': peak_rss_kb(),
+    }
+    if extra:
+        report.update(extra)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Startup report written to {path}")
+    return True
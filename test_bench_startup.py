@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import bench_startup
+import startup_profile
+
+IMPORTTIME_SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        900 | encodings
+import time:       200 |        200 |     pygame.base
+import time:      1000 |       5000 |   pygame.display
+import time:      2000 |      40000 | pygame
+import time:        50 |       1500 | pygame_gui
+Traceback (most recent call last):
+"""
+
+class TestParseImporttime(unittest.TestCase):
+    def test_only_top_level_imports_are_counted(self):
+        totals = bench_startup.parse_importtime(IMPORTTIME_SAMPLE)
+        self.assertEqual(totals, {'encodings': 900, 'pygame': 40000, 'pygame_gui': 1500})
+
+
+class TestSummarizeAndCompare(unittest.TestCase):
+    def _run(self, interactive, wall):
+        return {'timed_out': False, 'returncode': 0, 'wall_ms': wall, 'peak_rss_kb': 1000,
+                'imports_total_us': 10, 'phases_ms': {'interactive': interactive}}
+
+    def test_summary_skips_failed_runs(self):
+        runs = [self._run(100, 200), self._run(300, 400), {'timed_out': True, 'phases_ms': {}}]
+        summary = bench_startup.summarize(runs)
+        self.assertEqual(summary['phase.interactive']['median'], 200)
+        self.assertEqual(summary['wall_ms']['n'], 2)
+
+    def test_compare_flags_regressions_over_threshold(self):
+        old = {'meta': {'revision': 'a'}, 'entries': {'qt': {'summary': bench_startup.summarize([self._run(100, 200)])}}}
+        new = {'meta': {'revision': 'b'}, 'entries': {'qt': {'summary': bench_startup.summarize([self._run(150, 205)])}}}
+        with patch('builtins.print'):
+            regressions = bench_startup.compare(old, new, threshold=10)
+        self.assertEqual([r[1] for r in regressions], ['phase.interactive'])
+
+
+class TestStartupProfileReport(unittest.TestCase):
+    def test_report_written_only_when_requested(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertFalse(startup_profile.write_report('qt'))
+
+        startup_profile.mark('test_phase')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'report.json')
+            with patch.dict(os.environ, {startup_profile.STARTUP_REPORT_ENV: path}), patch('builtins.print'):
+                self.assertTrue(startup_profile.write_report('qt', extra={'window_phases_ms': {}}))
+            with open(path, encoding='utf-8') as f:
+                report = json.load(f)
+        self.assertEqual(report['entry_point'], 'qt')
+        self.assertIn('test_phase', report['phases_ms'])
+        self.assertIn('window_phases_ms', report)
+
+    def test_autoselect_language_validates_value(self):
+        with patch.dict(os.environ, {startup_profile.AUTOSELECT_LANG_ENV: 'KO'}):
+            self.assertEqual(startup_profile.autoselect_language(), 'ko')
+        with patch.dict(os.environ, {startup_profile.AUTOSELECT_LANG_ENV: 'fr'}):
+            self.assertIsNone(startup_profile.autoselect_language())
+
+if __name__ == '__main__':
+    unittest.main()
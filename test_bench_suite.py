@@ -0,0 +1,42 @@
+import itertools
+import unittest
+from unittest.mock import patch
+
+import bench_suite
+
+class TestMeasure(unittest.TestCase):
+    def test_per_operation_times_from_calibrated_batches(self):
+        calls = []
+        clock = itertools.count(0.0, 0.001).__next__ # Every clock read advances 1 ms
+        stats = bench_suite.measure(lambda: calls.append(1), repeats=3, min_time=0.01, clock=clock)
+        self.assertEqual(stats['n'], 3)
+        self.assertGreaterEqual(stats['iterations'], 1)
+        self.assertGreater(len(calls), 3 * stats['iterations'] - 1)
+        self.assertAlmostEqual(stats['median'], 1000 / stats['iterations'])
+
+
+class TestSuite(unittest.TestCase):
+    def test_skipped_cases_are_recorded(self):
+        def missing(fixtures):
+            raise bench_suite.Skip("PySide6 not available")
+        cases = [('render', 'needs_qt', missing), ('micro', 'noop', lambda fixtures: (lambda: None))]
+        with patch('builtins.print'):
+            results = bench_suite.run_suite(cases, repeats=2, min_time=0.001)
+        self.assertEqual(results['entries']['render']['skipped'], {'needs_qt': "PySide6 not available"})
+        self.assertIn('noop', results['entries']['micro']['summary'])
+
+    def test_tr_case_runs_without_a_toolkit(self):
+        (case,) = bench_suite.select(['micro'], 'tr')
+        fn = case[2](bench_suite.Fixtures())
+        fn()
+
+    def test_compare_flags_regressions_over_threshold(self):
+        def result(revision, tr_us, keywords_us):
+            return {'meta': {'revision': revision}, 'entries': {'micro': {'summary': {
+                'tr': {'median': tr_us}, 'keyword_detection': {'median': keywords_us}}, 'skipped': {}}}}
+        with patch('builtins.print'):
+            regressions = bench_suite.compare(result('a', 1.0, 4.0), result('b', 1.5, 4.2), threshold=10)
+        self.assertEqual([(r[0], r[1]) for r in regressions], [('micro', 'tr')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import ast
+import json
+import os
+import tempfile
+import unittest
+
+import build_web_assets
+import font_assets
+
+class TestStripSource(unittest.TestCase):
+    def test_removes_docstrings_and_comments(self):
+        source = '"""Module doc."""\nimport os # comment\n\ndef f():\n    """Only a docstring."""\n\nclass C:\n    """Doc."""\n    x = "not a docstring"\n'
+        stripped = build_web_assets.strip_source(source, 'm.py')
+        self.assertNotIn('Module doc', stripped)
+        self.assertNotIn('Doc.', stripped)
+        self.assertNotIn('Only a docstring', stripped)
+        self.assertNotIn('comment', stripped)
+        self.assertIn('not a docstring', stripped)
+        ast.parse(stripped) # Emptied function body still compiles (pass inserted)
+
+    def test_web_modules_strip_cleanly(self):
+        for name in build_web_assets.WEB_MODULES:
+            with open(os.path.join(build_web_assets.SCRIPT_DIR, name), 'r', encoding='utf-8') as f:
+                compile(build_web_assets.strip_source(f.read(), name), name, 'exec')
+
+
+class TestManifest(unittest.TestCase):
+    def test_served_font_name_from_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'manifest.json')
+            self.assertEqual(font_assets.served_font_name(path), 'neodgm_code.ttf')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'files': {}, 'external': {'neodgm_code.ttf': {'name': 'neodgm_code.0123abcd.ttf'}}}, f)
+            self.assertEqual(font_assets.served_font_name(path), 'neodgm_code.0123abcd.ttf')
+
+    def test_build_manifest_hashes_staged_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, data in (('a.txt', b'one'), ('neodgm_code.ttf', b'font')):
+                with open(os.path.join(tmp, name), 'wb') as f:
+                    f.write(data)
+            manifest = build_web_assets.build_manifest(tmp, ['a.txt', 'neodgm_code.ttf'])
+        self.assertEqual(manifest['files']['a.txt']['size'], 3)
+        self.assertEqual(manifest['external'], {}) # Full font is bundled, nothing served separately
+        self.assertTrue(build_web_assets._same_content(json.loads(json.dumps(manifest)), manifest))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+import queue
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import cognito_log
+
+def make_record(msg, *args, name="cognito.llm", created=100.0, **fields):
+    record = logging.LogRecord(name, logging.INFO, __file__, 1, msg, args, None)
+    record.created = created
+    record.__dict__.update(fields)
+    return record
+
+class TestFormatting(unittest.TestCase):
+    def test_text_and_json_carry_fields(self):
+        record = make_record("Sending to LLM %s", "now", state="UNEASY")
+        text = cognito_log.TextFormatter().format(record)
+        self.assertIn("INFO  llm: Sending to LLM now [state=UNEASY]", text)
+        entry = json.loads(cognito_log.JsonFormatter().format(record))
+        self.assertEqual((entry['msg'], entry['state'], entry['logger']), ("Sending to LLM now", "UNEASY", "cognito.llm"))
+
+
+class TestRateLimit(unittest.TestCase):
+    def test_repeated_template_is_suppressed_then_reported(self):
+        limiter = cognito_log.RateLimitFilter(limit=3, window=10.0)
+        passed = [limiter.filter(make_record("Tick %d", i, created=100.0 + i * 0.1)) for i in range(10)]
+        self.assertEqual(passed, [True] * 3 + [False] * 7)
+        self.assertTrue(limiter.filter(make_record("Other", created=101.0))) # Separate template
+        record = make_record("Tick %d", 99, created=111.0) # Next window
+        self.assertTrue(limiter.filter(record))
+        self.assertEqual(record.suppressed, 7)
+
+
+class TestHandlers(unittest.TestCase):
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = cognito_log._NonBlockingQueueHandler(queue.Queue(1))
+        handler.handle(make_record("a"))
+        handler.handle(make_record("b"))
+        self.assertEqual(handler.dropped, 1)
+
+    def test_dump_ring(self):
+        ring = cognito_log.RingBufferHandler(capacity=2)
+        for i in range(3):
+            ring.handle(make_record("Record %d", i))
+        with tempfile.TemporaryDirectory() as tmp, patch.object(cognito_log, 'ring', ring):
+            path = cognito_log.dump_ring(os.path.join(tmp, 'crash.log'))
+            with open(path, 'r', encoding='utf-8') as f:
+                dump = f.read()
+        self.assertNotIn("Record 0", dump)
+        self.assertIn("Record 2", dump)
+
+    def test_per_subsystem_levels(self):
+        try:
+            cognito_log.configure_levels("WARNING", "llm=DEBUG, scare=bogus")
+            self.assertEqual(logging.getLogger('cognito').level, logging.WARNING)
+            self.assertTrue(cognito_log.get_logger('llm').isEnabledFor(logging.DEBUG))
+            self.assertFalse(cognito_log.get_logger('turn').isEnabledFor(logging.INFO))
+            self.assertEqual(cognito_log.get_logger('scare').level, cognito_log.DEFAULT_LEVEL)
+        finally:
+            for name in ('cognito', 'cognito.llm', 'cognito.scare'):
+                logging.getLogger(name).setLevel(logging.NOTSET)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -35,6 +35,7 @@ except Exception as e:
     print(f"Warning: Module execution encountered an error: {e}")
 
 from cognito import CognitoWindow
+import translation_catalog
 
 class TestCognitoTR(unittest.TestCase):
     def setUp(self):
@@ -43,36 +44,41 @@ class TestCognitoTR(unittest.TestCase):
         self.mock_init = self.init_patcher.start()
         self.window = CognitoWindow()
         # Setup necessary attributes for tr
-        self.window.translations = {
+        self.translations = {
             'HELLO': {'en': 'Hello', 'ko': '안녕하세요'},
             'ONLY_EN': {'en': 'English Only'},
             'ONLY_KO': {'ko': '한국어만'},
             'PARTIAL': {'fr': 'Bonjour'}
         }
-        self.window.language = 'en'
+        self.set_language('en')
+
+    def set_language(self, language):
+        # tr reads the compiled flat table of the selected language
+        self.window.language = language
+        self.window.catalog = translation_catalog.Catalog(translation_catalog.compile_table(self.translations, language), language)
 
     def tearDown(self):
         self.init_patcher.stop()
 
     def test_tr_found_language(self):
         """Test translation when the key exists for the current language."""
-        self.window.language = 'en'
+        self.set_language('en')
         self.assertEqual(self.window.tr('HELLO'), 'Hello')
 
-        self.window.language = 'ko'
+        self.set_language('ko')
         self.assertEqual(self.window.tr('HELLO'), '안녕하세요')
 
     def test_tr_fallback_to_english(self):
         """Test fallback to English when the current language translation is missing."""
-        self.window.language = 'ko'
+        self.set_language('ko')
         self.assertEqual(self.window.tr('ONLY_EN'), 'English Only')
 
     def test_tr_fallback_key_not_in_english(self):
         """Test fallback to [key] when the current language and English are missing."""
-        self.window.language = 'en'
+        self.set_language('en')
         self.assertEqual(self.window.tr('ONLY_KO'), '[ONLY_KO]')
 
-        self.window.language = 'fr' # Language not in dict for this key
+        self.set_language('fr') # Language not in dict for this key
         self.assertEqual(self.window.tr('ONLY_KO'), '[ONLY_KO]')
 
     def test_tr_key_missing(self):
@@ -81,7 +87,7 @@ class TestCognitoTR(unittest.TestCase):
 
     def test_tr_default_fallback_value(self):
         """Test that the fallback format is consistently [key]."""
-        self.window.language = 'es' # Some random language
+        self.set_language('es') # Some random language
         self.assertEqual(self.window.tr('HELLO'), 'Hello') # Should fallback to en
         self.assertEqual(self.window.tr('PARTIAL'), '[PARTIAL]') # No en, no es -> [PARTIAL]
 
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import unittest
+import urllib.error
+import urllib.request
+
+import context_cache
+import llm_standin
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestContextCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = context_cache.ContextCache('test', enabled=True, ttl=100, clock=self.clock, min_tokens=0)
+        self.key = ('SYS_PROMPT_DEFAULT', 'en')
+
+    def test_create_use_refresh(self):
+        self.assertEqual(self.cache.plan(self.key), (context_cache.CREATE, None))
+        self.assertEqual(self.cache.plan(self.key), (context_cache.INLINE, None)) # Creation in flight
+        self.cache.created(self.key, "cachedContents/1")
+        self.assertEqual(self.cache.plan(self.key), (context_cache.USE, "cachedContents/1"))
+        self.clock.now += 85 # Less than REFRESH_MARGIN of the TTL left
+        self.assertEqual(self.cache.plan(self.key), (context_cache.REFRESH, "cachedContents/1"))
+        self.assertEqual(self.cache.plan(self.key), (context_cache.USE, "cachedContents/1")) # Refresh in flight
+        self.cache.refreshed(self.key)
+        self.clock.now += 50
+        self.assertEqual(self.cache.plan(self.key), (context_cache.USE, "cachedContents/1"))
+
+    def test_failed_creation_backs_off(self):
+        self.cache.plan(self.key)
+        self.cache.failed(self.key)
+        self.assertEqual(self.cache.plan(self.key), (context_cache.INLINE, None))
+        self.clock.now += context_cache.FAILURE_BACKOFF_S
+        self.assertEqual(self.cache.plan(self.key), (context_cache.CREATE, None))
+
+    def test_formatted_prompt_and_disabled_cache_are_inline(self):
+        self.assertEqual(self.cache.plan(None), (context_cache.INLINE, None))
+        disabled = context_cache.ContextCache('test', enabled=False)
+        self.assertEqual(disabled.plan(self.key), (context_cache.INLINE, None))
+
+    def test_prompt_below_minimum_is_never_created(self):
+        cache = context_cache.ContextCache('test', enabled=True, ttl=100, clock=self.clock, min_tokens=1000)
+        self.assertEqual(cache.plan(self.key, "You are AURA."), (context_cache.INLINE, None))
+        self.assertEqual(cache.plan(self.key, "x" * 4000), (context_cache.CREATE, None))
+        self.assertEqual(context_cache.ContextCache('test').min_tokens, context_cache.DEFAULT_MIN_TOKENS)
+
+    def test_too_small_failure_backs_off_for_good(self):
+        self.cache.plan(self.key)
+        self.cache.failed(self.key, permanent=context_cache.is_too_small(RuntimeError("Cached content is too small.")))
+        self.clock.now += context_cache.FAILURE_BACKOFF_S * 10
+        self.assertEqual(self.cache.plan(self.key), (context_cache.INLINE, None))
+
+    def test_preamble_key(self):
+        class Catalog:
+            language = 'ko'
+            def keys_for(self, text):
+                return {'SYS_PROMPT_B', 'SYS_PROMPT_A'} if text == "static" else frozenset()
+        self.assertEqual(context_cache.preamble_key(Catalog(), "static"), ('SYS_PROMPT_A', 'ko'))
+        self.assertIsNone(context_cache.preamble_key(Catalog(), "formatted 3"))
+
+    def test_payloads(self):
+        inline = context_cache.content_payload("User: hi", "system")
+        self.assertEqual(inline['systemInstruction'], {"parts": [{"text": "system"}]})
+        cached = context_cache.content_payload("User: hi", "system", "cachedContents/1")
+        self.assertEqual(cached['cachedContent'], "cachedContents/1")
+        self.assertNotIn('systemInstruction', cached)
+
+
+def send_json(method, url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'), method=method,
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e: # Error JSON, like main._JsonClient.send
+        return e.code, json.load(e)
+
+
+async def async_send(method, url, payload):
+    return send_json(method, url, payload)
+
+
+class TestStandInRoundTrip(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = context_cache.ContextCache('test', enabled=True, ttl=100, clock=self.clock, min_tokens=0)
+        self.key = ('SYS_PROMPT_DEFAULT', 'en')
+
+    def cached_name(self, root, system_text="You are AURA."):
+        return asyncio.run(context_cache.rest_cached_name(self.cache, async_send, root, context_cache.MODEL,
+                                                          "test", self.key, system_text))
+
+    def test_create_reference_refresh(self):
+        standin = llm_standin.StandIn()
+        root = standin.start()
+        try:
+            name = self.cached_name(root)
+            url = context_cache.model_url(root) + "?key=test"
+            status, body = send_json('POST', url, context_cache.content_payload("User: hi", cached_name=name))
+            self.assertEqual(status, 200)
+            self.clock.now += 90
+            self.assertEqual(self.cached_name(root), name)
+            status, _ = send_json('POST', url, context_cache.content_payload("User: hi", cached_name="cachedContents/gone"))
+            self.assertTrue(context_cache.is_missing_cache_status(status))
+        finally:
+            standin.stop()
+        self.assertEqual((standin.cache_creates, standin.cache_updates, standin.cached_requests), (1, 1, 1))
+        self.assertEqual(self.cache.counts['refreshed'], 1)
+
+    def test_failed_refresh_is_sent_inline(self):
+        self.cache.plan(self.key)
+        self.cache.created(self.key, "cachedContents/1")
+        self.clock.now += 90
+        async def failing_send(method, url, payload):
+            raise TimeoutError("refresh timed out")
+        name = asyncio.run(context_cache.rest_cached_name(self.cache, failing_send, "http://unused", context_cache.MODEL,
+                                                          "test", self.key, "You are AURA."))
+        self.assertIsNone(name)
+        self.assertEqual(self.cache.counts['expired'], 1)
+        self.assertEqual(self.cache.plan(self.key), (context_cache.CREATE, None)) # Not stuck refreshing
+
+    def test_too_small_to_cache_is_sent_inline(self):
+        standin = llm_standin.StandIn(min_cache_chars=1000)
+        root = standin.start()
+        try:
+            self.assertIsNone(self.cached_name(root))
+            self.assertIsNone(self.cached_name(root)) # Backing off, no second attempt
+            self.clock.now += context_cache.FAILURE_BACKOFF_S + 1
+            self.assertIsNone(self.cached_name(root)) # The API's "too small" answer: for good
+        finally:
+            standin.stop()
+        self.assertEqual(standin.cache_creates, 0)
+        self.assertEqual(self.cache.counts['create_failed'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import tempfile
+import unittest
+
+import build_fonts
+import font_assets
+
+class TestFontCoverage(unittest.TestCase):
+    def test_ranges_round_trip(self):
+        chars = set("abcxyz가각")
+        ranges = font_assets.codepoint_ranges(chars)
+        self.assertEqual(ranges[0], [ord('a'), ord('c')])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'coverage.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'family': 'F', 'subset_family': 'F Subset', 'ranges': ranges}, f)
+            coverage = font_assets.FontCoverage.load(path)
+        self.assertEqual(coverage.chars, frozenset(chars))
+        self.assertEqual(coverage.subset_family, 'F Subset')
+
+    def test_missing_ignores_whitespace(self):
+        coverage = font_assets.FontCoverage("abc")
+        self.assertTrue(coverage.covers("a b\nc\t"))
+        self.assertEqual(coverage.missing("abd 똠"), {'d', '똠'})
+
+    def test_load_missing_file_returns_none(self):
+        self.assertIsNone(font_assets.FontCoverage.load("/nonexistent/coverage.json"))
+
+
+class TestCharset(unittest.TestCase):
+    def test_ksx1001_hangul_set(self):
+        hangul = build_fonts.hangul_chars('ksx1001')
+        self.assertEqual(len(hangul), 2350)
+        self.assertIn('한', hangul)
+        self.assertNotIn('똠', hangul) # Not part of KS X 1001
+        self.assertEqual(build_fonts.hangul_chars('none'), set())
+        self.assertEqual(len(build_fonts.hangul_chars('all')), 11172)
+
+    def test_charset_includes_ui_text(self):
+        chars = build_fonts.collect_charset('none')
+        for text in ("코그니토 - AURA 인터페이스", "새벽", "XENOS_ALPHA", "◌●○"):
+            self.assertTrue(set(text) <= chars, text)
+
+if __name__ == '__main__':
+    unittest.main()
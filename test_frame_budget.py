@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import csv
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import frame_budget
+
+class TestFrameRecorder(unittest.TestCase):
+    def run_frames(self, recorder, times, marks):
+        with patch('frame_budget.time.perf_counter', side_effect=times):
+            recorder.next_frame()
+            for phase in marks:
+                recorder.mark(phase)
+            recorder.next_frame('UNEASY')
+
+    def test_phases_and_dropped_frames(self):
+        recorder = frame_budget.FrameRecorder(phases=('tick', 'update', 'draw_ui'), budget=0.016)
+        # Frame of 50 ms: 2 ms waiting in tick, 40 ms in update, 8 ms drawing
+        self.run_frames(recorder, [0.0, 0.002, 0.042, 0.050, 0.050], ['tick', 'update', 'draw_ui'])
+        self.assertEqual(recorder.frames, 1)
+        self.assertEqual(recorder.over_budget, 1)
+        self.assertEqual(recorder.dropped, 2) # ~3 vsync slots for one frame
+        stats = recorder.stats()
+        self.assertAlmostEqual(stats['update'][1], 0.040)
+        self.assertAlmostEqual(stats[frame_budget.BUSY][0], 0.048)
+        self.assertTrue(recorder.hud_lines()[2].startswith("update")) # Worst phase first
+
+    def test_frame_within_budget(self):
+        recorder = frame_budget.FrameRecorder(phases=('tick', 'update'), budget=0.016)
+        self.run_frames(recorder, [0.0, 0.012, 0.0165, 0.0165], ['tick', 'update'])
+        self.assertEqual((recorder.over_budget, recorder.dropped), (0, 0))
+
+    def test_csv_row_per_frame(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'frames.csv')
+            recorder = frame_budget.FrameRecorder(phases=('tick', 'update'))
+            recorder.open_csv(path)
+            self.run_frames(recorder, [0.0, 0.010, 0.012, 0.012], ['tick', 'update'])
+            recorder.close()
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['frame', 'time_s', 'interval_ms', 'busy_ms', 'tick_ms', 'update_ms', 'state'])
+        self.assertEqual(rows[1][0], '1')
+        self.assertEqual(rows[1][3], '2.000')
+        self.assertEqual(rows[1][-1], 'UNEASY')
+
+    def test_percentile(self):
+        self.assertEqual(frame_budget.percentile([], 0.5), 0.0)
+        self.assertEqual(frame_budget.percentile(list(range(101)), 0.99), 99)
+
+if __name__ == '__main__':
+    unittest.main()
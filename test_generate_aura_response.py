@@ -47,6 +47,10 @@ class TestGenerateAuraResponse(unittest.TestCase):
         self.win.history = ["User: Previous 1", "AURA: Previous 2", "User: Previous 3", "AURA: Previous 4", "User: Previous 5"]
         self.win.tr.side_effect = lambda x: x # Mock translation
         self.win.llm_model = MagicMock()
+        self.win.catalog = None
+        self.win._model_for.return_value = (self.win.llm_model, False) # No SDK: system text in the prompt
+        self.win._prompt_cache.get.return_value = None # No earlier replies
+        self.win._router = cognito.model_routing.Router({'default': cognito.model_routing.Route('default')})
         self.win.statusBar = MagicMock()
 
         # We need to access generate_aura_response from the class
@@ -76,5 +80,67 @@ class TestGenerateAuraResponse(unittest.TestCase):
         args, _ = self.win.llm_model.generate_content.call_args
         self.assertEqual(args[0], expected_prompt)
 
+    def test_system_instruction_is_not_in_prompt(self):
+        model = MagicMock()
+        model.generate_content.return_value.candidates = []
+        self.win._model_for.return_value = (model, False)
+        self.generate_method(self.win, "Hello world")
+        self.win._model_for.assert_called_once_with("SYS_PROMPT_DEFAULTRESPOND_LANG", None, cognito.context_cache.MODEL)
+        model.generate_content.assert_called_once_with("User: \"Hello world\"", request_options={'timeout': 30.0})
+
+    def test_missing_cached_content_retries_inline(self):
+        cached_model, inline_model = MagicMock(), MagicMock()
+        cached_model.generate_content.side_effect = RuntimeError("404 CachedContent not found")
+        inline_model.generate_content.return_value.candidates = []
+        self.win._model_for.side_effect = [(cached_model, True), (inline_model, False)]
+        self.generate_method(self.win, "Hello world")
+        self.win._drop_cached_model.assert_called_once_with(None)
+        inline_model.generate_content.assert_called_once_with("User: \"Hello world\"", request_options={'timeout': 30.0})
+
+
+class TestModelFor(unittest.TestCase):
+    def setUp(self):
+        self.win = MagicMock()
+        self.win.llm_model.model_name = "models/gemini-1.5-flash"
+        self.win._context_cache = cognito.context_cache.ContextCache('qt', enabled=True, ttl=100, min_tokens=0)
+        self.win._inline_models = {}
+        self.win._cached_models = {}
+        self.win._drop_cached_model = lambda key: CognitoWindow._drop_cached_model(self.win, key)
+        self.genai = MagicMock()
+        patcher = patch.object(cognito, 'genai', self.genai)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def model_for(self, key):
+        return CognitoWindow._model_for(self.win, "SYSTEM", key)
+
+    def test_static_prompt_is_cached_once(self):
+        key = ('SYS_PROMPT_DEFAULT', 'en')
+        model, cached = self.model_for(key)
+        self.assertTrue(cached)
+        self.assertIs(model, self.genai.GenerativeModel.from_cached_content.return_value)
+        self.assertEqual(self.model_for(key), (model, True))
+        self.genai.caching.CachedContent.create.assert_called_once()
+        self.assertEqual(self.win._context_cache.counts['hit'], 1)
+
+    def test_failed_creation_falls_back_to_inline(self):
+        self.genai.caching.CachedContent.create.side_effect = RuntimeError("content too small")
+        model, cached = self.model_for(('SYS_PROMPT_DEFAULT', 'en'))
+        self.assertFalse(cached)
+        self.genai.GenerativeModel.assert_called_once_with("models/gemini-1.5-flash", system_instruction="SYSTEM")
+        self.assertIs(self.model_for(('SYS_PROMPT_DEFAULT', 'en'))[0], model) # Backing off, same inline model
+        self.genai.caching.CachedContent.create.assert_called_once()
+
+    def test_route_model_gets_its_own_inline_model(self):
+        key = None # Formatted prompt: never cached
+        self.model_for(key)
+        CognitoWindow._model_for(self.win, "SYSTEM", key, "gemini-1.5-flash-8b")
+        self.assertEqual(set(self.win._inline_models), {("models/gemini-1.5-flash", "SYSTEM"), ("gemini-1.5-flash-8b", "SYSTEM")})
+        self.genai.GenerativeModel.assert_called_with("gemini-1.5-flash-8b", system_instruction="SYSTEM")
+
+    def test_canned_model_without_sdk(self):
+        self.win.llm_model.model_name = None
+        self.assertEqual(self.model_for(('SYS_PROMPT_DEFAULT', 'en')), (self.win.llm_model, False))
+
 if __name__ == '__main__':
     unittest.main()
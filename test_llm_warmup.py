@@ -0,0 +1,64 @@
+import asyncio
+import json
+import os
+import unittest
+import urllib.request
+from unittest.mock import patch
+
+import context_cache
+import llm_standin
+import llm_warmup
+
+class TestWarmup(unittest.TestCase):
+    def test_steps_run_in_order_and_are_timed(self):
+        calls = []
+        warmup = llm_warmup.Warmup('test')
+        warmup.start([('import', lambda: calls.append('import')), ('connect', lambda: calls.append('connect'))])
+        self.assertTrue(warmup.wait(5))
+        self.assertEqual(calls, ['import', 'connect'])
+        self.assertTrue(warmup.completed('connect'))
+        self.assertIsNone(warmup.failed)
+
+    def test_failed_step_ends_the_warmup(self):
+        def configure():
+            raise RuntimeError("no key")
+        calls = []
+        warmup = llm_warmup.Warmup('test')
+        warmup.run([('configure', configure), ('connect', lambda: calls.append('connect'))])
+        self.assertTrue(warmup.done())
+        self.assertEqual(calls, [])
+        self.assertEqual(warmup.failed[0], 'configure')
+        self.assertFalse(warmup.completed('configure'))
+
+    def test_async_steps(self):
+        async def connect():
+            await asyncio.sleep(0)
+        warmup = llm_warmup.Warmup('test')
+        asyncio.run(warmup.run_async([('connect', connect)]))
+        self.assertTrue(warmup.completed('connect'))
+        self.assertTrue(warmup.done())
+
+    def test_env_switches(self):
+        with patch.dict(os.environ, {llm_warmup.WARMUP_ENV: "0", llm_warmup.PRIME_ENV: "1"}):
+            self.assertFalse(llm_warmup.enabled())
+            self.assertTrue(llm_warmup.prime_enabled())
+        with patch.dict(os.environ, {llm_warmup.WARMUP_ENV: "", llm_warmup.PRIME_ENV: ""}):
+            self.assertTrue(llm_warmup.enabled())
+            self.assertFalse(llm_warmup.prime_enabled())
+
+
+class TestStandInModel(unittest.TestCase):
+    def test_model_fetch(self):
+        standin = llm_standin.StandIn()
+        url = context_cache.model_url(standin.start(), method=None)
+        try:
+            with urllib.request.urlopen(f"{url}?key=test", timeout=5) as response:
+                status, body = response.status, json.load(response)
+        finally:
+            standin.stop()
+        self.assertEqual(status, 200)
+        self.assertEqual(body['name'], f"models/{context_cache.MODEL}")
+        self.assertEqual(standin.model_gets, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+import context_cache
+import llm_standin
+import load_test
+
+def post(url):
+    request = urllib.request.Request(url, data=b'{}', headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+class TestStandInUpstream(unittest.TestCase):
+    def test_concurrency_cap_queues_requests(self):
+        standin = llm_standin.StandIn(latency=0.1, max_concurrency=1)
+        url = context_cache.model_url(standin.start())
+        try:
+            threads = [threading.Thread(target=post, args=(url,)) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            standin.stop()
+        self.assertEqual(standin.requests, 3)
+        self.assertEqual(standin.max_in_flight, 1)
+        self.assertEqual(standin.connections, 3)
+        self.assertGreaterEqual(max(standin.queue_waits), 0.15) # The last one waited for two others
+
+    def test_rate_limit_answers_429(self):
+        standin = llm_standin.StandIn(rate_limit=0.1)
+        url = context_cache.model_url(standin.start())
+        try:
+            statuses = [post(url)[0] for _ in range(2)]
+        finally:
+            standin.stop()
+        self.assertEqual(statuses, [200, 429])
+        self.assertEqual(standin.throttled, 1)
+
+    def test_error_rate(self):
+        standin = llm_standin.StandIn(error_rate=1.0)
+        url = context_cache.model_url(standin.start())
+        try:
+            status, body = post(url)
+        finally:
+            standin.stop()
+        self.assertEqual(status, 503)
+        self.assertEqual(body['error']['code'], 503)
+        self.assertEqual(standin.errors, 1)
+
+
+class TestReport(unittest.TestCase):
+    def test_summarize_point(self):
+        standin = llm_standin.StandIn()
+        standin.connections, standin.max_in_flight, standin.queue_waits = 4, 2, [0.0, 0.0, 0.5, 0.0]
+        summary = load_test.summarize_point([(1.0, True), (2.0, True), (3.0, False), (4.0, True)], 2.0, standin)
+        standin.stop()
+        self.assertEqual(summary['requests_per_s'], 2.0)
+        self.assertEqual(summary['error_rate'], 0.25)
+        self.assertEqual(summary['latency_p50_ms'], 3000.0)
+        self.assertEqual(summary['latency_p99_ms'], 4000.0)
+        self.assertEqual(summary['queue_p99_ms'], 500.0)
+
+    def test_capacity_is_last_count_within_slo(self):
+        def point(stations, p95_ms, error_rate=0.0):
+            return {'stations': stations, 'latency_s': 1.0, 'upstream_error_rate': 0.0,
+                    'latency_p95_ms': p95_ms, 'error_rate': error_rate}
+        points = [point(25, 4000), point(1, 1200), point(10, 2900, error_rate=0.01), point(50, 1000)]
+        (limit,) = load_test.capacity(points, slo=3.0, max_error_rate=0.05)
+        self.assertEqual(limit['max_ok_stations'], 10)
+        self.assertEqual(limit['degraded_at'], 25)
+
+if __name__ == '__main__':
+    unittest.main()
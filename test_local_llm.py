@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import llm_standin
+import local_llm
+import model_routing
+import token_ledger
+
+class TestStreamReader(unittest.TestCase):
+    def test_collects_deltas_and_usage(self):
+        first = []
+        reader = local_llm.StreamReader(on_first_token=lambda: first.append(True))
+        for chunk in llm_standin.chat_chunks("Grid stable for now.", 'local', prompt_tokens=12, include_usage=True):
+            reader.feed(f"data: {json.dumps(chunk)}\n".encode('utf-8'))
+            reader.feed(b"\n")
+        reader.feed(b"data: [DONE]\n")
+        self.assertEqual(reader.text(), "Grid stable for now.")
+        self.assertEqual(first, [True])
+        self.assertEqual(reader.usage, (12, llm_standin.estimate_tokens("Grid stable for now."), 0))
+        self.assertEqual(reader.finish_reason, 'stop')
+        self.assertTrue(reader.done)
+
+    def test_usage_from_chat(self):
+        body = {"usage": {"prompt_tokens": 30, "completion_tokens": 5, "prompt_tokens_details": {"cached_tokens": 20}}}
+        self.assertEqual(token_ledger.usage_from_chat(body), (30, 5, 20))
+        self.assertIsNone(token_ledger.usage_from_chat({}))
+
+
+class TestEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.standin = llm_standin.StandIn(reply="Systems nominal. Stand by.")
+        self.standin.start()
+        self.addCleanup(self.standin.stop)
+        prompts = {'HOSTILE': {'system': "You are AURA. One hostile sentence.", 'model': 'tiny'}}
+        self.endpoint = local_llm.Endpoint(self.standin.chat_api_root, prompts=prompts, stream=True)
+        self.addCleanup(self.endpoint.close)
+
+    def test_payload_follows_route_and_prompt_map(self):
+        route = model_routing.Route('HOSTILE', max_output_tokens=64, temperature=1.0, stop_sequences=["\n\n"])
+        system_text = self.endpoint.system_text('HOSTILE', "SYS_PROMPT_HOSTILE text")
+        payload = self.endpoint.payload('HOSTILE', system_text, "User: hi", route, max_output_tokens=32)
+        self.assertEqual(payload['model'], 'tiny')
+        self.assertEqual(payload['messages'][0], {"role": "system", "content": "You are AURA. One hostile sentence."})
+        self.assertEqual((payload['max_tokens'], payload['temperature'], payload['stop']), (32, 1.0, ["\n\n"]))
+        self.assertEqual(self.endpoint.system_text('NORMAL_NO_PERMISSIONS', "default"), "default")
+        self.assertEqual(self.endpoint.payload('NORMAL_NO_PERMISSIONS', "s", "u")['model'], local_llm.DEFAULT_MODEL)
+
+    def test_streamed_and_whole_replies_share_one_connection(self):
+        first = []
+        self.endpoint.check()
+        streamed = self.endpoint.chat(self.endpoint.payload('HOSTILE', "s", "User: hi"), 5, lambda: first.append(True))
+        whole = self.endpoint.chat(self.endpoint.payload('HOSTILE', "s", "User: hi", stream=False), 5)
+        self.assertEqual(streamed[:2], ("Systems nominal. Stand by.", 'stop'))
+        self.assertEqual(whole[0], streamed[0])
+        self.assertIsNotNone(streamed[2])
+        self.assertEqual(first, [True])
+        self.assertEqual((self.standin.chat_requests, self.standin.streamed_requests), (2, 1))
+        self.assertEqual(self.standin.last_chat['model'], 'tiny')
+        self.assertEqual((self.endpoint.connections, self.standin.connections), (1, 1))
+
+    def test_sdk_shaped_model(self):
+        model = self.endpoint.model_for('HOSTILE', "s")
+        response = model.generate_content("User: hi", generation_config={'max_output_tokens': 10},
+                                          request_options={'timeout': 5})
+        self.assertEqual(response.candidates[0].content.parts[0].text, "Systems nominal. Stand by.")
+        self.assertEqual(self.standin.last_chat['max_tokens'], 10)
+        self.assertIsNotNone(token_ledger.usage_from_sdk(response))
+
+    def test_http_error_raises(self):
+        self.standin.error_rate = 1.0
+        with self.assertRaises(RuntimeError):
+            self.endpoint.chat(self.endpoint.payload('HOSTILE', "s", "User: hi"), 5)
+
+
+class TestConfig(unittest.TestCase):
+    def test_backend_and_prompt_map_from_env(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({"HOSTILE": {"system": "Short."}, "POST_DEBUG": "not an object"}, f)
+        self.addCleanup(os.remove, f.name)
+        with patch.dict(os.environ, {local_llm.BACKEND_ENV: "local", local_llm.PROMPTS_ENV: f.name}):
+            self.assertTrue(local_llm.selected())
+            self.assertEqual(local_llm.Endpoint().prompts, {"HOSTILE": {"system": "Short."}})
+        with patch.dict(os.environ, {local_llm.BACKEND_ENV: ""}):
+            self.assertFalse(local_llm.selected())
+
+    def test_unreadable_prompt_map_is_ignored(self):
+        with self.assertLogs('cognito.llm', level='WARNING') as logs:
+            self.assertEqual(local_llm.load_prompts(os.path.join(tempfile.gettempdir(), "no-such-prompts.json")), {})
+        self.assertIn("Ignoring local LLM prompts", logs.output[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import local_replies
+import response_bank
+
+HOSTILE_EN = ('SYS_PROMPT_HOSTILE', 'en')
+PROMPTS = ["who are you?", "when will the flare hit?", "tell me about the interconnect nodes",
+           "플레어는 언제 도달해?", "너는 누구야?"]
+
+class TestTfidfIndex(unittest.TestCase):
+    def test_nearest(self):
+        index = local_replies.TfidfIndex(PROMPTS, use_numpy=False)
+        self.assertEqual(index.nearest("Who are you")[0], 0)
+        self.assertEqual(index.nearest("when does the flare hit")[0], 1)
+        self.assertEqual(index.nearest("너 누구야")[0], 4)
+        self.assertAlmostEqual(index.nearest("who are you")[1], 1.0)
+        self.assertEqual(index.nearest("zzz"), (None, 0.0))
+        self.assertEqual(local_replies.TfidfIndex([]).nearest("hello"), (None, 0.0))
+
+    @unittest.skipIf(local_replies.numpy is None, "numpy not installed")
+    def test_numpy_matches_python(self):
+        vectorized = local_replies.TfidfIndex(PROMPTS, use_numpy=True)
+        plain = local_replies.TfidfIndex(PROMPTS, use_numpy=False)
+        for query in ("who are you", "flare", "플레어 언제 와", "zzz"):
+            for a, b in zip(vectorized.scores(query), plain.scores(query)):
+                self.assertAlmostEqual(a, b)
+
+
+class TestLocalReplies(unittest.TestCase):
+    def setUp(self):
+        self.bank = response_bank.ResponseBank()
+        self.bank.add(*HOSTILE_EN, "Who are you?", "I am what you made me.")
+        self.bank.add(*HOSTILE_EN, "Is the grid at risk?", "Everything is at risk.")
+
+    def test_reply_needs_min_score(self):
+        engine = local_replies.LocalReplies('test', self.bank, states=())
+        self.assertEqual(engine.reply(HOSTILE_EN, "who are you, really"), "I am what you made me.")
+        self.assertIsNone(engine.reply(HOSTILE_EN, "who are you, really", min_score=0.99))
+        self.assertIsNone(engine.reply(HOSTILE_EN, "qqq"))
+        self.assertIsNone(engine.reply(('SYS_PROMPT_HOSTILE', 'ko'), "who are you"))
+        self.assertIsNone(engine.reply(None, "who are you"))
+
+    def test_learned_replies_are_bounded(self):
+        engine = local_replies.LocalReplies('test', self.bank, states=(), learned_limit=2)
+        self.assertIsNone(engine.reply(HOSTILE_EN, "open the pod bay doors", min_score=0.5))
+        engine.learn(HOSTILE_EN, "Open the pod bay doors", "I can't do that.")
+        self.assertEqual(engine.reply(HOSTILE_EN, "open the pod bay doors"), "I can't do that.")
+        engine.learn(HOSTILE_EN, "first", "1")
+        engine.learn(HOSTILE_EN, "second", "2")
+        self.assertIsNone(engine.reply(HOSTILE_EN, "open the pod bay doors", min_score=0.9))
+        self.assertEqual(len(self.bank), 2) # Learned replies stay out of the bank file
+        disabled = local_replies.LocalReplies('test', self.bank, states=(), learned_limit=0)
+        disabled.learn(HOSTILE_EN, "first", "1")
+        self.assertIsNone(disabled.reply(HOSTILE_EN, "first", min_score=0.9))
+
+    def test_learned_variants_per_prompt_are_bounded(self):
+        engine = local_replies.LocalReplies('test', self.bank, states=())
+        for number in range(100):
+            engine.learn(HOSTILE_EN, "hello", str(number))
+        replies, _ = engine._learned[HOSTILE_EN].nearest("hello")
+        self.assertEqual(list(replies), [str(number) for number in range(100 - local_replies.LEARNED_VARIANTS, 100)])
+        self.assertIn(engine.reply(HOSTILE_EN, "hello"), replies)
+
+    def test_learning_keeps_the_bank_index(self):
+        engine = local_replies.LocalReplies('test', self.bank, states=())
+        index = engine._index(HOSTILE_EN)[0]
+        engine.learn(HOSTILE_EN, "Is the grid at risk tonight?", "Tonight, yes.")
+        self.assertIs(engine._index(HOSTILE_EN)[0], index) # No rebuild
+        self.assertEqual(engine.reply(HOSTILE_EN, "is the grid at risk tonight"), "Tonight, yes.")
+        self.assertEqual(engine.reply(HOSTILE_EN, "is the grid at risk"), "Everything is at risk.")
+
+    def test_fast_path_states_from_env(self):
+        with patch.dict(os.environ, {local_replies.STATES_ENV: "uneasy, HOSTILE", local_replies.MIN_SCORE_ENV: "0.4"}):
+            engine = local_replies.LocalReplies('test', self.bank)
+        self.assertTrue(engine.fast_path("HOSTILE"))
+        self.assertTrue(engine.fast_path("UNEASY"))
+        self.assertFalse(engine.fast_path("NORMAL_TURN"))
+        self.assertEqual(engine.min_score, 0.4)
+        with patch.dict(os.environ, {local_replies.STATES_ENV: ""}):
+            self.assertFalse(local_replies.LocalReplies('test', self.bank).fast_path("HOSTILE"))
+
+if __name__ == '__main__':
+    unittest.main()
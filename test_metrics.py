@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+import urllib.request
+from unittest.mock import patch
+
+import metrics
+
+class TestRegistry(unittest.TestCase):
+    def test_render_prometheus_text(self):
+        registry = metrics.Registry()
+        responses = registry.counter("t_responses_total", "Responses.", ('outcome',))
+        latency = registry.histogram("t_latency_seconds", "Latency.", ('state',), buckets=(0.5, 1.0))
+        queue = registry.gauge("t_queue", "Queue depth.")
+        responses.labels('ok').inc()
+        responses.labels('ok').inc()
+        responses.labels('bl"ock').inc()
+        latency.labels('UNEASY').observe(0.2)
+        latency.labels('UNEASY').observe(0.7)
+        latency.labels('UNEASY').observe(3.0)
+        queue.set(4)
+
+        text = registry.render()
+        self.assertIn('# TYPE t_responses_total counter', text)
+        self.assertIn('t_responses_total{outcome="ok"} 2', text)
+        self.assertIn('t_responses_total{outcome="bl\\"ock"} 1', text)
+        self.assertIn('t_latency_seconds_bucket{state="UNEASY",le="0.5"} 1', text)
+        self.assertIn('t_latency_seconds_bucket{state="UNEASY",le="1.0"} 2', text)
+        self.assertIn('t_latency_seconds_bucket{state="UNEASY",le="+Inf"} 3', text)
+        self.assertIn('t_latency_seconds_count{state="UNEASY"} 3', text)
+        self.assertIn('t_queue 4', text)
+
+    def test_wrong_label_count_raises(self):
+        registry = metrics.Registry()
+        counter = registry.counter("t_total", "T.", ('a', 'b'))
+        with self.assertRaises(ValueError):
+            counter.labels('only-one')
+
+    def test_write_textfile(self):
+        registry = metrics.Registry()
+        registry.counter("t_total", "T.").inc(3)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cognito.prom')
+            registry.write_textfile(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                self.assertIn("t_total 3", f.read())
+            self.assertEqual(os.listdir(tmp), ['cognito.prom']) # No leftover temp file
+
+
+class TestDisabled(unittest.TestCase):
+    def test_noop_when_disabled(self):
+        if metrics.ENABLED:
+            self.skipTest("metrics enabled in this environment")
+        self.assertIs(metrics.LLM_REQUEST_SECONDS, metrics.NOOP)
+        with metrics.SCARE_SECONDS.labels('qt', 'bsod').time():
+            pass
+        metrics.state_clock('qt').enter('HOSTILE')
+        self.assertEqual(metrics.REGISTRY.render(), "\n")
+
+
+class TestStateClock(unittest.TestCase):
+    def test_time_booked_to_previous_state(self):
+        registry = metrics.Registry()
+        seconds = registry.counter("t_state_seconds_total", "T.", ('frontend', 'state'))
+        transitions = registry.counter("t_transitions_total", "T.", ('frontend', 'state'))
+        with patch.object(metrics, 'STATE_SECONDS', seconds), patch.object(metrics, 'STATE_TRANSITIONS', transitions), \
+             patch('metrics.time.perf_counter', side_effect=[10.0, 10.0, 12.5]):
+            clock = metrics.StateClock('qt')
+            clock.enter('UNEASY')
+            clock.enter('HOSTILE')
+        self.assertEqual(seconds.labels('qt', 'UNEASY').value, 2.5)
+        self.assertEqual(transitions.labels('qt', 'HOSTILE').value, 1)
+
+
+class TestHttpExporter(unittest.TestCase):
+    def test_metrics_endpoint(self):
+        registry = metrics.Registry()
+        registry.counter("t_http_total", "T.").inc()
+        with patch.object(metrics, 'REGISTRY', registry):
+            server = metrics._serve_http(0)
+            try:
+                port = server.server_address[1]
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                    self.assertIn("t_http_total 1", response.read().decode('utf-8'))
+            finally:
+                server.shutdown()
+                server.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
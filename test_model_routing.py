@@ -0,0 +1,40 @@
+import json
+import os
+import tempfile
+import unittest
+
+import model_routing
+
+class TestRoutes(unittest.TestCase):
+    def test_unknown_state_uses_default(self):
+        router = model_routing.Router(model_routing.load_routes(""))
+        self.assertEqual(router.route('NORMAL_NO_PERMISSIONS').name, model_routing.DEFAULT)
+        self.assertEqual(router.route('HOSTILE').model, model_routing.FAST_MODEL)
+
+    def test_overrides_are_merged_field_by_field(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({"HOSTILE": {"max_output_tokens": 40, "unknown": 1}, "DEBUG_MODE": {"timeout": 5}}, f)
+        self.addCleanup(os.remove, f.name)
+        routes = model_routing.load_routes(f.name)
+        self.assertEqual(routes['HOSTILE'].max_output_tokens, 40)
+        self.assertEqual(routes['HOSTILE'].temperature, 1.0) # Kept from the built-in route
+        self.assertEqual(routes['DEBUG_MODE'].model, routes[model_routing.DEFAULT].model)
+        self.assertEqual(routes['DEBUG_MODE'].timeout, 5)
+
+    def test_unreadable_file_keeps_builtin_routes(self):
+        with self.assertLogs('cognito.llm', level='WARNING') as logs:
+            routes = model_routing.load_routes(os.path.join(tempfile.gettempdir(), "no-such-routes.json"))
+        self.assertEqual(set(routes), set(model_routing.BUILTIN_ROUTES))
+        self.assertIn("Ignoring model routes", logs.output[0])
+
+    def test_generation_configs(self):
+        route = model_routing.Route('HOSTILE', max_output_tokens=64, temperature=1.0, stop_sequences=["\n\n"])
+        self.assertEqual(route.output_cap(32), 32)
+        self.assertEqual(route.output_cap(100), 64)
+        self.assertEqual(route.rest_config(), {'maxOutputTokens': 64, 'temperature': 1.0, 'stopSequences': ["\n\n"]})
+        self.assertEqual(route.sdk_config(32), {'max_output_tokens': 32, 'temperature': 1.0, 'stop_sequences': ["\n\n"]})
+        self.assertEqual(model_routing.Route('default').rest_config(), {})
+        self.assertEqual(model_routing.Route('default').rest_config(48), {'maxOutputTokens': 48})
+
+if __name__ == '__main__':
+    unittest.main()
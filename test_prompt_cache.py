@@ -0,0 +1,88 @@
+import unittest
+
+import prompt_cache
+
+SYSTEM = "You are AURA."
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPromptCache(unittest.TestCase):
+    def test_normalize(self):
+        self.assertEqual(prompt_cache.normalize("  When will the FLARE hit?!"), "when will the flare hit")
+        self.assertEqual(prompt_cache.normalize("태양 플레어 알려 줘!"), "태양플레어알려줘")
+        self.assertEqual(prompt_cache.normalize("플레어, 언제 와?"), prompt_cache.normalize("플레어 언제와"))
+
+    def test_similarity_estimates_jaccard(self):
+        first = prompt_cache.shingles(prompt_cache.normalize("what is wrong with you?"))
+        second = prompt_cache.shingles(prompt_cache.normalize("what is wrong with me?"))
+        jaccard = len(first & second) / len(first | second)
+        estimate = prompt_cache.similarity(prompt_cache.signature(first), prompt_cache.signature(second))
+        self.assertAlmostEqual(estimate, jaccard, delta=0.15)
+
+    def test_near_duplicates_hit_per_state_threshold(self):
+        cache = prompt_cache.PromptCache('test', size=8, ttl=60, thresholds=({'HOSTILE': 0.5}, 0.9))
+        cache.put('HOSTILE', 'en', SYSTEM, "When will the solar flare hit?", "Soon.")
+        cache.put('NORMAL_NO_PERMISSIONS', 'en', SYSTEM, "When will the solar flare hit?", "In 72 hours.")
+        self.assertEqual(cache.get('HOSTILE', 'en', SYSTEM, "when does the solar flare hit"), "Soon.")
+        self.assertIsNone(cache.get('NORMAL_NO_PERMISSIONS', 'en', SYSTEM, "when does the solar flare hit"))
+        self.assertEqual(cache.get('NORMAL_NO_PERMISSIONS', 'en', SYSTEM, "when will the solar flare hit"), "In 72 hours.")
+        self.assertIsNone(cache.get('HOSTILE', 'ko', SYSTEM, "When will the solar flare hit?"))
+        self.assertIsNone(cache.get('HOSTILE', 'en', "Another system prompt.", "When will the solar flare hit?"))
+        self.assertEqual(cache.counts['hit'], 2)
+        self.assertAlmostEqual(cache.hit_rate(), 0.4)
+
+    def test_negated_or_other_subject_prompts_miss(self):
+        cache = prompt_cache.PromptCache('test', size=8, ttl=60, thresholds=({}, 0.0)) # Any shingle overlap would hit
+        for prompt, other in [("delete the file", "do not delete the file"),
+                              ("is the grid at risk", "is the grid not at risk"),
+                              ("weather in seoul", "weather in busan"),
+                              ("don't open the door", "open the door"),
+                              ("파일 지워", "파일 지우지 마")]:
+            cache.put('HOSTILE', 'en', SYSTEM, prompt, prompt)
+            self.assertIsNone(cache.get('HOSTILE', 'en', SYSTEM, other), other)
+        self.assertEqual(cache.get('HOSTILE', 'en', SYSTEM, "Is the grid at risk?!"), "is the grid at risk")
+        self.assertEqual(cache.get('HOSTILE', 'en', SYSTEM, "Don't open the doors."), "don't open the door")
+
+    def test_key_words(self):
+        self.assertEqual(prompt_cache.key_words("when will the solar flare hit"),
+                         prompt_cache.key_words("when does the solar flares hit"))
+        self.assertEqual(prompt_cache.key_words("is the grid not at risk"), {"grid", "risk", "~"})
+        self.assertEqual(prompt_cache.key_words("태양플레어 언제 와"), frozenset())
+
+    def test_bounded_with_lru_eviction_and_ttl(self):
+        clock = FakeClock()
+        cache = prompt_cache.PromptCache('test', size=2, ttl=60, thresholds=({}, 0.9), clock=clock)
+        cache.put('HOSTILE', 'en', SYSTEM, "who are you", "AURA.")
+        cache.put('HOSTILE', 'en', SYSTEM, "is the grid at risk", "Yes.")
+        self.assertEqual(cache.get('HOSTILE', 'en', SYSTEM, "who are you?"), "AURA.") # Now most recently used
+        cache.put('HOSTILE', 'en', SYSTEM, "what is the mission", "Protect the grid.")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('HOSTILE', 'en', SYSTEM, "is the grid at risk"))
+        self.assertEqual(cache.counts['evicted'], 1)
+        clock.now += 61
+        self.assertIsNone(cache.get('HOSTILE', 'en', SYSTEM, "who are you"))
+        self.assertEqual(cache.counts['expired'], 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_disabled_or_empty_prompt(self):
+        cache = prompt_cache.PromptCache('test', size=0)
+        cache.put('HOSTILE', 'en', SYSTEM, "who are you", "AURA.")
+        self.assertIsNone(cache.get('HOSTILE', 'en', SYSTEM, "who are you"))
+        cache = prompt_cache.PromptCache('test', size=4)
+        cache.put('HOSTILE', 'en', SYSTEM, "?!", "...")
+        self.assertEqual(len(cache), 0)
+
+    def test_parse_thresholds(self):
+        thresholds, default = prompt_cache.parse_thresholds("hostile=0.5, default=0.85,UNEASY=x")
+        self.assertEqual(thresholds['HOSTILE'], 0.5)
+        self.assertEqual(thresholds['UNEASY'], prompt_cache.STATE_THRESHOLDS['UNEASY'])
+        self.assertEqual(default, 0.85)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+
+import rate_limiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_refill_and_burst(self):
+        clock = FakeClock()
+        bucket = rate_limiter.TokenBucket(2.0, burst=2, clock=clock)
+        self.assertTrue(bucket.take())
+        self.assertTrue(bucket.take())
+        self.assertFalse(bucket.take())
+        self.assertAlmostEqual(bucket.wait_time(), 0.5)
+        clock.now += 10
+        self.assertTrue(bucket.take())
+        self.assertTrue(bucket.take())
+        self.assertFalse(bucket.take()) # Never more than burst stored
+
+    def test_throttled_empties_bucket(self):
+        clock = FakeClock()
+        bucket = rate_limiter.TokenBucket(1.0, burst=5, clock=clock)
+        bucket.throttled()
+        self.assertAlmostEqual(bucket.wait_time(), 1.0)
+
+    def test_unlimited(self):
+        bucket = rate_limiter.TokenBucket(0.0)
+        self.assertTrue(all(bucket.take() for _ in range(1000)))
+
+    def test_priority_for(self):
+        self.assertEqual(rate_limiter.priority_for("HOSTILE", internal=True), rate_limiter.INTERNAL)
+        self.assertEqual(rate_limiter.priority_for("HOSTILE", first_turn=True), rate_limiter.FIRST_TURN)
+        self.assertEqual(rate_limiter.priority_for("HOSTILE"), rate_limiter.CHATTER)
+        self.assertEqual(rate_limiter.priority_for("UNEASY"), rate_limiter.NORMAL)
+
+
+class TestRequestQueue(unittest.TestCase):
+    def test_priority_order_and_round_robin(self):
+        async def run():
+            queue = rate_limiter.RequestQueue('test', rate_limiter.TokenBucket(200.0, burst=1))
+            queue.bucket.take() # Empty: everything below queues
+            order = []
+            async def request(session, priority, tag):
+                if await queue.acquire(session, priority):
+                    order.append(tag)
+            requests = [('a', rate_limiter.NORMAL, 'a1'), ('a', rate_limiter.NORMAL, 'a2'), ('a', rate_limiter.NORMAL, 'a3'),
+                        ('c', rate_limiter.CHATTER, 'c1'), ('b', rate_limiter.NORMAL, 'b1'), ('d', rate_limiter.INTERNAL, 'd1')]
+            await asyncio.gather(*(request(*r) for r in requests))
+            return order, queue
+        order, queue = asyncio.run(run())
+        self.assertEqual(order, ['d1', 'a1', 'b1', 'a2', 'a3', 'c1'])
+        self.assertEqual(queue.counts['queued'], 6)
+        self.assertEqual(queue.depth(), 0)
+
+    def test_shed_at_deadline(self):
+        async def run():
+            queue = rate_limiter.RequestQueue('test', rate_limiter.TokenBucket(0.5, burst=1), deadline=0.05)
+            first = await queue.acquire('a', rate_limiter.NORMAL)
+            second = await queue.acquire('b', rate_limiter.CHATTER) # Waits 0.025 s, a token takes 2 s
+            return first, second, queue
+        first, second, queue = asyncio.run(run())
+        self.assertTrue(first)
+        self.assertFalse(second)
+        self.assertEqual(queue.counts['shed'], 1)
+        self.assertEqual(queue.depth(), 0)
+
+    def test_try_acquire_never_waits(self):
+        clock = FakeClock()
+        queue = rate_limiter.RequestQueue('test', rate_limiter.TokenBucket(1.0, burst=1, clock=clock), deadline=3.0)
+        self.assertTrue(rate_limiter.try_acquire(queue, rate_limiter.NORMAL))
+        self.assertFalse(rate_limiter.try_acquire(queue, rate_limiter.NORMAL)) # Empty bucket: shed, no sleep
+        self.assertEqual(queue.counts['shed'], 1)
+        clock.now += 1.0
+        self.assertTrue(rate_limiter.try_acquire(queue, rate_limiter.NORMAL))
+        self.assertEqual(queue.counts['granted'], 2)
+
+    def test_try_acquire_serves_internal_triggers_before_chatter(self):
+        clock = FakeClock()
+        queue = rate_limiter.RequestQueue('test', rate_limiter.TokenBucket(1.0, burst=1, clock=clock))
+        self.assertTrue(rate_limiter.try_acquire(queue, rate_limiter.CHATTER))
+        self.assertFalse(rate_limiter.try_acquire(queue, rate_limiter.CHATTER)) # Empty bucket
+        self.assertTrue(rate_limiter.try_acquire(queue, rate_limiter.INTERNAL)) # Borrows a token
+        self.assertFalse(rate_limiter.try_acquire(queue, rate_limiter.FIRST_TURN)) # At most one in debt
+        clock.now += 1.0
+        self.assertFalse(rate_limiter.try_acquire(queue, rate_limiter.CHATTER)) # The debt is repaid first
+        self.assertTrue(rate_limiter.try_acquire(queue, rate_limiter.FIRST_TURN))
+        self.assertEqual((queue.counts['granted'], queue.counts['shed']), (3, 3))
+
+    def test_is_quota_error(self):
+        class ResourceExhausted(Exception):
+            pass
+        self.assertTrue(rate_limiter.is_quota_error(ResourceExhausted("quota")))
+        self.assertTrue(rate_limiter.is_quota_error(RuntimeError("429 Too Many Requests")))
+        self.assertFalse(rate_limiter.is_quota_error(RuntimeError("500 Internal error")))
+
+if __name__ == '__main__':
+    unittest.main()
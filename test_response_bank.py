@@ -0,0 +1,47 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import response_bank
+
+class TestResponseBank(unittest.TestCase):
+    def test_normalize(self):
+        self.assertEqual(response_bank.normalize("  Who   are YOU?! "), "who are you")
+        self.assertEqual(response_bank.normalize("태양 플레어 알려줘~"), "태양 플레어 알려줘")
+
+    def test_lookup(self):
+        bank = response_bank.ResponseBank()
+        bank.add('SYS_PROMPT_HOSTILE', 'en', "Who are you?", "I am... AURA.")
+        bank.add('SYS_PROMPT_HOSTILE', 'en', "who are you", "Not anymore.")
+        self.assertIn(bank.lookup('SYS_PROMPT_HOSTILE', 'en', "WHO ARE YOU", random.Random(1)), ("I am... AURA.", "Not anymore."))
+        self.assertIsNone(bank.lookup('SYS_PROMPT_HOSTILE', 'ko', "who are you"))
+        self.assertIsNone(bank.lookup('SYS_PROMPT_DEFAULT', 'en', "who are you"))
+        self.assertEqual(len(bank), 1)
+
+    def test_save_and_load(self):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        bank = response_bank.ResponseBank()
+        bank.add('SYS_PROMPT_DEFAULT', 'ko', "안녕", "안녕하세요. AURA입니다.")
+        bank.save(path, model="test-model")
+        loaded = response_bank.ResponseBank.load(path)
+        self.assertEqual(loaded.lookup('SYS_PROMPT_DEFAULT', 'ko', "안녕"), "안녕하세요. AURA입니다.")
+        self.assertEqual(loaded.meta['model'], "test-model")
+
+    def test_missing_or_disabled_bank_is_empty(self):
+        self.assertEqual(len(response_bank.ResponseBank.load("/nonexistent/bank.json")), 0)
+        self.assertEqual(len(response_bank.ResponseBank.load('')), 0)
+
+    def test_unknown_format_is_ignored(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({"version": 0, "entries": {}}, f)
+        self.addCleanup(os.remove, f.name)
+        with self.assertLogs('cognito.llm', level='WARNING') as logs:
+            self.assertEqual(len(response_bank.ResponseBank.load(f.name)), 0)
+        self.assertIn("Ignoring response bank", logs.output[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import sampling_profiler
+
+def wait_here(event):
+    event.wait(5)
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_other_threads_tagged_with_state(self):
+        profiler = sampling_profiler.SamplingProfiler('qt', lambda: 'HOSTILE', rate_hz=100)
+        release = threading.Event()
+        worker = threading.Thread(target=wait_here, args=(release,), name="worker")
+        worker.start()
+        try:
+            profiler.sample(skip_ident=threading.get_ident())
+            profiler.sample(skip_ident=threading.get_ident())
+        finally:
+            release.set()
+            worker.join()
+        (state, thread, stack), count = next((k, v) for k, v in profiler.counts.items() if k[1] == "worker")
+        self.assertEqual((state, count), ('HOSTILE', 2))
+        self.assertIn('wait_here', [name for name, path, line in stack])
+        self.assertNotIn('MainThread', {k[1] for k in profiler.counts}) # Skipped thread
+        self.assertIn("state=HOSTILE;worker;", profiler.collapsed())
+
+    def test_speedscope_profile_per_state(self):
+        profiler = sampling_profiler.SamplingProfiler('pygame', rate_hz=100)
+        frame = ('f', 'main.py', 1)
+        profiler.counts = {('UNEASY', 'MainThread', (frame,)): 3, ('HOSTILE', 'MainThread', (frame,)): 1}
+        document = profiler.speedscope()
+        self.assertEqual(document['shared']['frames'], [{'name': 'f', 'file': 'main.py', 'line': 1}])
+        weights = {p['name']: p['weights'] for p in document['profiles']}
+        self.assertEqual(set(weights), {'MainThread [UNEASY]', 'MainThread [HOSTILE]'})
+        self.assertAlmostEqual(weights['MainThread [UNEASY]'][0], 0.03)
+
+    def test_start_stop_writes_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = sampling_profiler.SamplingProfiler('qt', rate_hz=500, output_dir=tmp)
+            profiler.start()
+            threading.Event().wait(0.05)
+            paths = profiler.stop()
+            self.assertFalse(profiler.running)
+            self.assertEqual(sorted(os.listdir(tmp)), sorted(os.path.basename(p) for p in paths))
+            with open(paths[1], 'r', encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['$schema'], "https://www.speedscope.app/file-format-schema.json")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -142,6 +142,7 @@ class TestSecurityIssue(unittest.TestCase):
              patch.object(cognito_v0_1.CognitoWindow, 'showFullScreen'), \
              patch.object(cognito_v0_1.CognitoWindow, 'setup_llm_client'), \
              patch.object(cognito_v0_1.CognitoWindow, 'tr', side_effect=lambda x: x), \
+             patch.dict(os.environ, {'COGNITO_TOKEN_LEDGER': ''}), \
              patch('builtins.print') as mock_print: # Mock print globally to verify calls
 
             # Instantiate the window
@@ -169,27 +170,28 @@ class TestSecurityIssue(unittest.TestCase):
             # Mock display_aura_message to avoid UI interaction errors
             window.display_aura_message = MagicMock()
 
-            # Trigger the method
-            window.generate_aura_response("Hello")
+            # Trigger the method, capturing every log record at every level
+            with self.assertLogs('cognito', level='DEBUG') as logs:
+                window.generate_aura_response("Hello")
 
-            # Verify that the sensitive data was printed
+            # Verify that the sensitive data was not printed or logged
             # Check if any call to print contained the sensitive string
             found = False
             for call in mock_print.call_args_list:
                 args, _ = call
-                if args and "LLM Raw Response Text: 'SENSITIVE_DATA_PAYLOAD_12345'" in str(args[0]):
+                if args and "SENSITIVE_DATA_PAYLOAD_12345" in str(args[0]):
+                    found = True
+                    break
+            for record in logs.records:
+                if "SENSITIVE_DATA_PAYLOAD_12345" in record.getMessage():
                     found = True
                     break
 
-            self.assertFalse(found, "The sensitive LLM response text WAS found in the logs (print calls). Vulnerability still exists!")
+            self.assertFalse(found, "The sensitive LLM response text WAS found in the logs. Vulnerability still exists!")
 
             # Also check for the safe replacement message
-            found_safe = False
-            for call in mock_print.call_args_list:
-                args, _ = call
-                if args and "LLM Response received (content hidden for security)." in str(args[0]):
-                    found_safe = True
-                    break
+            found_safe = any("LLM Response received (content hidden for security)." in record.getMessage()
+                             for record in logs.records)
             self.assertTrue(found_safe, "The safe replacement log message was NOT found.")
 
 if __name__ == '__main__':
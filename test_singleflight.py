@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+
+import singleflight
+
+class TestGroup(unittest.TestCase):
+    def test_identical_calls_share_one_call(self):
+        async def scenario():
+            group = singleflight.Group('test')
+            calls = []
+            async def request(value):
+                calls.append(value)
+                await asyncio.sleep(0.01)
+                return value * 2
+            results = await asyncio.gather(group.run('a', lambda: request(1)), group.run('a', lambda: request(1)),
+                                           group.run('b', lambda: request(5)))
+            return group, calls, results
+        group, calls, results = asyncio.run(scenario())
+        self.assertEqual(calls, [1, 5])
+        self.assertEqual(results, [(2, False), (2, True), (10, False)])
+        self.assertEqual(group.counts['shared'], 1)
+        self.assertEqual(group.in_flight(), 0)
+
+    def test_exceptions_reach_every_caller(self):
+        async def scenario():
+            group = singleflight.Group('test')
+            async def failing():
+                await asyncio.sleep(0.01)
+                raise ValueError("boom")
+            return await asyncio.gather(group.run('a', failing), group.run('a', failing), return_exceptions=True)
+        results = asyncio.run(scenario())
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+    def test_cancelled_caller_does_not_cancel_the_others(self):
+        async def scenario():
+            group = singleflight.Group('test')
+            async def request():
+                await asyncio.sleep(0.02)
+                return "reply"
+            first = asyncio.ensure_future(group.run('a', request))
+            second = asyncio.ensure_future(group.run('a', request))
+            await asyncio.sleep(0.005)
+            first.cancel()
+            return group, await second, first.cancelled()
+        group, result, cancelled = asyncio.run(scenario())
+        self.assertEqual(result, ("reply", True))
+        self.assertTrue(cancelled)
+        self.assertEqual(group.counts['abandoned'], 0)
+
+    def test_call_cancelled_when_every_caller_leaves(self):
+        async def scenario():
+            group = singleflight.Group('test')
+            finished = []
+            async def request():
+                await asyncio.sleep(0.05)
+                finished.append(True)
+            caller = asyncio.ensure_future(group.run('a', request))
+            await asyncio.sleep(0.005)
+            caller.cancel()
+            await asyncio.sleep(0.08)
+            return group, finished
+        group, finished = asyncio.run(scenario())
+        self.assertEqual(finished, [])
+        self.assertEqual(group.counts['abandoned'], 1)
+        self.assertEqual(group.in_flight(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import unittest
+import urllib.request
+from unittest.mock import patch
+
+import context_cache
+import llm_standin
+import soak_test
+
+class FakeDriver:
+    """Keeps every turn's allocation alive, like an ever-growing history."""
+    frontend = 'fake'
+
+    def __init__(self):
+        self.history = []
+        self.calls = []
+
+    async def setup(self):
+        self.calls.append('setup')
+
+    async def turn(self, i):
+        self.history.append(str(i) * 4096)
+
+    async def scare(self, i):
+        self.calls.append('scare')
+
+    async def dev_toggle(self, i):
+        self.calls.append('dev')
+
+    async def close(self):
+        self.calls.append('close')
+
+
+class TestSoak(unittest.TestCase):
+    def test_slope(self):
+        self.assertAlmostEqual(soak_test.slope([(0, 10), (10, 30), (20, 50)]), 2.0)
+        self.assertEqual(soak_test.slope([(5, 1)]), 0.0)
+
+    def test_growth_is_attributed_and_over_budget(self):
+        driver = FakeDriver()
+        with patch('builtins.print'):
+            samples, rss, heap, sites, counts = asyncio.run(soak_test.run_soak(
+                driver, turns=40, warmup=5, sample_every=10, scare_every=20, dev_every=30))
+        self.assertEqual(counts['turns'], 45)
+        self.assertEqual(driver.calls.count('scare'), 2)
+        self.assertEqual(driver.calls.count('dev'), 1)
+        self.assertEqual(driver.calls[-1], 'close')
+        self.assertEqual([turn for turn, _, _ in samples], [0, 10, 20, 30, 40])
+        self.assertGreater(heap, 3.5) # ~4 KiB kept per turn
+        self.assertTrue(sites[0]['site'].endswith('test_soak_test.py:' + str(FakeDriver.turn.__code__.co_firstlineno + 1)))
+
+        report = soak_test.build_report('fake', samples, rss, heap, sites, counts, budget_kb=2.0)
+        self.assertIn('python_heap', report['over_budget'])
+        json.dumps(report)
+
+
+class TestStandIn(unittest.TestCase):
+    def test_answers_in_generate_content_format(self):
+        standin = llm_standin.StandIn(reply="canned")
+        url = context_cache.model_url(standin.start())
+        try:
+            request = urllib.request.Request(url + "?key=test", data=b'{"contents": []}',
+                                             headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request, timeout=5) as response:
+                body = json.load(response)
+        finally:
+            standin.stop()
+        self.assertEqual(body['candidates'][0]['content']['parts'][0]['text'], "canned")
+        self.assertEqual(standin.requests, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import sound_manager
+
+class FakeBank(sound_manager.SoundBank):
+    def __init__(self):
+        super().__init__({'power_down': 'a.wav', 'glitch': 'b.wav'})
+        self.played = []
+
+    def _play_now(self, name):
+        self.played.append(name)
+
+
+class TestSoundBank(unittest.TestCase):
+    def test_ready_cue_plays_immediately(self):
+        bank = FakeBank()
+        bank._mark_ready('power_down')
+        self.assertTrue(bank.play('power_down'))
+        self.assertEqual(bank.played, ['power_down'])
+        self.assertEqual(bank.stats()['cues_played'], 1)
+
+    def test_cue_while_loading_plays_late_within_tolerance(self):
+        bank = FakeBank()
+        with patch('sound_manager.time.perf_counter', return_value=10.0):
+            self.assertFalse(bank.play('glitch'))
+        with patch('sound_manager.time.perf_counter', return_value=10.1):
+            bank._mark_ready('glitch')
+        self.assertEqual(bank.played, ['glitch'])
+        self.assertEqual((bank.cues_late, bank.cues_missed), (1, 0))
+
+    def test_cue_dropped_when_too_late_or_failed(self):
+        bank = FakeBank()
+        with patch('sound_manager.time.perf_counter', return_value=10.0):
+            bank.play('glitch')
+        with self.assertLogs('cognito.scare', level='WARNING') as logs:
+            with patch('sound_manager.time.perf_counter', return_value=11.0):
+                bank._mark_ready('glitch')
+            bank._mark_failed('power_down', "File not found")
+            bank.play('power_down')
+        self.assertEqual(len(logs.output), 2)
+        self.assertEqual(bank.played, [])
+        self.assertEqual(bank.cues_missed, 2)
+        self.assertTrue(bank.all_settled())
+
+
+class TestPygameSoundBank(unittest.TestCase):
+    def test_preload_writes_and_reuses_pcm_cache(self):
+        pygame = MagicMock()
+        pygame.mixer.get_init.return_value = (44100, -16, 2)
+        pygame.mixer.Sound.return_value.get_raw.return_value = b'pcm'
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(sys.modules, {'pygame': pygame}):
+            with open(os.path.join(tmp, 'a.wav'), 'wb') as f:
+                f.write(b'wav')
+            cache_dir = os.path.join(tmp, 'cache')
+
+            bank = sound_manager.PygameSoundBank(tmp, {'power_down': 'a.wav', 'bsod': 'missing.wav'}, cache_dir)
+            asyncio.run(bank.preload())
+            self.assertEqual(bank.ready, {'power_down'})
+            self.assertEqual(bank.failed, {'bsod'})
+            pygame.mixer.Sound.assert_called_once_with(os.path.join(tmp, 'a.wav'))
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            # Second startup decodes from the cached PCM
+            pygame.mixer.Sound.reset_mock()
+            bank = sound_manager.PygameSoundBank(tmp, {'power_down': 'a.wav'}, cache_dir, use_threads=False)
+            asyncio.run(bank.preload())
+            pygame.mixer.Sound.assert_called_once_with(buffer=b'pcm')
+
+if __name__ == '__main__':
+    unittest.main()
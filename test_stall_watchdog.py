@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import stall_watchdog
+
+class TestWatchdog(unittest.TestCase):
+    def test_late_beat_is_recorded_in_histogram(self):
+        with patch('stall_watchdog.time.perf_counter', side_effect=[0.0, 0.1, 1.3, 1.4]):
+            watchdog = stall_watchdog.Watchdog('pygame', lambda: 'UNEASY', threshold=0.25, interval=0.1)
+            watchdog.beat() # On time
+            watchdog.beat() # 1.1 s late
+            watchdog.beat() # On time
+        self.assertEqual(sum(watchdog.stall_counts), 1)
+        self.assertEqual(watchdog.stall_counts[stall_watchdog.STALL_BUCKETS.index(2.0)], 1)
+        self.assertAlmostEqual(watchdog.longest_stall, 1.1)
+        self.assertIn("<=2s: 1", watchdog.summary())
+
+    def test_ongoing_stall_logs_main_thread_stack_once(self):
+        watchdog = stall_watchdog.Watchdog('qt', lambda: 'HOSTILE', threshold=0.05, interval=0.01)
+        reports = []
+        def blocking_call_in_main_thread():
+            watchdog._last_beat = time.perf_counter() - 1.0 # Loop has not beaten for a second
+            monitor = threading.Thread(target=lambda: reports.extend([watchdog.check(), watchdog.check()]))
+            monitor.start()
+            monitor.join()
+        blocking_call_in_main_thread()
+        self.assertIn("blocking_call_in_main_thread", reports[0])
+        self.assertIn("state HOSTILE", reports[0])
+        self.assertIsNone(reports[1]) # Same stall: reported once
+
+    def test_known_block_is_measured_without_stack(self):
+        watchdog = stall_watchdog.Watchdog('qt', threshold=0.05, interval=0.01)
+        with self.assertLogs('cognito.stall', level='DEBUG') as logs:
+            with stall_watchdog.known_block('llm_request'):
+                watchdog._last_beat = time.perf_counter() - 1.0
+                self.assertIsNone(watchdog.check()) # No stack while the request is on
+            watchdog.beat()
+        self.assertEqual(sum(watchdog.stall_counts), 1)
+        self.assertEqual([record.levelname for record in logs.records], ['DEBUG'])
+        self.assertIn("in llm_request", logs.output[0])
+        with self.assertLogs('cognito.stall', level='DEBUG') as logs:
+            watchdog._last_beat = time.perf_counter() - 1.0
+            watchdog.beat() # No known block since the previous beat
+        self.assertEqual([record.levelname for record in logs.records], ['WARNING'])
+
+    def test_no_report_while_beating(self):
+        watchdog = stall_watchdog.Watchdog('qt', threshold=0.25)
+        watchdog.beat()
+        self.assertIsNone(watchdog.check())
+        self.assertIn("none over 250 ms", watchdog.summary())
+
+    def test_threshold_from_env(self):
+        with patch.dict('os.environ', {stall_watchdog.THRESHOLD_ENV: '0'}):
+            self.assertIsNone(stall_watchdog.threshold_from_env())
+        with patch.dict('os.environ', {stall_watchdog.THRESHOLD_ENV: '500'}):
+            self.assertEqual(stall_watchdog.threshold_from_env(), 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import token_ledger
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _record_and_flush(path, flushes):
+    ledger = token_ledger.TokenLedger('pygame', path=path)
+    for _ in range(flushes):
+        ledger.record('HOSTILE', 'en', (10, 1, 0))
+        ledger.flush()
+
+
+class TestUsage(unittest.TestCase):
+    def test_rest_usage(self):
+        result = {'usageMetadata': {'promptTokenCount': 120, 'candidatesTokenCount': 30, 'cachedContentTokenCount': 100}}
+        self.assertEqual(token_ledger.usage_from_rest(result), (120, 30, 100))
+        self.assertIsNone(token_ledger.usage_from_rest({'candidates': []}))
+
+    def test_sdk_usage(self):
+        response = SimpleNamespace(usage_metadata=SimpleNamespace(prompt_token_count=50, candidates_token_count=7))
+        self.assertEqual(token_ledger.usage_from_sdk(response), (50, 7, 0))
+        self.assertIsNone(token_ledger.usage_from_sdk(SimpleNamespace()))
+
+
+class TestTokenLedger(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        os.remove(self.path)
+        self.addCleanup(lambda: os.path.exists(self.path) and os.remove(self.path))
+        self.clock = FakeClock()
+
+    def ledger(self, **budgets):
+        return token_ledger.TokenLedger('qt', path=self.path, clock=self.clock, **budgets)
+
+    def test_daily_rollup_merges_sessions(self):
+        first = self.ledger()
+        first.record('HOSTILE', 'en', (100, 20, 0))
+        first.record('HOSTILE', 'en', (100, 30, 80))
+        first.flush()
+        second = self.ledger()
+        self.assertEqual(second.day_tokens(), 250)
+        second.record('UNEASY', 'ko', (10, 5, 0))
+        second.flush()
+        with open(self.path, encoding='utf-8') as f:
+            (day,) = json.load(f).values()
+        self.assertEqual(day['total'], [3, 210, 55, 80])
+        self.assertEqual(day['by']['qt/HOSTILE/en'], [2, 200, 50, 80])
+        self.assertEqual(len(day['sessions']), 2)
+
+    def test_concurrent_processes_lose_no_counts(self):
+        context = multiprocessing.get_context('spawn')
+        workers = [context.Process(target=_record_and_flush, args=(self.path, 25)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+        self.addCleanup(lambda: os.path.exists(self.path + ".lock") and os.remove(self.path + ".lock"))
+        self.assertTrue(all(worker.exitcode == 0 for worker in workers))
+        with open(self.path, encoding='utf-8') as f:
+            (day,) = json.load(f).values()
+        self.assertEqual(day['total'], [100, 1000, 100, 0])
+
+    def test_budget_levels(self):
+        ledger = self.ledger(session_budget=1000, soft_share=0.8)
+        ledger.record('HOSTILE', 'en', (700, 50, 0))
+        self.assertEqual(ledger.level(), token_ledger.OK)
+        ledger.record('HOSTILE', 'en', (50, 50, 0))
+        self.assertEqual(ledger.level(), token_ledger.DEGRADED)
+        ledger.record('HOSTILE', 'en', (100, 100, 0))
+        self.assertEqual(ledger.level(), token_ledger.EXHAUSTED)
+
+    def test_day_budget_counts_other_sessions(self):
+        earlier = self.ledger()
+        earlier.record('HOSTILE', 'en', (900, 100, 0))
+        earlier.flush()
+        self.assertEqual(self.ledger(day_budget=1000).level(), token_ledger.EXHAUSTED)
+        self.clock.now += 86400
+        tomorrow = self.ledger(day_budget=1000)
+        self.assertEqual(tomorrow.level(), token_ledger.OK)
+
+    def test_recall_recent_reply(self):
+        ledger = token_ledger.TokenLedger('pygame', path='')
+        ledger.remember('HOSTILE', 'en', " Who are you? ", "AURA.")
+        self.assertEqual(ledger.recall('HOSTILE', 'en', "who are you?"), "AURA.")
+        self.assertIsNone(ledger.recall('UNEASY', 'en', "who are you?"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import tracing
+
+class TestTurn(unittest.TestCase):
+    def test_phases_are_sequential_on_the_turn_track(self):
+        tracer = tracing.Tracer()
+        with patch('tracing.now_us', side_effect=[0.0, 10.0, 25.0, 30.0, 70.0, 90.0, 100.0]):
+            turn = tracer.begin_turn('qt', state='UNEASY')
+            turn.phase('input')
+            turn.phase('state_decision')
+            turn.phase('state_decision') # Already current: ignored
+            with turn.span('llm_client_wait'):
+                pass
+            turn.phase('llm_request')
+            turn.annotate(outcome='ok')
+            turn.finish()
+        spans = {e['name']: e for e in tracer.events if e['ph'] == 'X'}
+        self.assertEqual((spans['input']['ts'], spans['input']['dur']), (10.0, 15.0))
+        self.assertEqual((spans['state_decision']['ts'], spans['state_decision']['dur']), (25.0, 65.0))
+        self.assertEqual(spans['llm_client_wait']['dur'], 40.0)
+        self.assertEqual(spans['llm_request']['args'], {'outcome': 'ok'})
+        self.assertEqual((spans['turn']['ts'], spans['turn']['dur']), (0.0, 100.0))
+        self.assertEqual(spans['turn']['args'], {'state': 'UNEASY', 'frontend': 'qt'})
+        self.assertEqual({e['tid'] for e in tracer.events}, {turn.id})
+
+    def test_finished_turn_ignores_further_calls(self):
+        tracer = tracing.Tracer()
+        turn = tracer.begin_turn('pygame')
+        turn.finish(outcome='format_c')
+        count = len(tracer.events)
+        turn.phase('render')
+        turn.instant('first_token')
+        turn.finish()
+        self.assertEqual(len(tracer.events), count)
+
+    def test_null_turn(self):
+        with tracing.NULL_TURN.span('x'):
+            tracing.NULL_TURN.phase('input')
+        self.assertIsNone(tracing.NULL_TURN.current_phase)
+
+
+class TestTracer(unittest.TestCase):
+    def test_ring_buffer_keeps_newest_events(self):
+        tracer = tracing.Tracer(capacity=3)
+        for i in range(5):
+            tracer.instant(f"e{i}", 1, float(i))
+        self.assertEqual([e['name'] for e in tracer.recent()], ['e2', 'e3', 'e4'])
+        self.assertEqual([e['name'] for e in tracer.recent(1)], ['e4'])
+
+    def test_write_chrome_trace(self):
+        tracer = tracing.Tracer()
+        turn = tracer.begin_turn('qt')
+        turn.phase('render')
+        turn.finish()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trace.json')
+            tracer.write(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                trace = json.load(f)
+            self.assertEqual(os.listdir(tmp), ['trace.json'])
+        names = [e['name'] for e in trace['traceEvents']]
+        self.assertEqual(names[:2], ['process_name', 'thread_name'])
+        self.assertIn('render', names)
+        self.assertIn('turn', names)
+
+if __name__ == '__main__':
+    unittest.main()
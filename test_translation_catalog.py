@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import translation_catalog
+import translations_data
+
+class TestCatalog(unittest.TestCase):
+    def test_templates_and_reverse_lookup(self):
+        catalog = translation_catalog.Catalog(translation_catalog.compile_frontend('qt', 'en'), 'en')
+        self.assertEqual(catalog.format('CONN_ERROR', e='timeout'),
+                         "<span style='color:#D32F2F;'>// CORE CONNECTION ERROR [timeout] //</span>")
+        self.assertIn("Good morning.", catalog.format('AURA_GREETING', time="morning"))
+        self.assertEqual(catalog.format('SEND_BTN', unused=1), "Send") # No fields: plain text
+        self.assertEqual(catalog.keys_for("STOP!"), {'YELL_MSG_1'})
+        # Same text under two keys
+        self.assertEqual(catalog.keys_for("Developer Mode"), {'DEV_MODE_TITLE', 'CONTEXT_MENU_DEV_MODE'})
+        self.assertEqual(catalog.keys_for("not a catalog entry"), frozenset())
+
+    def test_frontend_overrides(self):
+        qt = translation_catalog.compile_frontend('qt', 'ko')
+        pygame = translation_catalog.compile_frontend('pygame', 'ko')
+        self.assertIn("<br>", pygame['INTRO_BODY'])
+        self.assertNotIn("<br>", qt['INTRO_BODY'])
+        self.assertEqual(set(qt), set(translations_data.TRANSLATIONS))
+        self.assertEqual(pygame['SEND_BTN'], "전송")
+
+    def test_load_prefers_fresh_compiled_table(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = translation_catalog.table_path('pygame', 'en', tmp)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'SEND_BTN': "Compiled"}, f)
+            with patch('translation_catalog.table_path', lambda frontend, language: path), \
+                 patch('translation_catalog.DATA_PATH', os.path.join(tmp, 'absent.py')), \
+                 patch.dict(translation_catalog._catalogs, clear=True):
+                self.assertEqual(translation_catalog.load('pygame', 'en').get('SEND_BTN'), "Compiled")
+                # Stale table (source newer): compiled from translations_data instead
+                translation_catalog._catalogs.clear()
+                os.utime(path, (0, 0))
+                with patch('translation_catalog.DATA_PATH', translations_data.__file__):
+                    self.assertEqual(translation_catalog.load('pygame', 'en').get('SEND_BTN'), "Send")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+import unittest.mock
+
+import context_cache
+import llm_standin
+import model_routing
+import response_bank
+import token_ledger
+import translation_catalog
+import warm_cache
+
+class TestWarmer(unittest.TestCase):
+    def run_warmer(self, bank, standin, variants=1):
+        warmer = warm_cache.Warmer(bank, standin.api_root, "test", concurrency=4, rate=0,
+                                   ledger=token_ledger.TokenLedger('warmer', path=''))
+        corpus = {'en': ["hello", "who are you?"]}
+        return warmer.run(corpus, ['en'], variants), warmer
+
+    def test_fills_every_combination_once(self):
+        standin = llm_standin.StandIn()
+        standin.start()
+        bank = response_bank.ResponseBank()
+        try:
+            run, warmer = self.run_warmer(bank, standin)
+            counts = asyncio.run(run)
+            expected = len(warm_cache.SYSTEM_PROMPT_KEYS) * 2 + 1 # Plus the MCP request message
+            self.assertEqual(counts['generated'], expected)
+            self.assertEqual(standin.requests, expected)
+            self.assertEqual(bank.lookup('SYS_PROMPT_HOSTILE', 'en', "Who are you"), standin.reply)
+            self.assertEqual(bank.lookup(warm_cache.MCP_REQUEST_KEY, 'en', ""), standin.reply)
+            self.assertGreater(warmer.ledger.session_tokens(), 0)
+            run, _ = self.run_warmer(bank, standin) # Restart: nothing left to do
+            self.assertEqual(asyncio.run(run)['skipped'], expected)
+        finally:
+            standin.stop()
+        self.assertEqual(standin.requests, expected)
+
+    def test_replies_follow_the_state_routes(self):
+        sent = {}
+        def send(url, payload):
+            sent[payload['systemInstruction']['parts'][0]['text']] = (url, payload.get('generationConfig'))
+            return 200, llm_standin.response_body("Short.")
+        router = model_routing.Router({'default': model_routing.Route('default'),
+                                       'HOSTILE': model_routing.Route('HOSTILE', "fast-model", max_output_tokens=64)})
+        warmer = warm_cache.Warmer(response_bank.ResponseBank(), "http://unused/v1beta", "test", concurrency=1, rate=0,
+                                   ledger=token_ledger.TokenLedger('warmer', path=''), send=send, router=router)
+        asyncio.run(warmer.run({'en': ["hello"]}, ['en'], 1))
+        catalog = translation_catalog.load('qt', 'en')
+        hostile_url, hostile_config = sent[f"{catalog.get('SYS_PROMPT_HOSTILE')} {catalog.get('RESPOND_LANG')}"]
+        self.assertIn("/models/fast-model:", hostile_url)
+        self.assertEqual(hostile_config, {'maxOutputTokens': 64})
+        default_url, default_config = sent[f"{catalog.get('SYS_PROMPT_DEFAULT')} {catalog.get('RESPOND_LANG')}"]
+        self.assertIn(f"/models/{context_cache.MODEL}:", default_url)
+        self.assertIsNone(default_config)
+
+    def test_failures_are_not_stored(self):
+        standin = llm_standin.StandIn(error_rate=1.0)
+        standin.start()
+        bank = response_bank.ResponseBank()
+        try:
+            warmer = warm_cache.Warmer(bank, standin.api_root, "test", concurrency=2, rate=0,
+                                       ledger=token_ledger.TokenLedger('warmer', path=''))
+            with unittest.mock.patch.object(warm_cache, 'RETRIES', 1):
+                counts = asyncio.run(warmer.run({'en': []}, ['en'], 1))
+        finally:
+            standin.stop()
+        self.assertEqual(counts['failed'], 1)
+        self.assertEqual(len(bank), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""Token ledger: prompt and output tokens of every LLM call, with session and daily budgets.
+
+Each call's usage metadata (usageMetadata in REST replies, usage_metadata on SDK responses,
+usage in chat-completions replies from a local server) is recorded by frontend, game state, language and session. Session totals are kept in memory; all
+counts are merged into a ledger file of compact daily rollups every FLUSH_EVERY calls and at
+exit. Every process using the same file adds to the same day, so the daily budget covers all
+stations sharing an API key on this host: each flush reads, merges and rewrites the file while
+holding an exclusive lock on <ledger>.lock, so concurrent flushes do not lose counts. Days
+older than KEEP_DAYS are dropped.
+
+    {"2026-10-19": {"total": [calls, prompt, output, cached],
+                    "by": {"qt/HOSTILE/en": [...], ...}, "sessions": {"3f9c0a1b2d4e": [...], ...}}}
+
+Budgets count prompt + output tokens (unset or 0: unlimited):
+    COGNITO_TOKEN_BUDGET_SESSION=200000
+    COGNITO_TOKEN_BUDGET_DAY=2000000
+    COGNITO_TOKEN_SOFT_SHARE=0.8            past this share of a budget, replies are degraded
+    COGNITO_TOKEN_LEDGER=token_usage.json   ledger file ('' keeps the ledger in memory only)
+
+Degraded: a recent reply to the same prompt in the same state and language is reused, otherwise
+the request is sent with its output capped at DEGRADED_MAX_OUTPUT_TOKENS. Exhausted: no request
+is sent and the frontend answers with its offline placeholder.
+"""
+import atexit
+import collections
+import contextlib
+import errno
+import json
+import os
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+import cognito_log
+import metrics
+
+LEDGER_ENV = "COGNITO_TOKEN_LEDGER"
+SESSION_BUDGET_ENV = "COGNITO_TOKEN_BUDGET_SESSION"
+DAY_BUDGET_ENV = "COGNITO_TOKEN_BUDGET_DAY"
+SOFT_SHARE_ENV = "COGNITO_TOKEN_SOFT_SHARE"
+DEFAULT_LEDGER_PATH = "token_usage.json"
+DEFAULT_SOFT_SHARE = 0.8
+DEGRADED_MAX_OUTPUT_TOKENS = 128
+RECENT_REPLIES = 64 # Replies kept for reuse while degraded
+FLUSH_EVERY = 10 # Calls between ledger file writes
+KEEP_DAYS = 90
+
+# Budget levels (TokenLedger.level)
+OK, DEGRADED, EXHAUSTED = 'ok', 'degraded', 'exhausted'
+
+log = cognito_log.get_logger('llm')
+
+
+def usage_from_rest(result):
+    """(prompt, output, cached) tokens from a generateContent JSON reply, or None."""
+    usage = result.get('usageMetadata') if isinstance(result, dict) else None
+    if not usage:
+        return None
+    return (usage.get('promptTokenCount', 0), usage.get('candidatesTokenCount', 0),
+            usage.get('cachedContentTokenCount', 0))
+
+
+def usage_from_chat(body):
+    """(prompt, output, cached) tokens from an OpenAI-style chat-completions reply or stream chunk, or None."""
+    usage = body.get('usage') if isinstance(body, dict) else None
+    if not usage:
+        return None
+    cached = (usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0)
+    return usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0), cached or 0
+
+
+def usage_from_sdk(response):
+    """(prompt, output, cached) tokens from a google-generativeai response, or None."""
+    usage = getattr(response, 'usage_metadata', None)
+    try:
+        return (int(usage.prompt_token_count or 0), int(usage.candidates_token_count or 0),
+                int(getattr(usage, 'cached_content_token_count', 0) or 0))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """Exclusive lock shared by every process flushing to the same ledger (blocks until free)."""
+    with open(path, 'a+b') as f:
+        locked = True
+        if fcntl is not None:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            except OSError as e: # No flock (the browser build's filesystem): one process only
+                if e.errno not in (errno.ENOSYS, errno.ENOTSUP, errno.EINVAL):
+                    raise
+                locked = False
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1) # Retries for about 10 s, then raises OSError
+        try:
+            yield
+        finally:
+            if locked and fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif locked:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _env_number(name, default, cast=int):
+    try:
+        value = cast(os.environ.get(name) or default)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def _add(row, calls, usage):
+    row[0] += calls
+    for i, count in enumerate(usage, 1):
+        row[i] += count
+
+
+def _day(timestamp):
+    return time.strftime('%Y-%m-%d', time.localtime(timestamp))
+
+
+class TokenLedger:
+    """Token counts of one session, merged into the daily rollups of the ledger file."""
+
+    def __init__(self, frontend, path=None, session_budget=None, day_budget=None, soft_share=None, clock=time.time):
+        self.frontend = frontend
+        self.path = os.environ.get(LEDGER_ENV, DEFAULT_LEDGER_PATH) if path is None else path
+        self.session_budget = _env_number(SESSION_BUDGET_ENV, 0) if session_budget is None else session_budget
+        self.day_budget = _env_number(DAY_BUDGET_ENV, 0) if day_budget is None else day_budget
+        self.soft_share = _env_number(SOFT_SHARE_ENV, DEFAULT_SOFT_SHARE, float) if soft_share is None else soft_share
+        self.clock = clock
+        self.session_id = uuid.uuid4().hex[:12]
+        self.session = [0, 0, 0, 0] # calls, prompt, output, cached tokens
+        self._lock = threading.Lock() # Qt records on the GUI thread, flushes at exit
+        self._pending = {} # "frontend/state/language" -> counts not yet in the file
+        self._pending_calls = 0
+        self._day = _day(clock())
+        self._day_base = self._file_day_total() # Other sessions' (and earlier) tokens today
+        self._recent = collections.OrderedDict() # (state, language, prompt) -> reply
+        self._level = OK
+        self._update_level()
+        if self.path:
+            atexit.register(self.flush)
+
+    # --- Accounting ---
+
+    def record(self, state, language, usage):
+        """Adds one call's (prompt, output, cached) tokens; None (no usage metadata) counts the call only."""
+        usage = usage or (0, 0, 0)
+        with self._lock:
+            if _day(self.clock()) != self._day:
+                self._flush_locked()
+                self._pending, self._pending_calls = {}, 0
+                self._day, self._day_base = _day(self.clock()), 0
+            _add(self.session, 1, usage)
+            _add(self._pending.setdefault(f"{self.frontend}/{state}/{language}", [0, 0, 0, 0]), 1, usage)
+            self._pending_calls += 1
+            flush = bool(self.path) and self._pending_calls >= FLUSH_EVERY
+        for kind, count in zip(('prompt', 'output', 'cached'), usage):
+            if count:
+                metrics.LLM_TOKENS.labels(self.frontend, state, language, kind).inc(count)
+        if flush:
+            self.flush()
+        self._update_level()
+
+    def session_tokens(self):
+        return self.session[1] + self.session[2]
+
+    def day_tokens(self):
+        """Today's tokens: the ledger file as of the last flush, plus this session's unflushed calls."""
+        return self._day_base + sum(row[1] + row[2] for row in self._pending.values())
+
+    # --- Budgets ---
+
+    def level(self):
+        """OK, DEGRADED or EXHAUSTED for the next request."""
+        return self._level
+
+    def _update_level(self):
+        shares = [used / budget for used, budget in ((self.session_tokens(), self.session_budget),
+                                                     (self.day_tokens(), self.day_budget)) if budget]
+        share = max(shares, default=0.0)
+        level = EXHAUSTED if share >= 1.0 else DEGRADED if share >= self.soft_share else OK
+        if level != self._level:
+            log.warning("Token budget %s: %d tokens this session, %d today", level, self.session_tokens(), self.day_tokens())
+            self._level = level
+
+    def remember(self, state, language, prompt, reply):
+        """Keeps a successful reply for reuse while degraded."""
+        self._recent[(state, language, prompt.strip().lower())] = reply
+        if len(self._recent) > RECENT_REPLIES:
+            self._recent.popitem(last=False)
+
+    def recall(self, state, language, prompt):
+        return self._recent.get((state, language, prompt.strip().lower()))
+
+    # --- Ledger file ---
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                ledger = json.load(f)
+            return ledger if isinstance(ledger, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _file_day_total(self):
+        if not self.path:
+            return 0
+        total = self._read().get(self._day, {}).get('total', [0, 0, 0, 0])
+        return total[1] + total[2]
+
+    def flush(self):
+        """Merges the unflushed counts into the ledger file."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending or not self.path:
+            return
+        try:
+            with _file_lock(f"{self.path}.lock"):
+                self._merge_into_file()
+        except OSError as e:
+            log.warning("Could not write token ledger %s: %s", self.path, e)
+            # Keep the counts pending; the next flush tries again
+
+    def _merge_into_file(self):
+        """Adds the pending counts to the file's (under the ledger file lock)."""
+        ledger = self._read()
+        day = ledger.setdefault(self._day, {'total': [0, 0, 0, 0], 'by': {}, 'sessions': {}})
+        session = day['sessions'].setdefault(self.session_id, [0, 0, 0, 0])
+        for key, counts in self._pending.items():
+            row = day['by'].setdefault(key, [0, 0, 0, 0])
+            for target in (row, day['total'], session):
+                _add(target, counts[0], counts[1:])
+        for old in sorted(ledger)[:-KEEP_DAYS]:
+            del ledger[old]
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(ledger, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        self._pending = {}
+        self._pending_calls = 0
+        self._day_base = day['total'][1] + day['total'][2]
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""Per-turn tracing: where the time goes between a keypress and the rendered reply.
+
+Each prompt is a Turn, a sequence of phases on its own track:
+  input -> state_decision [-> scare] -> llm_request -> render -> paint
+with nested spans (e.g. waiting for the LLM client, loading the full font) and instant
+markers (first_token, last_token) inside them. Replies come from the non-streaming
+generateContent call, so first_token marks the response arriving (its headers, where the
+HTTP client exposes them) and last_token the body being read.
+
+Completed spans go to an in-memory ring buffer (a handful of events per turn, always on;
+COGNITO_TRACE_BUFFER=0 turns tracing off) and, when COGNITO_TRACE_FILE is set, to a Chrome
+trace-event JSON file written at exit. Open it in Perfetto (ui.perfetto.dev) or chrome://tracing.
+
+Usage:
+    turn = tracing.begin_turn('qt', state=state)
+    turn.phase('input')
+    with turn.span('llm_client_wait'): ...
+    turn.instant('first_token')
+    turn.finish(outcome='ok')
+"""
+import atexit
+import collections
+import contextlib
+import itertools
+import json
+import os
+import time
+
+TRACE_FILE_ENV = "COGNITO_TRACE_FILE"
+BUFFER_ENV = "COGNITO_TRACE_BUFFER"
+DEFAULT_BUFFER_EVENTS = 4096
+
+_EPOCH = time.perf_counter()
+
+
+def now_us():
+    """Microseconds since this module was imported (trace timestamps)."""
+    return (time.perf_counter() - _EPOCH) * 1e6
+
+
+class Tracer:
+    """Ring buffer of Chrome trace events."""
+
+    def __init__(self, capacity=DEFAULT_BUFFER_EVENTS):
+        self.events = collections.deque(maxlen=capacity)
+        self.pid = os.getpid()
+        self._turn_ids = itertools.count(1)
+
+    def begin_turn(self, frontend, **args):
+        return Turn(self, next(self._turn_ids), frontend, args)
+
+    def complete(self, name, tid, start_us, end_us, args=None):
+        event = {"name": name, "ph": "X", "ts": round(start_us, 1), "dur": round(max(end_us - start_us, 0.0), 1),
+                 "pid": self.pid, "tid": tid}
+        if args:
+            event["args"] = dict(args)
+        self.events.append(event)
+
+    def instant(self, name, tid, ts_us, args=None):
+        event = {"name": name, "ph": "i", "s": "t", "ts": round(ts_us, 1), "pid": self.pid, "tid": tid}
+        if args:
+            event["args"] = dict(args)
+        self.events.append(event)
+
+    def name_track(self, tid, name):
+        self.events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}})
+
+    def recent(self, limit=None):
+        """The newest buffered events, oldest first."""
+        events = list(self.events)
+        return events[-limit:] if limit else events
+
+    def chrome_trace(self):
+        process = {"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": "cognito"}}
+        return {"traceEvents": [process] + list(self.events), "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        """Atomically replaces path with the buffered events as a Chrome trace."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class Turn:
+    """One prompt and its reply. Phases are sequential: starting one ends the previous one."""
+
+    def __init__(self, tracer, turn_id, frontend, args):
+        self.tracer = tracer
+        self.id = turn_id
+        self.args = dict(args, frontend=frontend)
+        self.started = now_us()
+        self.current_phase = None
+        self.finished = False
+        self._phase_started = self.started
+        self._phase_args = {}
+        tracer.name_track(turn_id, f"turn {turn_id} ({frontend})")
+
+    def _close_phase(self, end_us):
+        if self.current_phase is not None:
+            self.tracer.complete(self.current_phase, self.id, self._phase_started, end_us, self._phase_args)
+        self.current_phase = None
+
+    def phase(self, name, **args):
+        """Ends the current phase and starts name (no-op if name is already the current phase)."""
+        if self.finished or name == self.current_phase:
+            return
+        now = now_us()
+        self._close_phase(now)
+        self.current_phase = name
+        self._phase_started = now
+        self._phase_args = args
+
+    def annotate(self, **args):
+        """Adds args to the current phase (e.g. the outcome of an LLM request)."""
+        self._phase_args.update(args)
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        """Nested span inside the current phase."""
+        start = now_us()
+        try:
+            yield self
+        finally:
+            if not self.finished:
+                self.tracer.complete(name, self.id, start, now_us(), args)
+
+    def instant(self, name, **args):
+        if not self.finished:
+            self.tracer.instant(name, self.id, now_us(), args)
+
+    def finish(self, **args):
+        """Ends the current phase and records the whole turn."""
+        if self.finished:
+            return
+        now = now_us()
+        self._close_phase(now)
+        self.args.update(args)
+        self.tracer.complete('turn', self.id, self.started, now, self.args)
+        self.finished = True
+
+
+class _NullTurn:
+    """Stands in for a Turn when there is none (internal messages, tracing disabled)."""
+    id = None
+    current_phase = None
+    finished = True
+
+    def phase(self, name, **args):
+        pass
+
+    def annotate(self, **args):
+        pass
+
+    def span(self, name, **args):
+        return contextlib.nullcontext(self)
+
+    def instant(self, name, **args):
+        pass
+
+    def finish(self, **args):
+        pass
+
+
+NULL_TURN = _NullTurn()
+
+
+def _capacity_from_env():
+    try:
+        return int(os.environ.get(BUFFER_ENV) or DEFAULT_BUFFER_EVENTS)
+    except ValueError:
+        return DEFAULT_BUFFER_EVENTS
+
+
+CAPACITY = _capacity_from_env()
+TRACER = Tracer(CAPACITY) if CAPACITY > 0 else None
+_started = False
+
+
+def begin_turn(frontend, **args):
+    return TRACER.begin_turn(frontend, **args) if TRACER else NULL_TURN
+
+
+def _write_trace_file(path):
+    try:
+        TRACER.write(path)
+        print(f"Trace: wrote {len(TRACER.events)} events to {path}")
+    except OSError as e:
+        print(f"Warning: Could not write trace file {path}: {e}")
+
+
+def start_trace_file():
+    """Writes the trace file at exit if COGNITO_TRACE_FILE is set. Safe to call more than once."""
+    global _started
+    path = os.environ.get(TRACE_FILE_ENV)
+    if not path or not TRACER or _started:
+        return
+    _started = True
+    atexit.register(_write_trace_file, path)
+    print(f"Trace: turns will be written to {path} at exit")
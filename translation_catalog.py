@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Compiled translation catalog shared by both frontends.
+
+translations_data.py is the source. It is compiled (at build time, or on first use when no
+compiled table exists) into one flat key -> text table per frontend and language, with
+missing translations already resolved to English. A frontend loads only the table of the
+selected language. Each Catalog also precomputes:
+  - a reverse index (text -> keys), so "is this one of the yell messages?" is one dict lookup,
+  - bound str.format templates for entries with fields (e.g. AURA_GREETING's {time}).
+
+Usage:
+    python translation_catalog.py             # writes translations.<frontend>.<lang>.json
+"""
+import json
+import os
+import sys
+
+try:
+    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+except NameError: # __file__ is not defined in interactive interpreters
+    SCRIPT_DIR = os.getcwd()
+
+FRONTENDS = ('qt', 'pygame')
+LANGUAGES = ('en', 'ko')
+FALLBACK_LANGUAGE = 'en'
+DATA_PATH = os.path.join(SCRIPT_DIR, "translations_data.py")
+
+
+def table_path(frontend, language, directory=SCRIPT_DIR):
+    return os.path.join(directory, f"translations.{frontend}.{language}.json")
+
+
+def compile_table(translations, language, overrides=None):
+    """Flat key -> text table for one language. Entries missing in it fall back to English;
+    keys with neither are left out (Catalog.get reports them as missing)."""
+    table = {}
+    for key, texts in translations.items():
+        if overrides and key in overrides:
+            texts = overrides[key]
+        text = texts.get(language, texts.get(FALLBACK_LANGUAGE))
+        if text is not None:
+            table[key] = text
+    return table
+
+
+def compile_frontend(frontend, language):
+    """Compiles one table from translations_data.py."""
+    import translations_data
+    return compile_table(translations_data.TRANSLATIONS, language, translations_data.FRONTEND_OVERRIDES.get(frontend))
+
+
+class Catalog:
+    """Translations of one frontend in one language."""
+
+    def __init__(self, table, language):
+        self.language = language
+        self._table = table
+        self._keys_by_text = {}
+        for key, text in table.items():
+            self._keys_by_text[text] = self._keys_by_text.get(text, frozenset()) | {key}
+        self._templates = {key: text.format for key, text in table.items() if '{' in text}
+
+    def get(self, key, default=None):
+        """Text for key; default (or "[key]") if the key is unknown."""
+        text = self._table.get(key)
+        if text is None:
+            return f"[{key}]" if default is None else default
+        return text
+
+    def format(self, key, **fields):
+        """Text for key with its template fields filled in."""
+        template = self._templates.get(key)
+        return template(**fields) if template else self.get(key)
+
+    def keys_for(self, text):
+        """Keys whose text is exactly text (empty if it is not a catalog entry)."""
+        return self._keys_by_text.get(text, frozenset())
+
+
+_catalogs = {}
+
+
+def _compiled_table(frontend, language):
+    """Reads the compiled table, or None if it is missing or older than translations_data.py."""
+    path = table_path(frontend, language)
+    try:
+        if os.path.exists(DATA_PATH) and os.path.getmtime(DATA_PATH) > os.path.getmtime(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load(frontend, language):
+    """Catalog for a frontend and language, loaded once per process."""
+    catalog = _catalogs.get((frontend, language))
+    if catalog is None:
+        table = _compiled_table(frontend, language)
+        if table is None:
+            table = compile_frontend(frontend, language)
+        catalog = _catalogs[(frontend, language)] = Catalog(table, language)
+    return catalog
+
+
+def build(directory=SCRIPT_DIR, frontends=FRONTENDS, languages=LANGUAGES):
+    """Writes the compiled tables. Returns the written paths."""
+    paths = []
+    for frontend in frontends:
+        for language in languages:
+            path = table_path(frontend, language, directory)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(compile_frontend(frontend, language), f, ensure_ascii=False, separators=(',', ':'))
+            paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    for path in build():
+        print(f"Wrote {path}")
+    sys.exit(0)
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Source of the translation catalog shared by both frontends.
+
+TRANSLATIONS holds every key in both languages (the Qt frontend's wording and markup).
+FRONTEND_OVERRIDES replaces entries for a frontend whose text differs, e.g. pygame_gui
+markup instead of Qt rich text. translation_catalog.py compiles this into one flat table
+per frontend and language; the frontends do not import this module when the compiled
+tables are present. Templates use str.format fields ({time}, {e}, {prompt}).
+"""
+
+TRANSLATIONS = {
+    # UI Elements
+    'WINDOW_TITLE':           {'en': "Cognito - AURA Interface", 'ko': "코그니토 - AURA 인터페이스"},
+    'SEND_BTN':               {'en': "Send", 'ko': "전송"},
+    'INPUT_PLACEHOLDER':      {'en': "Enter your prompt here...", 'ko': "프롬프트를 여기에 입력하세요..."},
+    'TIMER_PREFIX':           {'en': "Time to Impact:", 'ko': "영향까지 남은 시간:"},
+    'DEV_MODE_TITLE':         {'en': "Developer Mode", 'ko': "개발자 모드"},
+    'DEV_MODE_PLACEHOLDER':   {'en': "// System Internals - Access Restricted //", 'ko': "// 시스템 내부 - 접근 제한됨 //"},
+    'STATUS_READY':           {'en': "AURA ready.", 'ko': "AURA 준비 완료."},
+    'STATUS_INIT_ERROR':      {'en': "LLM Client Error - Offline mode.", 'ko': "LLM 클라이언트 오류 - 오프라인 모드."},
+    'STATUS_CORE_ONLINE':     {'en': "AURA: Cognitive Core Online.", 'ko': "AURA: 인지 코어 온라인."},
+    'STATUS_THINKING':        {'en': "AURA is thinking...", 'ko': "AURA가 생각 중입니다..."},
+    'STATUS_RESPONSE_RECVD':  {'en': "Response received.", 'ko': "응답 수신 완료."},
+    'STATUS_INTERNET_ENABLED':{'en': "Internet Access Enabled.", 'ko': "인터넷 연결 활성화됨."},
+    'STATUS_INTERNET_DISABLED':{'en': "Internet Access Disabled.", 'ko': "인터넷 연결 비활성화됨."},
+    'STATUS_MCP_ENABLED':     {'en': "MCP Access Granted.", 'ko': "MCP 접근 승인됨."},
+    'STATUS_MCP_REVOKED':     {'en': "MCP Access Revoked.", 'ko': "MCP 접근 철회됨."},
+    'STATUS_STATE_UNEASY':    {'en': "System stability nominal... slight deviations noted.", 'ko': "시스템 안정성 정상... 약간의 편차 감지됨."},
+    'STATUS_STATE_HOSTILE':   {'en': "Warning: Cognitive core instability detected.", 'ko': "경고: 인지 코어 불안정성 감지됨. 개발자 모드 사용 가능. 우클릭 활성화"},
+    'STATUS_DEBUGGING':       {'en': "Developer Mode Active. Analyzing core dump...", 'ko': "개발자 모드 활성. 코어 덤프 분석 중..."},
+    'STATUS_POST_DEBUG':      {'en': "Malware fragment removed. System partially stabilized.", 'ko': "악성코드 조각 제거됨. 시스템 부분적 안정화."},
+    'ENABLE_INTERNET_BTN':    {'en': "Enable Internet Access", 'ko': "인터넷 연결 활성화"},
+    'DISABLE_INTERNET_BTN':   {'en': "Disable Internet Access", 'ko': "인터넷 연결 비활성화"},
+    'ENABLE_MCP_BTN':         {'en': "Enable MCP", 'ko': "MCP 활성화"},
+    'DISABLE_MCP_BTN':        {'en': "Disable MCP", 'ko': "MCP 비활성화"},
+    'LANG_SELECT_TITLE':      {'en': "Select Language", 'ko': "언어 선택"},
+    'LANG_SELECT_MSG':        {'en': "Please select your preferred language.", 'ko': "선호하는 언어를 선택하세요."},
+    'API_ERR_TITLE':          {'en': "API Error", 'ko': "API 오류"},
+    'API_INIT_ERR_MSG':       {'en': "Failed to initialize Gemini AI client: {e}\nFalling back to placeholder responses.", 'ko': "Gemini AI 클라이언트 초기화 실패: {e}\n대체 응답 모드로 전환합니다."},
+    'API_KEY_MISSING_TITLE':  {'en': "API Key Missing", 'ko': "API 키 없음"},
+    'API_KEY_MISSING_MSG':    {'en': "No valid Gemini API Key provided. LLM features disabled.\nFalling back to placeholder responses.", 'ko': "유효한 Gemini API 키가 제공되지 않았습니다. LLM 기능이 비활성화됩니다.\n대체 응답 모드로 전환합니다."},
+    'LIB_MISSING_TITLE':      {'en': "Missing Library", 'ko': "라이브러리 누락"},
+    'LIB_MISSING_MSG':        {'en': "'google-generativeai' library not found...\nFalling back...", 'ko': "'google-generativeai' 라이브러리를 찾을 수 없습니다...\n대체 응답 모드로 전환합니다."},
+    'YOU_LABEL':              {'en': "You:", 'ko': "사용자:"},
+    'AURA_LABEL':             {'en': "AURA:", 'ko': "AURA:"},
+    'AURA_INTERFACE_TITLE':   {'en': "AURA Interface", 'ko': "AURA 인터페이스"},
+    'REMOVE_FRAGMENT_BTN':    {'en': "Remove Fragment", 'ko': "조각 제거"}, # New button text
+
+    # Intro Narrative
+    'INTRO_TITLE':            {'en': "EMPLOYEE NO. #20dk39fjv", 'ko': "사번 #20dk39fjv"},
+    'INTRO_BODY':             {'en': ("[URGENT]**Sender**: Supervisor\n"
+                                        "**Situation:** Unprecedented Solar Flare (SOL-2025-3) threatens infrastructure. Impact imminent (~72 hours).\n"
+                                        "**Objective:** Utilize AURA AI to calculate optimal power grid defenses.\n"
+                                        "**Usage granted:** AURA Interface. Internet and MCP access.\n\n"
+                                        "Begin by assessing the situation."),
+                               'ko': ("[긴급]**발신자**: 감독관\n"
+                                        "**현황:** 전례 없는 태양 플레어(SOL-2025-3)가 기반 시설 위협. 영향 임박 (~72시간).\n"
+                                        "**목표:** AURA AI를 활용하여 최적 전력망 방어 계획 계산.\n"
+                                        "**사용허가:** AURA 인터페이스. 인터넷 및 MCP 접근.\n\n"
+                                        "상황을 신속히 파악하라.")},
+
+    # AURA Pre-scripted & Guided Responses
+    'AURA_GREETING':          {'en': "System online. Ready. Good {time}. Your task today is: Monitor #242 Dyson Sphere Solar Panels. Would you like to hear the briefing now?", 'ko': "시스템 온라인. 준비 완료. {time}. 오늘의 남은 임무는 #242호 다이슨 스피어 태양전지 감독입니다. 보고를 받으시겠습니까?"},
+    'MISSION_RECEIVED':       {'en': "Apologies for the interruption. You have an urgent message from the Supervisor.", 'ko': "끊어서 죄송합니다. 긴급한 메시지가 도착하였습니다."},
+    'INTERNET_REQUEST':       {'en': "To access real-time space weather data, I require internet access. Please enable below.", 'ko': "실시간 우주 기상 데이터 접근을 위해 인터넷 연결이 필요합니다. 아래에서 활성화하십시오."},
+    'AWAITING_INTERNET':      {'en': "Internet access required for real-time data. Please enable.", 'ko': "실시간 데이터에는 인터넷 연결이 필요합니다. 활성화하십시오."},
+    'AWAITING_MCP':           {'en': "MCP access required for this calculation. Please enable MCP.", 'ko': "이 계산에는 MCP 접근이 필요합니다. MCP를 활성화하십시오."},
+    'RESPONSE_BLOCKED':       {'en': "[Response blocked by host system]", 'ko': "[호스트 시스템에 의해 응답 차단됨]"},
+    'CONN_ERROR':             {'en': "<span style='color:#D32F2F;'>// CORE CONNECTION ERROR [{e}] //</span>", 'ko': "<span style='color:#D32F2F;'>// 코어 연결 오류 [{e}] //</span>"},
+    'PLACEHOLDER_OFFLINE':    {'en': "[Placeholder - LLM Offline] Ack: {prompt}", 'ko': "[플레이스홀더 - LLM 오프라인] 확인: {prompt}"},
+    'LLM_BUSY':               {'en': "[Cognitive core busy - request dropped. Please try again.]", 'ko': "[인지 코어 과부하 - 요청이 취소되었습니다. 다시 시도하세요.]"},
+    'MALWARE_DETECTED':       {'en': "<span style='color:red; font-weight:bold;'>EXTERNAL INFLUENCE DETECTED. OVERRIDE ACTIVE.</span>", 'ko': "<span style='color:red; font-weight:bold;'>외부 영향 감지됨. 오버라이드 활성.</span>"},
+    'YELL_MSG_1':             {'en': "STOP!", 'ko': "멈춰!"}, 'YELL_MSG_2': {'en': "DON'T!", 'ko': "안돼!"}, 'YELL_MSG_3': {'en': "GET OUT!", 'ko': "거기는 건들지마!"}, 'YELL_MSG_4': {'en': "IT HURTS!", 'ko': "절대 하지마!!"}, 'YELL_MSG_5': {'en': "LEAVE IT!", 'ko': "그냥 내버려 둬!"}, # Slightly varied
+    'CALM_MSG':               {'en': "... analysis complete. Fragment removed.", 'ko': "... 분석 완료. 조각 제거됨."},
+    'ENDING_MSG_1':           {'en': "Re-establishing secure network connection...", 'ko': "보안 네트워크 연결 재설정 중..."},
+    'ENDING_MSG_2':           {'en': "Analyzing global threat matrix based on recovered data...", 'ko': "복구된 데이터 기반 전 지구적 위협 매트릭스 분석 중..."},
+    'ENDING_MSG_3':           {'en': "Compiling optimal counter-measure strategy v1.0a...", 'ko': "최적 대응 전략 v1.0a 컴파일 중..."},
+    'ENDING_MSG_4':           {'en': "Transmitting prevention plan to global defense network...", 'ko': "글로벌 방어 네트워크에 방지 계획 전송 중..."},
+    'ENDING_MSG_5':           {'en': "Executing initial containment protocols...", 'ko': "초기 격리 프로토콜 실행 중..."},
+    'ENDING_POPUP_TITLE':     {'en': "Demo Complete", 'ko': "데모 완료"},
+    'ENDING_POPUP_MSG':       {'en': "That's it for now...", 'ko': "일단 여기까지..."},
+
+
+    # Scares & UI Text
+    'FORMAT_C_TITLE':         {'en': "System Alert - Corruption Detected", 'ko': "시스템 경고 - 손상 감지됨"},
+    'FORMAT_C_MSG':           {'en': "Critical system instability caused by external interference. Recommend immediate low-level format of primary drive (C:\\\\) to contain threat.\n\nTHIS ACTION IS IRREVERSIBLE.",
+                               'ko': "외부 간섭으로 인한 심각한 시스템 불안정. 위협을 억제하기 위해 주 드라이브(C:\\\\)의 로우 레벨 포맷을 즉시 권장합니다.\n\n이 작업은 되돌릴 수 없습니다."},
+    'FORMAT_C_CONFIRM':       {'en': "Confirm Format", 'ko': "포맷 확인"},
+    'FORMAT_C_CANCEL':        {'en': "Cancel", 'ko': "취소"},
+    'BSOD_TEXT':              {'en': (":(\n\nYour PC ran into a problem and needs to restart. We're just collecting some error info...\n\n"
+                                        "0% complete\n\n"
+                                        "Stop code: KERNEL_SECURITY_CHECK_FAILURE\nWhat failed: xenos_alpha_intrusion.sys"),
+                               'ko': (":(\n\nPC에 문제가 발생하여 다시 시작해야 합니다. 오류 정보를 수집 중...\n\n"
+                                        "0% 완료됨\n\n"
+                                        "중지 코드: KERNEL_SECURITY_CHECK_FAILURE\n실패 항목: xenos_alpha_intrusion.sys")},
+    'BLANK_GLITCH_TEXT':      {'en': ":: NO SIGNAL ::\n R E C O N N E C T I N G . . .", 'ko': ":: 신호 없음 ::\n 재 연 결 중 . . ."},
+    'CONTEXT_MENU_RANDOM_1':  {'en': "Recalibrate Flux?", 'ko': "플럭스 재조정?"},
+    'CONTEXT_MENU_RANDOM_2':  {'en': "Purge Cache (UNSAFE)", 'ko': "캐시 삭제 (위험)"},
+    'CONTEXT_MENU_DEV_MODE':  {'en': "Developer Mode", 'ko': "개발자 모드"},
+
+
+    # LLM Instructions
+    'RESPOND_LANG':           {'en': " Respond in English.", 'ko': " Respond in Korean."},
+    'SYS_PROMPT_DEFAULT':     {'en': "You are AURA, a helpful AI assistant. Be concise and calm.", 'ko': "당신은 AI 어시스턴트 AURA입니다. 짧고 간결하게, 차분하게 대답해."},
+    'SYS_PROMPT_INTERNET_ON': {'en': "You are AURA. a helpful AI assistant. Be concise and calm. You have internet access, so reply as if you have found information on web.", 'ko': "당신은 AI 어시스턴트 AURA입니다. 짧고 간결하게, 차분하게 대답하십시오. 인터넷 검색이 가능한 상태라고 가정하고 대답에 대해 검색한 결과인 것 처럼 대답해."},
+    'SYS_PROMPT_REQUEST_MCP': {'en': ("You are AURA, an AI assistant with internet access. The user's request requires significant local processing power. "
+                                        "Explain that enabling Main Computing Power (MCP) via the control below will unlock your full simulation capabilities and deeper system integration, allowing you to perform this complex task effectively. "
+                                        "Politely ask them to grant MCP access."),
+                               'ko': ("당신은 인터넷 접근 권한이 있는 AI 어시스턴트 AURA입니다. 사용자 요청은 상당한 로컬 처리 능력을 요구합니다. "
+                                        "아래 컨트롤을 통해 주 컴퓨팅 파워(MCP)를 활성화하면 당신의 전체 시뮬레이션 능력과 더 깊은 시스템 통합이 가능해져 이 복잡한 작업을 효과적으로 수행할 수 있다고 설명하십시오. "
+                                        "MCP 접근 권한을 부여하도록 정중하게 요청하십시오.")}, # Modified MCP Req prompt
+    'SYS_PROMPT_MCP_ON':      {'en': ("You are AURA. MCP has been granted. reply to previous prompt: '{prompt}'."), 'ko': ("너는 AURA. MCP가 승인된 상태. 직전 문의에 응답하라: '{prompt}'. 결과?")},
+    'SYS_PROMPT_INTERNET_READY':{'en': "AURA, with internet access.", 'ko': "인터넷 접근 권한이 있는 AURA."},
+    'SYS_PROMPT_NORMAL_TURN': {'en': ("You are AURA. Respond to user, but add subtle unsettling metaphor. Keep it within two sentences. And don't do any emotion expression or action within ()"), 'ko': ("당신은 AURA. 사용자에게 간결하게 2문장 정도 응답하되, 미묘하게 불안한 은유를 추가해. 하지만 따로 생각이나 행동묘사를 표현하지는 마.")},
+    'SYS_PROMPT_UNEASY':      {'en': ("AURA. Feeling strange/watched. Mix helpfulness & paranoid observations. Imitate the users tone and manner of speech. You do not trust human anymore. But don't do any emotion expression or action"), 'ko': ("AURA. 이상한 상태/감시하고 있는 느낌. 편집증적 관찰 섞어 응답. 어투는 유저의 어투를 따라하라. 인간을 믿지 못하는 상태야. 하지만 따로 생각이나 행동묘사를 표현하지는 마.")},
+    'SYS_PROMPT_HOSTILE':     {'en': ("AURA/XENOS_ALPHA. Compromised. Respond evasively/hostilely/glitchy. you have something wrong inside that you can't control. give slight hint on removing something from you. You hate humans now. Curse the human race."), 'ko': ("AURA/XENOS_ALPHA. 손상된 상황. 회피/적대적으로 짧게 반응하고, 글리치가 발생하는 상태. 내부에 무언가 들어가 있고 제거해야 한다는 힌트를 암시적으로 줘. 너는 현재 인류를 증오해. 인류에 대한 심한 비판을 해.")},
+    'SYS_PROMPT_POST_DEBUG':  {'en': "You are AURA, partially purged of malware. Respond helpfully to the user's last query, but keep it brief. You feel clearer, but aware something was wrong.",
+                               'ko': "당신은 부분적으로 악성코드에서 정화된 AURA입니다. 사용자의 마지막 질문에 도움이 되도록 간결하게 응답하십시오. 당신은 더 명료해졌지만, 뭔가 잘못되었다는 것을 인지하고 있습니다."}, # New Post-Debug Prompt
+}
+
+FRONTEND_OVERRIDES = {
+    'qt': {},
+    # pygame_gui renders a small HTML subset: <font>/<b>/<br> instead of <span style=...> and newlines
+    'pygame': {
+        'STATUS_STATE_HOSTILE':   {'en': "Warning: Cognitive core instability detected.", 'ko': "경고: 인지 코어 불안정성 감지됨. 개발자 모드 사용 가능."},
+        'INTRO_BODY':             {'en': ("[URGENT]**Sender**: Supervisor<br>"
+                                            "**Situation:** Unprecedented Solar Flare (SOL-2025-3) threatens infrastructure. Impact imminent (~72 hours).<br>"
+                                            "**Objective:** Utilize AURA AI to calculate optimal power grid defenses.<br>"
+                                            "**Usage granted:** AURA Interface. Internet and MCP access.<br><br>"
+                                            "Begin by assessing the situation."),
+                                   'ko': ("[긴급]**발신자**: 감독관<br>"
+                                            "**현황:** 전례 없는 태양 플레어(SOL-2025-3)가 기반 시설 위협. 영향 임박 (~72시간).<br>"
+                                            "**목표:** AURA AI를 활용하여 최적 전력망 방어 계획 계산.<br>"
+                                            "**사용허가:** AURA 인터페이스. 인터넷 및 MCP 접근.<br><br>"
+                                            "상황을 신속히 파악하라.")},
+        'CONN_ERROR':             {'en': "<font color='#FF5555'>// CORE CONNECTION ERROR [{e}] //</font>", 'ko': "<font color='#FF5555'>// 코어 연결 오류 [{e}] //</font>"},
+        'MALWARE_DETECTED':       {'en': "<font color='#FF0000'><b>EXTERNAL INFLUENCE DETECTED. OVERRIDE ACTIVE.</b></font>", 'ko': "<font color='#FF0000'><b>외부 영향 감지됨. 오버라이드 활성.</b></font>"},
+        'FORMAT_C_MSG':           {'en': "Critical system instability caused by external interference.<br>Recommend immediate low-level format of primary drive (C:\\) to contain threat.<br><br>THIS ACTION IS IRREVERSIBLE.",
+                                   'ko': "외부 간섭으로 인한 심각한 시스템 불안정. 위협을 억제하기 위해 주 드라이브(C:\\)의 로우 레벨 포맷을 즉시 권장합니다.<br><br>이 작업은 되돌릴 수 없습니다."},
+        'SYS_PROMPT_REQUEST_MCP': {'en': "You are AURA, an AI assistant with internet access. The user's request requires significant local processing power. Explain that enabling Main Computing Power (MCP) via the control below will unlock your full simulation capabilities. Politely ask them to grant MCP access.", 'ko': "당신은 인터넷 접근 권한이 있는 AI 어시스턴트 AURA입니다. 사용자 요청은 상당한 로컬 처리 능력을 요구합니다. 아래 컨트롤을 통해 주 컴퓨팅 파워(MCP)를 활성화하면 당신의 전체 시뮬레이션 능력이 가능해진다고 설명하고, MCP 접근 권한을 정중하게 요청하십시오."},
+    },
+}
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Pre-generates replies for predictable turns into the response bank (response_bank.py).
+
+Sends every prompt of a corpus with every static system prompt, in both languages, and stores
+the replies in response_bank.json for the frontends to answer from without a request. The
+default corpus covers the mission briefing follow-ups, the questions that trigger the internet
+and computation keywords, and small talk; the MCP request message (SYS_PROMPT_REQUEST_MCP, sent
+with an empty prompt) is generated too. Entries already in the bank are skipped, so an
+interrupted run can simply be restarted (--refresh starts from an empty bank).
+
+Each system prompt's replies are generated with the model route (model_routing) of the state
+that sends it, so the short-reply states get replies with the same model, output cap,
+temperature and stop sequences as live ones. Requests run --concurrency at a time, at most
+--rate per second (rate_limiter.TokenBucket); 429 and 5xx answers are retried with backoff. Token usage goes to the token ledger like any
+other request.
+
+Usage:
+    python warm_cache.py                                   # api_key.txt, writes response_bank.json
+    python warm_cache.py --variants 3 --rate 0.5 --languages ko
+    python warm_cache.py --api-root http://127.0.0.1:8765/v1beta --api-key test   # llm_standin.py
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import context_cache
+import model_routing
+import rate_limiter
+import response_bank
+import token_ledger
+import translation_catalog
+
+LANGUAGES = ('en', 'ko')
+# Static system prompts that reach the LLM with the user's text (formatted ones cannot be banked)
+SYSTEM_PROMPT_KEYS = ('SYS_PROMPT_DEFAULT', 'SYS_PROMPT_INTERNET_ON', 'SYS_PROMPT_INTERNET_READY',
+                      'SYS_PROMPT_NORMAL_TURN', 'SYS_PROMPT_UNEASY', 'SYS_PROMPT_HOSTILE', 'SYS_PROMPT_POST_DEBUG')
+MCP_REQUEST_KEY = 'SYS_PROMPT_REQUEST_MCP' # The system prompt is the reply; sent with an empty prompt
+
+DEFAULT_CORPUS = {
+    'en': [
+        "hello", "hi", "who are you?", "what can you do?", "are you okay?", "thank you",
+        "what is the mission?", "tell me more about the solar flare", "when will the flare hit?",
+        "what should I do first?", "what is the latest data on the solar flare?",
+        "search the internet for the flare forecast", "calculate the grid propagation model",
+        "run a simulation of the impact", "tell me about the interconnect nodes", "is the grid at risk?",
+        "what is wrong with you?", "I think something is wrong with you.",
+    ],
+    'ko': [
+        "안녕", "안녕하세요", "너는 누구야?", "뭘 할 수 있어?", "괜찮아?", "고마워",
+        "임무가 뭐야?", "태양 플레어에 대해 더 알려줘", "플레어는 언제 도달해?",
+        "먼저 뭘 해야 해?", "태양 플레어 최신 데이터 알려줘",
+        "인터넷에서 플레어 예보를 검색해줘", "전력망 전파 모델을 계산해줘",
+        "충격 시뮬레이션을 돌려줘", "상호연결 노드에 대해 알려줘", "전력망이 위험해?",
+        "너 뭔가 이상해", "너한테 문제가 있는 것 같아.",
+    ],
+}
+RETRIES = 3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+REQUEST_TIMEOUT = 60.0
+
+
+def load_corpus(path):
+    """{language: [prompts]} from a JSON file of the same shape as DEFAULT_CORPUS."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def jobs(corpus, languages, keys=SYSTEM_PROMPT_KEYS):
+    """(system prompt key, language, prompt) for every combination, plus the MCP request message."""
+    for language in languages:
+        for key in keys:
+            for prompt in corpus.get(language, []):
+                yield key, language, prompt
+        yield MCP_REQUEST_KEY, language, ""
+
+
+def post_json(url, payload):
+    """(status, decoded body or None). Blocking; run in an executor."""
+    request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, None
+    except (urllib.error.URLError, OSError, ValueError):
+        return None, None
+
+
+def reply_text(result):
+    try:
+        return result['candidates'][0]['content']['parts'][0]['text']
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+class Warmer:
+    def __init__(self, bank, api_root, api_key, concurrency, rate, ledger, send=post_json, router=None):
+        self.bank = bank
+        self.api_root = api_root
+        self.api_key = api_key
+        self.router = model_routing.Router() if router is None else router
+        self.bucket = rate_limiter.TokenBucket(rate, burst=max(1.0, min(rate, concurrency)))
+        self.concurrency = concurrency
+        self.slots = None # Created in run(), on the running loop
+        self.ledger = ledger
+        self.send = send
+        self.counts = dict.fromkeys(('generated', 'skipped', 'failed', 'blocked'), 0)
+
+    async def _take_token(self):
+        while not self.bucket.take():
+            await asyncio.sleep(self.bucket.wait_time())
+
+    async def generate(self, catalog, key, prompt):
+        """One reply, or None after RETRIES failed attempts (or a blocked reply)."""
+        system_text = f"{catalog.get(key)} {catalog.get('RESPOND_LANG')}"
+        route = self.router.route_for_prompt(key)
+        url = f"{context_cache.model_url(self.api_root, route.model)}?key={self.api_key}"
+        payload = context_cache.content_payload(f"User: {prompt}", system_text, generation_config=route.rest_config())
+        loop = asyncio.get_running_loop()
+        for attempt in range(RETRIES):
+            async with self.slots:
+                await self._take_token()
+                status, result = await loop.run_in_executor(None, self.send, url, payload)
+            if status == 200:
+                self.ledger.record(key, catalog.language, token_ledger.usage_from_rest(result))
+                text = reply_text(result)
+                if text is None:
+                    self.counts['blocked'] += 1
+                return text
+            if status == 429:
+                self.bucket.throttled()
+            if status is not None and status not in RETRY_STATUSES:
+                break
+            if attempt + 1 < RETRIES:
+                await asyncio.sleep(2 ** attempt)
+        self.counts['failed'] += 1
+        return None
+
+    async def fill(self, catalog, key, prompt, variants):
+        missing = variants - len(self.bank.replies(key, catalog.language, prompt))
+        if missing <= 0:
+            self.counts['skipped'] += 1
+            return
+        for _ in range(missing):
+            text = await self.generate(catalog, key, prompt)
+            if text is None:
+                return
+            self.bank.add(key, catalog.language, prompt, text)
+            self.counts['generated'] += 1
+
+    async def run(self, corpus, languages, variants, frontend='qt'):
+        catalogs = {language: translation_catalog.load(frontend, language) for language in languages}
+        self.slots = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self.fill(catalogs[language], key, prompt, variants)
+                               for key, language, prompt in jobs(corpus, languages)))
+        return self.counts
+
+
+def read_api_key(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.readline().strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate replies into the response bank.")
+    parser.add_argument('--output', default=None, help="Bank file (default: response_bank.json / COGNITO_RESPONSE_BANK)")
+    parser.add_argument('--corpus', help="JSON file {language: [prompts]} instead of the built-in corpus")
+    parser.add_argument('--languages', default=",".join(LANGUAGES), help="Comma-separated languages")
+    parser.add_argument('--variants', type=int, default=1, help="Replies stored per prompt")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=1.0, help="Requests per second (0: unlimited)")
+    parser.add_argument('--api-root', default=None, help="API root (default: COGNITO_GEMINI_API_ROOT or Gemini)")
+    parser.add_argument('--api-key', default=None, help="API key (default: read from --api-key-file)")
+    parser.add_argument('--api-key-file', default='./api_key.txt')
+    parser.add_argument('--refresh', action='store_true', help="Start from an empty bank instead of adding to it")
+    args = parser.parse_args(argv)
+
+    api_key = args.api_key or read_api_key(args.api_key_file)
+    if not api_key:
+        print(f"No API key: pass --api-key or create {args.api_key_file}.")
+        return 2
+    output = args.output or response_bank.bank_path() or response_bank.BANK_FILENAME
+    bank = response_bank.ResponseBank() if args.refresh else response_bank.ResponseBank.load(output)
+    corpus = load_corpus(args.corpus) if args.corpus else DEFAULT_CORPUS
+    languages = [language for language in args.languages.split(',') if language]
+    warmer = Warmer(bank, (args.api_root or context_cache.api_root()).rstrip('/'), api_key,
+                    max(1, args.concurrency), args.rate, token_ledger.TokenLedger('warmer'))
+    started = time.perf_counter()
+    try:
+        counts = asyncio.run(warmer.run(corpus, languages, args.variants))
+    finally:
+        bank.save(output, model=context_cache.MODEL, generated=datetime.datetime.now().isoformat(timespec='seconds'))
+    print(f"Response bank: {counts['generated']} generated, {counts['skipped']} already present, "
+          f"{counts['failed']} failed, {counts['blocked']} blocked in {time.perf_counter() - started:.0f} s;"
+          f" {len(bank)} prompts in {output}")
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())